@@ -3,6 +3,7 @@
 import logging
 import re
 from abc import ABCMeta, abstractmethod
+from collections import namedtuple
 from datetime import timedelta
 
 from django.conf import settings
@@ -13,11 +14,13 @@ from eventtracking import tracker
 from search.search_engine_base import SearchEngine
 
 from cms.djangoapps.contentstore.course_group_config import GroupConfiguration
+from cms.djangoapps.contentstore.models import IndexedStructureVersion
 from common.djangoapps.course_modes.models import CourseMode
 from openedx.core.lib.courses import course_image_url, course_organization_image_url
 from xmodule.annotator_mixin import html_to_text  # lint-amnesty, pylint: disable=wrong-import-order
 from xmodule.library_tools import normalize_key_for_search  # lint-amnesty, pylint: disable=wrong-import-order
 from xmodule.modulestore import ModuleStoreEnum  # lint-amnesty, pylint: disable=wrong-import-order
+from xmodule.util.keys import BlockKey  # lint-amnesty, pylint: disable=wrong-import-order
 
 # REINDEX_AGE is the default amount of time that we look back for changes
 # that might have happened. If we are provided with a time at which the
@@ -30,8 +33,21 @@ REINDEX_AGE = timedelta(0, 60)  # 60 seconds
 # timed out for courseware indexing.
 INDEXING_REQUEST_TIMEOUT = 60
 
+# INDEXING_BATCH_SIZE is the maximum number of documents that are added to, or
+# removed from, the index in a single request to the search engine.
+INDEXING_BATCH_SIZE = 500
+
 log = logging.getLogger('edx.modulestore')
 
+# The blocks of a structure that changed since the version of it that was last indexed:
+# `changed` are the blocks whose documents have to be updated, i.e. the blocks whose own
+# data changed, unless only their children changed, their descendants, which may inherit
+# from them, and their ancestors below the root, whose content groups depend on theirs;
+# `visited` are the blocks that indexing walks through, i.e. the changed blocks and their
+# descendants, whose content groups restrict theirs; and `deleted` are the blocks that
+# are no longer in the structure.
+StructureChanges = namedtuple('StructureChanges', ['changed', 'visited', 'deleted'])
+
 
 def strip_html_content_to_text(html_content):
     """ Gets only the textual part for html content - useful for building text to be searched """
@@ -45,6 +61,72 @@ def strip_html_content_to_text(html_content):
     return text_content
 
 
+def get_structure_changes(old_blocks, new_blocks):
+    """
+    Returns the StructureChanges between the given `blocks` of two versions of
+    a split modulestore structure.
+    """
+    changed = set()
+    # blocks whose descendants changed with them
+    pending = []
+    for block_key, block_data in new_blocks.items():
+        old_block_data = old_blocks.get(block_key)
+        if old_block_data is None or _block_data_changed(old_block_data, block_data, ignore_children=True):
+            pending.append(block_key)
+        elif _block_data_changed(old_block_data, block_data):
+            changed.add(block_key)
+
+    parents = {}
+    for block_key, block_data in new_blocks.items():
+        for child in block_data.fields.get('children', []):
+            parents[BlockKey(*child)] = block_key
+
+    changed |= _get_subtrees(new_blocks, pending)
+
+    # The root isn't indexed, so only the ancestors that have parents are changed with their descendants.
+    for block_key in list(changed):
+        block_key = parents.get(block_key)
+        while block_key in parents and block_key not in changed:
+            changed.add(block_key)
+            block_key = parents[block_key]
+
+    return StructureChanges(changed, _get_subtrees(new_blocks, changed), set(old_blocks) - set(new_blocks))
+
+
+def _get_subtrees(blocks, block_keys):
+    """
+    Returns the given blocks of a structure and all their descendants.
+    """
+    subtrees = set()
+    pending = list(block_keys)
+    while pending:
+        block_key = pending.pop()
+        if block_key in subtrees or block_key not in blocks:
+            continue
+        subtrees.add(block_key)
+        pending.extend(BlockKey(*child) for child in blocks[block_key].fields.get('children', []))
+    return subtrees
+
+
+def _block_data_changed(old_block_data, new_block_data, ignore_children=False):
+    """
+    Returns whether the content or settings of a block, or, unless
+    `ignore_children`, its children, differ between two versions of a
+    structure. Only its edit info may differ otherwise.
+    """
+    old_fields, new_fields = old_block_data.fields, new_block_data.fields
+    if ignore_children:
+        old_fields = {name: value for name, value in old_fields.items() if name != 'children'}
+        new_fields = {name: value for name, value in new_fields.items() if name != 'children'}
+    return (
+        old_block_data.block_type != new_block_data.block_type or
+        old_block_data.definition != new_block_data.definition or
+        old_fields != new_fields or
+        old_block_data.defaults != new_block_data.defaults or
+        old_block_data.get_asides() != new_block_data.get_asides()
+    )
+
+
 def indexing_is_enabled():
     """
     Checks to see if the indexing feature is enabled
@@ -113,6 +195,30 @@ class SearchIndexerBase(metaclass=ABCMeta):
         result_ids = [result["data"]["id"] for result in response["results"]]
         searcher.remove(result_ids)
 
+    @classmethod
+    def get_structure_changes(cls, modulestore, structure_key, structure):
+        """
+        Returns the StructureChanges of the published structure of the given
+        course or library since the version of it that was last indexed, or
+        None if they can't be determined, e.g. because it was never indexed
+        or isn't stored in the split modulestore.
+        """
+        structure_version = getattr(structure, 'course_version', None)
+        indexed_version = IndexedStructureVersion.get_version(cls.INDEX_NAME, structure_key)
+        if structure_version is None or indexed_version is None:
+            return None
+
+        store = modulestore
+        if hasattr(store, '_get_modulestore_for_courselike'):
+            store = store._get_modulestore_for_courselike(structure_key)  # pylint: disable=protected-access
+        if not hasattr(store, 'get_structures_by_id'):
+            return None
+        indexed_version = structure_key.as_object_id(indexed_version)
+        structures = store.get_structures_by_id([indexed_version, structure_version])
+        if indexed_version not in structures or structure_version not in structures:
+            return None
+        return get_structure_changes(structures[indexed_version]['blocks'], structures[structure_version]['blocks'])
+
     @classmethod
     def index(cls, modulestore, structure_key, triggered_at=None, reindex_age=REINDEX_AGE, timeout=INDEXING_REQUEST_TIMEOUT):  # lint-amnesty, pylint: disable=line-too-long, too-many-statements
         """
@@ -124,7 +230,11 @@ class SearchIndexerBase(metaclass=ABCMeta):
         structure_key (CourseKey|LibraryKey) - course or library identifier
 
         triggered_at (datetime) - provides time at which indexing was triggered;
-            useful for index updates - only things changed recently from that date
+            useful for index updates - only the items that changed since the
+            structure was last indexed, and their ancestors, will have their index
+            updated, and only they and their descendants are walked through.
+            If the changes since then
+            can't be determined, only things changed recently from that date
             (within REINDEX_AGE above ^^) will have their index updated, others skip
             updating their index but are still walked through in order to identify
             which items may need to be removed from the index
@@ -157,6 +267,12 @@ class SearchIndexerBase(metaclass=ABCMeta):
         # instead of per item index API call.
         items_index = []
 
+        # structure_changes are the changes since the structure was last indexed,
+        # if only the changed items are indexed, and removed_items are the ids of
+        # the items that are then removed from the index.
+        structure_changes = None
+        removed_items = set()
+
         def get_item_location(item):
             """
             Gets the version agnostic item location
@@ -178,10 +294,25 @@ class SearchIndexerBase(metaclass=ABCMeta):
             Returns:
             item_content_groups - content groups assigned to indexed item
             """
-            item_index_dictionary = item.index_dictionary()
-            # if it's not indexable and it does not have children, then ignore
-            if not item_index_dictionary and not item.has_children:
-                return
+            item_id = str(cls._id_modifier(item.scope_ids.usage_id))
+            # when only changed items are indexed, the unchanged descendants of changed
+            # items are walked only for their content groups
+            walk_only = False
+            if structure_changes is not None:
+                block_key = BlockKey.from_usage_key(item.location)
+                if block_key not in structure_changes.visited:
+                    return
+                skip_index = walk_only = block_key not in structure_changes.changed
+
+            if walk_only or (skip_index and item.has_children):
+                item_index_dictionary = None
+            else:
+                item_index_dictionary = item.index_dictionary()
+                # if it's not indexable and it does not have children, then ignore
+                if not item_index_dictionary and not item.has_children:
+                    if structure_changes is not None:
+                        removed_items.add(item_id)
+                    return
 
             item_content_groups = None
 
@@ -205,7 +336,6 @@ class SearchIndexerBase(metaclass=ABCMeta):
                 item_location = get_item_location(item)
                 item_content_groups = groups_usage_info.get(str(item_location), None)
 
-            item_id = str(cls._id_modifier(item.scope_ids.usage_id))
             indexed_items.add(item_id)
             if item.has_children:
                 # determine if it's okay to skip adding the children herein based upon how recently any may have changed
@@ -224,6 +354,9 @@ class SearchIndexerBase(metaclass=ABCMeta):
                 if None in children_groups_usage:
                     item_content_groups = None
 
+            if walk_only:
+                # the item is indexed with these content groups already
+                return item_content_groups
             if skip_index or not item_index_dictionary:
                 return
 
@@ -253,12 +386,30 @@ class SearchIndexerBase(metaclass=ABCMeta):
                 # First perform any additional indexing from the structure object
                 cls.supplemental_index_information(modulestore, structure)
 
+                if triggered_at is not None:
+                    structure_changes = cls.get_structure_changes(modulestore, structure_key, structure)
+
                 # Now index the content
                 for item in structure.get_children():
                     prepare_item_index(item, groups_usage_info=groups_usage_info)
-                if items_index:
-                    searcher.index(items_index, request_timeout=timeout)
-                cls.remove_deleted_items(searcher, structure_key, indexed_items)
+                for start in range(0, len(items_index), INDEXING_BATCH_SIZE):
+                    searcher.index(items_index[start:start + INDEXING_BATCH_SIZE], request_timeout=timeout)
+
+                if structure_changes is None:
+                    cls.remove_deleted_items(searcher, structure_key, indexed_items)
+                else:
+                    removed_items.update(
+                        str(cls._id_modifier(structure.location.course_key.make_usage_key(*block_key)))
+                        for block_key in structure_changes.deleted
+                    )
+                    # search engines ignore the ids of documents that aren't in the index
+                    removed_ids = list(removed_items)
+                    for start in range(0, len(removed_ids), INDEXING_BATCH_SIZE):
+                        searcher.remove(removed_ids[start:start + INDEXING_BATCH_SIZE])
+
+                structure_version = getattr(structure, 'course_version', None)
+                if structure_version is not None and not error_list:
+                    IndexedStructureVersion.set_version(cls.INDEX_NAME, structure_key, structure_version)
         except Exception as err:  # pylint: disable=broad-except
             # broad exception so that index operation does not prevent the rest of the application from working
             log.exception(
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.20 on 2026-10-18 12:00
+
+import opaque_keys.edx.django.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contentstore', '0014_remove_componentlink_downstream_is_modified_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndexedStructureVersion',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('index_name', models.CharField(help_text='Name of the search index', max_length=100)),
+                (
+                    'context_key',
+                    opaque_keys.edx.django.models.CourseKeyField(
+                        help_text='Key of the indexed course or library', max_length=255
+                    ),
+                ),
+                ('structure_version', models.CharField(help_text='Version of the indexed structure', max_length=255)),
+                ('updated', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'unique_together': {('index_name', 'context_key')},
+            },
+        ),
+    ]
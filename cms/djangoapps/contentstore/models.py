@@ -618,3 +618,45 @@ class LearningContextLinksStatus(models.Model):
         self.status = status
         self.updated = updated or datetime.now(tz=timezone.utc)
         self.save()
+
+
+class IndexedStructureVersion(models.Model):
+    """
+    The version of the published structure of a course or library whose content
+    was last indexed in a search index.
+
+    Indexing the content again after a publish only updates the documents of
+    the blocks that changed since that version.
+    """
+    index_name = models.CharField(max_length=100, help_text=_("Name of the search index"))
+    context_key = CourseKeyField(max_length=255, help_text=_("Key of the indexed course or library"))
+    structure_version = models.CharField(max_length=255, help_text=_("Version of the indexed structure"))
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = [('index_name', 'context_key')]
+
+    def __str__(self):
+        return f"{self.index_name}|{self.context_key}|{self.structure_version}"
+
+    @classmethod
+    def get_version(cls, index_name: str, context_key: CourseKey) -> str | None:
+        """
+        Returns the version of the structure of the given course or library that
+        was last indexed in the given search index, if any.
+        """
+        return cls.objects.filter(
+            index_name=index_name, context_key=context_key,
+        ).values_list('structure_version', flat=True).first()
+
+    @classmethod
+    def set_version(cls, index_name: str, context_key: CourseKey, structure_version) -> None:
+        """
+        Records the version of the structure of the given course or library that
+        was just indexed in the given search index.
+        """
+        cls.objects.update_or_create(
+            index_name=index_name,
+            context_key=context_key,
+            defaults={'structure_version': str(structure_version)},
+        )
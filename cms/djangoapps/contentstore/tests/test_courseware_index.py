@@ -20,6 +20,7 @@ from cms.djangoapps.contentstore.courseware_index import (
     LibrarySearchIndexer,
     SearchIndexingError
 )
+from cms.djangoapps.contentstore.models import IndexedStructureVersion
 from cms.djangoapps.contentstore.signals.handlers import listen_for_course_publish, listen_for_library_update
 from cms.djangoapps.contentstore.tasks import update_search_index
 from cms.djangoapps.contentstore.tests.utils import CourseTestCase
@@ -343,9 +344,11 @@ class TestCoursewareSearchIndexer(MixedWithOptionsTestCase):
 
         before_time = datetime.now(UTC)
         self.publish_item(store, vertical2.location)
-        # index based on time, will include an index of the origin sequential
+        # index based on time, when the version of the course that was last indexed
+        # is unknown, will include an index of the origin sequential
         # because it is in a common subtree but not of the original vertical
         # because the original sequential's subtree is too old
+        IndexedStructureVersion.objects.all().delete()
         new_indexed_count = self.index_recent_changes(store, before_time)
         self.assertEqual(new_indexed_count, 5)
 
@@ -353,6 +356,39 @@ class TestCoursewareSearchIndexer(MixedWithOptionsTestCase):
         indexed_count = self.reindex_course(store)
         self.assertEqual(indexed_count, 7)
 
+    def _test_incremental_index(self, store):
+        """ Make sure that only the items changed since the course was last indexed are indexed again """
+        self.publish_item(store, self.vertical.location)
+        indexed_count = self.reindex_course(store)
+        self.assertEqual(indexed_count, 4)
+
+        # only the edited html and its ancestors, whose content groups depend on it,
+        # are indexed again, even though everything is recent enough
+        self.html_unit.display_name = "Edited Html Content"
+        self.update_item(store, self.html_unit)
+        self.publish_item(store, self.vertical.location)
+        new_indexed_count = self.index_recent_changes(store, datetime(2015, 1, 1, tzinfo=UTC))
+        self.assertEqual(new_indexed_count, 4)
+        response = self.search()
+        self.assertEqual(response["total"], 4)
+        self.assertIn(
+            "Edited Html Content",
+            [result["data"]["content"]["display_name"] for result in response["results"]],
+        )
+
+        # once the html is deleted, only its vertical and the vertical's ancestors are
+        # indexed again and the html is removed
+        self.delete_item(store, self.html_unit.location)
+        self.publish_item(store, self.vertical.location)
+        new_indexed_count = self.index_recent_changes(store, datetime(2015, 1, 1, tzinfo=UTC))
+        self.assertEqual(new_indexed_count, 3)
+        response = self.search()
+        self.assertEqual(response["total"], 3)
+
+        # nothing is indexed again when nothing changed
+        new_indexed_count = self.index_recent_changes(store, datetime(2015, 1, 1, tzinfo=UTC))
+        self.assertEqual(new_indexed_count, 0)
+
     def _test_course_about_property_index(self, store):
         """
         Test that informational properties in the course object end up in the course_info index.
@@ -482,6 +518,9 @@ class TestCoursewareSearchIndexer(MixedWithOptionsTestCase):
     def test_time_based_index(self):
         self._test_time_based_index(self.store)
 
+    def test_incremental_index(self):
+        self._test_incremental_index(self.store)
+
     def test_exception(self):
         self._test_exception(self.store)
 
@@ -71,6 +71,11 @@ update_module_store_settings(
     },
 )
 
+# Threads don't see the data of the transaction of the test
+COURSE_OVERVIEW_REFRESH_MAX_WORKERS = 1
+# Rolled back test transactions don't remove the overviews that they saved from the shared cache
+COURSE_OVERVIEW_CACHE_TIMEOUT = 0
+
 CONTENTSTORE = {
     "ENGINE": "xmodule.contentstore.mongo.MongoContentStore",
     "DOC_STORE_CONFIG": {
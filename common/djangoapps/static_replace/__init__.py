@@ -2,16 +2,19 @@
 
 import logging
 import re
+from functools import lru_cache
 
 from django.conf import settings
 from django.contrib.staticfiles import finders
 from django.contrib.staticfiles.storage import staticfiles_storage
+from edx_django_utils.cache import RequestCache
 from opaque_keys.edx.locator import AssetLocator
 
 from xmodule.contentstore.content import StaticContent
 
 log = logging.getLogger(__name__)
 XBLOCK_STATIC_RESOURCE_PREFIX = '/static/xblock/'
+STATIC_URL_LOOKUPS_CACHE_NAMESPACE = 'static_replace.static_url_lookups'
 
 
 def _url_replace_regex(prefix):
@@ -29,6 +32,42 @@ def _url_replace_regex(prefix):
         """.format(prefix=prefix)
 
 
+def _static_url_prefix_regex(data_dir=None):
+    """
+    Match the prefixes of static urls, unless they are followed by the data directory.
+    """
+    return '(?:{static_url}|/static/)(?!{data_dir})'.format(
+        static_url=settings.STATIC_URL,
+        data_dir=data_dir
+    )
+
+
+@lru_cache(maxsize=64)
+def _compiled_urls_replace_regex(static_prefix, course=True, jump_to_id=True):
+    """
+    Compiles a single regex matching the static urls, and optionally the /course/ and
+    /jump_to_id/ urls, in quotes.  The group 'static' is set for static urls.
+    """
+    prefixes = ['(?P<static>{static_prefix})'.format(static_prefix=static_prefix)]
+    if course:
+        prefixes.append('/course/')
+    if jump_to_id:
+        prefixes.append('/jump_to_id/')
+    return re.compile(_url_replace_regex('|'.join(prefixes)))
+
+
+def _is_xblock_resource_url(full_url):
+    """
+    Returns whether the given static url is a link to an XBlock resource.
+    """
+    # Probably wasn't a good idea that /static works for actual static assets and
+    # for magical course asset URLs....
+    starts_with_static_url = full_url.startswith(str(settings.STATIC_URL))
+    starts_with_prefix = full_url.startswith(XBLOCK_STATIC_RESOURCE_PREFIX)
+    contains_prefix = XBLOCK_STATIC_RESOURCE_PREFIX in full_url
+    return starts_with_prefix or (starts_with_static_url and contains_prefix)
+
+
 def try_staticfiles_lookup(path):
     """
     Try to lookup a path in staticfiles_storage.  If it fails, return
@@ -44,6 +83,59 @@ def try_staticfiles_lookup(path):
     return url
 
 
+class StaticUrlLookups:
+    """
+    Looks up the urls of static files and course assets for replace_static_urls.
+    """
+
+    def staticfiles_exists(self, path):
+        return staticfiles_storage.exists(path)
+
+    def staticfiles_url(self, path):
+        return staticfiles_storage.url(path)
+
+    def asset_url(self, course_id, path):
+        """
+        Returns the url of the given course asset in the contentstore.
+        """
+        # Import is placed here to avoid model import at project startup.
+        from common.djangoapps.static_replace.models import AssetBaseUrlConfig, AssetExcludedExtensionsConfig
+        base_url = AssetBaseUrlConfig.get_base_url()
+        excluded_exts = AssetExcludedExtensionsConfig.get_excluded_extensions()
+        return StaticContent.get_canonicalized_asset_path(course_id, path, base_url, excluded_exts)
+
+
+class RequestCachedStaticUrlLookups(StaticUrlLookups):
+    """
+    Looks up the urls of static files and course assets, and caches them for the rest of
+    the request.  The url of a course asset holds the digest of its content, which takes a
+    contentstore query to find, and the many blocks of a page often link to the same assets.
+    """
+
+    def __init__(self):
+        self._cache = RequestCache(STATIC_URL_LOOKUPS_CACHE_NAMESPACE)
+
+    def _cached_lookup(self, key, lookup, *args):
+        """
+        Returns the cached result of the lookup with the given key, or looks it up.
+        """
+        cached_response = self._cache.get_cached_response(key)
+        if cached_response.is_found:
+            return cached_response.value
+        value = lookup(*args)
+        self._cache.set(key, value)
+        return value
+
+    def staticfiles_exists(self, path):
+        return self._cached_lookup(('staticfiles_exists', path), super().staticfiles_exists, path)
+
+    def staticfiles_url(self, path):
+        return self._cached_lookup(('staticfiles_url', path), super().staticfiles_url, path)
+
+    def asset_url(self, course_id, path):
+        return self._cached_lookup(('asset_url', str(course_id), path), super().asset_url, course_id, path)
+
+
 def replace_jump_to_id_urls(text, course_id, jump_to_id_base_url):  # lint-amnesty, pylint: disable=unused-argument
     """
     This will replace a link to another piece of courseware to a 'jump_to'
@@ -108,23 +200,14 @@ def process_static_urls(text, replacement_function, data_dir=None):
         quote = match.group('quote')
         rest = match.group('rest')
 
-        # Don't rewrite XBlock resource links.  Probably wasn't a good idea that /static
-        # works for actual static assets and for magical course asset URLs....
-        full_url = prefix + rest
-
-        starts_with_static_url = full_url.startswith(str(settings.STATIC_URL))
-        starts_with_prefix = full_url.startswith(XBLOCK_STATIC_RESOURCE_PREFIX)
-        contains_prefix = XBLOCK_STATIC_RESOURCE_PREFIX in full_url
-        if starts_with_prefix or (starts_with_static_url and contains_prefix):
+        # Don't rewrite XBlock resource links.
+        if _is_xblock_resource_url(prefix + rest):
             return original
 
         return replacement_function(original, prefix, quote, rest)
 
     return re.sub(
-        _url_replace_regex('(?:{static_url}|/static/)(?!{data_dir})'.format(
-            static_url=settings.STATIC_URL,
-            data_dir=data_dir
-        )),
+        _url_replace_regex(_static_url_prefix_regex(data_dir)),
         wrap_part_extraction,
         text
     )
@@ -147,32 +230,14 @@ def make_static_urls_absolute(request, html):
     )
 
 
-def replace_static_urls(
-    text,
-    data_directory=None,
-    course_id=None,
-    static_asset_path='',
-    static_paths_out=None,
-    xblock=None,
-    lookup_asset_url=None
+def _static_url_replacer(
+    data_directory, course_id, static_asset_path, static_paths_out, xblock, lookup_asset_url, lookups
 ):
     """
-    Replace /static/$stuff urls either with their correct url as generated by collectstatic,
-    (/static/$md5_hashed_stuff) or by the course-specific content static url
-    /static/$course_data_dir/$stuff, or, if course_namespace is not None, by the
-    correct url in the contentstore (/c4x/.. or /asset-loc:..) or by lookup_asset_url
-
-    text: The source text to do the substitution in
-    data_directory: The directory in which course data is stored
-    course_id: The course identifier used to distinguish static content for this course in studio
-    static_asset_path: Path for static assets, which overrides data_directory and course_namespace, if nonempty
-    static_paths_out: (optional) pass an array to collect tuples for each static URI found:
-      * the original unmodified static URI
-      * the updated static URI (will match the original if unchanged)
-    xblock: xblock where the static assets are stored
-    lookup_url_func: Lookup function which returns the correct path of the asset
+    Returns the function that replaces a single static url matched by
+    process_static_urls for replace_static_urls, looking urls up with the
+    given StaticUrlLookups.
     """
-
     if static_paths_out is None:
         static_paths_out = []
 
@@ -202,21 +267,17 @@ def replace_static_urls(
 
             exists_in_staticfiles_storage = False
             try:
-                exists_in_staticfiles_storage = staticfiles_storage.exists(rest)
+                exists_in_staticfiles_storage = lookups.staticfiles_exists(rest)
             except Exception as err:  # lint-amnesty, pylint: disable=broad-except
                 log.warning("staticfiles_storage couldn't find path {}: {}".format(
                     rest, str(err)))
 
             if exists_in_staticfiles_storage:
-                url = staticfiles_storage.url(rest)
+                url = lookups.staticfiles_url(rest)
             else:
                 # if not, then assume it's courseware specific content and then look in the
                 # Mongo-backed database
-                # Import is placed here to avoid model import at project startup.
-                from common.djangoapps.static_replace.models import AssetBaseUrlConfig, AssetExcludedExtensionsConfig
-                base_url = AssetBaseUrlConfig.get_base_url()
-                excluded_exts = AssetExcludedExtensionsConfig.get_excluded_extensions()
-                url = StaticContent.get_canonicalized_asset_path(course_id, rest, base_url, excluded_exts)
+                url = lookups.asset_url(course_id, rest)
 
                 if AssetLocator.CANONICAL_NAMESPACE in url:
                     url = url.replace('block@', 'block/', 1)
@@ -226,10 +287,10 @@ def replace_static_urls(
             course_path = "/".join((static_asset_path or data_directory, rest))
 
             try:
-                if staticfiles_storage.exists(rest):
-                    url = staticfiles_storage.url(rest)
+                if lookups.staticfiles_exists(rest):
+                    url = lookups.staticfiles_url(rest)
                 else:
-                    url = staticfiles_storage.url(course_path)
+                    url = lookups.staticfiles_url(course_path)
             # And if that fails, assume that it's course content, and add manually data directory
             except Exception as err:  # lint-amnesty, pylint: disable=broad-except
                 log.warning("staticfiles_storage couldn't find path {}: {}".format(
@@ -239,4 +300,89 @@ def replace_static_urls(
         static_paths_out.append((original_uri, url))
         return "".join([quote, url, quote])
 
+    return replace_static_url
+
+
+def replace_static_urls(
+    text,
+    data_directory=None,
+    course_id=None,
+    static_asset_path='',
+    static_paths_out=None,
+    xblock=None,
+    lookup_asset_url=None
+):
+    """
+    Replace /static/$stuff urls either with their correct url as generated by collectstatic,
+    (/static/$md5_hashed_stuff) or by the course-specific content static url
+    /static/$course_data_dir/$stuff, or, if course_namespace is not None, by the
+    correct url in the contentstore (/c4x/.. or /asset-loc:..) or by lookup_asset_url
+
+    text: The source text to do the substitution in
+    data_directory: The directory in which course data is stored
+    course_id: The course identifier used to distinguish static content for this course in studio
+    static_asset_path: Path for static assets, which overrides data_directory and course_namespace, if nonempty
+    static_paths_out: (optional) pass an array to collect tuples for each static URI found:
+      * the original unmodified static URI
+      * the updated static URI (will match the original if unchanged)
+    xblock: xblock where the static assets are stored
+    lookup_url_func: Lookup function which returns the correct path of the asset
+    """
+
+    replace_static_url = _static_url_replacer(
+        data_directory, course_id, static_asset_path, static_paths_out, xblock, lookup_asset_url, StaticUrlLookups(),
+    )
     return process_static_urls(text, replace_static_url, data_dir=static_asset_path or data_directory)
+
+
+def replace_urls(
+    text,
+    course_id=None,
+    data_directory=None,
+    static_asset_path='',
+    static_paths_out=None,
+    jump_to_id_base_url=None,
+    static_replace_only=False,
+    xblock=None,
+    lookup_asset_url=None
+):
+    """
+    Replace the static, /course/ and /jump_to_id/ urls of the given text in a single pass,
+    as replace_static_urls, replace_course_urls and replace_jump_to_id_urls would in turn.
+    The lookups of static files and course assets are cached for the rest of the request.
+
+    /course/ urls aren't replaced if static_replace_only is True or lookup_asset_url is
+    given, and /jump_to_id/ urls aren't replaced if jump_to_id_base_url is not given.
+    See replace_static_urls for the other arguments.
+    """
+    replace_course = not static_replace_only and not lookup_asset_url
+    regex = _compiled_urls_replace_regex(
+        _static_url_prefix_regex(static_asset_path or data_directory),
+        course=replace_course,
+        jump_to_id=replace_course and bool(jump_to_id_base_url),
+    )
+    replace_static_url = _static_url_replacer(
+        data_directory, course_id, static_asset_path, static_paths_out, xblock, lookup_asset_url,
+        RequestCachedStaticUrlLookups(),
+    )
+    course_urls_prefix = '/courses/' + str(course_id) + '/'
+
+    def replace_url(match):
+        """
+        Replaces a single matched url according to its prefix.
+        """
+        original = match.group(0)
+        prefix = match.group('prefix')
+        quote = match.group('quote')
+        rest = match.group('rest')
+
+        if match.group('static') is not None:
+            # Don't rewrite XBlock resource links.
+            if _is_xblock_resource_url(prefix + rest):
+                return original
+            return replace_static_url(original, prefix, quote, rest)
+        if prefix == '/course/':
+            return "".join([quote, course_urls_prefix, rest, quote])
+        return "".join([quote, jump_to_id_base_url + rest, quote])
+
+    return regex.sub(replace_url, text)
@@ -9,6 +9,7 @@ from urllib.parse import parse_qsl, quote, urlparse, urlunparse, urlencode
 import ddt
 import pytest
 from django.test import override_settings
+from edx_django_utils.cache import RequestCache
 from opaque_keys.edx.keys import CourseKey
 from PIL import Image
 from web_fragments.fragment import Fragment
@@ -20,6 +21,7 @@ from common.djangoapps.static_replace import (
     replace_course_urls,
     replace_static_urls,
     replace_jump_to_id_urls,
+    replace_urls,
 )
 from common.djangoapps.static_replace.services import ReplaceURLService
 from common.djangoapps.static_replace.wrapper import replace_urls_wrapper
@@ -264,6 +266,43 @@ def test_static_url_with_xblock_resource_on_cdn(mock_modulestore, mock_storage):
     assert replace_static_urls(pre_text, DATA_DIRECTORY, COURSE_KEY) == post_text
 
 
+@patch('common.djangoapps.static_replace.staticfiles_storage', autospec=True)
+@patch('xmodule.modulestore.django.modulestore', autospec=True)
+def test_replace_urls(mock_modulestore, mock_storage):
+    """
+    Make sure that replace_urls replaces the static, course and jump-to-id urls as the
+    separate functions do in turn, and looks each static file up only once.
+    """
+    mock_storage.exists.return_value = True
+    mock_storage.url.side_effect = lambda path: '/static/hashed/' + path
+    mock_modulestore.return_value = Mock(MongoModuleStore)
+    RequestCache.clear_all_namespaces()
+
+    text = (
+        '<a href="/static/file.png"/><a href="/course/info"/><a href="/jump_to_id/abc"/>'
+        '<img src="/static/file.png"/><img src="/static/xblock/resources/file.png"/><a href="/static/file.png?raw"/>'
+    )
+    expected = replace_jump_to_id_urls(
+        replace_course_urls(replace_static_urls(text, DATA_DIRECTORY, COURSE_KEY), COURSE_KEY), COURSE_KEY, '/jump/',
+    )
+    mock_storage.reset_mock()
+
+    static_paths = []
+    assert replace_urls(
+        text, COURSE_KEY, DATA_DIRECTORY, static_paths_out=static_paths, jump_to_id_base_url='/jump/',
+    ) == expected
+    assert static_paths == [
+        ('/static/file.png', '/static/hashed/file.png'),
+        ('/static/file.png', '/static/hashed/file.png'),
+        ('/static/file.png?raw', '/static/file.png?raw'),
+    ]
+    mock_storage.exists.assert_called_once_with('file.png')
+    mock_storage.url.assert_called_once_with('file.png')
+
+    assert replace_urls(text, COURSE_KEY, DATA_DIRECTORY, static_replace_only=True) == \
+        replace_static_urls(text, DATA_DIRECTORY, COURSE_KEY)
+
+
 @ddt.ddt
 class CanonicalContentTest(SharedModuleStoreTestCase):
     """
@@ -614,14 +653,8 @@ class ReplaceURLServiceTest(SharedModuleStoreTestCase):
 
     def setUp(self):
         super().setUp()
-        self.mock_replace_static_urls = self.create_patch(
-            'common.djangoapps.static_replace.services.replace_static_urls'
-        )
-        self.mock_replace_course_urls = self.create_patch(
-            'common.djangoapps.static_replace.services.replace_course_urls'
-        )
-        self.mock_replace_jump_to_id_urls = self.create_patch(
-            'common.djangoapps.static_replace.services.replace_jump_to_id_urls'
+        self.mock_replace_urls = self.create_patch(
+            'common.djangoapps.static_replace.services.replace_urls'
         )
 
     def create_patch(self, name):
@@ -632,45 +665,53 @@ class ReplaceURLServiceTest(SharedModuleStoreTestCase):
 
     def test_replace_static_url_only(self):
         """
-        Test only replace_static_urls method called when static_replace_only is passed as True.
+        Test only static urls are replaced when static_replace_only is passed as True.
         """
         replace_url_service = ReplaceURLService(xblock=self.course)
         replace_url_service.replace_urls("text", static_replace_only=True)
-        assert self.mock_replace_static_urls.called
-        assert not self.mock_replace_course_urls.called
-        assert not self.mock_replace_jump_to_id_urls.called
+        assert self.mock_replace_urls.call_count == 1
+        assert self.mock_replace_urls.call_args.kwargs['static_replace_only'] is True
+        assert self.mock_replace_urls.call_args.kwargs['course_id'] == self.course.id
 
     def test_service_block_argument(self):
         """This service accepts either `block` or `xblock` keyword argument."""
         replace_url_service = ReplaceURLService(block=self.course)
         replace_url_service.replace_urls("text", static_replace_only=True)
-        assert self.mock_replace_static_urls.called
-        assert not self.mock_replace_course_urls.called
-        assert not self.mock_replace_jump_to_id_urls.called
+        assert self.mock_replace_urls.call_count == 1
+        assert self.mock_replace_urls.call_args.kwargs['course_id'] == self.course.id
 
     def test_replace_course_urls_called(self):
         """
-        Test replace_course_urls method called static_replace_only is passed as False.
+        Test course urls are replaced when static_replace_only is passed as False.
         """
         replace_url_service = ReplaceURLService(xblock=self.course)
         replace_url_service.replace_urls("text")
-        assert self.mock_replace_course_urls.called
+        assert self.mock_replace_urls.call_args.kwargs['static_replace_only'] is False
 
     def test_replace_jump_to_id_urls_called(self):
         """
-        Test replace_jump_to_id_urls method called jump_to_id_base_url is provided.
+        Test jump-to-id urls are replaced when jump_to_id_base_url is provided.
         """
         replace_url_service = ReplaceURLService(xblock=self.course, jump_to_id_base_url="/course/course_id")
         replace_url_service.replace_urls("text")
-        assert self.mock_replace_jump_to_id_urls.called
+        assert self.mock_replace_urls.call_args.kwargs['jump_to_id_base_url'] == "/course/course_id"
 
     def test_replace_jump_to_id_urls_not_called(self):
         """
-        Test replace_jump_to_id_urls method called jump_to_id_base_url is not provided.
+        Test jump-to-id urls are not replaced when jump_to_id_base_url is not provided.
         """
         replace_url_service = ReplaceURLService(xblock=self.course)
         replace_url_service.replace_urls("text")
-        assert not self.mock_replace_jump_to_id_urls.called
+        assert self.mock_replace_urls.call_args.kwargs['jump_to_id_base_url'] is None
+
+    def test_lookup_asset_url(self):
+        """
+        Test only static urls are replaced, with the lookup function, when lookup_asset_url is provided.
+        """
+        lookup_asset_url = Mock()
+        replace_url_service = ReplaceURLService(xblock=self.course, lookup_asset_url=lookup_asset_url)
+        replace_url_service.replace_urls("text")
+        self.mock_replace_urls.assert_called_once_with("text", xblock=self.course, lookup_asset_url=lookup_asset_url)
 
 
 @ddt.ddt
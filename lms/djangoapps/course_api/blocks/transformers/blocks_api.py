@@ -34,6 +34,18 @@ class BlocksAPITransformer(BlockStructureTransformer):
 
     WRITE_VERSION = 1
     READ_VERSION = 1
+    # The fields read by the student_view_data of the html, discussion
+    # and video blocks, collected by the StudentViewTransformer.
+    COLLECTED_XBLOCK_FIELDS = (
+        'data',
+        'discussion_id',
+        'edx_video_id',
+        'html5_sources',
+        'only_on_web',
+        'sub',
+        'transcripts',
+        'youtube_id_1_0',
+    )
     STUDENT_VIEW_DATA = 'student_view_data'
     STUDENT_VIEW_MULTI_DEVICE = 'student_view_multi_device'
 
@@ -32,6 +32,7 @@ class MilestonesAndSpecialExamsTransformer(BlockStructureTransformer):
     """
     WRITE_VERSION = 1
     READ_VERSION = 1
+    COLLECTED_XBLOCK_FIELDS = ()
 
     @classmethod
     def name(cls):
@@ -0,0 +1,62 @@
+"""
+Tests for incremental updates of stored block structures with the
+registered transformers.
+"""
+from unittest.mock import patch
+
+from edx_toggles.toggles.testutils import override_waffle_switch
+
+from openedx.core.djangoapps.content.block_structure.api import get_block_structure_manager
+from openedx.core.djangoapps.content.block_structure.config import INCREMENTAL_UPDATES
+from openedx.core.djangoapps.content.block_structure.transformer_registry import TransformerRegistry
+from openedx.core.djangoapps.content.block_structure.transformers import BlockStructureTransformers
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase  # lint-amnesty, pylint: disable=wrong-import-order
+from xmodule.modulestore.tests.factories import BlockFactory, CourseFactory  # lint-amnesty, pylint: disable=wrong-import-order
+
+
+@override_waffle_switch(INCREMENTAL_UPDATES, True)
+class TestIncrementalUpdates(ModuleStoreTestCase):
+    """
+    Tests incremental updates of stored block structures with the real
+    transformer registry.
+    """
+    def setUp(self):
+        super().setUp()
+        self.course = CourseFactory.create()
+        self.chapter = BlockFactory.create(parent=self.course, category='chapter')
+        self.sequential = BlockFactory.create(parent=self.chapter, category='sequential', display_name='Old Name')
+        self.vertical = BlockFactory.create(parent=self.sequential, category='vertical')
+        self.bs_manager = get_block_structure_manager(self.course.id)
+        self.bs_manager.update_collected_if_needed()
+
+    def update_sequential(self, **fields):
+        """
+        Updates and publishes the given fields of the sequential, then
+        updates the stored block structure.
+        """
+        sequential = self.store.get_item(self.sequential.location)
+        for field_name, value in fields.items():
+            setattr(sequential, field_name, value)
+        self.store.update_item(sequential, self.user.id)
+        self.store.publish(self.sequential.location, self.user.id)
+        with patch.object(BlockStructureTransformers, 'collect', wraps=BlockStructureTransformers.collect) as collect:
+            self.bs_manager.update_collected_if_needed()
+        return collect
+
+    def test_registered_transformers_declare_collected_fields(self):
+        undeclared = [
+            transformer.name()
+            for transformer in TransformerRegistry.get_registered_transformers()
+            if transformer.COLLECTED_XBLOCK_FIELDS is None
+        ]
+        assert not undeclared
+
+    def test_requested_field_change(self):
+        collect = self.update_sequential(display_name='New Name')
+        collect.assert_not_called()
+        block_structure = self.bs_manager.get_collected()
+        assert block_structure.get_xblock_field(self.sequential.location, 'display_name') == 'New Name'
+
+    def test_collected_field_change(self):
+        collect = self.update_sequential(visible_to_staff_only=True)
+        collect.assert_called_once()
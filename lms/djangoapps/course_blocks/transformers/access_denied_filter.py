@@ -14,6 +14,7 @@ class AccessDeniedMessageFilterTransformer(BlockStructureTransformer):
     """
     WRITE_VERSION = 1
     READ_VERSION = 1
+    COLLECTED_XBLOCK_FIELDS = ()
 
     @classmethod
     def name(cls):
@@ -16,6 +16,7 @@ from openedx.core.djangoapps.content.block_structure.transformer import (
 )
 from xmodule.library_content_block import LegacyLibraryContentBlock  # lint-amnesty, pylint: disable=wrong-import-order
 from xmodule.modulestore.django import modulestore  # lint-amnesty, pylint: disable=wrong-import-order
+from xmodule.modulestore.split_mongo import ORIGINAL_USAGE_FIELD  # lint-amnesty, pylint: disable=wrong-import-order
 
 from ..utils import get_student_module_as_dict
 
@@ -32,6 +33,7 @@ class ContentLibraryTransformer(FilteringTransformerMixin, BlockStructureTransfo
     """
     WRITE_VERSION = 1
     READ_VERSION = 1
+    COLLECTED_XBLOCK_FIELDS = (ORIGINAL_USAGE_FIELD,)
 
     @classmethod
     def name(cls):
@@ -193,6 +195,7 @@ class ContentLibraryOrderTransformer(BlockStructureTransformer):
     """
     WRITE_VERSION = 1
     READ_VERSION = 1
+    COLLECTED_XBLOCK_FIELDS = ()
 
     @classmethod
     def name(cls):
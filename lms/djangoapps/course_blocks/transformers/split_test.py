@@ -26,6 +26,7 @@ class SplitTestTransformer(FilteringTransformerMixin, BlockStructureTransformer)
     """
     WRITE_VERSION = 1
     READ_VERSION = 1
+    COLLECTED_XBLOCK_FIELDS = ()
 
     @classmethod
     def name(cls):
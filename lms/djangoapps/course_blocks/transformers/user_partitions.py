@@ -28,6 +28,7 @@ class UserPartitionTransformer(BlockStructureTransformer):
     """
     WRITE_VERSION = 1
     READ_VERSION = 1
+    COLLECTED_XBLOCK_FIELDS = ('user_partitions', 'group_access', 'user_partition_id', 'group_id_to_child')
 
     @classmethod
     def name(cls):
@@ -9,6 +9,7 @@ import textwrap
 from collections import OrderedDict
 
 from functools import partial
+from time import perf_counter
 
 from completion.services import CompletionService
 from django.conf import settings
@@ -23,7 +24,11 @@ from django.utils.text import slugify
 from django.views.decorators.clickjacking import xframe_options_exempt
 from django.views.decorators.csrf import csrf_exempt
 from edx_django_utils.cache import DEFAULT_REQUEST_CACHE, RequestCache
-from edx_django_utils.monitoring import set_custom_attributes_for_course_key, set_monitoring_transaction_name
+from edx_django_utils.monitoring import (
+    accumulate,
+    set_custom_attributes_for_course_key,
+    set_monitoring_transaction_name
+)
 from edx_proctoring.api import get_attempt_status_summary
 from edx_proctoring.services import ProctoringService
 from edx_rest_framework_extensions.auth.jwt.authentication import JwtAuthentication
@@ -65,11 +70,13 @@ from lms.djangoapps.courseware.masquerade import (
 from lms.djangoapps.courseware.model_data import DjangoKeyValueStore, FieldDataCache
 from lms.djangoapps.courseware.field_overrides import OverrideFieldData
 from lms.djangoapps.courseware.services import UserStateService
+from lms.djangoapps.courseware.toggles import courseware_preload_field_data_from_block_structure
 from lms.djangoapps.grades.api import GradesUtilService
 from lms.djangoapps.lms_xblock.field_data import LmsFieldData
 from lms.djangoapps.lms_xblock.runtime import UserTagsService, lms_wrappers_aside, lms_applicable_aside_types
 from lms.djangoapps.verify_student.services import XBlockVerificationService
 from openedx.core.djangoapps.bookmarks.api import BookmarksService
+from openedx.core.djangoapps.content.block_structure.api import get_course_in_cache
 from openedx.core.djangoapps.crawlers.models import CrawlersConfig
 from openedx.core.djangoapps.credit.services import CreditService
 from openedx.core.djangoapps.enrollments.services import EnrollmentsService
@@ -484,6 +491,119 @@ def get_block_for_descriptor(
     return block
 
 
+class _LazyServices(dict):
+    """
+    The services of a runtime prepared for a user, which are instantiated on
+    their first use rather than when the runtime is prepared.
+
+    The services in SHARED_RUNTIME_SERVICES only depend on the user and the
+    course, so they are instantiated once per request for each user and
+    course, and shared by all of the runtimes prepared during the request.
+    """
+    SHARED_RUNTIME_SERVICES = frozenset({
+        'fs', 'user', 'verification', 'proctoring', 'milestones', 'credit', 'bookmarks', 'gating', 'grade_utils',
+        'user_state', 'content_type_gating', 'cache', 'sandbox', 'completion', 'library_tools', 'partitions',
+        'settings', 'user_tags', 'teams', 'teams_configuration', 'call_to_action', 'enrollments', 'video_config',
+    })
+    REQUEST_CACHE_NAMESPACE = 'lms.block_render.runtime_services'
+
+    def __init__(self, services, factories, user, course_id):
+        if isinstance(services, _LazyServices):
+            factories = {**services._factories, **factories}  # pylint: disable=protected-access
+        # The services of the previous preparation are replaced by the new factories.
+        super().__init__(
+            (service_name, service) for service_name, service in dict.items(services)
+            if service_name not in factories
+        )
+        self._factories = factories
+        self._user_id = getattr(user, 'id', None)
+        self._course_id = course_id
+
+    def _resolve(self, service_name):
+        """
+        Instantiates the service named `service_name`, if it is not yet.
+        """
+        factory = self._factories.pop(service_name, None)
+        if factory is None:
+            return
+
+        request_cache = RequestCache(self.REQUEST_CACHE_NAMESPACE)
+        cache_key = (service_name, self._user_id, self._course_id)
+        if service_name in self.SHARED_RUNTIME_SERVICES:
+            cached_service = request_cache.get_cached_response(cache_key)
+            if cached_service.is_found:
+                super().__setitem__(service_name, cached_service.value)
+                return
+
+        start_time = perf_counter()
+        service = factory()
+        # .. custom_attribute_name: xblock_runtime.service_ms.{service_name}
+        # .. custom_attribute_description: Total time in milliseconds spent instantiating the given
+        #   XBlock runtime service during the request.
+        accumulate(f'xblock_runtime.service_ms.{service_name}', (perf_counter() - start_time) * 1000)
+        if service_name in self.SHARED_RUNTIME_SERVICES:
+            request_cache.set(cache_key, service)
+        super().__setitem__(service_name, service)
+
+    def _resolve_all(self):
+        for service_name in list(self._factories):
+            self._resolve(service_name)
+
+    def __getitem__(self, service_name):
+        self._resolve(service_name)
+        return super().__getitem__(service_name)
+
+    def get(self, service_name, default=None):
+        self._resolve(service_name)
+        return super().get(service_name, default)
+
+    def __contains__(self, service_name):
+        return service_name in self._factories or super().__contains__(service_name)
+
+    def __setitem__(self, service_name, service):
+        self._factories.pop(service_name, None)
+        super().__setitem__(service_name, service)
+
+    def __delitem__(self, service_name):
+        if self._factories.pop(service_name, None) is None:
+            super().__delitem__(service_name)
+
+    def pop(self, service_name, *default):
+        self._resolve(service_name)
+        return super().pop(service_name, *default)
+
+    def setdefault(self, service_name, default=None):
+        self._resolve(service_name)
+        return super().setdefault(service_name, default)
+
+    def update(self, *args, **kwargs):
+        for service_name, service in dict(*args, **kwargs).items():
+            self[service_name] = service
+
+    def __iter__(self):
+        self._resolve_all()
+        return super().__iter__()
+
+    def __len__(self):
+        return len(self._factories) + super().__len__()
+
+    def keys(self):
+        self._resolve_all()
+        return super().keys()
+
+    def values(self):
+        self._resolve_all()
+        return super().values()
+
+    def items(self):
+        self._resolve_all()
+        return super().items()
+
+    def copy(self):
+        self._resolve_all()
+        return dict(super().items())
+
+
 def prepare_runtime_for_user(
         user: User | AnonymousUser,
         student_data: KvsFieldData,
@@ -586,10 +706,10 @@ def prepare_runtime_for_user(
 
     store = modulestore()
 
-    services = {
-        'fs': FSService(),
-        'mako': mako_service,
-        'user': DjangoXBlockUserService(
+    service_factories = {
+        'fs': FSService,
+        'mako': lambda: mako_service,
+        'user': lambda: DjangoXBlockUserService(
             user,
             user_is_beta_tester=CourseBetaTesterRole(course_id).has_user(user),
             user_is_staff=user_is_staff,
@@ -600,20 +720,20 @@ def prepare_runtime_for_user(
             deprecated_anonymous_user_id=anonymous_id_for_user(user, None),
             request_country_code=user_location,
         ),
-        'verification': XBlockVerificationService(),
-        'proctoring': ProctoringService(),
-        'milestones': milestones_helpers.get_service(),
-        'credit': CreditService(),
-        'bookmarks': BookmarksService(user=user),
-        'gating': GatingService(),
-        'grade_utils': GradesUtilService(course_id=course_id),
-        'user_state': UserStateService(),
-        'content_type_gating': ContentTypeGatingService(),
-        'cache': CacheService(cache),
-        'sandbox': SandboxService(contentstore=contentstore, course_id=course_id),
-        'replace_urls': replace_url_service,
+        'verification': XBlockVerificationService,
+        'proctoring': ProctoringService,
+        'milestones': milestones_helpers.get_service,
+        'credit': CreditService,
+        'bookmarks': lambda: BookmarksService(user=user),
+        'gating': GatingService,
+        'grade_utils': lambda: GradesUtilService(course_id=course_id),
+        'user_state': UserStateService,
+        'content_type_gating': ContentTypeGatingService,
+        'cache': lambda: CacheService(cache),
+        'sandbox': lambda: SandboxService(contentstore=contentstore, course_id=course_id),
+        'replace_urls': lambda: replace_url_service,
         # Rebind module service to deal with noauth modules getting attached to users.
-        'rebind_user': RebindUserService(
+        'rebind_user': lambda: RebindUserService(
             user,
             course_id,
             track_function=track_function,
@@ -625,24 +745,28 @@ def prepare_runtime_for_user(
             request_token=request_token,
             will_recheck_access=will_recheck_access,
         ),
-        'completion': CompletionService(user=user, context_key=course_id) if user and user.is_authenticated else None,
-        'i18n': XBlockI18nService,
-        'library_tools': LegacyLibraryToolsService(store, user_id=user.id if user else None),
-        'partitions': PartitionService(course_id=course_id, cache=DEFAULT_REQUEST_CACHE.data),
-        'settings': SettingsService(),
-        'user_tags': UserTagsService(user=user, course_id=course_id),
-        'teams': TeamsService(),
-        'teams_configuration': TeamsConfigurationService(),
-        'call_to_action': CallToActionService(),
-        'publish': EventPublishingService(user, course_id, track_function),
-        'enrollments': EnrollmentsService(),
-        'video_config': VideoConfigService(),
+        'completion': lambda: (
+            CompletionService(user=user, context_key=course_id) if user and user.is_authenticated else None
+        ),
+        'i18n': lambda: XBlockI18nService,
+        'library_tools': lambda: LegacyLibraryToolsService(store, user_id=user.id if user else None),
+        'partitions': lambda: PartitionService(course_id=course_id, cache=DEFAULT_REQUEST_CACHE.data),
+        'settings': SettingsService,
+        'user_tags': lambda: UserTagsService(user=user, course_id=course_id),
+        'teams': TeamsService,
+        'teams_configuration': TeamsConfigurationService,
+        'call_to_action': CallToActionService,
+        'publish': lambda: EventPublishingService(user, course_id, track_function),
+        'enrollments': EnrollmentsService,
+        'video_config': VideoConfigService,
     }
 
     runtime.get_block_for_descriptor = inner_get_block
 
     runtime.wrappers = block_wrappers
-    runtime._services.update(services)  # lint-amnesty, pylint: disable=protected-access
+    runtime._services = _LazyServices(  # lint-amnesty, pylint: disable=protected-access
+        runtime._services, service_factories, user, course_id,  # lint-amnesty, pylint: disable=protected-access
+    )
     runtime.request_token = request_token
     runtime.wrap_asides_override = lms_wrappers_aside
     runtime.applicable_aside_types_override = lms_applicable_aside_types
@@ -850,6 +974,41 @@ def _get_block_by_usage_key(usage_key):
     return block, tracking_context
 
 
+# Block types whose learner state may be prefetched from the collected block structure.
+BLOCK_STRUCTURE_FIELD_DATA_BLOCK_TYPES = ('sequential', 'vertical')
+
+
+def _field_data_cache_for_block(course_key, user, block, read_only=False):
+    """
+    Returns a FieldDataCache of the field data of `block` and its descendants.
+
+    When the courseware.preload_field_data_from_block_structure flag is on,
+    the usage keys of the descendants of a sequence or unit are read from the
+    collected block structure of the course, so that the descendant XBlocks
+    are not loaded.  The descendants are still walked when the block is not
+    in the block structure, when its children differ from those of the block
+    structure, which is then out of date, or when it contains conditional
+    blocks, whose required blocks are not among their children.
+    """
+    if (
+        block.category in BLOCK_STRUCTURE_FIELD_DATA_BLOCK_TYPES and
+        courseware_preload_field_data_from_block_structure(course_key)
+    ):
+        block_structure = get_course_in_cache(course_key)
+        if (
+            block.location in block_structure and
+            block_structure.get_children(block.location) == block.children
+        ) and not any(
+            usage_key.block_type == 'conditional'
+            for usage_key in block_structure.topological_traversal(start_node=block.location)
+        ):
+            return FieldDataCache.cache_for_block_structure(
+                course_key, user, block_structure, start_node=block.location, read_only=read_only,
+            )
+
+    return FieldDataCache.cache_for_block_descendents(course_key, user, block, read_only=read_only)
+
+
 def get_block_by_usage_id(request, course_id, usage_id, disable_staff_debug_info=False, course=None,
                           will_recheck_access=False):
     """
@@ -862,7 +1021,7 @@ def get_block_by_usage_id(request, course_id, usage_id, disable_staff_debug_info
     block, tracking_context = _get_block_by_usage_key(usage_key)
 
     _, user = setup_masquerade(request, course_key, has_access(request.user, 'staff', block, course_key))
-    field_data_cache = FieldDataCache.cache_for_block_descendents(
+    field_data_cache = _field_data_cache_for_block(
         course_key,
         user,
         block,
@@ -26,17 +26,20 @@ import json
 import logging
 from abc import ABCMeta, abstractmethod
 from collections import defaultdict, namedtuple
+from functools import lru_cache
 
+from django.conf import settings
 from django.db import DatabaseError, IntegrityError, transaction
 from opaque_keys.edx.asides import AsideUsageKeyV1, AsideUsageKeyV2
 from opaque_keys.edx.block_types import BlockTypeKeyV1
 from opaque_keys.edx.keys import LearningContextKey
-from xblock.core import XBlockAside
+from xblock.core import XBlock, XBlockAside
 from xblock.exceptions import InvalidScopeError, KeyValueMultiSaveError
-from xblock.fields import Scope, UserScope
-from xblock.runtime import KeyValueStore
+from xblock.fields import Scope, ScopeIds, UserScope
+from xblock.plugin import PluginMissingError
+from xblock.runtime import KeyValueStore, Mixologist
 
-from lms.djangoapps.courseware.user_state_client import DjangoXBlockUserStateClient
+from lms.djangoapps.courseware.user_state_client import DjangoXBlockUserStateClient, flush_pending_state_writes
 from xmodule.modulestore.django import modulestore  # lint-amnesty, pylint: disable=wrong-import-order
 
 from .models import StudentModule, XModuleStudentInfoField, XModuleStudentPrefsField, XModuleUserStateSummaryField
@@ -82,6 +85,47 @@ def _all_block_types(blocks, aside_types):
     return block_types
 
 
+@lru_cache(maxsize=None)
+def _mixed_block_class(block_type):
+    """
+    Returns the class of the blocks of `block_type` mixed with the
+    XBLOCK_MIXINS, as the modulestore runtime loads them, or None if the
+    block type is not installed.
+    """
+    try:
+        block_class = XBlock.load_class(block_type)
+    except PluginMissingError:
+        return None
+    return Mixologist(getattr(settings, 'XBLOCK_MIXINS', ())).mix(block_class)
+
+
+class _BlockStructureBlock:
+    """
+    Stand-in for the XBlock of a block in a block structure, with only the
+    attributes that FieldDataCache needs to prefetch the block's field data,
+    so that the XBlock itself does not have to be loaded.
+
+    The fields of the stand-in include those of the XBLOCK_MIXINS and of the
+    given aside types, as the loaded XBlock and its asides would have.
+    """
+    def __init__(self, usage_key, aside_types=()):
+        self.location = usage_key
+        self.scope_ids = ScopeIds(None, usage_key.block_type, None, usage_key)
+        block_class = _mixed_block_class(usage_key.block_type)
+        self.entry_point = getattr(block_class, 'entry_point', XBlock.entry_point)
+        self.fields = dict(getattr(block_class, 'fields', {}))
+        for aside_type in aside_types:
+            try:
+                aside_class = XBlockAside.load_class(aside_type)
+            except PluginMissingError:
+                continue
+            # Aside fields are keyed by aside type, since their names may clash with the block's fields.
+            self.fields.update(
+                ((aside_type, field_name), field) for field_name, field in aside_class.fields.items()
+            )
+        self.has_score = getattr(block_class, 'has_score', False)
+
+
 class DjangoKeyValueStore(KeyValueStore):
     """
     This KeyValueStore will read and write data in the following scopes to django models
@@ -776,6 +820,29 @@ class FieldDataCache:
         cache.add_block_descendents(block, depth, block_filter)
         return cache
 
+    @classmethod
+    def cache_for_block_structure(cls, course_id, user, block_structure, start_node=None,
+                                  asides=None, read_only=False):
+        """
+        Returns a FieldDataCache of the field data of the blocks of a collected
+        block structure, such as the blocks visible to `user` returned by
+        get_course_blocks, without loading their XBlocks.
+
+        course_id: the course in the context of which we want StudentModules.
+        user: the django user for whom to load modules.
+        block_structure: A BlockStructure.
+        start_node: The usage key of the block whose descendants, in addition to itself,
+            to load field data for. If None, load field data for all blocks of the structure.
+        """
+        if start_node is None:
+            usage_keys = block_structure.get_block_keys()
+        else:
+            usage_keys = block_structure.topological_traversal(start_node=start_node)
+
+        cache = FieldDataCache([], course_id, user, asides=asides, read_only=read_only)
+        cache.add_blocks_to_cache([_BlockStructureBlock(usage_key, cache.asides) for usage_key in usage_keys])
+        return cache
+
     def _fields_to_cache(self, blocks):
         """
         Returns a map of scopes to fields in that scope that should be cached
@@ -971,6 +1038,10 @@ def set_score(user_id, usage_key, score, max_score):
     """
     Set the score and max_score for the specified user and xblock usage.
     """
+    # Save the user's coalesced state writes first, so that the state they
+    # record is never older than the score.
+    flush_pending_state_writes(user_id=user_id)
+
     created = False
     kwargs = {"student_id": user_id, "module_state_key": usage_key, "course_id": usage_key.context_key}
     try:
@@ -21,10 +21,11 @@ from django.middleware.csrf import get_token  # lint-amnesty, pylint: disable=wr
 from django.test.client import RequestFactory  # lint-amnesty, pylint: disable=wrong-import-order
 from django.test.utils import override_settings  # lint-amnesty, pylint: disable=wrong-import-order
 from django.urls import reverse  # lint-amnesty, pylint: disable=wrong-import-order
+from edx_django_utils.cache import RequestCache  # lint-amnesty, pylint: disable=wrong-import-order
 from edx_proctoring.api import create_exam, create_exam_attempt, update_attempt_status  # lint-amnesty, pylint: disable=wrong-import-order
 from edx_proctoring.runtime import set_runtime_service  # lint-amnesty, pylint: disable=wrong-import-order
 from edx_proctoring.tests.test_services import MockCertificateService, MockCreditService, MockGradesService  # lint-amnesty, pylint: disable=wrong-import-order
-from edx_toggles.toggles.testutils import override_waffle_switch  # lint-amnesty, pylint: disable=wrong-import-order
+from edx_toggles.toggles.testutils import override_waffle_flag, override_waffle_switch  # lint-amnesty, pylint: disable=wrong-import-order
 from edx_when.field_data import DateLookupFieldData  # lint-amnesty, pylint: disable=wrong-import-order
 from freezegun import freeze_time  # lint-amnesty, pylint: disable=wrong-import-order
 from milestones.tests.utils import MilestonesTestCaseMixin  # lint-amnesty, pylint: disable=wrong-import-order
@@ -36,7 +37,7 @@ from xblock.completable import CompletableXBlockMixin  # lint-amnesty, pylint: d
 from xblock.core import XBlock, XBlockAside  # lint-amnesty, pylint: disable=wrong-import-order
 from xblock.exceptions import NoSuchServiceError
 from xblock.field_data import FieldData  # lint-amnesty, pylint: disable=wrong-import-order
-from xblock.fields import ScopeIds  # lint-amnesty, pylint: disable=wrong-import-order
+from xblock.fields import Scope, ScopeIds  # lint-amnesty, pylint: disable=wrong-import-order
 from xblock.runtime import DictKeyValueStore, KvsFieldData  # lint-amnesty, pylint: disable=wrong-import-order
 from xblock.test.tools import TestRuntime  # lint-amnesty, pylint: disable=wrong-import-order
 
@@ -80,12 +81,13 @@ from lms.djangoapps.courseware.access_response import AccessResponse
 from lms.djangoapps.courseware.courses import get_course_info_section, get_course_with_access
 from lms.djangoapps.courseware.field_overrides import OverrideFieldData
 from lms.djangoapps.courseware.masquerade import CourseMasquerade
-from lms.djangoapps.courseware.model_data import FieldDataCache
+from lms.djangoapps.courseware.model_data import DjangoKeyValueStore, FieldDataCache
 from lms.djangoapps.courseware.models import StudentModule
 from lms.djangoapps.courseware.block_render import get_block_for_descriptor, hash_resource
 from lms.djangoapps.courseware.tests.factories import StudentModuleFactory
 from lms.djangoapps.courseware.tests.test_submitting_problems import TestSubmittingProblems
 from lms.djangoapps.courseware.tests.tests import LoginEnrollmentTestCase
+from lms.djangoapps.courseware.toggles import COURSEWARE_PRELOAD_FIELD_DATA_FROM_BLOCK_STRUCTURE
 from lms.djangoapps.lms_xblock.field_data import LmsFieldData
 from openedx.core.djangoapps.credit.api import set_credit_requirement_status, set_credit_requirements
 from openedx.core.djangoapps.credit.models import CreditCourse
@@ -2371,6 +2373,47 @@ class LMSXBlockServiceBindingTest(LMSXBlockServiceMixin):
         service = self.block.runtime.service(self.block, expected_service)
         assert service is not None
 
+    def test_services_are_lazy_and_timed(self):
+        """
+        Tests that runtime services are instantiated on first use, and that the
+        time spent instantiating each of them is recorded.
+        """
+        RequestCache(render._LazyServices.REQUEST_CACHE_NAMESPACE).clear()  # pylint: disable=protected-access
+        runtime = Mock(_services={})
+        with patch('lms.djangoapps.courseware.block_render.accumulate') as mock_accumulate:
+            render.prepare_runtime_for_user(
+                self.user, self.student_data, runtime, self.course.id, self.track_function, self.request_token,
+                course=self.course,
+            )
+            mock_accumulate.assert_not_called()
+            assert 'bookmarks' in runtime._services  # pylint: disable=protected-access
+
+            assert runtime._services['bookmarks'] is not None  # pylint: disable=protected-access
+            mock_accumulate.assert_called_once()
+            assert mock_accumulate.call_args[0][0] == 'xblock_runtime.service_ms.bookmarks'
+
+    def test_services_are_shared_during_request(self):
+        """
+        Tests that the services that only depend on the user and the course are
+        shared by the runtimes prepared for them during a request.
+        """
+        runtimes = [Mock(_services={}), Mock(_services={})]
+        for runtime in runtimes:
+            render.prepare_runtime_for_user(
+                self.user, self.student_data, runtime, self.course.id, self.track_function, self.request_token,
+                course=self.course,
+            )
+        services = [runtime._services for runtime in runtimes]  # pylint: disable=protected-access
+        assert services[0]['user'] is services[1]['user']
+        assert services[0]['publish'] is not services[1]['publish']
+
+        other_user_runtime = Mock(_services={})
+        render.prepare_runtime_for_user(
+            UserFactory(), self.student_data, other_user_runtime, self.course.id, self.track_function,
+            self.request_token, course=self.course,
+        )
+        assert other_user_runtime._services['user'] is not services[0]['user']  # pylint: disable=protected-access
+
     def test_get_set_tag(self):
         """
         Tests the user service interface.
@@ -2560,6 +2603,72 @@ class TestFilteredChildren(SharedModuleStoreTestCase):
 
 
 @ddt.ddt
+@ddt.ddt
+@override_waffle_flag(COURSEWARE_PRELOAD_FIELD_DATA_FROM_BLOCK_STRUCTURE, True)
+class TestFieldDataCacheFromBlockStructure(ModuleStoreTestCase):
+    """
+    Tests that the learner state of sequences and units is prefetched from the
+    collected block structure.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.course = CourseFactory.create()
+        chapter = BlockFactory.create(parent=self.course, category='chapter')
+        self.sequential = BlockFactory.create(parent=chapter, category='sequential')
+        self.vertical = BlockFactory.create(parent=self.sequential, category='vertical')
+        self.problem = BlockFactory.create(parent=self.vertical, category='problem')
+        self.user = UserFactory.create()
+        StudentModuleFactory.create(
+            student=self.user,
+            course_id=self.course.id,
+            module_state_key=self.problem.location,
+            state=json.dumps({'attempts': 2}),
+        )
+
+    def field_data_cache(self, usage_key):
+        """
+        Returns the FieldDataCache for the block at `usage_key` and whether
+        it was prefetched from the block structure.
+        """
+        block = self.store.get_item(usage_key)
+        with patch.object(
+            FieldDataCache, 'cache_for_block_structure', wraps=FieldDataCache.cache_for_block_structure,
+        ) as cache_for_block_structure:
+            field_data_cache = render._field_data_cache_for_block(  # pylint: disable=protected-access
+                self.course.id, self.user, block,
+            )
+        return field_data_cache, cache_for_block_structure.called
+
+    def assert_problem_state_cached(self, field_data_cache):
+        """
+        Asserts that the state of the problem is read from `field_data_cache` without queries.
+        """
+        with self.assertNumQueries(0):
+            assert DjangoKeyValueStore(field_data_cache).get(
+                DjangoKeyValueStore.Key(Scope.user_state, self.user.id, self.problem.location, 'attempts')
+            ) == 2
+
+    @ddt.data('sequential', 'vertical')
+    def test_prefetched_from_block_structure(self, category):
+        field_data_cache, from_block_structure = self.field_data_cache(getattr(self, category).location)
+        assert from_block_structure
+        self.assert_problem_state_cached(field_data_cache)
+
+    def test_stale_block_structure(self):
+        with patch('lms.djangoapps.courseware.block_render.get_course_in_cache', return_value=Mock(
+            __contains__=Mock(return_value=True), get_children=Mock(return_value=[]),
+        )):
+            field_data_cache, from_block_structure = self.field_data_cache(self.vertical.location)
+        assert not from_block_structure
+        self.assert_problem_state_cached(field_data_cache)
+
+    def test_conditional_block(self):
+        BlockFactory.create(parent=self.vertical, category='conditional')
+        _, from_block_structure = self.field_data_cache(self.vertical.location)
+        assert not from_block_structure
+
+
 class TestDisabledXBlockTypes(ModuleStoreTestCase):
     """
     Tests that verify disabled XBlock types are not loaded.
@@ -8,12 +8,17 @@ import pytest
 
 from django.db import connections, DatabaseError
 from django.test import TestCase
-from xblock.core import XBlock
+from xblock.core import XBlock, XBlockAside
 from xblock.exceptions import KeyValueMultiSaveError
 from xblock.fields import BlockScope, Scope, ScopeIds
 
 from common.djangoapps.student.tests.factories import UserFactory
-from lms.djangoapps.courseware.model_data import DjangoKeyValueStore, FieldDataCache, InvalidScopeError
+from lms.djangoapps.courseware.model_data import (
+    DjangoKeyValueStore,
+    FieldDataCache,
+    InvalidScopeError,
+    _BlockStructureBlock,
+)
 from lms.djangoapps.courseware.models import (
     StudentModule,
     XModuleStudentInfoField,
@@ -26,6 +31,10 @@ from lms.djangoapps.courseware.tests.factories import StudentInfoFactory
 from lms.djangoapps.courseware.tests.factories import StudentModuleFactory as cmfStudentModuleFactory
 from lms.djangoapps.courseware.tests.factories import StudentPrefsFactory
 from lms.djangoapps.courseware.tests.factories import UserStateSummaryFactory
+from openedx.core.djangoapps.content.block_structure.block_structure import BlockStructureBlockData
+from xmodule.capa_block import ProblemBlock
+from xmodule.modulestore.inheritance import InheritanceMixin
+from xmodule.modulestore.tests.test_asides import AsideTestType
 
 
 def mock_field(scope, name):
@@ -444,3 +453,54 @@ class TestStudentInfoStorage(OtherUserFailureTestMixin, StorageTestBase, TestCas
     storage_class = XModuleStudentInfoField
     other_key_factory = partial(DjangoKeyValueStore.Key, Scope.user_info, 2, 'mock_problem')  # user_id=2, not 1
     existing_field_name = "existing_field"
+
+
+class TestFieldDataCacheForBlockStructure(TestCase):
+    """Tests for FieldDataCache.cache_for_block_structure"""
+    # Tell Django to clean out all databases, not just default
+    databases = set(connections)
+
+    def setUp(self):
+        super().setUp()
+        self.vertical_key = COURSE_KEY.make_usage_key('vertical', 'vertical')
+        self.block_structure = BlockStructureBlockData(COURSE_KEY.make_usage_key('course', 'course'))
+        self.block_structure._add_relation(self.block_structure.root_block_usage_key, self.vertical_key)  # pylint: disable=protected-access
+        self.block_structure._add_relation(self.vertical_key, LOCATION('usage_id'))  # pylint: disable=protected-access
+        self.block_structure._add_relation(self.block_structure.root_block_usage_key, LOCATION('other_usage_id'))  # pylint: disable=protected-access
+
+        self.user = StudentModuleFactory(state=json.dumps({'a_field': 'a_value'})).student
+        StudentModuleFactory(
+            student=self.user, module_state_key=LOCATION('other_usage_id'), state=json.dumps({'a_field': 'other_value'}),
+        )
+
+    def test_cache_for_block_structure(self):
+        field_data_cache = FieldDataCache.cache_for_block_structure(COURSE_KEY, self.user, self.block_structure)
+        kvs = DjangoKeyValueStore(field_data_cache)
+        with self.assertNumQueries(0):
+            assert kvs.get(user_state_key('a_field')) == 'a_value'
+            assert kvs.get(DjangoKeyValueStore.Key(
+                Scope.user_state, self.user.id, LOCATION('other_usage_id'), 'a_field'
+            )) == 'other_value'
+        assert field_data_cache.scorable_locations == {LOCATION('usage_id'), LOCATION('other_usage_id')}
+
+    def test_cache_for_descendants_in_block_structure(self):
+        field_data_cache = FieldDataCache.cache_for_block_structure(
+            COURSE_KEY, self.user, self.block_structure, start_node=self.vertical_key,
+        )
+        kvs = DjangoKeyValueStore(field_data_cache)
+        with self.assertNumQueries(0):
+            assert kvs.get(user_state_key('a_field')) == 'a_value'
+            with pytest.raises(KeyError):
+                kvs.get(DjangoKeyValueStore.Key(Scope.user_state, self.user.id, LOCATION('other_usage_id'), 'a_field'))
+
+    def test_block_structure_block_fields(self):
+        block = _BlockStructureBlock(LOCATION('usage_id'))
+        # Fields of the XBLOCK_MIXINS, such as the inherited `due`, are included.
+        assert block.fields['due'] is InheritanceMixin.due
+        assert block.fields['weight'] is ProblemBlock.weight
+        assert block.has_score
+
+        with patch.object(XBlockAside, 'load_class', return_value=AsideTestType):
+            block = _BlockStructureBlock(LOCATION('usage_id'), ['test_aside'])
+        assert block.fields[('test_aside', 'content')] is AsideTestType.content
+        assert block.fields['weight'] is ProblemBlock.weight
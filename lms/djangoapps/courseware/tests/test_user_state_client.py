@@ -3,19 +3,28 @@ Black-box tests of the DjangoUserStateClient against the semantics
 defined in edx_user_state_client.
 """
 
+import json
+
 import pytz
+from crum import set_current_request
+from django.core.signals import request_finished
+from django.test import RequestFactory, override_settings
 from opaque_keys.edx.locator import BlockUsageLocator, CourseLocator
 from xblock.fields import Scope
 from datetime import datetime
+from unittest.mock import patch
 from unittest import TestCase
 from collections import defaultdict
-from django.db import connections
+from django.db import DatabaseError, connections
+from time import monotonic
 
 from common.djangoapps.student.tests.factories import UserFactory
+from lms.djangoapps.courseware.models import StudentModule
 from lms.djangoapps.courseware.user_state_client import (
     DjangoXBlockUserStateClient,
     XBlockUserStateClient,
-    XBlockUserState
+    XBlockUserState,
+    flush_pending_state_writes
 )
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase  # lint-amnesty, pylint: disable=wrong-import-order
 
@@ -757,3 +766,102 @@ class TestDjangoUserStateClient(UserStateClientTestBase, ModuleStoreTestCase):
             2. Update the test in the other repo to align with the new functionality
             3. Remove this override to re-enable the working test
         """
+
+
+@override_settings(STUDENT_MODULE_WRITE_BEHIND_BLOCK_TYPES=['problem'])
+class TestDjangoUserStateClientWriteBehind(TestDjangoUserStateClient):
+    """
+    Tests of the DjangoUserStateClient backend with coalesced writes.
+    It reuses all tests from :class:`~UserStateClientTestBase`, with each write
+    made in a request of its own.
+    """
+
+    def setUp(self):
+        super().setUp()
+        set_current_request(RequestFactory().get('/'))
+        self.addCleanup(set_current_request, None)
+        self.addCleanup(flush_pending_state_writes)
+
+    def set(self, user, block, state):
+        result = super().set(user, block, state)
+        request_finished.send(sender=None)
+        return result
+
+    def set_many(self, user, block_to_state):
+        result = super().set_many(user, block_to_state)
+        request_finished.send(sender=None)
+        return result
+
+    def test_writes_are_coalesced(self):
+        self.client.set(self._user(0), self._block(0), {'a': 'x'})
+        self.client.set(self._user(0), self._block(0), {'b': 'y'})
+        assert not StudentModule.objects.filter(student=self.users[0]).exists()
+
+        request_finished.send(sender=None)
+        student_module = StudentModule.objects.get(student=self.users[0])
+        assert json.loads(student_module.state) == {'a': 'x', 'b': 'y'}
+        assert len(list(self.client.get_history(self._user(0), self._block(0)))) == 1
+
+    @override_settings(STUDENT_MODULE_WRITE_BEHIND_WINDOW=60)
+    def test_writes_are_coalesced_across_requests(self):
+        with patch('lms.djangoapps.courseware.user_state_client.monotonic', return_value=1000):
+            self.client.set(self._user(0), self._block(0), {'a': 'x'})
+            request_finished.send(sender=None)
+            self.client.set(self._user(0), self._block(0), {'b': 'y'})
+            request_finished.send(sender=None)
+        assert not StudentModule.objects.filter(student=self.users[0]).exists()
+
+        # The window starts with the first write, so later writes don't postpone the save.
+        with patch('lms.djangoapps.courseware.user_state_client.monotonic', return_value=1060):
+            self.client.set(self._user(0), self._block(0), {'c': 'z'})
+            request_finished.send(sender=None)
+        student_module = StudentModule.objects.get(student=self.users[0])
+        assert json.loads(student_module.state) == {'a': 'x', 'b': 'y', 'c': 'z'}
+        assert len(list(self.client.get_history(self._user(0), self._block(0)))) == 1
+
+    @override_settings(STUDENT_MODULE_WRITE_BEHIND_WINDOW=60)
+    def test_reads_see_pending_writes(self):
+        self.client.set(self._user(0), self._block(0), {'a': 'x'})
+        request_finished.send(sender=None)
+        assert self.get(user=0, block=0).state == {'a': 'x'}
+
+    @override_settings(STUDENT_MODULE_WRITE_BEHIND_MAX_PENDING_WRITES=1)
+    def test_max_pending_writes(self):
+        self.client.set(self._user(0), self._block(0), {'a': 'x'})
+        assert not StudentModule.objects.filter(student=self.users[0]).exists()
+        self.client.set(self._user(0), self._block(1), {'a': 'y'})
+        assert StudentModule.objects.filter(student=self.users[0]).count() == 2
+
+    @override_settings(STUDENT_MODULE_WRITE_BEHIND_WINDOW=60)
+    def test_failed_writes_are_requeued(self):
+        self.client.set(self._user(0), self._block(0), {'a': 'x'})
+        self.client.set(self._user(1), self._block(0), {'a': 'y'})
+        save_many = DjangoXBlockUserStateClient.save_many
+
+        def fail_for_first_user(client, user, block_keys_to_state):
+            if user == self.users[0]:
+                raise DatabaseError
+            return save_many(client, user, block_keys_to_state)
+
+        with patch.object(DjangoXBlockUserStateClient, 'save_many', autospec=True, side_effect=fail_for_first_user):
+            flush_pending_state_writes()
+        assert not StudentModule.objects.filter(student=self.users[0]).exists()
+        assert json.loads(StudentModule.objects.get(student=self.users[1]).state) == {'a': 'y'}
+
+        # The failed write is merged under the writes coalesced since.
+        self.client.set(self._user(0), self._block(0), {'b': 'z'})
+        flush_pending_state_writes()
+        assert json.loads(StudentModule.objects.get(student=self.users[0]).state) == {'a': 'x', 'b': 'z'}
+
+    @override_settings(STUDENT_MODULE_WRITE_BEHIND_WINDOW=60)
+    def test_timer_flushes_expired_writes(self):
+        with patch('lms.djangoapps.courseware.user_state_client.threading.Timer') as mock_timer:
+            self.client.set(self._user(0), self._block(0), {'a': 'x'})
+            self.client.set(self._user(0), self._block(1), {'a': 'y'})
+        mock_timer.assert_called_once()
+        assert mock_timer.call_args.args[0] == 60
+
+        with patch('lms.djangoapps.courseware.user_state_client.monotonic', return_value=monotonic() + 60), \
+                patch('lms.djangoapps.courseware.user_state_client.connections'):
+            mock_timer.call_args.args[1]()
+        assert StudentModule.objects.filter(student=self.users[0]).count() == 2
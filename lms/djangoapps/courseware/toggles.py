@@ -138,6 +138,20 @@ COURSEWARE_OPTIMIZED_RENDER_XBLOCK = CourseWaffleFlag(
     f'{WAFFLE_FLAG_NAMESPACE}.optimized_render_xblock', __name__
 )
 
+# .. toggle_name: courseware.preload_field_data_from_block_structure
+# .. toggle_implementation: CourseWaffleFlag
+# .. toggle_default: False
+# .. toggle_description: Waffle flag to prefetch the learner state of a sequence or unit being rendered from the
+#   course's collected block structure, instead of loading each of its descendant XBlocks to find their usage keys.
+# .. toggle_use_cases: temporary
+# .. toggle_creation_date: 2026-10-18
+# .. toggle_target_removal_date: 2027-01-31
+# .. toggle_warning: The learner state of blocks published after the block structure was last collected is not
+#   prefetched, so the state of those blocks reads as empty until the block structure is updated.
+COURSEWARE_PRELOAD_FIELD_DATA_FROM_BLOCK_STRUCTURE = CourseWaffleFlag(
+    f'{WAFFLE_FLAG_NAMESPACE}.preload_field_data_from_block_structure', __name__
+)
+
 # .. toggle_name: COURSES_INVITE_ONLY
 # .. toggle_implementation: SettingToggle
 # .. toggle_type: feature_flag
@@ -215,3 +229,10 @@ def courseware_disable_navigation_sidebar_blocks_caching(course_key=None):
     Return whether the courseware.disable_navigation_sidebar_blocks_caching flag is on.
     """
     return COURSEWARE_MICROFRONTEND_NAVIGATION_SIDEBAR_BLOCKS_DISABLE_CACHING.is_enabled(course_key)
+
+
+def courseware_preload_field_data_from_block_structure(course_key):
+    """
+    Return whether the courseware.preload_field_data_from_block_structure flag is on.
+    """
+    return COURSEWARE_PRELOAD_FIELD_DATA_FROM_BLOCK_STRUCTURE.is_enabled(course_key)
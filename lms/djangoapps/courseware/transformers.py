@@ -14,6 +14,7 @@ class OpenAssessmentDateTransformer(FilteringTransformerMixin, BlockStructureTra
     """
     WRITE_VERSION = 2
     READ_VERSION = 1
+    COLLECTED_XBLOCK_FIELDS = ()
 
     @classmethod
     def name(cls):
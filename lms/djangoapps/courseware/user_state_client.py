@@ -4,19 +4,24 @@ data in a Django ORM model.
 """
 
 
+import atexit
 import itertools
 import logging
+import threading
 from operator import attrgetter
-from time import time
+from time import monotonic, time
 
 from abc import abstractmethod
 from collections import namedtuple
 
+from crum import get_current_request
 from django.conf import settings
 from django.contrib.auth.models import User  # lint-amnesty, pylint: disable=imported-auth-user
 from django.core.paginator import Paginator
-from django.db import transaction
+from django.core.signals import request_finished
+from django.db import connections, transaction
 from django.db.utils import IntegrityError
+from django.dispatch import receiver
 from edx_django_utils import monitoring as monitoring_utils
 from xblock.fields import Scope
 
@@ -31,6 +36,159 @@ except ImportError:
 log = logging.getLogger(__name__)
 
 
+class _PendingStateWrites:
+    """
+    The coalesced user state writes of the process, which are shared by all of
+    its requests.
+
+    `writes` maps (user id, usage key) pairs to (user, state dict, time of the
+    first coalesced write) tuples.
+
+    While there are pending writes, a timer saves those whose window has
+    passed, so that they are saved even when the process gets no requests.
+    """
+    def __init__(self):
+        self.writes = {}
+        self.lock = threading.Lock()
+        self._timer = None
+
+    def schedule_flush(self):
+        """
+        Starts the timer that saves the expired pending writes, unless it is
+        already started.  Must be called with the lock held.
+        """
+        window = getattr(settings, 'STUDENT_MODULE_WRITE_BEHIND_WINDOW', 0)
+        if self._timer is None and self.writes and window > 0:
+            self._timer = threading.Timer(window, self._flush_on_timer)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _flush_on_timer(self):
+        """
+        Saves the expired pending writes, then restarts the timer if writes
+        are still pending.
+        """
+        try:
+            flush_expired_state_writes()
+        except Exception:  # pylint: disable=broad-except
+            log.exception("Could not save the expired user state writes")
+        finally:
+            # The timer's thread has its own database connections.
+            connections.close_all()
+            with self.lock:
+                self._timer = None
+                self.schedule_flush()
+
+    def requeue(self, user, block_keys_to_state):
+        """
+        Puts back writes of `user` that could not be saved, under any writes
+        of the same blocks that were coalesced since, so that they are saved
+        again once their window has passed.
+        """
+        with self.lock:
+            for usage_key, state in block_keys_to_state.items():
+                key = (user.id, usage_key)
+                first_write_time = monotonic()
+                if key in self.writes:
+                    _, newer_state, first_write_time = self.writes[key]
+                    state = {**state, **newer_state}
+                self.writes[key] = (user, state, first_write_time)
+            self.schedule_flush()
+
+    def pop(self, should_flush):
+        """
+        Removes and returns the pending writes whose (user, first write time)
+        satisfy `should_flush`, as a dict that maps user ids to (user, dict of
+        usage keys to states) pairs.
+        """
+        block_keys_to_state_by_user = {}
+        with self.lock:
+            for key in list(self.writes):
+                user, state, first_write_time = self.writes[key]
+                if should_flush(user, first_write_time):
+                    del self.writes[key]
+                    block_keys_to_state_by_user.setdefault(user.id, (user, {}))[1][key[1]] = state
+        return block_keys_to_state_by_user
+
+
+_pending_state_writes = _PendingStateWrites()
+
+
+def _should_write_behind(usage_key):
+    """
+    Returns whether writes of the user state of the given block are coalesced
+    with later writes rather than saved immediately.
+    """
+    return (
+        usage_key.block_type in getattr(settings, 'STUDENT_MODULE_WRITE_BEHIND_BLOCK_TYPES', []) and
+        get_current_request() is not None
+    )
+
+
+def _save_pending_state_writes(block_keys_to_state_by_user, requeue=True):
+    """
+    Saves the pending writes returned by `_PendingStateWrites.pop`.
+
+    The writes of each user are saved separately, so that a failure to save
+    those of one user doesn't lose those of the others.  Writes that could
+    not be saved are logged, and put back in the pending writes if `requeue`.
+    """
+    for user, block_keys_to_state in block_keys_to_state_by_user.values():
+        try:
+            DjangoXBlockUserStateClient(user).save_many(user, block_keys_to_state)
+        except Exception:  # pylint: disable=broad-except
+            log.exception(
+                "Could not save the pending user state writes of user %s for blocks %s",
+                user.id, list(block_keys_to_state),
+            )
+            if requeue:
+                _pending_state_writes.requeue(user, block_keys_to_state)
+
+
+def flush_pending_state_writes(username=None, user_id=None, requeue=True):
+    """
+    Saves the coalesced user state writes of the process, either of all users
+    or only of the user with the given username or id.
+    """
+    _save_pending_state_writes(_pending_state_writes.pop(
+        lambda user, first_write_time: (
+            (username is None or user.username == username) and
+            (user_id is None or user.id == user_id)
+        )
+    ), requeue=requeue)
+
+
+def flush_expired_state_writes():
+    """
+    Saves the coalesced user state writes whose first write is older than
+    ``STUDENT_MODULE_WRITE_BEHIND_WINDOW`` seconds.
+    """
+    expiry_time = monotonic() - getattr(settings, 'STUDENT_MODULE_WRITE_BEHIND_WINDOW', 0)
+    _save_pending_state_writes(_pending_state_writes.pop(
+        lambda user, first_write_time: first_write_time <= expiry_time
+    ))
+
+
+@receiver(request_finished)
+def _flush_pending_state_writes_on_request_finished(sender, **kwargs):  # pylint: disable=unused-argument
+    """
+    Saves the coalesced user state writes whose window has passed once a
+    request has finished.
+    """
+    flush_expired_state_writes()
+
+
+@atexit.register
+def _flush_pending_state_writes_at_exit():
+    """
+    Saves all of the coalesced user state writes when the process exits.
+    """
+    try:
+        flush_pending_state_writes(requeue=False)
+    except Exception:  # pylint: disable=broad-except
+        log.exception("Could not save the pending user state writes at exit")
+
+
 class XBlockUserState(namedtuple('_XBlockUserState', ['username', 'block_key', 'state', 'updated', 'scope'])):
     """
     The current state of a single XBlock.
@@ -361,6 +519,8 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
         # count how many times this function gets called
         self._nr_stat_increment('get_many', 'calls')
 
+        flush_pending_state_writes(username=username)
+
         # keep track of blocks requested
         self._nr_stat_accumulate('get_many', 'blocks_requested', len(block_keys))
 
@@ -428,6 +588,50 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
             # what we have.
             return
 
+        block_keys_to_state = self._coalesce_writes(user, block_keys_to_state)
+        if block_keys_to_state:
+            self.save_many(user, block_keys_to_state)
+
+    def _coalesce_writes(self, user, block_keys_to_state):
+        """
+        Merges the states of the blocks whose writes are coalesced into the
+        pending writes of the process, and returns the states of the other
+        blocks, merged with any of their pending writes.
+        """
+        block_keys_to_save = {}
+        with _pending_state_writes.lock:
+            pending_writes = _pending_state_writes.writes
+            for usage_key, state in block_keys_to_state.items():
+                key = (user.id, usage_key)
+                first_write_time = monotonic()
+                if key in pending_writes:
+                    _, pending_state, first_write_time = pending_writes.pop(key)
+                    state = {**pending_state, **state}
+                if _should_write_behind(usage_key):
+                    # The window of a pending write starts with its first write, so
+                    # that a block that is written continuously is still saved.
+                    pending_writes[key] = (user, state, first_write_time)
+                    self._nr_block_stat_increment('set_many', usage_key.block_type, 'blocks_coalesced')
+                else:
+                    block_keys_to_save[usage_key] = state
+            _pending_state_writes.schedule_flush()
+            too_many_pending_writes = (
+                len(pending_writes) > getattr(settings, 'STUDENT_MODULE_WRITE_BEHIND_MAX_PENDING_WRITES', 1000)
+            )
+
+        if too_many_pending_writes:
+            flush_pending_state_writes()
+        return block_keys_to_save
+
+    def save_many(self, user, block_keys_to_state):
+        """
+        Save fields for the given XBlocks to StudentModule immediately.
+
+        Arguments:
+            user: The user whose state should be saved
+            block_keys_to_state (dict): A dict mapping UsageKeys to state dicts,
+                which are overlaid over the stored state.
+        """
         evt_time = time()
 
         for usage_key, state in block_keys_to_state.items():
@@ -511,6 +715,8 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
         if scope != Scope.user_state:
             raise ValueError("Only Scope.user_state is supported")
 
+        flush_pending_state_writes(username=username)
+
         evt_time = time()  # lint-amnesty, pylint: disable=unused-variable
         student_modules = self._get_student_modules(username, block_keys)
         for student_module, _ in student_modules:
@@ -549,6 +755,8 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
 
         if scope != Scope.user_state:
             raise ValueError("Only Scope.user_state is supported")
+
+        flush_pending_state_writes(username=username)
         student_modules = list(
             student_module
             for student_module, usage_id
@@ -600,6 +808,7 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
         if scope != Scope.user_state:
             raise ValueError("Only Scope.user_state is supported")
 
+        flush_pending_state_writes()
         results = StudentModule.objects.order_by('id').filter(module_state_key=block_key).select_related('student')
         p = Paginator(results, settings.USER_STATE_BATCH_SIZE)
 
@@ -632,6 +841,7 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
         if scope != Scope.user_state:
             raise ValueError("Only Scope.user_state is supported")
 
+        flush_pending_state_writes()
         results = StudentModule.objects.order_by('id').filter(course_id=course_key)
         if block_type:
             results = results.filter(module_type=block_type)
@@ -18,6 +18,8 @@ from lms.djangoapps.grades import constants, context, course_data, events
 from lms.djangoapps.grades.config.waffle import gradebook_bulk_management_enabled, is_writable_gradebook_enabled
 # Public Grades Factories
 from lms.djangoapps.grades.course_grade_factory import CourseGradeFactory
+from lms.djangoapps.grades.problem_score_matrix import ProblemScoreMatrix
+from lms.djangoapps.grades.vectorized_course_grade import VectorizedCourseGrader
 from lms.djangoapps.grades.models_api import *
 from lms.djangoapps.grades.signals import signals
 # TODO exposing functionality from Grades handlers seems fishy.
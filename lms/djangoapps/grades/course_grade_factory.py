@@ -2,6 +2,7 @@
 Course Grade Factory Class
 """
 from collections import namedtuple
+from itertools import islice
 from logging import getLogger
 
 from openedx.core.djangoapps.signals.signals import (
@@ -12,7 +13,11 @@ from openedx.core.djangoapps.signals.signals import (
 from .course_data import CourseData
 from .course_grade import CourseGrade, ZeroCourseGrade
 from .models import PersistentCourseGrade
-from .models_api import prefetch_grade_overrides_and_visible_blocks
+from .models_api import (
+    clear_prefetched_grade_overrides_and_visible_blocks_for_users,
+    prefetch_grade_overrides_and_visible_blocks,
+    prefetch_grade_overrides_and_visible_blocks_for_users
+)
 
 log = getLogger(__name__)
 
@@ -23,6 +28,10 @@ class CourseGradeFactory:
     """
     GradeResult = namedtuple('GradeResult', ['student', 'course_grade', 'error'])
 
+    # Number of users whose grade overrides and visible blocks are prefetched
+    # together when iterating over forced grade updates.
+    PREFETCH_BATCH_SIZE = 100
+
     def read(
             self,
             user,
@@ -93,8 +102,24 @@ class CourseGradeFactory:
         course_data = CourseData(
             user=None, course=course, collected_block_structure=collected_block_structure, course_key=course_key,
         )
-        for user in users:
-            yield self._iter_grade_result(user, course_data, force_update)
+        if not force_update:
+            for user in users:
+                yield self._iter_grade_result(user, course_data, force_update)
+            return
+
+        # Forced updates read the grade overrides and visible blocks of each
+        # user, so prefetch them for batches of users rather than one by one.
+        users = iter(users)
+        while True:
+            batch = list(islice(users, self.PREFETCH_BATCH_SIZE))
+            if not batch:
+                break
+            prefetch_grade_overrides_and_visible_blocks_for_users(batch, course_data.course_key)
+            try:
+                for user in batch:
+                    yield self._iter_grade_result(user, course_data, force_update)
+            finally:
+                clear_prefetched_grade_overrides_and_visible_blocks_for_users(batch, course_data.course_key)
 
     def _iter_grade_result(self, user, course_data, force_update):  # lint-amnesty, pylint: disable=missing-function-docstring
         try:
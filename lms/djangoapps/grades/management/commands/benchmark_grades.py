@@ -0,0 +1,270 @@
+"""
+Command to benchmark grade computation against a synthetic course.
+
+Generates a split modulestore course with the given numbers of sections,
+subsections and problems, enrolls synthetic learners with random problem
+scores, and then times CourseGradeFactory.read, update and iter, as well as
+the generation of the rows of a ProblemGradeReport.  The wall time, number
+of database queries and peak Python memory allocation of each operation are
+emitted as JSON, so that results can be compared between releases.
+
+The generated course and learners are left in place.  Only run this command
+against a development or test database.
+"""
+
+
+import json
+import logging
+import random
+import statistics
+import tracemalloc
+from time import perf_counter
+from uuid import uuid4
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from edx_django_utils.cache import RequestCache
+
+from common.djangoapps.student.models import CourseEnrollment
+from lms.djangoapps.courseware.models import StudentModule
+from lms.djangoapps.grades.course_grade_factory import CourseGradeFactory
+from lms.djangoapps.instructor_task.tasks_helper.grades import ProblemGradeReport, _ProblemGradeReportContext
+from openedx.core.djangoapps.content.block_structure.api import update_course_in_cache
+from xmodule.modulestore import ModuleStoreEnum  # lint-amnesty, pylint: disable=wrong-import-order
+from xmodule.modulestore.django import modulestore  # lint-amnesty, pylint: disable=wrong-import-order
+
+log = logging.getLogger(__name__)
+
+PROBLEM_DATA = """
+<problem>
+  <multiplechoiceresponse>
+    <choicegroup type="MultipleChoice">
+      <choice correct="true">Correct</choice>
+      <choice correct="false">Incorrect</choice>
+    </choicegroup>
+  </multiplechoiceresponse>
+</problem>
+"""
+
+
+class Command(BaseCommand):
+    """
+    Example usage:
+        $ ./manage.py lms benchmark_grades --settings=devstack
+        $ ./manage.py lms benchmark_grades --sections 20 --subsections 5 --problems 10 --learners 500
+            --output grades_benchmark.json --settings=devstack
+    """
+    help = 'Benchmarks grade computation against a synthetic course and emits the results as JSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sections',
+            help='Number of sections in the synthetic course.',
+            default=10,
+            type=int,
+        )
+        parser.add_argument(
+            '--subsections',
+            help='Number of graded subsections in each section.',
+            default=4,
+            type=int,
+        )
+        parser.add_argument(
+            '--problems',
+            help='Number of problems in each subsection.',
+            default=5,
+            type=int,
+        )
+        parser.add_argument(
+            '--learners',
+            help='Number of enrolled learners.',
+            default=100,
+            type=int,
+        )
+        parser.add_argument(
+            '--attempted_ratio',
+            help='Fraction of problems attempted by each learner.',
+            default=0.75,
+            type=float,
+        )
+        parser.add_argument(
+            '--iterations',
+            help='Number of timed runs of each operation.',
+            default=3,
+            type=int,
+        )
+        parser.add_argument(
+            '--seed',
+            help='Seed of the random learner scores.',
+            default=0,
+            type=int,
+        )
+        parser.add_argument(
+            '--output',
+            help='File to write the JSON results to, instead of stdout.',
+        )
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError('At least one iteration is required.')
+
+        course = self._create_course(options['sections'], options['subsections'], options['problems'])
+        users = self._create_learners(
+            course, options['learners'], options['attempted_ratio'], random.Random(options['seed']),
+        )
+        operations = {
+            'update': lambda: [CourseGradeFactory().update(user, course) for user in users],
+            'read': lambda: [CourseGradeFactory().read(user, course) for user in users],
+            'iter': lambda: list(CourseGradeFactory().iter(users, course)),
+            'problem_grade_report': lambda: self._generate_problem_grade_report_rows(course.id),
+        }
+        results = {
+            'course_id': str(course.id),
+            'sections': options['sections'],
+            'subsections_per_section': options['subsections'],
+            'problems_per_subsection': options['problems'],
+            'learners': options['learners'],
+            'iterations': options['iterations'],
+            'operations': {
+                name: self._benchmark(name, operation, options['iterations'])
+                for name, operation in operations.items()
+            },
+        }
+
+        output = json.dumps(results, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as output_file:
+                output_file.write(output)
+        else:
+            self.stdout.write(output)
+
+    def _create_course(self, num_sections, num_subsections, num_problems):
+        """
+        Creates and publishes a split course with the given numbers of
+        sections, graded subsections per section and problems per
+        subsection.  Subsections cycle through the assignment types of the
+        default grading policy.
+        """
+        store = modulestore()
+        user_id = ModuleStoreEnum.UserID.mgmt_command
+        with store.default_store(ModuleStoreEnum.Type.split):
+            course = store.create_course(
+                'GradesBenchmark', uuid4().hex[:8], 'run', user_id, fields={'display_name': 'Grades Benchmark'},
+            )
+            assignment_types = [grader['type'] for grader in course.raw_grader]
+            with store.bulk_operations(course.id):
+                for section_index in range(num_sections):
+                    chapter = store.create_child(
+                        user_id, course.location, 'chapter', fields={'display_name': f'Section {section_index}'},
+                    )
+                    for subsection_index in range(num_subsections):
+                        sequential = store.create_child(
+                            user_id, chapter.location, 'sequential', fields={
+                                'display_name': f'Subsection {section_index}.{subsection_index}',
+                                'graded': True,
+                                'format': assignment_types[subsection_index % len(assignment_types)],
+                            },
+                        )
+                        vertical = store.create_child(user_id, sequential.location, 'vertical')
+                        for problem_index in range(num_problems):
+                            store.create_child(
+                                user_id, vertical.location, 'problem', fields={
+                                    'display_name': f'Problem {problem_index}',
+                                    'data': PROBLEM_DATA,
+                                },
+                            )
+                store.publish(course.location, user_id)
+        update_course_in_cache(course.id)
+        log.info('Created course %s for grades benchmark', course.id)
+        return store.get_course(course.id, depth=0)
+
+    def _create_learners(self, course, num_learners, attempted_ratio, rand):
+        """
+        Creates learners enrolled in the given course, with a random score
+        on a random subset of its problems.
+        """
+        prefix = f'grades_benchmark_{uuid4().hex[:8]}'
+        get_user_model().objects.bulk_create([
+            get_user_model()(
+                username=f'{prefix}_{index}',
+                email=f'{prefix}_{index}@example.com',
+                password=make_password(None),
+            )
+            for index in range(num_learners)
+        ])
+        # Not every database backend sets primary keys on bulk_create.
+        users = list(get_user_model().objects.filter(username__startswith=prefix).order_by('id'))
+
+        CourseEnrollment.objects.bulk_create([
+            CourseEnrollment(user=user, course_id=course.id, mode='audit', is_active=True)
+            for user in users
+        ])
+
+        problem_keys = [
+            problem.location for problem in modulestore().get_items(course.id, qualifiers={'category': 'problem'})
+        ]
+        student_modules = []
+        for user in users:
+            for problem_key in problem_keys:
+                if rand.random() < attempted_ratio:
+                    student_modules.append(StudentModule(
+                        student=user,
+                        course_id=course.id,
+                        module_state_key=problem_key,
+                        module_type='problem',
+                        state=json.dumps({'attempts': 1}),
+                        grade=rand.choice((0, 1)),
+                        max_grade=1,
+                    ))
+        StudentModule.objects.bulk_create(student_modules, batch_size=1000)
+        log.info('Created %d learners with %d problem scores', len(users), len(student_modules))
+        return users
+
+    def _generate_problem_grade_report_rows(self, course_key):
+        """
+        Generates all rows of a ProblemGradeReport for the course, without
+        uploading them.
+        """
+        context = _ProblemGradeReportContext(None, None, course_key, {}, 'graded')
+        report = ProblemGradeReport(context)
+        report._success_headers()  # pylint: disable=protected-access
+        for _ in report._batched_rows():  # pylint: disable=protected-access
+            pass
+
+    def _benchmark(self, name, operation, iterations):
+        """
+        Returns the wall times and query count of the timed runs of the given
+        operation, and its peak memory allocation in an additional run.
+        """
+        wall_times = []
+        num_queries = None
+        for _ in range(iterations):
+            RequestCache.clear_all_namespaces()
+            with CaptureQueriesContext(connection) as queries:
+                start = perf_counter()
+                operation()
+                wall_times.append(perf_counter() - start)
+            num_queries = len(queries)
+
+        # Memory is traced in a separate run, since tracing slows down the operation.
+        RequestCache.clear_all_namespaces()
+        tracemalloc.start()
+        try:
+            operation()
+            _, peak_memory = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        log.info('Benchmarked %s: %s', name, wall_times)
+        return {
+            'wall_time_seconds': {
+                'min': min(wall_times),
+                'median': statistics.median(wall_times),
+                'max': max(wall_times),
+            },
+            'queries': num_queries,
+            'peak_memory_bytes': peak_memory,
+        }
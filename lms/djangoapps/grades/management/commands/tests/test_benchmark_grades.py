@@ -0,0 +1,47 @@
+"""
+Tests for benchmark_grades management command.
+"""
+
+
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from common.djangoapps.student.models import CourseEnrollment
+from lms.djangoapps.courseware.models import StudentModule
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase  # lint-amnesty, pylint: disable=wrong-import-order
+
+
+class TestBenchmarkGrades(ModuleStoreTestCase):
+    """
+    Tests benchmark_grades management command.
+    """
+
+    def test_benchmark(self):
+        out = StringIO()
+        call_command(
+            'benchmark_grades',
+            '--sections', '2',
+            '--subsections', '2',
+            '--problems', '2',
+            '--learners', '3',
+            '--attempted_ratio', '1',
+            '--iterations', '2',
+            stdout=out,
+        )
+        results = json.loads(out.getvalue())
+
+        assert results['learners'] == 3
+        assert CourseEnrollment.objects.filter(course_id=results['course_id']).count() == 3
+        assert StudentModule.objects.filter(course_id=results['course_id']).count() == 3 * 2 * 2 * 2
+        assert set(results['operations']) == {'update', 'read', 'iter', 'problem_grade_report'}
+        for operation_results in results['operations'].values():
+            assert set(operation_results['wall_time_seconds']) == {'min', 'median', 'max'}
+            assert operation_results['queries'] > 0
+            assert operation_results['peak_memory_bytes'] > 0
+
+    def test_no_iterations(self):
+        with pytest.raises(CommandError):
+            call_command('benchmark_grades', '--iterations', '0')
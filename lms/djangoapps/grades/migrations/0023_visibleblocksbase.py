@@ -0,0 +1,38 @@
+# Generated by Django 4.2.20 on 2026-10-18 12:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+import opaque_keys.edx.django.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('grades', '0022_rename_persistentsubsectiongrade_first_attempted_course_id_user_id_first_course_id_user_id_idx_and_m'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VisibleBlocksBase',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('blocks_json', models.TextField()),
+                ('hashed', models.CharField(max_length=100, unique=True)),
+                ('course_id', opaque_keys.edx.django.models.CourseKeyField(max_length=255)),
+                ('usage_key', opaque_keys.edx.django.models.UsageKeyField(max_length=255)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['course_id', 'usage_key'], name='visible_blocks_base_idx')],
+            },
+        ),
+        migrations.AddField(
+            model_name='visibleblocks',
+            name='base',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, to='grades.visibleblocksbase'),
+        ),
+        migrations.AddField(
+            model_name='visibleblocks',
+            name='excluded_json',
+            field=models.TextField(blank=True, default=''),
+        ),
+    ]
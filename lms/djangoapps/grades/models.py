@@ -15,6 +15,7 @@ from collections import defaultdict, namedtuple
 from hashlib import sha1
 
 from django.apps import apps
+from django.conf import settings
 from django.db import models, IntegrityError, transaction
 from openedx_events.learning.data import CourseData, PersistentCourseGradeData
 from openedx_events.learning.signals import PERSISTENT_GRADE_SUMMARY_CHANGED
@@ -129,6 +130,141 @@ class BlockRecordList:
         return cls(blocks, course_key)
 
 
+def _excluded_indices(base_blocks, blocks):
+    """
+    Returns the indices of the items of base_blocks that are not in blocks, if
+    blocks is a subsequence of base_blocks.  Otherwise, returns None.
+    """
+    excluded = []
+    position = 0
+    for index, block in enumerate(base_blocks):
+        if position < len(blocks) and blocks[position] == block:
+            position += 1
+        else:
+            excluded.append(index)
+    return excluded if position == len(blocks) else None
+
+
+def _merge_blocks(base_blocks, blocks):
+    """
+    Returns a list that contains blocks as a subsequence, along with the
+    items of base_blocks whose locators are not in blocks, in the order of
+    base_blocks where possible.  Each locator is in the list once, with its
+    item from blocks if it is in both.
+    """
+    positions = {block['locator']: position for position, block in enumerate(blocks)}
+    merged = []
+    position = 0
+    for base_block in base_blocks:
+        block_position = positions.get(base_block['locator'])
+        if block_position is None:
+            merged.append(base_block)
+        elif block_position >= position:
+            merged.extend(blocks[position:block_position + 1])
+            position = block_position + 1
+    return merged + blocks[position:]
+
+
+def _blocks_by_locator(blocks):
+    """
+    Returns a dict of the given block records keyed by their locators.
+    """
+    return {block['locator']: block for block in blocks}
+
+
+class VisibleBlocksBase(models.Model):
+    """
+    A django model used to store a list of block records under a given
+    subsection, which is shared by the VisibleBlocks of the learners who
+    see that subsection.  A VisibleBlocks record that references a base
+    stores only the indices of the base's block records that were not
+    visible to the learner, rather than a full copy of the block records.
+
+    The block records are stored in the same json format as those of
+    VisibleBlocks, and a hash of this json is used for lookup purposes.
+
+    .. no_pii:
+    """
+    blocks_json = models.TextField()
+    hashed = models.CharField(max_length=100, unique=True)
+    course_id = CourseKeyField(blank=False, max_length=255)
+    usage_key = UsageKeyField(blank=False, max_length=255)
+
+    _CACHE_NAMESPACE = "grades.models.VisibleBlocksBase"
+
+    class Meta:
+        app_label = "grades"
+        indexes = [
+            models.Index(fields=['course_id', 'usage_key'], name='visible_blocks_base_idx'),
+        ]
+
+    def __str__(self):
+        """
+        String representation of this model.
+        """
+        return f"VisibleBlocksBase object - subsection: {self.usage_key}, hash:{self.hashed}"
+
+    @lazy
+    def data(self):
+        """
+        Returns the deserialized blocks_json data stored on this model.
+        """
+        return json.loads(self.blocks_json)
+
+    @classmethod
+    def get_or_create_for_blocks(cls, usage_key, block_record_list):
+        """
+        Returns the latest base of the given subsection, along with the
+        indices of its block records that are not in the given
+        BlockRecordList.  If the block records are not a subsequence of the
+        latest base, a new base that merges the two is created and returned.
+
+        If the merged block records are the same as the latest base's, i.e.
+        the given block records only differ from the base in their order,
+        no base is created and (None, None) is returned.
+        """
+        data = json.loads(block_record_list.json_value)
+        base = cls._latest_base(block_record_list.course_key, usage_key)
+        if base is not None and base.data['version'] == data['version']:
+            excluded = _excluded_indices(base.data['blocks'], data['blocks'])
+            if excluded is not None:
+                return base, excluded
+            merged_blocks = _merge_blocks(base.data['blocks'], data['blocks'])
+            if _blocks_by_locator(merged_blocks) == _blocks_by_locator(base.data['blocks']):
+                return None, None
+            base_data = dict(data, blocks=merged_blocks)
+        else:
+            base_data = data
+
+        base_json = json.dumps(base_data, separators=(',', ':'), sort_keys=True)
+        base, _ = cls.objects.get_or_create(
+            hashed=b64encode(sha1(base_json.encode('utf-8')).digest()).decode('utf-8'),
+            defaults={
+                'blocks_json': base_json,
+                'course_id': block_record_list.course_key,
+                'usage_key': usage_key,
+            },
+        )
+        get_cache(cls._CACHE_NAMESPACE)[cls._cache_key(block_record_list.course_key, usage_key)] = base
+        return base, _excluded_indices(base.data['blocks'], data['blocks'])
+
+    @classmethod
+    def _latest_base(cls, course_key, usage_key):
+        """
+        Returns the most recently created base of the given subsection, or
+        None if the subsection has no base yet.
+        """
+        cache = get_cache(cls._CACHE_NAMESPACE)
+        cache_key = cls._cache_key(course_key, usage_key)
+        if cache_key not in cache:
+            cache[cache_key] = cls.objects.filter(course_id=course_key, usage_key=usage_key).order_by('-id').first()
+        return cache[cache_key]
+
+    @classmethod
+    def _cache_key(cls, course_key, usage_key):
+        return f"visible_blocks_base.{course_key}.{usage_key}"
+
+
 class VisibleBlocks(models.Model):
     """
     A django model used to track the state of a set of visible blocks under a
@@ -138,11 +274,19 @@ class VisibleBlocks(models.Model):
     in the blocks_json field. A hash of this json array is used for lookup
     purposes.
 
+    When delta encoding is enabled, the array is instead stored as a
+    reference to a VisibleBlocksBase of the subsection, along with the
+    indices of the base's block records that are excluded from the array,
+    and blocks_json is left empty.  Use json_value rather than blocks_json
+    to read the json array of either representation.
+
     .. no_pii:
     """
     blocks_json = models.TextField()
     hashed = models.CharField(max_length=100, unique=True)
     course_id = CourseKeyField(blank=False, max_length=255, db_index=True)
+    base = models.ForeignKey(VisibleBlocksBase, null=True, blank=True, on_delete=models.PROTECT)
+    excluded_json = models.TextField(blank=True, default='')
 
     _CACHE_NAMESPACE = "grades.models.VisibleBlocks"
 
@@ -155,13 +299,26 @@ class VisibleBlocks(models.Model):
         """
         return f"VisibleBlocks object - hash:{self.hashed}, raw json:'{self.blocks_json}'"
 
+    @property
+    def json_value(self):
+        """
+        Returns the json array of block records of this model, as serialized
+        by BlockRecordList.json_value.
+        """
+        if self.base_id is None:
+            return self.blocks_json
+        excluded = set(json.loads(self.excluded_json))
+        data = dict(self.base.data)
+        data['blocks'] = [block for index, block in enumerate(data['blocks']) if index not in excluded]
+        return json.dumps(data, separators=(',', ':'), sort_keys=True)
+
     @property
     def blocks(self):
         """
-        Returns the blocks_json data stored on this model as a list of
+        Returns the block records stored on this model as a list of
         BlockRecords in the order they were provided.
         """
-        return BlockRecordList.from_json(self.blocks_json)
+        return BlockRecordList.from_json(self.json_value)
 
     @classmethod
     def bulk_read(cls, user_id, course_key):
@@ -179,12 +336,15 @@ class VisibleBlocks(models.Model):
         return prefetched
 
     @classmethod
-    def cached_get_or_create(cls, user_id, blocks):
+    def cached_get_or_create(cls, user_id, blocks, usage_key=None):
         """
         Given a ``user_id`` and a ``BlockRecordList`` object, attempts to
         fetch the related VisibleBlocks model from the request cache.  This
         will create and save a new ``VisibleBlocks`` record if no record
         exists corresponding to the hash_value of ``blocks``.
+
+        If the ``usage_key`` of the subsection of ``blocks`` is given, a new
+        record may be delta encoded against the subsection's base.
         """
         prefetched = get_cache(cls._CACHE_NAMESPACE).get(cls._cache_key(user_id, blocks.course_key))
         if prefetched is not None:
@@ -193,30 +353,75 @@ class VisibleBlocks(models.Model):
                 # We still have to do a get_or_create, because
                 # another user may have had this block hash created,
                 # even if the user we checked the cache for hasn't yet.
-                model, _ = cls.objects.get_or_create(
-                    hashed=blocks.hash_value, blocks_json=blocks.json_value, course_id=blocks.course_key,
-                )
+                model = cls._get_or_create(blocks, usage_key)
                 cls._update_cache(user_id, blocks.course_key, [model])
         else:
+            model = cls._get_or_create(blocks, usage_key)
+        return model
+
+    @classmethod
+    def _get_or_create(cls, blocks, usage_key):
+        """
+        Returns the VisibleBlocks record corresponding to the hash_value of
+        the given ``BlockRecordList``, creating it if needed.
+        """
+        if not cls._use_delta_encoding(usage_key):
             model, _ = cls.objects.get_or_create(
                 hashed=blocks.hash_value,
                 defaults={'blocks_json': blocks.json_value, 'course_id': blocks.course_key},
             )
-        return model
+            return model
+
+        # The base is only looked up when the record needs to be created.
+        try:
+            return cls.objects.get(hashed=blocks.hash_value)
+        except cls.DoesNotExist:
+            pass
+        stored_fields = cls._stored_fields(blocks, usage_key)
+        try:
+            with transaction.atomic():
+                return cls.objects.create(hashed=blocks.hash_value, course_id=blocks.course_key, **stored_fields)
+        except IntegrityError:
+            return cls.objects.get(hashed=blocks.hash_value)
+
+    @classmethod
+    def _stored_fields(cls, blocks, usage_key):
+        """
+        Returns the values of the fields that store the block records of the
+        given ``BlockRecordList``, delta encoded against the base of the
+        subsection when enabled, when the subsection has a base for them and
+        when that is smaller than a full copy.
+        """
+        if cls._use_delta_encoding(usage_key):
+            base, excluded = VisibleBlocksBase.get_or_create_for_blocks(usage_key, blocks)
+            if base is not None:
+                excluded_json = json.dumps(excluded, separators=(',', ':'))
+                if len(excluded_json) < len(blocks.json_value):
+                    return {'blocks_json': '', 'base': base, 'excluded_json': excluded_json}
+        return {'blocks_json': blocks.json_value}
+
+    @staticmethod
+    def _use_delta_encoding(usage_key):
+        return usage_key is not None and getattr(settings, 'GRADES_DELTA_ENCODED_VISIBLE_BLOCKS', False)
 
     @classmethod
-    def bulk_create(cls, user_id, course_key, block_record_lists):
+    def bulk_create(cls, user_id, course_key, block_record_lists, usage_keys_by_hash=None):
         """
         Bulk creates VisibleBlocks for the given iterator of
         BlockRecordList objects and updates the VisibleBlocks cache
         for the block records' course with the new VisibleBlocks.
         Returns the newly created visible blocks.
+
+        ``usage_keys_by_hash`` optionally maps the hash_value of each
+        BlockRecordList to the usage key of its subsection, so that the
+        new records may be delta encoded.
         """
+        usage_keys_by_hash = usage_keys_by_hash or {}
         visual_blocks = [
             VisibleBlocks(
-                blocks_json=brl.json_value,
                 hashed=brl.hash_value,
                 course_id=course_key,
+                **cls._stored_fields(brl, usage_keys_by_hash.get(brl.hash_value)),
             )
             for brl in block_record_lists
         ]
@@ -253,7 +458,7 @@ class VisibleBlocks(models.Model):
         return created_visual_blocks
 
     @classmethod
-    def bulk_get_or_create(cls, user_id, course_key, block_record_lists):
+    def bulk_get_or_create(cls, user_id, course_key, block_record_lists, usage_keys_by_hash=None):
         """
         Bulk creates VisibleBlocks for the given iterator of
         BlockRecordList objects for the given user and course_key, but
@@ -261,7 +466,35 @@ class VisibleBlocks(models.Model):
         """
         cached_records = cls.bulk_read(user_id, course_key)
         non_existent_brls = {brl for brl in block_record_lists if brl.hash_value not in cached_records}
-        cls.bulk_create(user_id, course_key, non_existent_brls)
+        cls.bulk_create(user_id, course_key, non_existent_brls, usage_keys_by_hash)
+
+    @classmethod
+    def prefetch_for_grades(cls, course_key, grades_by_user_id):
+        """
+        Prefetches the visible blocks of the given subsection grades, grouped
+        by user id, and stores them in the cache of each user.  Visible blocks
+        shared by the grades of several users are read from the database only
+        once, and each grade is updated to reference the shared record.
+        """
+        hashes = {grade.visible_blocks_id for grades in grades_by_user_id.values() for grade in grades}
+        visible_blocks = {}
+        if hashes:
+            visible_blocks = {
+                block.hashed: block for block in cls.objects.filter(hashed__in=hashes).prefetch_related('base')
+            }
+        for user_id, grades in grades_by_user_id.items():
+            prefetched = {}
+            for grade in grades:
+                grade.visible_blocks = visible_blocks[grade.visible_blocks_id]
+                prefetched[grade.visible_blocks_id] = grade.visible_blocks
+            get_cache(cls._CACHE_NAMESPACE)[cls._cache_key(user_id, course_key)] = prefetched
+
+    @classmethod
+    def clear_prefetched_data(cls, user_id, course_key):
+        """
+        Clears prefetched visible blocks for this user and course from the RequestCache.
+        """
+        get_cache(cls._CACHE_NAMESPACE).pop(cls._cache_key(user_id, course_key), None)
 
     @classmethod
     def _initialize_cache(cls, user_id, course_key):
@@ -270,7 +503,7 @@ class VisibleBlocks(models.Model):
         Returns a dictionary mapping hashes of these block records to the
         block record objects.
         """
-        grades_with_blocks = PersistentSubsectionGrade.objects.select_related('visible_blocks').filter(
+        grades_with_blocks = PersistentSubsectionGrade.objects.select_related('visible_blocks__base').filter(
             user_id=user_id,
             course_id=course_key,
         )
@@ -392,24 +625,56 @@ class PersistentSubsectionGrade(TimeStampedModel):
     @classmethod
     def prefetch(cls, course_key, users):
         """
-        Prefetches grades for the given users in the given course.
+        Prefetches grades, along with their overrides and visible blocks, for
+        the given users in the given course.  Replaces any grades previously
+        prefetched for the course.
         """
-        cache_key = cls._cache_key(course_key)
-        get_cache(cls._CACHE_NAMESPACE)[cache_key] = defaultdict(list)
-        cached_grades = get_cache(cls._CACHE_NAMESPACE)[cache_key]
-        queryset = cls.objects.select_related('visible_blocks', 'override').filter(
-            user_id__in=[user.id for user in users],
-            course_id=course_key,
+        cls.clear_prefetched_data(course_key)
+        get_cache(cls._CACHE_NAMESPACE)[cls._cache_key(course_key)] = cls.prefetch_overrides_and_visible_blocks(
+            course_key, users,
         )
-        for record in queryset:
-            cached_grades[record.user_id].append(record)
+
+    @classmethod
+    def prefetch_overrides_and_visible_blocks(cls, course_key, users):
+        """
+        Prefetches the overrides and visible blocks of the grades of the given
+        users in the given course into the caches that the per-user grading
+        code reads from, using a constant number of queries for the whole
+        batch of users.  Returns the grades, as a dict of lists keyed by user id.
+        """
+        user_ids = [user.id for user in users]
+        grades_by_user_id = defaultdict(list, {user_id: [] for user_id in user_ids})
+        if user_ids:
+            queryset = cls.objects.select_related('override').filter(
+                user_id__in=user_ids,
+                course_id=course_key,
+            )
+            for record in queryset:
+                grades_by_user_id[record.user_id].append(record)
+
+        VisibleBlocks.prefetch_for_grades(course_key, grades_by_user_id)
+        PersistentSubsectionGradeOverride.prefetch_for_grades(course_key, grades_by_user_id)
+        return grades_by_user_id
 
     @classmethod
     def clear_prefetched_data(cls, course_key):
         """
-        Clears prefetched grades for this course from the RequestCache.
+        Clears prefetched grades for this course, along with the overrides and
+        visible blocks prefetched with them, from the RequestCache.
         """
-        get_cache(cls._CACHE_NAMESPACE).pop(cls._cache_key(course_key), None)
+        prefetched_grades = get_cache(cls._CACHE_NAMESPACE).pop(cls._cache_key(course_key), None)
+        if prefetched_grades:
+            cls.clear_prefetched_overrides_and_visible_blocks(course_key, list(prefetched_grades))
+
+    @classmethod
+    def clear_prefetched_overrides_and_visible_blocks(cls, course_key, user_ids):
+        """
+        Clears prefetched overrides and visible blocks for the given users in
+        this course from the RequestCache.
+        """
+        for user_id in user_ids:
+            VisibleBlocks.clear_prefetched_data(user_id, course_key)
+            PersistentSubsectionGradeOverride.clear_prefetched_overrides_for_learner(user_id, course_key)
 
     @classmethod
     def read_grade(cls, user_id, usage_key):
@@ -422,7 +687,7 @@ class PersistentSubsectionGrade(TimeStampedModel):
 
         Raises PersistentSubsectionGrade.DoesNotExist if applicable
         """
-        return cls.objects.select_related('visible_blocks', 'override').get(
+        return cls.objects.select_related('visible_blocks__base', 'override').get(
             user_id=user_id,
             course_id=usage_key.course_key,  # course_id is included to take advantage of db indexes
             usage_key=usage_key,
@@ -447,7 +712,7 @@ class PersistentSubsectionGrade(TimeStampedModel):
                 return []
         except KeyError:
             # subsection grades were not prefetched for the course, so get them from the DB
-            return cls.objects.select_related('visible_blocks', 'override').filter(
+            return cls.objects.select_related('visible_blocks__base', 'override').filter(
                 user_id=user_id,
                 course_id=course_key,
             )
@@ -458,7 +723,7 @@ class PersistentSubsectionGrade(TimeStampedModel):
         Wrapper for objects.update_or_create.
         """
         cls._prepare_params(params)
-        VisibleBlocks.cached_get_or_create(params['user_id'], params['visible_blocks'])
+        VisibleBlocks.cached_get_or_create(params['user_id'], params['visible_blocks'], params['usage_key'])
         cls._prepare_params_visible_blocks_id(params)
 
         # TODO: do we NEED to pop these?
@@ -493,7 +758,10 @@ class PersistentSubsectionGrade(TimeStampedModel):
 
         list(map(cls._prepare_params, grade_params_iter))
         VisibleBlocks.bulk_get_or_create(
-            user_id, course_key, [params['visible_blocks'] for params in grade_params_iter]
+            user_id,
+            course_key,
+            [params['visible_blocks'] for params in grade_params_iter],
+            {params['visible_blocks'].hash_value: params['usage_key'] for params in grade_params_iter},
         )
         list(map(cls._prepare_params_visible_blocks_id, grade_params_iter))
 
@@ -788,12 +1056,36 @@ class PersistentSubsectionGradeOverride(models.Model):
 
     @classmethod
     def prefetch(cls, user_id, course_key):
+        """
+        Prefetches the overrides of the given user in the given course, unless
+        they were already prefetched along with a batch of users.
+        """
+        if user_id in get_cache(cls._CACHE_NAMESPACE).get(cls._batch_cache_key(course_key), ()):
+            return
         get_cache(cls._CACHE_NAMESPACE)[(user_id, str(course_key))] = {
             override.grade.usage_key: override
             for override in
             cls.objects.filter(grade__user_id=user_id, grade__course_id=course_key)
         }
 
+    @classmethod
+    def prefetch_for_grades(cls, course_key, grades_by_user_id):
+        """
+        Stores the overrides of the given subsection grades, grouped by user
+        id, in the cache of each user.  The grades must have been read with
+        their overrides selected.
+        """
+        cache = get_cache(cls._CACHE_NAMESPACE)
+        for user_id, grades in grades_by_user_id.items():
+            overrides = {}
+            for grade in grades:
+                try:
+                    overrides[grade.usage_key] = grade.override
+                except cls.DoesNotExist:
+                    pass
+            cache[(user_id, str(course_key))] = overrides
+        cache.setdefault(cls._batch_cache_key(course_key), set()).update(grades_by_user_id)
+
     @classmethod
     def get_override(cls, user_id, usage_key):  # lint-amnesty, pylint: disable=missing-function-docstring
         prefetch_values = get_cache(cls._CACHE_NAMESPACE).get((user_id, str(usage_key.course_key)), None)
@@ -836,6 +1128,12 @@ class PersistentSubsectionGradeOverride(models.Model):
             override._history_user = requesting_user  # pylint: disable=protected-access
         override.save()
 
+        prefetched = get_cache(cls._CACHE_NAMESPACE).get(
+            (subsection_grade_model.user_id, str(subsection_grade_model.course_id)), None
+        )
+        if prefetched is not None:
+            prefetched[subsection_grade_model.usage_key] = override
+
         return override
 
     @staticmethod
@@ -863,3 +1161,8 @@ class PersistentSubsectionGradeOverride(models.Model):
     @classmethod
     def clear_prefetched_overrides_for_learner(cls, user_id, course_key):
         get_cache(cls._CACHE_NAMESPACE).pop((user_id, str(course_key)), None)
+        get_cache(cls._CACHE_NAMESPACE).get(cls._batch_cache_key(course_key), set()).discard(user_id)
+
+    @staticmethod
+    def _batch_cache_key(course_key):
+        return ('batch_prefetched_users', str(course_key))
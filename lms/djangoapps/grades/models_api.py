@@ -18,6 +18,14 @@ def prefetch_grade_overrides_and_visible_blocks(user, course_key):
     _VisibleBlocks.bulk_read(user.id, course_key)
 
 
+def prefetch_grade_overrides_and_visible_blocks_for_users(users, course_key):
+    _PersistentSubsectionGrade.prefetch_overrides_and_visible_blocks(course_key, users)
+
+
+def clear_prefetched_grade_overrides_and_visible_blocks_for_users(users, course_key):
+    _PersistentSubsectionGrade.clear_prefetched_overrides_and_visible_blocks(course_key, [user.id for user in users])
+
+
 def prefetch_course_grades(course_key, users):
     _PersistentCourseGrade.prefetch(course_key, users)
 
@@ -34,6 +42,7 @@ def clear_prefetched_course_grades(course_key):
 
 def clear_prefetched_course_and_subsection_grades(course_key):
     _PersistentCourseGrade.clear_prefetched_data(course_key)
+    _PersistentSubsectionGrade.clear_prefetched_data(course_key)
 
 
 def get_recently_modified_grades(course_keys, start_date, end_date, users=None):
@@ -0,0 +1,237 @@
+"""
+ProblemScoreMatrix Class
+
+Computes the scores of a batch of users on each graded problem of a
+course at once.  Rather than building CourseGrade objects for each user,
+the scores stored in StudentModule and by the Submissions API for the
+whole batch are read with a constant number of queries.  The block records
+of the users' persisted subsection grades determine the weight and
+possible score of each problem, and whether it is available to each user.
+
+Scores are resolved in the same order of precedence as scores.get_score:
+the Submissions API, then StudentModule, then the persisted block record,
+then the latest block content.  Problems of subsections that a user has no
+persisted grade for are graded against the collected course structure, and
+are available to the user if they are in the user's course structure.
+"""
+
+
+from collections import OrderedDict, defaultdict, namedtuple
+
+import numpy
+from submissions.models import ScoreSummary
+
+from common.djangoapps.student.models import AnonymousUserId
+from lms.djangoapps.courseware.models import StudentModule
+
+from .context import grading_context
+from .course_data import CourseData
+from .models import PersistentSubsectionGrade, VisibleBlocks
+from .scores import weighted_score
+from .transformer import GradesTransformer
+
+# Arrays of users by problems of the scores of a batch of users.  Where a
+# problem isn't available to a user, possible is NaN and available is False.
+ProblemScores = namedtuple('ProblemScores', ['user_ids', 'earned', 'possible', 'attempted', 'available'])
+
+
+class ProblemScoreMatrix:
+    """
+    Computes matrices of users by graded problems of the scores of batches
+    of users.
+    """
+    def __init__(self, course=None, collected_block_structure=None, course_key=None, problem_keys=None):
+        """
+        Arguments:
+            problem_keys: the problems of the columns of the matrices, in
+                order.  Defaults to the scored descendants of the course's
+                graded subsections, in the order of the grading context.
+        """
+        course_data = CourseData(
+            user=None, course=course, collected_block_structure=collected_block_structure, course_key=course_key,
+        )
+        self.course_key = course_data.course_key
+
+        subsection_keys = OrderedDict()
+        blocks = {}
+        context = grading_context(course_data.course, course_data.collected_structure)
+        for subsection_infos in context['all_graded_subsections_by_type'].values():
+            for subsection_info in subsection_infos:
+                for block in subsection_info['scored_descendants']:
+                    subsection_keys.setdefault(block.location, subsection_info['subsection_block'].location)
+                    blocks[block.location] = block
+
+        self.problem_keys = list(subsection_keys) if problem_keys is None else list(problem_keys)
+        self._problem_indices = {problem_key: index for index, problem_key in enumerate(self.problem_keys)}
+        # The Submissions API stores the strings of the usage keys.
+        self._problem_indices_by_item_id = {
+            str(problem_key): index for index, problem_key in enumerate(self.problem_keys)
+        }
+        self._problem_indices_by_subsection = defaultdict(list)
+        for index, problem_key in enumerate(self.problem_keys):
+            self._problem_indices_by_subsection[subsection_keys[problem_key]].append(index)
+        self._weights = [getattr(blocks[problem_key], 'weight', None) for problem_key in self.problem_keys]
+
+        # Possible score of each problem for users who haven't attempted it
+        # and have no persisted grade of its subsection.
+        self.default_possible = numpy.array([
+            self._weighted_possible(
+                blocks[problem_key].transformer_data[GradesTransformer].max_score, self._weights[index],
+            )
+            for index, problem_key in enumerate(self.problem_keys)
+        ], dtype=float)
+
+    def load(self, user_ids, user_structures=None):
+        """
+        Returns the ProblemScores of the given users.
+
+        Arguments:
+            user_structures: the course structure of each of the users, as
+                returned by VectorizedCourseGrader.get_user_structure.  If
+                given, the problems of subsections without a persisted grade
+                that aren't in a user's structure aren't available to them.
+        """
+        user_ids = list(user_ids)
+        user_indices = {user_id: index for index, user_id in enumerate(user_ids)}
+        shape = (len(user_ids), len(self.problem_keys))
+        earned = numpy.zeros(shape)
+        possible = numpy.tile(self.default_possible, (len(user_ids), 1))
+        attempted = numpy.zeros(shape, dtype=bool)
+
+        persisted = numpy.zeros(shape, dtype=bool)
+        persisted_weights = self._load_persisted_blocks(user_indices, possible, persisted)
+        if user_structures is not None:
+            hidden = numpy.array([
+                [problem_key not in user_structure for problem_key in self.problem_keys]
+                for user_structure in user_structures
+            ], dtype=bool).reshape(shape)
+            possible[hidden & ~persisted] = numpy.nan
+        available = ~numpy.isnan(possible)
+
+        # Scores stored in StudentModule, as read by ScoresClient.
+        csm_scores = StudentModule.objects.filter(
+            student_id__in=user_ids,
+            course_id=self.course_key,
+            module_state_key__in=self.problem_keys,
+            max_grade__isnull=False,
+        ).values_list('student_id', 'module_state_key', 'grade', 'max_grade')
+        for user_id, location, correct, total in csm_scores:
+            user_index = user_indices[user_id]
+            problem_index = self._problem_indices.get(location.map_into_course(self.course_key))
+            if problem_index is None or not available[user_index, problem_index]:
+                continue
+            weight = persisted_weights.get((user_index, problem_index), self._weights[problem_index])
+            raw_earned = correct if correct is not None else 0.0
+            earned[user_index, problem_index], possible[user_index, problem_index] = weighted_score(
+                raw_earned, total, weight,
+            )
+            attempted[user_index, problem_index] = correct is not None
+
+        # Scores stored by the Submissions API, which take precedence.
+        for user_index, problem_index, points_earned, points_possible in self._load_submissions_scores(user_indices):
+            if not available[user_index, problem_index]:
+                continue
+            earned[user_index, problem_index] = points_earned
+            possible[user_index, problem_index] = points_possible
+            attempted[user_index, problem_index] = True
+
+        return ProblemScores(user_ids, earned, possible, attempted, available)
+
+    def nondefault_cells(self, scores):
+        """
+        Returns the (user indices, problem indices) of the cells of the given
+        ProblemScores that differ from a problem that is not attempted and
+        whose possible score is the default one.  Only these cells need to be
+        stored for the scores to be recovered.
+        """
+        same_possible = (scores.possible == self.default_possible) | (
+            numpy.isnan(scores.possible) & numpy.isnan(self.default_possible)
+        )
+        return numpy.nonzero(scores.attempted | ~same_possible)
+
+    def _load_persisted_blocks(self, user_indices, possible, persisted):
+        """
+        Applies the block records of the persisted subsection grades of the
+        given users to the `possible` array, where NaN marks the problems
+        that are not in the records of their subsection's grade, and marks
+        the problems of these subsections in the `persisted` array.
+
+        Returns the persisted weights, keyed by (user index, problem index).
+        """
+        grades = PersistentSubsectionGrade.objects.filter(
+            user_id__in=list(user_indices),
+            course_id=self.course_key,
+        ).values_list('user_id', 'usage_key', 'visible_blocks_id')
+        grades = [
+            (user_id, usage_key.replace(course_key=self.course_key) if usage_key.run is None else usage_key, hashed)
+            for user_id, usage_key, hashed in grades
+        ]
+
+        # Visible blocks shared by the grades of several users are read and parsed only once.
+        hashes = {hashed for _, usage_key, hashed in grades if usage_key in self._problem_indices_by_subsection}
+        block_records = {
+            visible_blocks.hashed: {record.locator: record for record in visible_blocks.blocks}
+            for visible_blocks in VisibleBlocks.objects.filter(hashed__in=hashes).select_related('base')
+        } if hashes else {}
+
+        persisted_weights = {}
+        for user_id, usage_key, hashed in grades:
+            records = block_records.get(hashed)
+            if records is None:
+                continue
+            user_index = user_indices[user_id]
+            for problem_index in self._problem_indices_by_subsection.get(usage_key, ()):
+                persisted[user_index, problem_index] = True
+                record = records.get(self.problem_keys[problem_index])
+                if record is None:
+                    possible[user_index, problem_index] = numpy.nan
+                    continue
+                persisted_weights[(user_index, problem_index)] = record.weight
+                possible[user_index, problem_index] = self._weighted_possible(record.raw_possible, record.weight)
+        return persisted_weights
+
+    def _load_submissions_scores(self, user_indices):
+        """
+        Yields the (user index, problem index, points earned, points possible)
+        of the latest scores of the given users stored by the Submissions API,
+        as submissions_api.get_scores returns them.
+        """
+        # Like anonymous_id_for_user, use the most recently created anonymous id of each user.
+        anonymous_user_ids = {
+            anonymous_user_id: user_id
+            for user_id, anonymous_user_id in dict(
+                AnonymousUserId.objects.filter(
+                    user_id__in=list(user_indices),
+                    course_id=self.course_key,
+                ).order_by('id').values_list('user_id', 'anonymous_user_id')
+            ).items()
+        }
+        if not anonymous_user_ids:
+            return
+
+        score_summaries = ScoreSummary.objects.filter(
+            student_item__course_id=str(self.course_key),
+            student_item__student_id__in=list(anonymous_user_ids),
+        ).values_list(
+            'student_item__student_id',
+            'student_item__item_id',
+            'latest__points_earned',
+            'latest__points_possible',
+        )
+        for anonymous_user_id, item_id, points_earned, points_possible in score_summaries:
+            # Scores with nothing possible are hidden, e.g. after a reset.
+            if not points_possible:
+                continue
+            problem_index = self._problem_indices_by_item_id.get(item_id)
+            if problem_index is not None:
+                yield user_indices[anonymous_user_ids[anonymous_user_id]], problem_index, points_earned, points_possible
+
+    @staticmethod
+    def _weighted_possible(raw_possible, weight):
+        """
+        Returns the weighted possible score of a problem, or NaN if the
+        problem has no possible score, in which case it isn't graded.
+        """
+        if raw_possible is None:
+            return numpy.nan
+        return weighted_score(0.0, raw_possible, weight)[1]
@@ -8,3 +8,13 @@ def plugin_settings(settings):
 
     # Queue to use for individual learner course regrades
     settings.SINGLE_LEARNER_COURSE_REGRADE_ROUTING_KEY = settings.DEFAULT_PRIORITY_QUEUE
+
+    # .. toggle_name: GRADES_DELTA_ENCODED_VISIBLE_BLOCKS
+    # .. toggle_implementation: DjangoSetting
+    # .. toggle_default: False
+    # .. toggle_description: When enabled, new VisibleBlocks records are stored as a reference to a base list of
+    #   the block records of their subsection, shared by all learners, plus the indices of the base's block records
+    #   that the learner could not see, rather than as a full copy of the learner's block records.
+    # .. toggle_use_cases: open_edx
+    # .. toggle_creation_date: 2026-10-18
+    settings.GRADES_DELTA_ENCODED_VISIBLE_BLOCKS = False
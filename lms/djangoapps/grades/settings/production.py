@@ -17,3 +17,7 @@ def plugin_settings(settings):
     settings.SINGLE_LEARNER_COURSE_REGRADE_ROUTING_KEY = settings.ENV_TOKENS.get(
         'SINGLE_LEARNER_COURSE_REGRADE_ROUTING_KEY', settings.DEFAULT_PRIORITY_QUEUE,
     )
+
+    settings.GRADES_DELTA_ENCODED_VISIBLE_BLOCKS = settings.ENV_TOKENS.get(
+        'GRADES_DELTA_ENCODED_VISIBLE_BLOCKS', settings.GRADES_DELTA_ENCODED_VISIBLE_BLOCKS,
+    )
@@ -8,9 +8,13 @@ from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase
 from xmodule.modulestore.tests.factories import CourseFactory, BlockFactory
 
 from xmodule.capa.tests.response_xml_factory import MultipleChoiceResponseXMLFactory
+from xmodule.partitions.partitions import Group, UserPartition
 from common.djangoapps.student.models import CourseEnrollment
 from common.djangoapps.student.tests.factories import UserFactory
 from lms.djangoapps.course_blocks.api import get_course_blocks
+from openedx.core.djangoapps.course_groups.cohorts import add_user_to_cohort
+from openedx.core.djangoapps.course_groups.tests.helpers import CohortFactory, config_course_cohorts
+from openedx.core.djangoapps.course_groups.views import link_cohort_to_partition_group
 from openedx.core.djangolib.testing.utils import get_mock_request
 
 from ..course_data import CourseData
@@ -115,3 +119,37 @@ class GradeTestBase(SharedModuleStoreTestCase):
         }
         self.course.set_grading_policy(self.grading_policy)
         self.store.update_item(self.course, 0)
+
+    def _restrict_to_content_group(self, block, users):
+        """
+        Restricts the given block to a content group of the course, which
+        only the given users are in.
+        """
+        content_group = Group(1, 'Content Group')
+        self._update_course_block(self.course, user_partitions=[UserPartition(
+            50, 'Content Groups', 'Content groups of the course', [content_group], scheme_id='cohort',
+        )])
+        self._update_course_block(block, group_access={50: [content_group.id]})
+        config_course_cohorts(self.course, is_cohorted=True)
+        cohort = CohortFactory(course_id=self.course.id)
+        link_cohort_to_partition_group(cohort, 50, content_group.id)
+        for user in users:
+            add_user_to_cohort(cohort, user.username)
+
+    def _update_course_block(self, block, **fields):
+        """
+        Updates the given fields of the given block in the modulestore,
+        restoring their values once the test completes.
+        """
+        block = self.store.get_item(block.location)
+        original_fields = {name: getattr(block, name) for name in fields}
+        for name, value in fields.items():
+            setattr(block, name, value)
+        self.store.update_item(block, 0)
+
+        def restore():
+            restored_block = self.store.get_item(block.location)
+            for name, value in original_fields.items():
+                setattr(restored_block, name, value)
+            self.store.update_item(restored_block, 0)
+        self.addCleanup(restore)
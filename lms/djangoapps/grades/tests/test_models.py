@@ -14,7 +14,7 @@ import ddt
 import pytest
 import pytz
 from django.db.utils import IntegrityError
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.utils.timezone import now
 from freezegun import freeze_time
 from opaque_keys import InvalidKeyError
@@ -30,7 +30,8 @@ from lms.djangoapps.grades.models import (
     PersistentCourseGrade,
     PersistentSubsectionGrade,
     PersistentSubsectionGradeOverride,
-    VisibleBlocks
+    VisibleBlocks,
+    VisibleBlocksBase
 )
 
 
@@ -368,6 +369,89 @@ class PersistentSubsectionGradeTest(GradesModelTestCase):
         deleted = PersistentSubsectionGrade.delete_subsection_grades_for_learner(self.user.id, self.course_key)
         self.assertEqual(deleted, 2)
 
+    def test_prefetch_for_users(self):
+        users = [self.user, UserFactory(), UserFactory(), UserFactory()]
+        grades = []
+        for user in users[:3]:
+            self.params['user_id'] = user.id
+            grades.append(PersistentSubsectionGrade.update_or_create_grade(**self.params))
+        override = PersistentSubsectionGradeOverride.update_or_create_override(
+            requesting_user=self.user,
+            subsection_grade_model=grades[0],
+            earned_all_override=0.0,
+            earned_graded_override=0.0,
+            feature=GradeOverrideFeatureEnum.gradebook,
+        )
+
+        # The grades with their overrides, and the shared visible blocks
+        with self.assertNumQueries(2):
+            PersistentSubsectionGrade.prefetch(self.course_key, users)
+
+        with self.assertNumQueries(0):
+            prefetched_grades = [
+                PersistentSubsectionGrade.bulk_read_grades(user.id, self.course_key) for user in users
+            ]
+            assert [len(user_grades) for user_grades in prefetched_grades] == [1, 1, 1, 0]
+            assert len({user_grades[0].visible_blocks.id for user_grades in prefetched_grades[:3]}) == 1
+            assert prefetched_grades[0][0].visible_blocks.blocks == self.block_records
+            for user in users:
+                VisibleBlocks.bulk_read(user.id, self.course_key)
+                PersistentSubsectionGradeOverride.prefetch(user.id, self.course_key)
+            assert PersistentSubsectionGradeOverride.get_override(users[0].id, self.usage_key) == override
+            assert PersistentSubsectionGradeOverride.get_override(users[1].id, self.usage_key) is None
+
+        PersistentSubsectionGrade.clear_prefetched_data(self.course_key)
+
+    @override_settings(GRADES_DELTA_ENCODED_VISIBLE_BLOCKS=True)
+    def test_delta_encoded_visible_blocks(self):
+        record_c = BlockRecord(
+            locator=self.locator_a.replace(block_id='block_id_c'), weight=1, raw_possible=5, graded=True,
+        )
+        block_record_lists = [
+            BlockRecordList([self.record_a, self.record_b], self.course_key),
+            BlockRecordList([self.record_b], self.course_key),
+            BlockRecordList([self.record_b, record_c], self.course_key),
+        ]
+        for block_record_list in block_record_lists:
+            self.params['user_id'] = UserFactory().id
+            self.params['visible_blocks'] = block_record_list
+            grade = PersistentSubsectionGrade.update_or_create_grade(**self.params)
+
+            visible_blocks = VisibleBlocks.objects.get(hashed=grade.visible_blocks_id)
+            assert visible_blocks.hashed == block_record_list.hash_value
+            assert visible_blocks.blocks_json == ''
+            assert visible_blocks.base is not None
+            assert visible_blocks.json_value == block_record_list.json_value
+            assert BlockRecordList.from_json(visible_blocks.json_value) == block_record_list
+            assert visible_blocks.blocks == block_record_list
+
+        # The first two lists share a base, which is merged with the third list.
+        bases = list(VisibleBlocksBase.objects.order_by('id'))
+        assert [len(base.data['blocks']) for base in bases] == [2, 3]
+        assert VisibleBlocks.objects.get(hashed=block_record_lists[2].hash_value).excluded_json == '[0]'
+
+    @override_settings(GRADES_DELTA_ENCODED_VISIBLE_BLOCKS=True)
+    def test_delta_encoded_visible_blocks_merge(self):
+        reweighted_record_b = self.record_b._replace(weight=2)
+        block_record_lists = [
+            BlockRecordList([self.record_a, self.record_b], self.course_key),
+            BlockRecordList([self.record_b, self.record_a], self.course_key),
+            BlockRecordList([self.record_a, reweighted_record_b], self.course_key),
+        ]
+        for block_record_list in block_record_lists:
+            self.params['user_id'] = UserFactory().id
+            self.params['visible_blocks'] = block_record_list
+            grade = PersistentSubsectionGrade.update_or_create_grade(**self.params)
+            visible_blocks = VisibleBlocks.objects.get(hashed=grade.visible_blocks_id)
+            assert visible_blocks.blocks == block_record_list
+
+        # Reordered block records are stored in full rather than in a new
+        # base, and a reweighted block record replaces the base's record.
+        assert VisibleBlocks.objects.get(hashed=block_record_lists[1].hash_value).base is None
+        bases = list(VisibleBlocksBase.objects.order_by('id'))
+        assert len(bases) == 2
+        assert [block['weight'] for block in bases[1].data['blocks']] == [1, 2]
+
 
 @ddt.ddt
 class PersistentCourseGradesTest(GradesModelTestCase):
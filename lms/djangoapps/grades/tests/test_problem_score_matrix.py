@@ -0,0 +1,95 @@
+"""
+Tests for the ProblemScoreMatrix class.
+"""
+import numpy
+
+from common.djangoapps.student.models import CourseEnrollment
+from common.djangoapps.student.tests.factories import UserFactory
+from openedx.core.djangolib.testing.utils import get_mock_request
+
+from ..course_grade_factory import CourseGradeFactory
+from ..problem_score_matrix import ProblemScoreMatrix
+from ..vectorized_course_grade import VectorizedCourseGrader
+from .base import GradeTestBase
+from .utils import answer_problem
+
+
+class TestProblemScoreMatrix(GradeTestBase):
+    """
+    Tests that the scores of a ProblemScoreMatrix are identical to the
+    problem scores of CourseGrades.
+    """
+    def setUp(self):
+        super().setUp()
+        self.users = [self.request.user] + [UserFactory() for _ in range(3)]
+        for user in self.users[1:]:
+            CourseEnrollment.enroll(user, self.course.id)
+
+    def _answer_problems(self):
+        """
+        Records different answers for each of the users.
+        """
+        answers = [
+            ((self.problem, 1, 1), (self.problem2, 1, 1)),
+            ((self.problem, 1, 3), (self.problem2, 2, 3)),
+            ((self.problem2, 0, 1),),
+            (),
+        ]
+        for user, user_answers in zip(self.users, answers):
+            request = get_mock_request(user)
+            for problem, score, max_value in user_answers:
+                answer_problem(self.course, request, problem, score=score, max_value=max_value)
+
+    def _assert_scores_match(self, matrix, scores):
+        """
+        Asserts that the given scores of all users equal the problem scores
+        of their CourseGrades.
+        """
+        assert scores.user_ids == [user.id for user in self.users]
+        for user_index, user in enumerate(self.users):
+            course_grade = CourseGradeFactory().read(user, self.course)
+            for problem_index, problem_key in enumerate(matrix.problem_keys):
+                problem_score = course_grade.problem_scores.get(problem_key)
+                if problem_score is None:
+                    assert not scores.available[user_index, problem_index]
+                    continue
+                assert scores.available[user_index, problem_index]
+                assert scores.earned[user_index, problem_index] == problem_score.earned
+                assert scores.possible[user_index, problem_index] == problem_score.possible
+                assert scores.attempted[user_index, problem_index] == bool(problem_score.first_attempted)
+
+    def test_scores_match(self):
+        self._answer_problems()
+        matrix = ProblemScoreMatrix(course=self.course)
+        assert set(matrix.problem_keys) >= {self.problem.location, self.problem2.location}
+        self._assert_scores_match(matrix, matrix.load([user.id for user in self.users]))
+
+    def test_scores_match_without_persisted_grades(self):
+        matrix = ProblemScoreMatrix(course=self.course)
+        scores = matrix.load([user.id for user in self.users])
+        assert not scores.attempted.any()
+        numpy.testing.assert_array_equal(scores.possible, numpy.tile(matrix.default_possible, (len(self.users), 1)))
+        self._assert_scores_match(matrix, scores)
+
+    def test_availability_without_persisted_grades(self):
+        self._restrict_to_content_group(self.sequence2, [self.users[1]])
+        grader = VectorizedCourseGrader(course=self.course)
+        matrix = ProblemScoreMatrix(course=self.course)
+        scores = matrix.load(
+            [user.id for user in self.users], [grader.get_user_structure(user) for user in self.users],
+        )
+        problem_index = matrix.problem_keys.index(self.problem2.location)
+        assert scores.available[:, problem_index].tolist() == [False, True, False, False]
+        self._assert_scores_match(matrix, scores)
+
+    def test_problem_keys(self):
+        matrix = ProblemScoreMatrix(course=self.course, problem_keys=[self.problem2.location])
+        assert matrix.problem_keys == [self.problem2.location]
+        assert matrix.load([self.request.user.id]).earned.shape == (1, 1)
+
+    def test_nondefault_cells(self):
+        self._answer_problems()
+        matrix = ProblemScoreMatrix(course=self.course, problem_keys=[self.problem.location, self.problem2.location])
+        scores = matrix.load([user.id for user in self.users])
+        user_indices, problem_indices = matrix.nondefault_cells(scores)
+        assert list(zip(user_indices.tolist(), problem_indices.tolist())) == [(0, 0), (0, 1), (1, 0), (1, 1), (2, 1)]
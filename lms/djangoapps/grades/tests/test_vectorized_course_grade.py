@@ -0,0 +1,175 @@
+"""
+Tests for the VectorizedCourseGrader class.
+"""
+import ddt
+import numpy
+import pytest
+from django.test.utils import override_settings
+
+from common.djangoapps.student.models import CourseEnrollment
+from common.djangoapps.student.tests.factories import UserFactory
+from openedx.core.djangolib.testing.utils import get_mock_request
+from xmodule.graders import AssignmentFormatGrader  # lint-amnesty, pylint: disable=wrong-import-order
+
+from ..api import override_subsection_grade
+from ..course_grade_factory import CourseGradeFactory
+from ..subsection_grade_factory import SubsectionGradeFactory
+from ..vectorized_course_grade import VectorizedCourseGrader
+from .base import GradeTestBase
+from .utils import answer_problem
+
+
+@ddt.ddt
+class TestVectorizedCourseGrader(GradeTestBase):
+    """
+    Tests that vectorized course grades are identical to CourseGrades.
+    """
+    def setUp(self):
+        super().setUp()
+        self.users = [self.request.user] + [UserFactory() for _ in range(3)]
+        for user in self.users[1:]:
+            CourseEnrollment.enroll(user, self.course.id)
+
+    def _set_grading_policy(self, passing=0.5, min_count=1, drop_count=0):  # pylint: disable=arguments-differ
+        """
+        Updates the course's grading policy.
+        """
+        self.grading_policy = {
+            "GRADER": [
+                {
+                    "type": "Homework",
+                    "min_count": min_count,
+                    "drop_count": drop_count,
+                    "short_label": "HW",
+                    "weight": 0.75,
+                },
+                {
+                    "type": "NoCredit",
+                    "min_count": 0,
+                    "drop_count": 0,
+                    "short_label": "NC",
+                    "weight": 0.0,
+                },
+            ],
+            "GRADE_CUTOFFS": {
+                "A": 0.7,
+                "Pass": passing,
+            },
+        }
+        self.course.set_grading_policy(self.grading_policy)
+        self.store.update_item(self.course, 0)
+
+    def _answer_problems(self):
+        """
+        Records different answers for each of the users.
+        """
+        answers = [
+            ((self.problem, 1, 1), (self.problem2, 1, 1)),
+            ((self.problem, 1, 3), (self.problem2, 2, 3)),
+            ((self.problem2, 1, 1),),
+            (),
+        ]
+        for user, user_answers in zip(self.users, answers):
+            request = get_mock_request(user)
+            for problem, score, max_value in user_answers:
+                answer_problem(self.course, request, problem, score=score, max_value=max_value)
+
+    def _assert_grades_match(self):
+        """
+        Asserts that the vectorized grades of all users equal their
+        CourseGrades.
+        """
+        grader = VectorizedCourseGrader(course=self.course)
+        assert grader.is_supported
+        vectorized_grades = grader.grade(self.users)
+        assert list(vectorized_grades) == [user.id for user in self.users]
+
+        for user in self.users:
+            course_grade = CourseGradeFactory().update(user, self.course)
+            vectorized_grade = vectorized_grades[user.id]
+            assert vectorized_grade.percent == course_grade.percent
+            assert vectorized_grade.letter_grade == course_grade.letter_grade
+            assert vectorized_grade.passed == course_grade.passed
+
+    @ddt.data(
+        (1, 0),
+        (3, 0),
+        (3, 1),
+        (1, 2),
+    )
+    @ddt.unpack
+    def test_grades_match(self, min_count, drop_count):
+        self._set_grading_policy(min_count=min_count, drop_count=drop_count)
+        self._answer_problems()
+        self._assert_grades_match()
+
+    def test_grades_match_with_override(self):
+        self._answer_problems()
+        override_subsection_grade(
+            self.users[1].id, self.course.id, self.sequence2.location, earned_graded=0.0,
+        )
+        self._assert_grades_match()
+
+    def test_grades_match_with_content_group(self):
+        self._restrict_to_content_group(self.sequence2, [self.users[1]])
+        self._answer_problems()
+        grader = VectorizedCourseGrader(course=self.course)
+        assert self.sequence2.location in grader.get_user_structure(self.users[1])
+        assert self.sequence2.location not in grader.get_user_structure(self.users[0])
+        self._assert_grades_match()
+
+    def test_shared_user_structures(self):
+        self._restrict_to_content_group(self.sequence2, self.users[1:3])
+        grader = VectorizedCourseGrader(course=self.course)
+        user_structures = grader.get_user_structures(self.users[1:])
+        assert user_structures[0] is user_structures[1]
+        assert user_structures[2] is not user_structures[0]
+        assert self.sequence2.location in user_structures[0]
+        assert self.sequence2.location not in user_structures[2]
+        assert grader.get_user_structures([self.users[3]])[0] is user_structures[2]
+
+    def test_load_subsection_grades(self):
+        self._answer_problems()
+        override_subsection_grade(
+            self.users[3].id, self.course.id, self.sequence2.location, earned_graded=1.0,
+        )
+        grader = VectorizedCourseGrader(course=self.course)
+        earned, possible, attempted = grader.load_subsection_grades([user.id for user in self.users])
+        for user_index, user in enumerate(self.users):
+            subsection_grade_factory = SubsectionGradeFactory(user, course=self.course)
+            for subsection_index, subsection_key in enumerate(grader.subsection_keys):
+                subsection_grade = subsection_grade_factory.create(
+                    grader.course_data.collected_structure[subsection_key], read_only=True,
+                )
+                assert attempted[user_index, subsection_index] == bool(
+                    subsection_grade.attempted_graded or subsection_grade.override
+                )
+                if attempted[user_index, subsection_index]:
+                    assert earned[user_index, subsection_index] == subsection_grade.graded_total.earned
+                    assert possible[user_index, subsection_index] == subsection_grade.graded_total.possible
+
+    @ddt.data(0, 1, 2, 4)
+    def test_averages_with_drops(self, drop_count):
+        subgrader = AssignmentFormatGrader('Homework', 1, drop_count)
+        subsection_percents = numpy.array([
+            [0.5, 0.25, 0.5, 1.0],
+            [0.0, 0.0, 0.0, 0.0],
+            [1.0, 0.75, 0.3333, 0.25],
+        ])
+        averages = VectorizedCourseGrader.compute_averages_with_drops(subgrader, subsection_percents)
+        assert averages.tolist() == [
+            subgrader.total_with_drops([{'percent': percent} for percent in percents])[0]
+            for percents in subsection_percents.tolist()
+        ]
+
+    def test_unknown_users(self):
+        grader = VectorizedCourseGrader(course=self.course)
+        vectorized_grades = grader.grade([UserFactory()])
+        assert [grade.percent for grade in vectorized_grades.values()] == [0.0]
+
+    @override_settings(GENERATE_PROFILE_SCORES=True)
+    def test_unsupported_grader(self):
+        grader = VectorizedCourseGrader(course=self.course)
+        assert not grader.is_supported
+        with pytest.raises(ValueError):
+            grader.grade([self.request.user])
@@ -39,6 +39,7 @@ class GradesTransformer(BlockStructureTransformer):
     """
     WRITE_VERSION = 4
     READ_VERSION = 4
+    COLLECTED_XBLOCK_FIELDS = ('data', 'weight', 'has_score', 'graded', 'grading_policy')
     FIELDS_TO_COLLECT = [
         'due',
         'format',
@@ -0,0 +1,439 @@
+"""
+VectorizedCourseGrader Class
+
+Computes the course grades of a batch of users at once.  Rather than
+building SubsectionGrade and CourseGrade objects for each user, the
+persisted subsection grades of the whole batch are loaded into NumPy
+arrays of users by graded subsections, and the course grader's
+assignment type rules (minimum counts, drops and weights) are applied
+as array operations.
+
+Each user's course structure is still transformed for the user, so
+subsections and problems that are not accessible to the user, e.g.
+because of their cohort, content group or enrollment track, are left
+out of the user's grade as they are by CourseGrade.  Users with the same
+accessible blocks share the possible scores of their ungraded subsections,
+and, where the course's transformers allow it, users with the same access
+to the course share a single transformed course structure.
+
+The floating point operations are performed in the same order as in
+xmodule.graders, so the resulting grades are identical to those of
+CourseGrade.update.
+"""
+
+
+from collections import OrderedDict, namedtuple
+
+import numpy
+from django.conf import settings
+
+from lazy import lazy
+
+from common.djangoapps.student.roles import CourseBetaTesterRole
+from lms.djangoapps.course_blocks.api import get_course_blocks, has_individual_student_override_provider
+from lms.djangoapps.course_blocks.transformers.user_partitions import UserPartitionTransformer
+from lms.djangoapps.courseware.access import has_access
+from openedx.features.content_type_gating.models import ContentTypeGatingConfig
+from xmodule.graders import AssignmentFormatGrader, WeightedSubsectionsGrader  # lint-amnesty, pylint: disable=wrong-import-order
+from xmodule.partitions.partitions_service import get_user_partition_groups  # lint-amnesty, pylint: disable=wrong-import-order
+
+from .course_data import CourseData
+from .course_grade import CourseGrade, CourseGradeBase
+from .models import PersistentSubsectionGrade
+from .subsection_grade import ZeroSubsectionGrade
+
+VectorizedCourseGradeResult = namedtuple('VectorizedCourseGradeResult', ['percent', 'letter_grade', 'passed'])
+
+
+class VectorizedCourseGrader:
+    """
+    Computes course grades for batches of users from their persisted
+    subsection grades and their course structures.
+
+    Subsections without a persisted grade are graded as zero, as they
+    are by CourseGrade.
+    """
+    def __init__(self, course=None, collected_block_structure=None, course_key=None):
+        self.course_data = CourseData(
+            user=None, course=course, collected_block_structure=collected_block_structure, course_key=course_key,
+        )
+        course = CourseGradeBase._prep_course_for_grading(self.course_data.course)  # pylint: disable=protected-access
+        self.grader = course.grader
+        self.grade_cutoffs = course.grade_cutoffs
+
+        self.subsection_keys = []
+        self._subsection_formats = []
+        for subsection in self._graded_subsections():
+            self.subsection_keys.append(subsection.location)
+            self._subsection_formats.append(getattr(subsection, 'format', ''))
+        self._subsection_indices = {key: index for index, key in enumerate(self.subsection_keys)}
+
+        # Possible graded score of each subsection for users without a
+        # persisted grade, or zero where the subsection isn't accessible,
+        # keyed by the blocks accessible to the users.
+        self._zero_possible_by_blocks = {}
+
+        # Transformed course structures shared by users with the same access
+        # to the course, keyed by _get_structure_sharing_key.
+        self._shared_user_structures = {}
+
+    @property
+    def is_supported(self):
+        """
+        Returns whether the course's grader can be computed by this
+        class, i.e. whether it is a WeightedSubsectionsGrader of
+        AssignmentFormatGraders, as created from a grading policy.
+        """
+        return self._is_grader_supported(self.grader)
+
+    @classmethod
+    def supports_course(cls, course):
+        """
+        Returns whether the grader of the given course can be computed by
+        this class, without reading the course structure.
+        """
+        return cls._is_grader_supported(
+            CourseGradeBase._prep_course_for_grading(course).grader  # pylint: disable=protected-access
+        )
+
+    @staticmethod
+    def _is_grader_supported(grader):
+        return (
+            isinstance(grader, WeightedSubsectionsGrader) and
+            all(isinstance(subgrader, AssignmentFormatGrader) for subgrader, _, _ in grader.subgraders) and
+            not settings.GENERATE_PROFILE_SCORES
+        )
+
+    def grade(self, users, user_structures=None):
+        """
+        Returns an OrderedDict of user id to VectorizedCourseGradeResult for
+        each of the given users.
+
+        Arguments:
+            users: the users to grade.
+            user_structures: the course structure of each of the users, as
+                returned by get_user_structure, if already available.
+
+        Raises:
+            ValueError if the course's grader is not supported.
+        """
+        if not self.is_supported:
+            raise ValueError(f'Course grader of {self.course_data.course_key} is not supported for vectorized grading.')
+
+        users = list(users)
+        if user_structures is None:
+            user_structures = self.get_user_structures(users)
+        user_ids = [user.id for user in users]
+        percents = self.compute_percents(*self.load_subsection_scores(user_ids, user_structures))
+        return OrderedDict(
+            (user_id, VectorizedCourseGradeResult(
+                percent,
+                CourseGrade._compute_letter_grade(self.grade_cutoffs, percent),  # pylint: disable=protected-access
+                CourseGrade._compute_passed(self.grade_cutoffs, percent),  # pylint: disable=protected-access
+            ))
+            for user_id, percent in zip(user_ids, percents.tolist())
+        )
+
+    def get_user_structure(self, user):
+        """
+        Returns the course structure of the blocks accessible to the given
+        user, as CourseGrade grades it.
+        """
+        return get_course_blocks(
+            user,
+            self.course_data.location,
+            collected_block_structure=self.course_data.collected_structure,
+        )
+
+    def get_user_structures(self, users):
+        """
+        Returns the course structure of each of the given users, as
+        get_user_structure does.
+
+        Users with the same access to the course share a single transformed
+        course structure, which is kept for later batches of users, rather
+        than the course being transformed for each of them.
+        """
+        user_structures = []
+        for user in users:
+            sharing_key = self._get_structure_sharing_key(user)
+            if sharing_key is None:
+                user_structures.append(self.get_user_structure(user))
+                continue
+            user_structure = self._shared_user_structures.get(sharing_key)
+            if user_structure is None:
+                user_structure = self._shared_user_structures[sharing_key] = self.get_user_structure(user)
+            user_structures.append(user_structure)
+        return user_structures
+
+    def load_subsection_scores(self, user_ids, user_structures):
+        """
+        Loads the persisted subsection grades of the given users with a
+        single query.
+
+        Returns a tuple of (earned, possible) arrays of users by graded
+        subsections, holding each user's graded total in each subsection,
+        with any grade overrides applied.  Both are zero for subsections
+        that are not in the user's course structure.
+        """
+        shape = (len(user_ids), len(self.subsection_keys))
+        earned = numpy.zeros(shape)
+        possible = numpy.array([self._get_zero_possible(structure) for structure in user_structures]).reshape(shape)
+        for user_index, subsection_index, earned_graded, possible_graded, _ in self._iter_persisted_grades(user_ids):
+            if self.subsection_keys[subsection_index] not in user_structures[user_index]:
+                continue
+            earned[user_index, subsection_index] = earned_graded
+            possible[user_index, subsection_index] = possible_graded
+
+        return earned, possible
+
+    def load_subsection_grades(self, user_ids):
+        """
+        Loads the persisted subsection grades of the given users with a
+        single query, without their course structures.
+
+        Returns a tuple of (earned, possible, attempted) arrays of users by
+        graded subsections, holding each user's graded total in each
+        subsection, with any grade overrides applied, and whether the user
+        attempted a graded problem in the subsection or has a grade override
+        for it.  Subsections without a persisted grade are zero and not
+        attempted, as they are in ZeroSubsectionGrades.
+        """
+        shape = (len(user_ids), len(self.subsection_keys))
+        earned = numpy.zeros(shape)
+        possible = numpy.zeros(shape)
+        attempted = numpy.zeros(shape, dtype=bool)
+        for user_index, subsection_index, earned_graded, possible_graded, grade_attempted in (
+            self._iter_persisted_grades(user_ids)
+        ):
+            earned[user_index, subsection_index] = earned_graded
+            possible[user_index, subsection_index] = possible_graded
+            attempted[user_index, subsection_index] = grade_attempted
+
+        return earned, possible, attempted
+
+    def _iter_persisted_grades(self, user_ids):
+        """
+        Yields a tuple of (user index, subsection index, earned graded,
+        possible graded, attempted) for each persisted grade of the given
+        users in a graded subsection, with any grade overrides applied.
+        """
+        user_indices = {user_id: index for index, user_id in enumerate(user_ids)}
+        course_key = self.course_data.course_key
+        grades = PersistentSubsectionGrade.objects.filter(
+            user_id__in=user_ids,
+            course_id=course_key,
+        ).values_list(
+            'user_id',
+            'usage_key',
+            'earned_graded',
+            'possible_graded',
+            'first_attempted',
+            'override__id',
+            'override__earned_graded_override',
+            'override__possible_graded_override',
+        )
+        for (
+            user_id, usage_key, earned_graded, possible_graded, first_attempted,
+            override_id, earned_override, possible_override,
+        ) in grades:
+            if usage_key.run is None:  # lint-amnesty, pylint: disable=no-member
+                usage_key = usage_key.replace(course_key=course_key)
+            subsection_index = self._subsection_indices.get(usage_key)
+            if subsection_index is None:
+                continue
+            if override_id is not None:
+                if earned_override is not None:
+                    earned_graded = earned_override
+                if possible_override is not None:
+                    possible_graded = possible_override
+            yield (
+                user_indices[user_id],
+                subsection_index,
+                earned_graded,
+                possible_graded,
+                first_attempted is not None or override_id is not None,
+            )
+
+    def compute_percents(self, earned, possible):
+        """
+        Returns an array of the course grade percent of each user, given
+        arrays of users by graded subsections of earned and possible
+        graded totals.
+        """
+        subsection_percents = self.compute_subsection_percents(earned, possible)
+        # Subsections with nothing possible are not part of the grade sheet.
+        in_grade_sheet = possible > 0
+
+        total_percents = numpy.zeros(len(earned))
+        for subgrader, _, weight in self.grader.subgraders:
+            columns = [
+                index for index, subsection_format in enumerate(self._subsection_formats)
+                if subsection_format == subgrader.type
+            ]
+            subgrader_percents = self._compute_assignment_type_percents(
+                subgrader, subsection_percents[:, columns], in_grade_sheet[:, columns],
+            )
+            total_percents = total_percents + subgrader_percents * weight
+
+        # Same as CourseGrade._compute_percent, for each user.
+        rounded = total_percents * 100 + 0.05
+        rounded = numpy.where(rounded >= 0, numpy.floor(rounded + 0.5), numpy.ceil(rounded - 0.5))
+        return rounded / 100
+
+    @staticmethod
+    def compute_subsection_percents(earned, possible):
+        """
+        Returns an array of users by subsections of the percent of each of
+        the given earned and possible graded totals, as compute_percent
+        computes it.
+        """
+        return numpy.around(
+            numpy.divide(earned, possible, out=numpy.zeros_like(earned), where=possible > 0),
+            decimals=4,
+        )
+
+    @staticmethod
+    def _compute_assignment_type_percents(subgrader, subsection_percents, in_grade_sheet):
+        """
+        Returns an array of each user's percent for the assignment type of
+        the given AssignmentFormatGrader, as AssignmentFormatGrader.grade
+        and total_with_drops compute it.
+        """
+        num_users, num_subsections = subsection_percents.shape
+        min_count = int(float(subgrader.min_count))
+        width = max(min_count, num_subsections)
+
+        # Each user's breakdown: the percents of the subsections in the
+        # grade sheet, in course order, padded with zeros to min_count.
+        num_scores = in_grade_sheet.sum(axis=1)
+        breakdown_lengths = numpy.maximum(min_count, num_scores)
+        breakdown = numpy.zeros((num_users, width))
+        users, subsections = numpy.nonzero(in_grade_sheet)
+        positions = numpy.cumsum(in_grade_sheet, axis=1) - 1
+        breakdown[users, positions[users, subsections]] = subsection_percents[users, subsections]
+        in_breakdown = numpy.arange(width) < breakdown_lengths[:, numpy.newaxis]
+
+        return VectorizedCourseGrader._total_with_drops(
+            subgrader.drop_count, breakdown, in_breakdown, breakdown_lengths,
+        )
+
+    @staticmethod
+    def compute_averages_with_drops(subgrader, subsection_percents):
+        """
+        Returns an array of each user's average of the given array of users
+        by subsections of percents, dropping the lowest percents as the
+        given AssignmentFormatGrader's total_with_drops does for a breakdown
+        of exactly those subsections.
+        """
+        num_users, num_subsections = subsection_percents.shape
+        return VectorizedCourseGrader._total_with_drops(
+            subgrader.drop_count,
+            subsection_percents,
+            numpy.ones((num_users, num_subsections), dtype=bool),
+            numpy.full(num_users, num_subsections),
+        )
+
+    @staticmethod
+    def _total_with_drops(drop_count, breakdown, in_breakdown, breakdown_lengths):
+        """
+        Returns an array of each user's total of the entries of their
+        breakdown, a row of the given array, after dropping the lowest
+        drop_count of the entries in the breakdown, as total_with_drops does.
+        """
+        num_users, width = breakdown.shape
+
+        # The lowest drop_count entries are dropped; on ties, the later
+        # entries are dropped, as with the stable sort in total_with_drops.
+        kept = in_breakdown
+        if drop_count > 0:
+            order = numpy.argsort(numpy.where(in_breakdown, -breakdown, numpy.inf), axis=1, kind='stable')
+            ranks = numpy.empty_like(order)
+            numpy.put_along_axis(ranks, order, numpy.arange(width)[numpy.newaxis, :].repeat(num_users, 0), axis=1)
+            kept = in_breakdown & (ranks < (breakdown_lengths - drop_count)[:, numpy.newaxis])
+
+        # Sum the kept entries in order, so the result is exactly the same
+        # as the sequential sum in total_with_drops.
+        totals = numpy.zeros(num_users)
+        if width:
+            totals = numpy.cumsum(numpy.where(kept, breakdown, 0.0), axis=1)[:, -1]
+
+        num_kept = breakdown_lengths - drop_count
+        return numpy.where(num_kept > 0, totals / numpy.maximum(num_kept, 1), totals)
+
+    def _get_zero_possible(self, user_structure):
+        """
+        Returns the possible graded score of each graded subsection for a
+        user with the given course structure and no persisted grades.
+        """
+        blocks = frozenset(user_structure)
+        zero_possible = self._zero_possible_by_blocks.get(blocks)
+        if zero_possible is None:
+            course_data = CourseData(
+                user=None,
+                course=self.course_data.course,
+                structure=user_structure,
+                course_key=self.course_data.course_key,
+            )
+            zero_possible = [
+                ZeroSubsectionGrade(user_structure[subsection_key], course_data).graded_total.possible
+                if subsection_key in user_structure else 0.0
+                for subsection_key in self.subsection_keys
+            ]
+            self._zero_possible_by_blocks[blocks] = zero_possible
+        return zero_possible
+
+    @lazy
+    def _can_share_structures(self):
+        """
+        Returns whether users with the same access to the course can share
+        a transformed course structure.  Courses with library content
+        blocks, whose children are selected for each user, and installations
+        with individual learner field overrides transform the course for
+        each user.
+        """
+        return not has_individual_student_override_provider() and not any(
+            block_key.block_type == 'library_content' for block_key in self.course_data.collected_structure
+        )
+
+    def _get_structure_sharing_key(self, user):
+        """
+        Returns a key identifying the given user's access to the course, or
+        None if the user's course structure can't be shared.
+
+        Other than in the courses excluded by _can_share_structures, the
+        blocks that a learner can access depend only on their groups in the
+        course's user partitions and on whether content type gating applies
+        to their enrollment.  Staff and beta testers, whose access to the
+        blocks also depends on their role, aren't shared.  Dates that are
+        personalized for a learner, e.g. due date extensions, are kept in
+        the shared structure as they are for the first learner with the same
+        access, since neither access to the blocks nor grading depends on them.
+        """
+        if not self._can_share_structures:
+            return None
+        course_key = self.course_data.course_key
+        if has_access(user, 'staff', course_key) or CourseBetaTesterRole(course_key).has_user(user):
+            return None
+        user_partitions = self.course_data.collected_structure.get_transformer_data(
+            UserPartitionTransformer, 'user_partitions',
+        ) or []
+        partition_groups = get_user_partition_groups(course_key, user_partitions, user, 'id')
+        return (
+            ContentTypeGatingConfig.enabled_for_enrollment(user=user, course_key=course_key),
+            tuple(sorted((partition_id, group.id) for partition_id, group in partition_groups.items())),
+        )
+
+    def _graded_subsections(self):
+        """
+        Returns the graded subsections of the collected course structure,
+        in the order in which CourseGrade adds them to the grade sheet.
+        """
+        structure = self.course_data.collected_structure
+        subsections = OrderedDict()
+        for chapter_key in structure.get_children(structure.root_block_usage_key):
+            for subsection_key in structure.get_children(chapter_key):
+                subsection = structure[subsection_key]
+                if subsection_key not in subsections and getattr(subsection, 'graded', False):
+                    subsections[subsection_key] = subsection
+        return list(subsections.values())
@@ -8,7 +8,7 @@ import json
 import random
 import shutil
 import tempfile
-from unittest.mock import Mock, NonCallableMock, patch
+from unittest.mock import ANY, Mock, NonCallableMock, patch
 
 import dateutil
 import ddt
@@ -72,6 +72,7 @@ from lms.djangoapps.certificates.data import CertificateStatuses
 from lms.djangoapps.certificates.tests.factories import GeneratedCertificateFactory
 from lms.djangoapps.courseware.models import StudentModule
 from lms.djangoapps.courseware.tests.helpers import LoginEnrollmentTestCase
+from lms.djangoapps.grades.api import VectorizedCourseGrader
 from lms.djangoapps.instructor.tests.utils import FakeContentTask, FakeEmail, FakeEmailInfo
 from lms.djangoapps.instructor.views.api import (
     _get_certificate_for_user,
@@ -86,6 +87,7 @@ from lms.djangoapps.instructor_task.api_helper import (
     QueueConnectionError,
     generate_already_running_error_message
 )
+from lms.djangoapps.instructor_task.config.waffle import USE_COLUMNAR_PROBLEM_GRADE_REPORT
 from lms.djangoapps.instructor_task.data import InstructorTaskTypes
 from lms.djangoapps.instructor_task.models import InstructorTask, InstructorTaskSchedule
 from lms.djangoapps.program_enrollments.tests.factories import ProgramEnrollmentFactory
@@ -3070,6 +3072,38 @@ class TestInstructorAPILevelsDataDump(SharedModuleStoreTestCase, LoginEnrollment
                 response = self.client.post(url, {})
                 self.assertContains(response, success_status)
 
+    @ddt.data(
+        ({}, {}),
+        ({'report_format': 'csv'}, {}),
+        ({'report_format': 'npz'}, {'report_format': 'npz'}),
+    )
+    @ddt.unpack
+    @override_waffle_flag(USE_COLUMNAR_PROBLEM_GRADE_REPORT, active=True)
+    def test_problem_grade_report_format(self, post_data, expected_task_kwargs):
+        url = reverse('problem_grade_report', kwargs={'course_id': str(self.course.id)})
+        with patch('lms.djangoapps.instructor_task.api.submit_problem_grade_report') as mock_submit:
+            response = self.client.post(url, post_data)
+        self.assertContains(response, "The problem grade report is being created.")
+        mock_submit.assert_called_once_with(ANY, self.course.id, **expected_task_kwargs)
+
+    def test_problem_grade_report_invalid_format(self):
+        url = reverse('problem_grade_report', kwargs={'course_id': str(self.course.id)})
+        with patch('lms.djangoapps.instructor_task.api.submit_problem_grade_report') as mock_submit:
+            response = self.client.post(url, {'report_format': 'parquet'})
+        assert response.status_code == 400
+        mock_submit.assert_not_called()
+
+    @ddt.data((False, True), (True, False))
+    @ddt.unpack
+    def test_problem_grade_report_npz_unavailable(self, columnar_report_enabled, course_supported):
+        url = reverse('problem_grade_report', kwargs={'course_id': str(self.course.id)})
+        with override_waffle_flag(USE_COLUMNAR_PROBLEM_GRADE_REPORT, active=columnar_report_enabled), \
+                patch.object(VectorizedCourseGrader, 'supports_course', return_value=course_supported), \
+                patch('lms.djangoapps.instructor_task.api.submit_problem_grade_report') as mock_submit:
+            response = self.client.post(url, {'report_format': 'npz'})
+        assert response.status_code == 400
+        mock_submit.assert_not_called()
+
     @valid_problem_location
     def test_idv_retirement_student_features_report(self):
         kwargs = {'course_id': str(self.course.id)}
@@ -81,6 +81,7 @@ from lms.djangoapps.course_home_api.toggles import course_home_mfe_progress_tab_
 from lms.djangoapps.courseware.access import has_access
 from lms.djangoapps.courseware.courses import get_course_with_access
 from lms.djangoapps.courseware.models import StudentModule
+from lms.djangoapps.grades.api import VectorizedCourseGrader
 from lms.djangoapps.instructor import enrollment
 from lms.djangoapps.instructor.access import ROLES, allow_access, list_with_level, revoke_access, update_forum_role
 from lms.djangoapps.instructor.constants import INVOICE_KEY
@@ -96,6 +97,7 @@ from lms.djangoapps.instructor.views.instructor_task_helpers import extract_emai
 from lms.djangoapps.instructor_analytics import basic as instructor_analytics_basic, csvs as instructor_analytics_csvs
 from lms.djangoapps.instructor_task import api as task_api
 from lms.djangoapps.instructor_task.api_helper import AlreadyRunningError, QueueConnectionError
+from lms.djangoapps.instructor_task.config.waffle import use_columnar_problem_grade_report
 from lms.djangoapps.instructor_task.data import InstructorTaskTypes
 from lms.djangoapps.instructor_task.models import ReportStore
 from lms.djangoapps.instructor.views.serializer import (
@@ -155,6 +157,9 @@ TASK_SUBMISSION_OK = 'created'
 SUCCESS_MESSAGE_TEMPLATE = _("The {report_type} report is being created. "
                              "To view the status of the report, see Pending Tasks below.")
 
+PROBLEM_GRADE_REPORT_CSV_FORMAT = 'csv'
+PROBLEM_GRADE_REPORT_FORMATS = (PROBLEM_GRADE_REPORT_CSV_FORMAT, 'npz')
+
 
 def common_exceptions_400(func):
     """
@@ -2931,12 +2936,36 @@ class ProblemGradeReport(DeveloperErrorViewMixin, APIView):
         Request a CSV showing students' grades for all problems in the
         course.
 
+        An optional `report_format` of 'npz' requests a NumPy .npz archive
+        instead, in courses that generate columnar problem grade reports.
+
         AlreadyRunningError is raised if the course's grades are already being
         updated.
         """
         course_key = CourseKey.from_string(course_id)
         report_type = _('problem grade')
-        task_api.submit_problem_grade_report(request, course_key)
+        report_format = request.POST.get('report_format', PROBLEM_GRADE_REPORT_CSV_FORMAT)
+        if report_format not in PROBLEM_GRADE_REPORT_FORMATS:
+            return JsonResponse(
+                {"error": _("Invalid report format: {report_format}").format(report_format=report_format)},
+                status=400,
+            )
+
+        task_kwargs = {}
+        if report_format != PROBLEM_GRADE_REPORT_CSV_FORMAT:
+            # Only columnar problem grade reports can be uploaded in other formats.
+            if not (
+                use_columnar_problem_grade_report(course_key) and
+                VectorizedCourseGrader.supports_course(get_course_by_id(course_key))
+            ):
+                return JsonResponse(
+                    {"error": _("The {report_format} format is not available for this course.").format(
+                        report_format=report_format
+                    )},
+                    status=400,
+                )
+            task_kwargs['report_format'] = report_format
+        task_api.submit_problem_grade_report(request, course_key, **task_kwargs)
         success_status = SUCCESS_MESSAGE_TEMPLATE.format(report_type=report_type)
 
         return JsonResponse({"status": success_status})
@@ -29,6 +29,81 @@ USE_ON_DISK_GRADE_REPORTING = CourseWaffleFlag(
     f'{WAFFLE_NAMESPACE}.use_on_disk_grade_reporting', __name__
 )
 
+# .. toggle_name: instructor_task.use_sharded_grade_reporting
+# .. toggle_implementation: CourseWaffleFlag
+# .. toggle_default: False
+# .. toggle_description: When generating course grade reports on disk, grade ranges of enrolled learners in
+#   parallel subtasks and merge their partial reports into a single report. The number of learners
+#   graded by each subtask is set by the COURSE_GRADE_REPORT_USERS_PER_TASK setting. Only takes effect
+#   when instructor_task.use_on_disk_grade_reporting is also enabled for the course.
+# .. toggle_use_cases: temporary
+# .. toggle_creation_date: 2026-10-18
+# .. toggle_target_removal_date: 2027-04-18
+USE_SHARDED_GRADE_REPORTING = CourseWaffleFlag(
+    f'{WAFFLE_NAMESPACE}.use_sharded_grade_reporting', __name__
+)
+
+# .. toggle_name: instructor_task.use_batch_rescoring
+# .. toggle_implementation: CourseWaffleFlag
+# .. toggle_default: False
+# .. toggle_description: When rescoring a problem whose responses can be graded from the learners' stored
+#   answers alone (choice, multiple choice, option, numerical and string responses without scripts or shuffled
+#   choices), grade the stored answers of all learners against a single parsed problem, without binding the
+#   problem to each learner, and save their states and scores with a bulk update per chunk of learners. Learners
+#   who lost access to the problem are skipped. Problems with per-learner field overrides other than due date
+#   extensions, and problems whose grading depends on the learner's seed or history, keep rescoring each learner's
+#   bound problem.
+# .. toggle_use_cases: temporary
+# .. toggle_creation_date: 2026-10-18
+# .. toggle_target_removal_date: 2027-04-18
+USE_BATCH_RESCORING = CourseWaffleFlag(
+    f'{WAFFLE_NAMESPACE}.use_batch_rescoring', __name__
+)
+
+# .. toggle_name: instructor_task.use_partitioned_module_state_updates
+# .. toggle_implementation: CourseWaffleFlag
+# .. toggle_default: False
+# .. toggle_description: When resetting attempts, deleting state or rescoring problems for all learners, split
+#   the learners' StudentModule rows into ranges of ids and update each range in a parallel subtask, rather than
+#   updating all rows in a single task. The number of rows updated by each subtask is set by the
+#   MODULE_STATE_UPDATE_MODULES_PER_TASK setting.
+# .. toggle_use_cases: temporary
+# .. toggle_creation_date: 2026-10-18
+# .. toggle_target_removal_date: 2027-04-18
+USE_PARTITIONED_MODULE_STATE_UPDATES = CourseWaffleFlag(
+    f'{WAFFLE_NAMESPACE}.use_partitioned_module_state_updates', __name__
+)
+
+# .. toggle_name: instructor_task.use_columnar_problem_grade_report
+# .. toggle_implementation: CourseWaffleFlag
+# .. toggle_default: False
+# .. toggle_description: Generates problem grade reports from matrices of the learners' scores on each problem that
+#   are read in bulk for each batch of learners, rather than from their CourseGrades. Problem grade reports requested
+#   with a 'report_format' of 'npz', which the instructor API's problem_grade_report endpoint accepts, are then
+#   uploaded as NumPy .npz archives of columns rather than as CSVs. Courses whose grading policy can't be vectorized
+#   keep using the CourseGrade based report.
+# .. toggle_use_cases: temporary
+# .. toggle_creation_date: 2026-10-18
+# .. toggle_target_removal_date: 2027-04-18
+USE_COLUMNAR_PROBLEM_GRADE_REPORT = CourseWaffleFlag(
+    f'{WAFFLE_NAMESPACE}.use_columnar_problem_grade_report', __name__
+)
+
+# .. toggle_name: instructor_task.use_vectorized_course_grade_report
+# .. toggle_implementation: CourseWaffleFlag
+# .. toggle_default: False
+# .. toggle_description: Computes the subsection grade and assignment average columns of course grade reports from
+#   arrays of the persisted subsection grades of each batch of learners, which are read with a single query, rather
+#   than from a SubsectionGrade object for each learner and subsection. The course grade and letter grade of each
+#   learner are still read from their persisted course grade. Courses whose grading policy can't be vectorized keep
+#   using the CourseGrade based columns.
+# .. toggle_use_cases: temporary
+# .. toggle_creation_date: 2026-10-18
+# .. toggle_target_removal_date: 2027-04-18
+USE_VECTORIZED_COURSE_GRADE_REPORT = CourseWaffleFlag(
+    f'{WAFFLE_NAMESPACE}.use_vectorized_course_grade_report', __name__
+)
+
 
 def problem_grade_report_verified_only(course_id):
     """
@@ -55,3 +130,43 @@ def use_on_disk_grade_reporting(course_id):
     False otherwise.
     """
     return USE_ON_DISK_GRADE_REPORTING.is_enabled(course_id)
+
+
+def use_sharded_grade_reporting(course_id):
+    """
+    Returns True if course grade reports should be generated
+    by parallel subtasks, False otherwise.
+    """
+    return USE_SHARDED_GRADE_REPORTING.is_enabled(course_id)
+
+
+def use_batch_rescoring(course_id):
+    """
+    Returns True if problems should be rescored for all
+    learners at once when possible, False otherwise.
+    """
+    return USE_BATCH_RESCORING.is_enabled(course_id)
+
+
+def use_partitioned_module_state_updates(course_id):
+    """
+    Returns True if the student modules of a problem should be
+    updated by parallel subtasks, False otherwise.
+    """
+    return USE_PARTITIONED_MODULE_STATE_UPDATES.is_enabled(course_id)
+
+
+def use_columnar_problem_grade_report(course_id):
+    """
+    Returns True if problem grade reports should be generated
+    from matrices of problem scores, False otherwise.
+    """
+    return USE_COLUMNAR_PROBLEM_GRADE_REPORT.is_enabled(course_id)
+
+
+def use_vectorized_course_grade_report(course_id):
+    """
+    Returns True if the subsection grades of course grade reports
+    should be computed from arrays of persisted grades, False otherwise.
+    """
+    return USE_VECTORIZED_COURSE_GRADE_REPORT.is_enabled(course_id)
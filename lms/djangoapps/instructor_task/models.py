@@ -12,8 +12,10 @@ file and check it in at the same time as your model changes. To do that,
 ASSUMPTIONS: modules have unique IDs, even across different module_types
 
 """
+import codecs
 import csv
 import hashlib
+import io
 import json
 import logging
 import os.path
@@ -23,7 +25,7 @@ from botocore.exceptions import ClientError
 from django.apps import apps
 from django.conf import settings
 from django.contrib.auth.models import User  # lint-amnesty, pylint: disable=imported-auth-user
-from django.core.files.base import ContentFile
+from django.core.files.base import ContentFile, File
 from django.db import models, transaction
 
 from django.utils.translation import gettext as _
@@ -294,18 +296,22 @@ class DjangoStorageReportStore(ReportStore):
         Store the contents of `buff` in a directory determined by hashing
         `course_id`, and name the file `filename`. `buff` can be any file-like
         object, ready to be read from the beginning.
+
+        Binary files, and text files opened with the utf-8 encoding, are
+        streamed to the storage; other text files are read into memory to be
+        encoded.
         """
         path = self.path_to(course_id, filename, parent_dir)
-        # See https://github.com/boto/boto/issues/2868
-        # Boto doesn't play nice with unicode in python3
-        buff_contents = buff.read()
-
-        if not isinstance(buff_contents, bytes):
-            buff_contents = buff_contents.encode('utf-8')
-
-        buff = ContentFile(buff_contents)
+        if isinstance(buff, io.TextIOWrapper) and codecs.lookup(buff.encoding).name == 'utf-8':
+            # The underlying binary file of a utf-8 text file already holds the encoded contents.
+            buff.flush()
+            buff = buff.buffer
+        elif isinstance(buff.read(0), str):
+            # See https://github.com/boto/boto/issues/2868
+            # Boto doesn't play nice with unicode in python3
+            buff = ContentFile(buff.read().encode('utf-8'))
 
-        self.storage.save(path, buff)
+        self.storage.save(path, File(buff, name=filename))
 
     def store_rows(self, course_id, filename, rows, parent_dir=''):
         """
@@ -318,6 +324,18 @@ class DjangoStorageReportStore(ReportStore):
         output_buffer.seek(0)
         self.store(course_id, filename, output_buffer, parent_dir)
 
+    def open(self, course_id, filename, parent_dir=''):
+        """
+        Return a binary file-like object for reading a stored file.
+        """
+        return self.storage.open(self.path_to(course_id, filename, parent_dir))
+
+    def delete(self, course_id, filename, parent_dir=''):
+        """
+        Delete a stored file, if it exists.
+        """
+        self.storage.delete(self.path_to(course_id, filename, parent_dir))
+
     def links_for(self, course_id):
         """
         For a given `course_id`, return a list of `(filename, url)` tuples.
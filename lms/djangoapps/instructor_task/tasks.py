@@ -35,7 +35,12 @@ from lms.djangoapps.instructor_task.tasks_helper.enrollments import (
     upload_may_enroll_csv,
     upload_students_csv
 )
-from lms.djangoapps.instructor_task.tasks_helper.grades import CourseGradeReport, ProblemGradeReport, ProblemResponses
+from lms.djangoapps.instructor_task.tasks_helper.grades import (
+    CourseGradeReport,
+    ProblemGradeReport,
+    ProblemResponses,
+    ShardedCourseGradeReport
+)
 from lms.djangoapps.instructor_task.tasks_helper.misc import (
     cohort_students_and_upload,
     upload_course_survey_report,
@@ -50,7 +55,8 @@ from lms.djangoapps.instructor_task.tasks_helper.module_state import (
     delete_problem_module_state,
     override_score_module_state,
     perform_module_state_update,
-    rescore_problem_module_state,
+    perform_module_state_update_partition,
+    perform_problem_rescore,
     reset_attempts_module_state
 )
 from lms.djangoapps.instructor_task.tasks_helper.runner import run_main_task
@@ -80,9 +86,7 @@ def rescore_problem(entry_id, xblock_instance_args):
     """
     # Translators: This is a past-tense verb that is inserted into task progress messages as {action}.
     action_name = gettext_noop('rescored')
-    update_fcn = partial(rescore_problem_module_state, xblock_instance_args)
-
-    visit_fcn = partial(perform_module_state_update, update_fcn, None)
+    visit_fcn = partial(perform_problem_rescore, xblock_instance_args)
     return run_main_task(entry_id, visit_fcn, action_name)
 
 
@@ -146,6 +150,20 @@ def delete_problem_state(entry_id, xblock_instance_args):
     return run_main_task(entry_id, visit_fcn, action_name)
 
 
+@shared_task
+@set_code_owner_attribute
+def update_module_states_partition(
+    entry_id, xblock_instance_args, update_fcn_name, module_id_range, subtask_status_dict,
+):
+    """
+    Updates a range of the student modules of a problem as a subtask of
+    `rescore_problem`, `reset_problem_attempts` or `delete_problem_state`.
+    """
+    return perform_module_state_update_partition(
+        entry_id, xblock_instance_args, update_fcn_name, module_id_range, subtask_status_dict,
+    )
+
+
 @shared_task(base=BaseInstructorTask)
 @set_code_owner_attribute
 def send_bulk_course_email(entry_id, _xblock_instance_args):
@@ -201,6 +219,17 @@ def calculate_grades_csv(entry_id, xblock_instance_args):
     return run_main_task(entry_id, task_fn, action_name)
 
 
+@shared_task
+@set_code_owner_attribute
+def calculate_grades_csv_shard(entry_id, xblock_instance_args, user_ids, subtask_status_dict):
+    """
+    Grade a range of a course's enrolled learners as a subtask of
+    `calculate_grades_csv`, and merge the report once all of its
+    subtasks have completed.
+    """
+    return ShardedCourseGradeReport.generate_shard(xblock_instance_args, entry_id, user_ids, subtask_status_dict)
+
+
 @shared_task(base=BaseInstructorTask)
 @set_code_owner_attribute
 def calculate_problem_grade_report(entry_id, xblock_instance_args):
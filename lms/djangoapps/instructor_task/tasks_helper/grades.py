@@ -2,9 +2,14 @@
 Functionality for generating grade reports.
 """
 
+import codecs
 import csv
+import json
 import logging
 import re
+import shutil
+import traceback
+import zipfile
 from collections import OrderedDict, defaultdict
 from datetime import datetime
 from itertools import chain
@@ -12,12 +17,16 @@ from tempfile import TemporaryFile
 
 from time import time
 
+import numpy
+from celery.states import FAILURE, SUCCESS
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from lazy import lazy
 from opaque_keys.edx.keys import UsageKey
 from pytz import UTC
 from six.moves import zip_longest
+from xblock.fields import Scope
 
 from common.djangoapps.course_modes.models import CourseMode
 from common.djangoapps.student.models import CourseEnrollment
@@ -25,16 +34,31 @@ from common.djangoapps.student.roles import BulkRoleCache
 from lms.djangoapps.certificates import api as certs_api
 from lms.djangoapps.certificates.api import get_certificates_for_course_and_users
 from lms.djangoapps.course_blocks.api import get_course_blocks
-from lms.djangoapps.courseware.user_state_client import DjangoXBlockUserStateClient
-from lms.djangoapps.grades.api import CourseGradeFactory
+from lms.djangoapps.courseware.models import StudentModule
+from lms.djangoapps.courseware.user_state_client import XBlockUserState
+from lms.djangoapps.grades.api import CourseGradeFactory, ProblemScoreMatrix, VectorizedCourseGrader
 from lms.djangoapps.grades.api import context as grades_context
-from lms.djangoapps.grades.api import prefetch_course_and_subsection_grades
-from lms.djangoapps.instructor_analytics.basic import list_problem_responses
-from lms.djangoapps.instructor_analytics.csvs import format_dictlist
+from lms.djangoapps.grades.api import (
+    clear_prefetched_course_and_subsection_grades,
+    prefetch_course_and_subsection_grades,
+    prefetch_course_grades
+)
+from lms.djangoapps.instructor_analytics.basic import get_response_state
 from lms.djangoapps.instructor_task.config.waffle import (
     course_grade_report_verified_only,
     problem_grade_report_verified_only,
+    use_columnar_problem_grade_report,
     use_on_disk_grade_reporting,
+    use_sharded_grade_reporting,
+    use_vectorized_course_grade_report,
+)
+from lms.djangoapps.instructor_task.models import InstructorTask, ReportStore
+from lms.djangoapps.instructor_task.subtasks import (
+    SUBTASK_LOCK_EXPIRE,
+    SubtaskStatus,
+    check_subtask_is_valid,
+    queue_subtasks_for_query,
+    update_subtask_status
 )
 from lms.djangoapps.teams.models import CourseTeamMembership
 from lms.djangoapps.verify_student.services import IDVerificationService
@@ -48,7 +72,7 @@ from xmodule.partitions.partitions_service import PartitionService  # lint-amnes
 from xmodule.split_test_block import get_split_user_partitions  # lint-amnesty, pylint: disable=wrong-import-order
 
 from .runner import TaskProgress
-from .utils import upload_csv_to_report_store, upload_csv_file_to_report_store
+from .utils import upload_csv_to_report_store, upload_csv_file_to_report_store, upload_npz_file_to_report_store
 
 TASK_LOG = logging.getLogger('edx.celery.task')
 
@@ -72,6 +96,19 @@ def _flatten(iterable):
     return list(chain.from_iterable(iterable))
 
 
+def _enrolled_learners_filter_kwargs(course_id, verified_only=False):
+    """
+    Returns the User filter kwargs that select the learners enrolled
+    in the given course.
+    """
+    filter_kwargs = {
+        'courseenrollment__course_id': course_id,
+    }
+    if verified_only:
+        filter_kwargs['courseenrollment__mode'] = CourseMode.VERIFIED
+    return filter_kwargs
+
+
 class _CourseGradeReportContext:
     """
     Internal class that provides a common context to use for a single grade
@@ -266,13 +303,16 @@ class _EnrollmentBulkContext:
 
 
 class _CourseGradeBulkContext:  # lint-amnesty, pylint: disable=missing-class-docstring
-    def __init__(self, context, users):
+    def __init__(self, context, users, prefetch_subsection_grades=True):
         self.certs = _CertificateBulkContext(context, users)
         self.teams = _TeamBulkContext(context, users)
         self.enrollments = _EnrollmentBulkContext(context, users)
         bulk_cache_cohorts(context.course_id, users)
         BulkRoleCache.prefetch(users)
-        prefetch_course_and_subsection_grades(context.course_id, users)
+        if prefetch_subsection_grades:
+            prefetch_course_and_subsection_grades(context.course_id, users)
+        else:
+            prefetch_course_grades(context.course_id, users)
         BulkCourseTags.prefetch(context.course_id, users)
 
 
@@ -350,7 +390,8 @@ class TemporaryFileReportMixin:
         self.context.update_status('TemporaryFileReportMixin - 1: Starting grade report')
         batched_rows = self._batched_rows()
 
-        with TemporaryFile('r+') as success_file, TemporaryFile('r+') as error_file:
+        with TemporaryFile('r+', encoding='utf-8') as success_file, \
+                TemporaryFile('r+', encoding='utf-8') as error_file:
             self.context.update_status('TemporaryFileReportMixin - 2: Compiling grades into temp files')
             has_errors = self.iter_and_write_batched_rows(batched_rows, success_file, error_file)
 
@@ -359,7 +400,7 @@ class TemporaryFileReportMixin:
 
         return self.context.update_status('TemporaryFileReportMixin - 4: Completed grades')
 
-    def iter_and_write_batched_rows(self, batched_rows, success_file, error_file):
+    def iter_and_write_batched_rows(self, batched_rows, success_file, error_file, include_headers=True):
         """
         Iterate through batched rows, writing returned chunks to disk as we go.
         This should hopefully help us avoid out of memory errors.
@@ -368,8 +409,9 @@ class TemporaryFileReportMixin:
         error_writer = csv.writer(error_file)
 
         # Write headers
-        success_writer.writerow(self._success_headers())
-        error_writer.writerow(self._error_headers())
+        if include_headers:
+            success_writer.writerow(self._success_headers())
+            error_writer.writerow(self._error_headers())
 
         succeeded, failed = 0, 0
         # Iterate through batched rows, writing to temp file
@@ -460,12 +502,7 @@ class GradeReportBase:
             This generator method fetches & loads the enrolled user objects on demand which in chunk
             size defined. This method is a workaround to avoid out-of-memory errors.
             """
-            filter_kwargs = {
-                'courseenrollment__course_id': course_id,
-            }
-            if verified_only:
-                filter_kwargs['courseenrollment__mode'] = CourseMode.VERIFIED
-
+            filter_kwargs = _enrolled_learners_filter_kwargs(course_id, verified_only)
             user_ids_list = get_user_model().objects.filter(**filter_kwargs).values_list('id', flat=True).order_by('id')
             user_chunks = grouper(user_ids_list)
             for user_ids in user_chunks:
@@ -523,6 +560,8 @@ class CourseGradeReport(GradeReportBase):
         with modulestore().bulk_operations(course_id):
             context = _CourseGradeReportContext(_xblock_instance_args, _entry_id, course_id, _task_input, action_name)
             if use_on_disk_grade_reporting(course_id):  # AU-926
+                if use_sharded_grade_reporting(course_id):
+                    return ShardedCourseGradeReport(context).queue_shards(_xblock_instance_args, _entry_id)
                 return TempFileCourseGradeReport(context)._generate()  # pylint: disable=protected-access
             else:
                 return InMemoryCourseGradeReport(context)._generate()  # pylint: disable=protected-access
@@ -560,12 +599,32 @@ class CourseGradeReport(GradeReportBase):
             grades_header.append(assignment_info['average_header'])
         return grades_header
 
+    @lazy
+    def vectorized_course_grader(self):
+        """
+        Returns the VectorizedCourseGrader that computes the subsection
+        grade columns of this report, or None if they are computed from
+        the learners' CourseGrades.
+        """
+        if not use_vectorized_course_grade_report(self.context.course_id):
+            return None
+        course_grader = VectorizedCourseGrader(
+            course=self.context.course,
+            collected_block_structure=self.context.course_structure,
+        )
+        return course_grader if course_grader.is_supported else None
+
     def _rows_for_users(self, users):
         """
         Returns a list of rows for the given users for this report.
         """
         with modulestore().bulk_operations(self.context.course_id):
-            bulk_context = _CourseGradeBulkContext(self.context, users)
+            bulk_context = _CourseGradeBulkContext(
+                self.context, users, prefetch_subsection_grades=self.vectorized_course_grader is None,
+            )
+            assignment_grades = None
+            if self.vectorized_course_grader is not None:
+                assignment_grades = self._load_assignment_grades(users)
 
             success_rows, error_rows = [], []
             for user, course_grade, error in CourseGradeFactory().iter(
@@ -580,7 +639,10 @@ class CourseGradeReport(GradeReportBase):
                 else:
                     success_rows.append(
                         [user.id, user.email, user.username] +
-                        self._user_grades(course_grade) +
+                        (
+                            self._user_grades(course_grade) if assignment_grades is None
+                            else self._user_vectorized_grades(course_grade, assignment_grades[user.id])
+                        ) +
                         self._user_cohort_group_names(user) +
                         self._user_experiment_group_names(user) +
                         self._user_team_names(user, bulk_context.teams) +
@@ -642,6 +704,55 @@ class CourseGradeReport(GradeReportBase):
                     assignment_average = 0.0
                 return assignment_average
 
+    def _load_assignment_grades(self, users):
+        """
+        Returns a dict of user id to a list of the given user's
+        (subsection grade results, assignment average) for each of the
+        graded assignments of this report, computed from arrays of the
+        users' persisted subsection grades rather than from their
+        CourseGrades.
+        """
+        course_grader = self.vectorized_course_grader
+        subsection_indices = {key: index for index, key in enumerate(course_grader.subsection_keys)}
+        user_ids = [user.id for user in users]
+        earned, possible, attempted = course_grader.load_subsection_grades(user_ids)
+        percents = course_grader.compute_subsection_percents(earned, possible)
+
+        assignment_grades = {user_id: [] for user_id in user_ids}
+        for assignment_info in self.context.graded_assignments.values():
+            columns = [subsection_indices[key] for key in assignment_info['subsection_headers']]
+            assignment_percents = percents[:, columns]
+            # Same as _user_subsection_grades, for each user.
+            subsection_results = numpy.where(
+                attempted[:, columns], assignment_percents.astype(object), 'Not Attempted',
+            ).tolist()
+            assignment_averages = [None] * len(user_ids)
+            if assignment_info['separate_subsection_avg_headers'] and assignment_info['grader']:
+                assignment_averages = course_grader.compute_averages_with_drops(
+                    assignment_info['grader'], assignment_percents,
+                ).tolist()
+            for user_id, user_results, assignment_average in zip(user_ids, subsection_results, assignment_averages):
+                assignment_grades[user_id].append((user_results, assignment_average))
+        return assignment_grades
+
+    def _user_vectorized_grades(self, course_grade, user_assignment_grades):
+        """
+        Returns a list of grade results for the given course_grade and the
+        user's grades for each assignment, as returned by
+        _load_assignment_grades, corresponding to the headers for this report.
+        """
+        grade_results = []
+        for subsection_results, assignment_average in user_assignment_grades:
+            if course_grade.attempted:
+                grade_results.extend(subsection_results)
+            else:
+                # A ZeroCourseGrade's subsection grades are all ZeroSubsectionGrades.
+                grade_results.extend(['Not Attempted'] * len(subsection_results))
+            if assignment_average is not None:
+                # Same as _user_assignment_average.
+                grade_results.append(assignment_average if course_grade.attempted else 0.0)
+        return [course_grade.percent] + grade_results
+
     def _user_cohort_group_names(self, user):
         """
         Returns a list of names of cohort groups in which the given user
@@ -709,6 +820,191 @@ class TempFileCourseGradeReport(CourseGradeReport, TemporaryFileReportMixin):
     """ Course Grade Report that writes file iteratively to a TempFile to then be uploaded """
 
 
+class ShardedCourseGradeReport(TempFileCourseGradeReport):
+    """
+    Course Grade Report whose rows are generated by parallel subtasks, each
+    for a range of the course's enrolled learners.
+
+    Each subtask writes the rows of its learners to partial CSV files in the
+    report store.  The subtask that completes the report last merges the
+    partial files, in order, into a single report.
+    """
+    PARTS_DIR_NAME = 'grade_report_parts'
+
+    def __init__(self, context, user_ids=None):
+        super().__init__(context)
+        self.user_ids = user_ids
+
+    def queue_shards(self, _xblock_instance_args, entry_id):
+        """
+        Queues subtasks that each grade a range of the course's enrolled
+        learners, and returns the task progress.  Courses with few learners
+        are graded by the current task instead.
+        """
+        entry = InstructorTask.objects.get(pk=entry_id)
+
+        # If subtasks have already been defined, this task was requeued
+        # after queueing them, and there is nothing left to do.
+        if len(entry.subtasks) > 0 and len(entry.task_output) > 0:
+            TASK_LOG.warning('%s, Subtasks have already been queued', self.context.task_info_string)
+            return json.loads(entry.task_output)
+
+        learners = get_user_model().objects.filter(
+            **_enrolled_learners_filter_kwargs(self.context.course_id, self.context.report_for_verified_only)
+        ).order_by('id')
+        total_num_learners = learners.count()
+        if total_num_learners <= settings.COURSE_GRADE_REPORT_USERS_PER_TASK:
+            return self._generate()
+
+        def _create_shard_subtask(item_list, initial_subtask_status):
+            """Creates a subtask to grade the learners in the given item list."""
+            # Imported here to avoid a circular import with the tasks module.
+            from lms.djangoapps.instructor_task.tasks import calculate_grades_csv_shard
+            return calculate_grades_csv_shard.subtask(
+                (
+                    entry_id,
+                    _xblock_instance_args,
+                    [item['pk'] for item in item_list],
+                    initial_subtask_status.to_dict(),
+                ),
+                task_id=initial_subtask_status.task_id,
+            )
+
+        self.context.update_status('ShardedCourseGradeReport - 1: Queueing subtasks')
+        return queue_subtasks_for_query(
+            entry,
+            self.context.action_name,
+            _create_shard_subtask,
+            [learners],
+            [],
+            settings.COURSE_GRADE_REPORT_USERS_PER_TASK,
+            total_num_learners,
+        )
+
+    @classmethod
+    def generate_shard(cls, _xblock_instance_args, entry_id, user_ids, subtask_status_dict):
+        """
+        Writes the partial report of the given learners, records the
+        subtask's progress and, if this is the last subtask to complete,
+        merges the partial reports.  Returns the subtask status dict.
+        """
+        subtask_status = SubtaskStatus.from_dict(subtask_status_dict)
+        current_task_id = subtask_status.task_id
+        check_subtask_is_valid(entry_id, current_task_id, subtask_status)
+
+        entry = InstructorTask.objects.get(pk=entry_id)
+        task_input = json.loads(entry.task_input)
+        action_name = json.loads(entry.task_output)['action_name']
+        with modulestore().bulk_operations(entry.course_id):
+            context = _CourseGradeReportContext(
+                _xblock_instance_args, entry_id, entry.course_id, task_input, action_name,
+            )
+            report = cls(context, user_ids)
+            try:
+                report._generate_part(entry.task_id, current_task_id)
+            except Exception:
+                TASK_LOG.exception('%s, Grade report subtask %s failed', context.task_info_string, current_task_id)
+                subtask_status.increment(failed=len(user_ids), state=FAILURE)
+                update_subtask_status(entry_id, current_task_id, subtask_status, complete_parent=False)
+                report._finish_if_complete(entry_id)
+                raise
+
+            subtask_status.increment(
+                succeeded=context.task_progress.succeeded,
+                failed=context.task_progress.failed,
+                state=SUCCESS,
+            )
+            update_subtask_status(entry_id, current_task_id, subtask_status, complete_parent=False)
+            report._finish_if_complete(entry_id)
+        return subtask_status.to_dict()
+
+    def _batch_users(self):
+        """
+        Returns a generator of batches of this subtask's users.
+        """
+        for index in range(0, len(self.user_ids), self.USER_BATCH_SIZE):
+            yield get_user_model().objects.filter(
+                id__in=self.user_ids[index:index + self.USER_BATCH_SIZE],
+            ).order_by('id').select_related('profile')
+
+    def _parts_dir(self, report_store, task_id):
+        """
+        Returns the report store directory of the partial reports of the
+        given task.
+        """
+        return report_store.path_to(self.context.course_id, f'{self.PARTS_DIR_NAME}/{task_id}')
+
+    def _generate_part(self, task_id, part_name):
+        """
+        Writes the rows of this subtask's users to partial success and
+        error reports, without headers.
+        """
+        self.context.update_status('ShardedCourseGradeReport - 2: Compiling grades into temp files')
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        parts_dir = self._parts_dir(report_store, task_id)
+        with TemporaryFile('r+', encoding='utf-8') as success_file, \
+                TemporaryFile('r+', encoding='utf-8') as error_file:
+            self.iter_and_write_batched_rows(self._batched_rows(), success_file, error_file, include_headers=False)
+            for part_file, suffix in ((success_file, ''), (error_file, '_err')):
+                part_file.seek(0)
+                # A retried subtask replaces the part of its earlier attempt,
+                # which the storage would otherwise save under another name.
+                report_store.delete(self.context.course_id, f'{part_name}{suffix}.csv', parts_dir)
+                report_store.store(self.context.course_id, f'{part_name}{suffix}.csv', part_file, parts_dir)
+
+    def _finish_if_complete(self, entry_id):
+        """
+        Merges the partial reports once all subtasks of the task have
+        completed, and only then marks the task as succeeded.  Only one of
+        the subtasks that observe completion does so.
+        """
+        entry = InstructorTask.objects.get(pk=entry_id)
+        subtask_dict = json.loads(entry.subtasks)
+        if subtask_dict['succeeded'] + subtask_dict['failed'] < subtask_dict['total']:
+            return
+        if not cache.add(f'{self.PARTS_DIR_NAME}-{entry.task_id}', 'true', SUBTASK_LOCK_EXPIRE):
+            return
+
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        parts_dir = self._parts_dir(report_store, entry.task_id)
+        part_names = list(subtask_dict['status'])
+        try:
+            if subtask_dict['failed']:
+                raise ValueError(
+                    f"{subtask_dict['failed']} of {subtask_dict['total']} grade report subtasks failed"
+                )
+            task_progress = json.loads(entry.task_output)
+            self.context.update_status('ShardedCourseGradeReport - 3: Merging and uploading files')
+            self._merge_parts(report_store, parts_dir, part_names, has_errors=task_progress['failed'] > 0)
+            self.context.update_status('ShardedCourseGradeReport - 4: Completed grades')
+            entry.task_state = SUCCESS
+            entry.save_now()
+        except Exception as exc:  # pylint: disable=broad-except
+            TASK_LOG.exception('%s, Failed to merge grade report', self.context.task_info_string)
+            entry.task_output = InstructorTask.create_output_for_failure(exc, traceback.format_exc())
+            entry.task_state = FAILURE
+            entry.save_now()
+        finally:
+            for part_name in part_names:
+                for suffix in ('', '_err'):
+                    report_store.delete(self.context.course_id, f'{part_name}{suffix}.csv', parts_dir)
+
+    def _merge_parts(self, report_store, parts_dir, part_names, has_errors):
+        """
+        Streams the partial reports, in order, into single success and
+        error reports, and uploads them.
+        """
+        with TemporaryFile('r+', encoding='utf-8') as success_file, \
+                TemporaryFile('r+', encoding='utf-8') as error_file:
+            csv.writer(success_file).writerow(self._success_headers())
+            csv.writer(error_file).writerow(self._error_headers())
+            for part_name in part_names:
+                for merged_file, suffix in ((success_file, ''), (error_file, '_err')):
+                    with report_store.open(self.context.course_id, f'{part_name}{suffix}.csv', parts_dir) as part:
+                        shutil.copyfileobj(codecs.getreader('utf-8')(part), merged_file)
+            self.upload_temp_files(success_file, error_file, has_errors)
+
+
 class ProblemGradeReport(GradeReportBase):
     """
     Class to encapsulate functionality related to generating user/row had header data for Problem Grade Reports.
@@ -721,6 +1017,10 @@ class ProblemGradeReport(GradeReportBase):
         """
         with modulestore().bulk_operations(course_id):
             context = _ProblemGradeReportContext(_xblock_instance_args, _entry_id, course_id, _task_input, action_name)
+            if use_columnar_problem_grade_report(course_id):
+                report = ColumnarProblemGradeReport(context)
+                if report.is_supported:
+                    return report._generate()  # pylint: disable=protected-access
             if use_on_disk_grade_reporting(course_id):  # AU-926
                 return TempFileProblemGradeReport(context)._generate()  # pylint: disable=protected-access
             else:
@@ -753,6 +1053,7 @@ class ProblemGradeReport(GradeReportBase):
         Returns a list of rows for the given users for this report.
         """
         success_rows, error_rows = [], []
+        prefetch_course_and_subsection_grades(self.context.course_id, users)
         for student, course_grade, error in CourseGradeFactory().iter(
             users,
             course=self.context.course,
@@ -794,6 +1095,7 @@ class ProblemGradeReport(GradeReportBase):
     def _clear_caches(self):
         get_cache('get_enrollment').clear()
         get_cache(CourseEnrollment.MODE_CACHE_NAMESPACE).clear()
+        clear_prefetched_course_and_subsection_grades(self.context.course_id)
 
 
 class InMemoryProblemGradeReport(ProblemGradeReport, InMemoryReportMixin):
@@ -804,6 +1106,220 @@ class TempFileProblemGradeReport(ProblemGradeReport, TemporaryFileReportMixin):
     """ Program Grade Report that writes file iteratively to a TempFile to then be uploaded """
 
 
+class _NpyColumnFile:
+    """
+    A column of a NumPy .npz archive whose values are appended to a
+    TempFile as they are computed, so that the whole column is never held
+    in memory.
+    """
+
+    def __init__(self, dtype):
+        self.dtype = numpy.dtype(dtype)
+        self.length = 0
+        self._file = TemporaryFile()
+
+    def append(self, values):
+        values = numpy.asarray(values, dtype=self.dtype)
+        self._file.write(values.tobytes())
+        self.length += len(values)
+
+    def write_to_archive(self, archive, name):
+        """
+        Writes the column to the given archive as an .npy file.
+        """
+        with archive.open(f'{name}.npy', 'w', force_zip64=True) as npy_file:
+            numpy.lib.format.write_array_header_1_0(npy_file, {
+                'descr': numpy.lib.format.dtype_to_descr(self.dtype),
+                'fortran_order': False,
+                'shape': (self.length,),
+            })
+            self._file.seek(0)
+            shutil.copyfileobj(self._file, npy_file)
+
+    def close(self):
+        self._file.close()
+
+
+class ColumnarProblemGradeReport(TempFileProblemGradeReport):
+    """
+    Problem Grade Report whose rows are computed from the ProblemScoreMatrix
+    and the VectorizedCourseGrader of each batch of learners, rather than
+    from their CourseGrades.
+
+    If the task input's 'report_format' is 'npz', the report is uploaded
+    as a NumPy .npz archive rather than as a CSV.  The archive holds the
+    'user_id' and 'grade' of each learner, the 'problem_key' and
+    'default_possible' score of each problem, and, for each score that
+    is attempted or whose possible score differs from the default, its
+    'cell_user' and 'cell_problem' indices and 'cell_earned',
+    'cell_possible' and 'cell_attempted' values.  Possible scores of NaN
+    mark the problems that are not available to a learner.
+    """
+    NPZ_REPORT_FORMAT = 'npz'
+
+    @lazy
+    def course_grader(self):
+        return VectorizedCourseGrader(
+            course=self.context.course,
+            collected_block_structure=self.context.course_structure,
+        )
+
+    @lazy
+    def score_matrix(self):
+        return ProblemScoreMatrix(
+            course=self.context.course,
+            collected_block_structure=self.context.course_structure,
+            problem_keys=list(self.context.graded_scorable_blocks_header),
+        )
+
+    @property
+    def is_supported(self):
+        """
+        Returns whether the grades of the course can be computed without
+        CourseGrades.
+        """
+        return self.course_grader.is_supported
+
+    def _generate(self):
+        if self.context.task_input.get('report_format') == self.NPZ_REPORT_FORMAT:
+            return self._generate_npz()
+        return super()._generate()
+
+    def _scores_for_users(self, users):
+        """
+        Returns the given users whose course structure could be computed, and
+        their course grades and ProblemScores, along with the error rows of
+        the other users.
+
+        Users with the same access to the course share their course
+        structure, as VectorizedCourseGrader.get_user_structures computes it.
+        """
+        graded_users, user_structures, error_rows = [], [], []
+        for user in users:
+            try:
+                user_structures.extend(self.course_grader.get_user_structures([user]))
+            except Exception as error:  # pylint: disable=broad-except
+                TASK_LOG.exception(
+                    'ColumnarProblemGradeReport: Cannot compute the course structure of user %s in course %s',
+                    user.id,
+                    self.context.course_id,
+                )
+                error_rows.append([user.id, user.email, user.username] + [str(error) or 'Unknown error'])
+                continue
+            graded_users.append(user)
+
+        user_ids = [user.id for user in graded_users]
+        return (
+            graded_users,
+            self.course_grader.grade(graded_users, user_structures),
+            self.score_matrix.load(user_ids, user_structures),
+            error_rows,
+        )
+
+    def _rows_for_users(self, users):
+        """
+        Returns a list of rows for the given users for this report.
+        """
+        users, course_grades, scores, error_rows = self._scores_for_users(users)
+        success_rows = []
+        for user_index, user in enumerate(users):
+            earned_possible_values = []
+            for problem_index, (earned, possible) in enumerate(
+                zip(scores.earned[user_index].tolist(), scores.possible[user_index].tolist())
+            ):
+                if not scores.available[user_index, problem_index]:
+                    earned_possible_values.append(['Not Available', 'Not Available'])
+                elif scores.attempted[user_index, problem_index]:
+                    earned_possible_values.append([earned, possible])
+                else:
+                    earned_possible_values.append(['Not Attempted', possible])
+
+            enrollment_status = _user_enrollment_status(user, self.context.course_id)
+            success_rows.append(
+                [user.id, user.email, user.username] +
+                [enrollment_status, course_grades[user.id].percent] +
+                _flatten(earned_possible_values)
+            )
+
+        return success_rows, error_rows
+
+    def _generate_npz(self):
+        """
+        Generate a NumPy .npz archive of all students' problem grades within a given `course_id`.
+        """
+        self.context.update_status('ColumnarProblemGradeReport - 1: Starting grade report')
+        columns = OrderedDict([
+            ('user_id', _NpyColumnFile('int64')),
+            ('grade', _NpyColumnFile('float64')),
+            ('cell_user', _NpyColumnFile('int64')),
+            ('cell_problem', _NpyColumnFile('int64')),
+            ('cell_earned', _NpyColumnFile('float64')),
+            ('cell_possible', _NpyColumnFile('float64')),
+            ('cell_attempted', _NpyColumnFile('bool')),
+        ])
+        failed = 0
+        error_file = TemporaryFile('r+', encoding='utf-8')
+        try:
+            error_writer = csv.writer(error_file)
+            error_writer.writerow(self._error_headers())
+
+            self.context.update_status('ColumnarProblemGradeReport - 2: Compiling grades into temp files')
+            for users in self._batch_users():
+                _, course_grades, scores, error_rows = self._scores_for_users(users)
+                error_writer.writerows(error_rows)
+                failed += len(error_rows)
+                user_indices, problem_indices = self.score_matrix.nondefault_cells(scores)
+                columns['cell_user'].append(user_indices + columns['user_id'].length)
+                columns['cell_problem'].append(problem_indices)
+                columns['cell_earned'].append(scores.earned[user_indices, problem_indices])
+                columns['cell_possible'].append(scores.possible[user_indices, problem_indices])
+                columns['cell_attempted'].append(scores.attempted[user_indices, problem_indices])
+                columns['user_id'].append(scores.user_ids)
+                columns['grade'].append([course_grades[user_id].percent for user_id in scores.user_ids])
+                self._clear_caches()
+
+            self.context.task_progress.succeeded = columns['user_id'].length
+            self.context.task_progress.failed = failed
+            self.context.task_progress.attempted = self.context.task_progress.succeeded + failed
+            self.context.task_progress.total = self.context.task_progress.attempted
+
+            self.context.update_status('ColumnarProblemGradeReport - 3: Uploading file')
+            with TemporaryFile() as npz_file:
+                with zipfile.ZipFile(npz_file, 'w', compression=zipfile.ZIP_DEFLATED, allowZip64=True) as archive:
+                    for name, values in (
+                        ('problem_key', numpy.array([str(key) for key in self.score_matrix.problem_keys], dtype=str)),
+                        ('default_possible', self.score_matrix.default_possible),
+                    ):
+                        with archive.open(f'{name}.npy', 'w', force_zip64=True) as npy_file:
+                            numpy.lib.format.write_array(npy_file, values, allow_pickle=False)
+                    for name, column in columns.items():
+                        column.write_to_archive(archive, name)
+                npz_file.seek(0)
+                date = datetime.now(UTC)
+                upload_npz_file_to_report_store(
+                    npz_file,
+                    self.context.upload_filename,
+                    self.context.course_id,
+                    date,
+                    parent_dir=self.context.upload_parent_dir,
+                )
+            if failed:
+                error_file.seek(0)
+                upload_csv_file_to_report_store(
+                    error_file,
+                    self.context.upload_filename + '_err',
+                    self.context.course_id,
+                    date,
+                    parent_dir=self.context.upload_parent_dir,
+                )
+        finally:
+            error_file.close()
+            for column in columns.values():
+                column.close()
+
+        return self.context.update_status('ColumnarProblemGradeReport - 4: Completed grades')
+
+
 class ProblemResponses:
     """
     Class to encapsulate functionality related to generating Problem Responses Reports.
@@ -850,13 +1366,71 @@ class ProblemResponses:
             name = course_blocks.get_xblock_field(block, 'display_name') or block.block_type
             yield from cls._build_problem_list(course_blocks, block, path + [name])
 
+    @staticmethod
+    def _iter_student_module_pages(course_key, block_key, limit_responses=None):
+        """
+        Generate the ``StudentModule`` rows of the given block, in pages of at
+        most ``USER_STATE_BATCH_SIZE`` rows ordered by learner.
+
+        Pages are read with keyset pagination on the learner's id, rather than
+        with an offset, so that every query only reads the rows of its own page.
+
+        Arguments:
+            course_key (CourseKey): The course of the block.
+            block_key (UsageKey): The block whose rows are read.
+            limit_responses (int|None): The maximum number of rows to read,
+                or None to read all of them.
+        Yields:
+            List[StudentModule]: The rows of the next page.
+        """
+        student_modules = StudentModule.objects.filter(
+            course_id=course_key,
+            module_state_key=block_key,
+        ).select_related('student').order_by('student_id')
+
+        last_student_id = None
+        while limit_responses is None or limit_responses > 0:
+            page_size = settings.USER_STATE_BATCH_SIZE
+            if limit_responses is not None:
+                page_size = min(page_size, limit_responses)
+                limit_responses -= page_size
+
+            page = student_modules
+            if last_student_id is not None:
+                page = page.filter(student_id__gt=last_student_id)
+            page = list(page[:page_size])
+            if page:
+                yield page
+            if len(page) < page_size:
+                return
+            last_student_id = page[-1].student_id
+
+    @staticmethod
+    def _iter_user_states(student_modules):
+        """
+        Generate the ``XBlockUserState`` of each of the given ``StudentModule``
+        rows that has any state, as ``iter_all_for_block`` would.
+        """
+        for student_module in student_modules:
+            state = json.loads(student_module.state)
+            if state == {}:
+                continue
+            yield XBlockUserState(
+                student_module.student.username,
+                student_module.module_state_key,
+                state,
+                student_module.modified,
+                Scope.user_state,
+            )
+
     @classmethod
-    def _build_student_data(
-        cls, user_id, course_key, usage_key_str_list, filter_types=None,
+    def _iter_student_data(
+        cls, user_id, course_key, usage_key_str_list, filter_types=None, student_data_keys=None,
     ):
         """
-        Generate a list of problem responses for all problem under the
-        ``problem_location`` root.
+        Generate the problem responses for all problem under the
+        ``problem_location`` root, one block and one page of learners at a time,
+        so that memory use doesn't grow with the number of responses.
         Arguments:
             user_id (int): The user id for the user generating the report
             course_key (CourseKey): The ``CourseKey`` for the course whose report
@@ -865,10 +1439,10 @@ class ProblemResponses:
                 blocks and their child blocks.
             filter_types (List[str]): The report generator will only include data for
                 block types in this list.
-        Returns:
-              Tuple[List[Dict], List[str]]: Returns a list of dictionaries
-                containing the student data which will be included in the
-                final csv, and the features/keys to include in that CSV.
+            student_data_keys (OrderedDict): If given, the keys of the columns returned
+                by the xblock report generators are added to it, in order.
+        Yields:
+            Dict: the student data of a row of the final csv.
         """
         usage_keys = [
             UsageKey.from_string(usage_key_str).map_into_course(course_key)
@@ -876,15 +1450,14 @@ class ProblemResponses:
         ]
         user = get_user_model().objects.get(pk=user_id)
 
-        student_data = []
         max_count = settings.FEATURES.get('MAX_PROBLEM_RESPONSES_COUNT')
 
         store = modulestore()
-        user_state_client = DjangoXBlockUserStateClient()
 
         # Each user's generated report data may contain different fields, so we use an OrderedDict to prevent
         # duplication of keys while preserving the order the XBlock provides the keys in.
-        student_data_keys = OrderedDict()
+        if student_data_keys is None:
+            student_data_keys = OrderedDict()
 
         with store.bulk_operations(course_key):
             for usage_key in usage_keys:  # lint-amnesty, pylint: disable=too-many-nested-blocks
@@ -902,71 +1475,113 @@ class ProblemResponses:
                         continue
 
                     block = store.get_item(block_key)
-                    generated_report_data = defaultdict(list)
-
                     # Blocks can implement the generate_report_data method to provide their own
                     # human-readable formatting for user state.
-                    if hasattr(block, 'generate_report_data'):
-                        try:
-                            user_state_iterator = user_state_client.iter_all_for_block(block_key)
-                            for username, state in block.generate_report_data(user_state_iterator, max_count):
-                                generated_report_data[username].append(state)
-                        except NotImplementedError:
-                            pass
-
-                    responses = []
-
-                    for response in list_problem_responses(course_key, block_key, max_count):
-                        response['title'] = title
-                        # A human-readable location for the current block
-                        response['location'] = ' > '.join(base_path + path)
-                        # A machine-friendly location for the current block
-                        response['block_key'] = str(block_key)
-                        # A block that has a single state per user can contain multiple responses
-                        # within the same state.
-                        user_states = generated_report_data.get(response['username'])
-                        if user_states:
-                            # For each response in the block, copy over the basic data like the
-                            # title, location, block_key and state, and add in the responses
-                            for user_state in user_states:
-                                user_response = response.copy()
-                                user_response.update(user_state)
-
-                                # Respect the column order as returned by the xblock, if any.
-                                if isinstance(user_state, OrderedDict):
-                                    user_state_keys = user_state.keys()
-                                else:
-                                    user_state_keys = sorted(user_state.keys())
-                                for key in user_state_keys:
-                                    student_data_keys[key] = 1
-
-                                responses.append(user_response)
-                        else:
-                            responses.append(response)
-
-                    student_data += responses
-
-                    if max_count is not None:
-                        max_count -= len(responses)
-                        if max_count <= 0:
-                            break
+                    generates_report_data = hasattr(block, 'generate_report_data')
+
+                    for page in cls._iter_student_module_pages(course_key, block_key, max_count):
+                        generated_report_data = defaultdict(list)
+                        if generates_report_data:
+                            try:
+                                user_state_iterator = cls._iter_user_states(page)
+                                for username, state in block.generate_report_data(user_state_iterator, max_count):
+                                    generated_report_data[username].append(state)
+                            except NotImplementedError:
+                                generates_report_data = False
+
+                        num_responses = 0
+                        for student_module in page:
+                            response = {
+                                'username': student_module.student.username,
+                                'state': get_response_state(student_module),
+                                'title': title,
+                                # A human-readable location for the current block
+                                'location': ' > '.join(base_path + path),
+                                # A machine-friendly location for the current block
+                                'block_key': str(block_key),
+                            }
+                            # A block that has a single state per user can contain multiple responses
+                            # within the same state.
+                            user_states = generated_report_data.get(response['username'])
+                            if user_states:
+                                # For each response in the block, copy over the basic data like the
+                                # title, location, block_key and state, and add in the responses
+                                for user_state in user_states:
+                                    user_response = response.copy()
+                                    user_response.update(user_state)
+
+                                    # Respect the column order as returned by the xblock, if any.
+                                    if isinstance(user_state, OrderedDict):
+                                        user_state_keys = user_state.keys()
+                                    else:
+                                        user_state_keys = sorted(user_state.keys())
+                                    for key in user_state_keys:
+                                        student_data_keys[key] = 1
+
+                                    num_responses += 1
+                                    yield user_response
+                            else:
+                                num_responses += 1
+                                yield response
+
+                        if max_count is not None:
+                            max_count -= num_responses
+                            if max_count <= 0:
+                                break
+
+                    if max_count is not None and max_count <= 0:
+                        break
 
+    @staticmethod
+    def _build_student_data_keys_list(student_data_keys):
+        """
+        Return the columns of the report, given the keys of the columns
+        returned by the xblock report generators.
+        """
         # Keep the keys in a useful order, starting with username, title and location,
         # then the columns returned by the xblock report generator in sorted order and
         # finally end with the more machine friendly block_key and state.
-        student_data_keys_list = (
+        return (
             ['username', 'title', 'location'] +
             list(student_data_keys.keys()) +
             ['block_key', 'state']
         )
 
-        return student_data, student_data_keys_list
+    @classmethod
+    def _build_student_data(
+        cls, user_id, course_key, usage_key_str_list, filter_types=None,
+    ):
+        """
+        Generate a list of problem responses for all problem under the
+        ``problem_location`` root.
+        Arguments:
+            user_id (int): The user id for the user generating the report
+            course_key (CourseKey): The ``CourseKey`` for the course whose report
+                is being generated
+            usage_key_str_list (List[str]): The generated report will include these
+                blocks and their child blocks.
+            filter_types (List[str]): The report generator will only include data for
+                block types in this list.
+        Returns:
+              Tuple[List[Dict], List[str]]: Returns a list of dictionaries
+                containing the student data which will be included in the
+                final csv, and the features/keys to include in that CSV.
+        """
+        student_data_keys = OrderedDict()
+        student_data = list(cls._iter_student_data(
+            user_id, course_key, usage_key_str_list, filter_types, student_data_keys,
+        ))
+        return student_data, cls._build_student_data_keys_list(student_data_keys)
 
     @classmethod
     def generate(cls, _xblock_instance_args, _entry_id, course_id, task_input, action_name):
         """
         For a given `course_id`, generate a CSV file containing
         all student answers to a given problem, and store using a `ReportStore`.
+
+        The columns of the report are only known once all responses have been
+        generated, so the responses are first written to a temporary file, one
+        JSON object per line, and then copied into the CSV file that is uploaded.
         """
         start_time = time()
         start_date = datetime.now(UTC)
@@ -981,31 +1596,41 @@ class ProblemResponses:
         if problem_types_filter:
             filter_types = problem_types_filter.split(',')
 
-        # Compute result table and format it
-        student_data, student_data_keys = cls._build_student_data(
-            user_id=task_input.get('user_id'),
-            course_key=course_id,
-            usage_key_str_list=problem_locations,
-            filter_types=filter_types,
-        )
-
-        for data in student_data:
-            for key in student_data_keys:
-                data.setdefault(key, '')
+        csv_name = cls._generate_upload_file_name(problem_locations, filter_types)
+        student_data_keys = OrderedDict()
+        num_rows = 0
+        with TemporaryFile('r+', encoding='utf-8') as student_data_file, \
+                TemporaryFile('r+', encoding='utf-8') as csv_file:
+            # Compute result table
+            for data in cls._iter_student_data(
+                user_id=task_input.get('user_id'),
+                course_key=course_id,
+                usage_key_str_list=problem_locations,
+                filter_types=filter_types,
+                student_data_keys=student_data_keys,
+            ):
+                student_data_file.write(json.dumps(data, default=str) + '\n')
+                num_rows += 1
 
-        header, rows = format_dictlist(student_data, student_data_keys)
+            # Format it
+            header = cls._build_student_data_keys_list(student_data_keys)
+            csv_writer = csv.writer(csv_file)
+            csv_writer.writerow(header)
+            student_data_file.seek(0)
+            for line in student_data_file:
+                data = json.loads(line)
+                csv_writer.writerow([str(data.get(key, '')) for key in header])
 
-        task_progress.attempted = task_progress.succeeded = len(rows)
-        task_progress.skipped = task_progress.total - task_progress.attempted
+            task_progress.attempted = task_progress.succeeded = num_rows
+            task_progress.skipped = task_progress.total - task_progress.attempted
 
-        rows.insert(0, header)
+            current_step = {'step': 'Uploading CSV'}
+            task_progress.update_task_state(extra_meta=current_step)
 
-        current_step = {'step': 'Uploading CSV'}
-        task_progress.update_task_state(extra_meta=current_step)
+            # Perform the upload
+            csv_file.seek(0)
+            report_name = upload_csv_file_to_report_store(csv_file, csv_name, course_id, start_date)
 
-        # Perform the upload
-        csv_name = cls._generate_upload_file_name(problem_locations, filter_types)
-        report_name = upload_csv_to_report_store(rows, csv_name, course_id, start_date)
         current_step = {
             'step': 'CSV uploaded',
             'report_name': report_name,
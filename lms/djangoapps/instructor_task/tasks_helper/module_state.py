@@ -5,31 +5,65 @@ Instructor Tasks related to module state.
 
 import json
 import logging
+from functools import partial
 from time import time
 
+from celery.states import FAILURE, SUCCESS
+from django.conf import settings
+from django.db.models.signals import post_save
+from django.utils.timezone import now
 from django.utils.translation import gettext_noop
 from opaque_keys.edx.keys import UsageKey
 from xblock.scorable import Score
 
+from xmodule.capa.correctmap import CorrectMap
 from xmodule.capa.responsetypes import LoncapaProblemError, ResponseError, StudentInputError
 from common.djangoapps.student.models import get_user_by_username_or_email
 from common.djangoapps.track.event_transaction_utils import create_new_event_transaction_id, set_event_transaction_type
 from common.djangoapps.track.views import task_track
 from common.djangoapps.util.db import outer_atomic
+from lms.djangoapps.course_blocks.api import INDIVIDUAL_STUDENT_OVERRIDE_PROVIDER
+from lms.djangoapps.courseware.access import has_access
 from lms.djangoapps.courseware.courses import get_problems_in_section
+from lms.djangoapps.courseware.field_overrides import resolve_dotted
 from lms.djangoapps.courseware.model_data import FieldDataCache
-from lms.djangoapps.courseware.models import StudentModule
+from lms.djangoapps.courseware.models import StudentFieldOverride, StudentModule
 from lms.djangoapps.courseware.block_render import get_block_for_descriptor
+from lms.djangoapps.grades.api import constants as grades_constants
 from lms.djangoapps.grades.api import events as grades_events
+from lms.djangoapps.grades.api import signals as grades_signals
 from openedx.core.lib.courses import get_course_by_id
+from openedx.core.lib.grade_utils import is_score_higher_or_equal
 from xmodule.modulestore.django import modulestore  # lint-amnesty, pylint: disable=wrong-import-order
 
+from ..config.waffle import use_batch_rescoring, use_partitioned_module_state_updates
 from ..exceptions import UpdateProblemModuleStateError
+from ..models import InstructorTask
+from ..subtasks import SubtaskStatus, check_subtask_is_valid, queue_subtasks_for_query, update_subtask_status
 from .runner import TaskProgress
 from .utils import UNKNOWN_TASK_ID, UPDATE_STATUS_FAILED, UPDATE_STATUS_SKIPPED, UPDATE_STATUS_SUCCEEDED
 
 TASK_LOG = logging.getLogger('edx.celery.task')
 
+# Response types that are graded from the stored answers of a learner alone, so that
+# a single parsed problem can rescore the answers of every learner.
+BATCH_RESCORE_RESPONSE_TYPES = {
+    'choiceresponse',
+    'multiplechoiceresponse',
+    'optionresponse',
+    'numericalresponse',
+    'stringresponse',
+}
+
+# Number of student modules saved by each bulk update of a batch rescore.
+BATCH_RESCORE_CHUNK_SIZE = 500
+
+# Per-learner field override providers whose overrides don't change how a
+# learner's answers to a problem are graded.
+BATCH_RESCORE_IGNORED_OVERRIDE_PROVIDERS = {
+    'openedx.features.personalized_learner_schedules.show_answer.show_answer_field_override.ShowAnswerFieldOverride',
+}
+
 
 def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, task_input, action_name):
     """
@@ -60,11 +94,90 @@ def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, ta
 
     """
     start_time = time()
+    student_identifier = task_input.get('student')
+    override_score_task = action_name == gettext_noop('overridden')
+    usage_keys, problems = _get_problems_to_update(course_id, task_input)
+
+    modules_to_update = _get_modules_to_update(
+        course_id, usage_keys, student_identifier, filter_fcn, override_score_task
+    )
+
+    update_fcn_name = _get_partitionable_update_fcn_name(update_fcn, filter_fcn)
+    if update_fcn_name and not student_identifier and use_partitioned_module_state_updates(course_id):
+        total_num_modules = modules_to_update.count()
+        if total_num_modules > settings.MODULE_STATE_UPDATE_MODULES_PER_TASK:
+            TaskProgress(action_name, total_num_modules, start_time).update_task_state()
+            return _queue_module_state_update_partitions(
+                _entry_id, update_fcn.args[0], update_fcn_name, modules_to_update, total_num_modules, action_name,
+            )
+
+    task_progress = TaskProgress(action_name, len(modules_to_update), start_time)
+    task_progress.update_task_state()
+
+    _update_modules(update_fcn, modules_to_update, problems, task_input, task_progress)
+
+    return task_progress.update_task_state()
+
+
+def perform_module_state_update_partition(
+    entry_id, xblock_instance_args, update_fcn_name, module_id_range, subtask_status_dict,
+):
+    """
+    Performs the update of a subtask of perform_module_state_update, on the
+    student modules whose ids are in the inclusive `module_id_range`, and
+    records the subtask's progress in the parent InstructorTask.
+
+    Returns the subtask status dict.
+    """
+    subtask_status = SubtaskStatus.from_dict(subtask_status_dict)
+    current_task_id = subtask_status.task_id
+    check_subtask_is_valid(entry_id, current_task_id, subtask_status)
+
+    entry = InstructorTask.objects.get(pk=entry_id)
+    task_input = json.loads(entry.task_input)
+    action_name = json.loads(entry.task_output)['action_name']
+    update_fcn = partial(_get_partitionable_update_fcns()[update_fcn_name], xblock_instance_args)
+
+    usage_keys, problems = _get_problems_to_update(entry.course_id, task_input)
+    first_module_id, last_module_id = module_id_range
+    modules_to_update = _get_modules_to_update(entry.course_id, usage_keys, None, None).filter(
+        id__gte=first_module_id, id__lte=last_module_id,
+    ).order_by('id')
+
+    task_progress = TaskProgress(action_name, len(modules_to_update), time())
+    try:
+        _update_modules(update_fcn, modules_to_update, problems, task_input, task_progress)
+    except Exception:
+        TASK_LOG.exception(
+            "Module state update subtask %s of instructor task %d failed", current_task_id, entry_id,
+        )
+        subtask_status.increment(
+            succeeded=task_progress.succeeded,
+            failed=task_progress.total - task_progress.succeeded - task_progress.skipped,
+            skipped=task_progress.skipped,
+            state=FAILURE,
+        )
+        update_subtask_status(entry_id, current_task_id, subtask_status)
+        raise
+
+    subtask_status.increment(
+        succeeded=task_progress.succeeded,
+        failed=task_progress.failed,
+        skipped=task_progress.skipped,
+        state=SUCCESS,
+    )
+    update_subtask_status(entry_id, current_task_id, subtask_status)
+    return subtask_status.to_dict()
+
+
+def _get_problems_to_update(course_id, task_input):
+    """
+    Returns the usage keys of the problems to update for the given task input,
+    and a dict of the problem blocks by the string of their usage keys.
+    """
     usage_keys = []
     problem_url = task_input.get('problem_url')
     entrance_exam_url = task_input.get('entrance_exam_url')
-    student_identifier = task_input.get('student')
-    override_score_task = action_name == gettext_noop('overridden')
     problems = {}
 
     # if problem_url is present make a usage key from it
@@ -81,13 +194,14 @@ def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, ta
         problems = get_problems_in_section(entrance_exam_url)
         usage_keys = [UsageKey.from_string(location) for location in problems.keys()]
 
-    modules_to_update = _get_modules_to_update(
-        course_id, usage_keys, student_identifier, filter_fcn, override_score_task
-    )
+    return usage_keys, problems
 
-    task_progress = TaskProgress(action_name, len(modules_to_update), start_time)
-    task_progress.update_task_state()
 
+def _update_modules(update_fcn, modules_to_update, problems, task_input, task_progress):
+    """
+    Calls `update_fcn` on each of the given student modules, and counts the
+    results in `task_progress`.
+    """
     for module_to_update in modules_to_update:
         task_progress.attempted += 1
         block = problems[str(module_to_update.module_state_key)]
@@ -105,9 +219,328 @@ def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, ta
         else:
             raise UpdateProblemModuleStateError(f"Unexpected update_status returned: {update_status}")
 
+
+def _get_partitionable_update_fcns():
+    """
+    Returns the update functions whose updates can be performed by subtasks,
+    by name.  Subtasks rebuild the update function from its name, since the
+    function can't be passed to them.
+    """
+    return {
+        update_fcn.__name__: update_fcn
+        for update_fcn in (rescore_problem_module_state, reset_attempts_module_state, delete_problem_module_state)
+    }
+
+
+def _get_partitionable_update_fcn_name(update_fcn, filter_fcn):
+    """
+    Returns the name of the given update function if its updates can be
+    performed by subtasks, or None.  Only updates by one of the partitionable
+    update functions, bound to the xblock_instance_args alone and without a
+    filter function, can be.
+    """
+    if filter_fcn is not None or not isinstance(update_fcn, partial):
+        return None
+    if len(update_fcn.args) != 1 or update_fcn.keywords:
+        return None
+    update_fcn_name = update_fcn.func.__name__
+    if _get_partitionable_update_fcns().get(update_fcn_name) is not update_fcn.func:
+        return None
+    return update_fcn_name
+
+
+def _queue_module_state_update_partitions(
+    entry_id, xblock_instance_args, update_fcn_name, modules_to_update, total_num_modules, action_name,
+):
+    """
+    Queues subtasks that each update a range of ids of the given student
+    modules, and returns the task progress.
+    """
+    entry = InstructorTask.objects.get(pk=entry_id)
+
+    # If subtasks have already been defined, this task was requeued
+    # after queueing them, and there is nothing left to do.
+    if len(entry.subtasks) > 0 and len(entry.task_output) > 0:
+        TASK_LOG.warning("Subtasks of instructor task %d have already been queued", entry_id)
+        return json.loads(entry.task_output)
+
+    def _create_partition_subtask(item_list, initial_subtask_status):
+        """Creates a subtask to update the student modules in the range of the given item list."""
+        # Imported here to avoid a circular import with the tasks module.
+        from lms.djangoapps.instructor_task.tasks import update_module_states_partition
+        return update_module_states_partition.subtask(
+            (
+                entry_id,
+                xblock_instance_args,
+                update_fcn_name,
+                [item_list[0]['pk'], item_list[-1]['pk']],
+                initial_subtask_status.to_dict(),
+            ),
+            task_id=initial_subtask_status.task_id,
+        )
+
+    TASK_LOG.info(
+        "Updating %d student modules of instructor task %d in subtasks", total_num_modules, entry_id,
+    )
+    return queue_subtasks_for_query(
+        entry,
+        action_name,
+        _create_partition_subtask,
+        [modules_to_update.order_by('id')],
+        [],
+        settings.MODULE_STATE_UPDATE_MODULES_PER_TASK,
+        total_num_modules,
+    )
+
+
+def perform_problem_rescore(xblock_instance_args, _entry_id, course_id, task_input, action_name):
+    """
+    Rescores the submissions of a problem, using a single parsed problem for all
+    learners when the problem supports it, and otherwise by visiting each
+    StudentModule with rescore_problem_module_state.
+
+    Returns the task's results, like perform_module_state_update.
+    """
+    if use_batch_rescoring(course_id) and task_input.get('problem_url') and not task_input.get('entrance_exam_url'):
+        task_progress = _batch_rescore_problem(xblock_instance_args, course_id, task_input, action_name)
+        if task_progress is not None:
+            return task_progress
+
+    update_fcn = partial(rescore_problem_module_state, xblock_instance_args)
+    return perform_module_state_update(update_fcn, None, _entry_id, course_id, task_input, action_name)
+
+
+def _batch_rescore_problem(xblock_instance_args, course_id, task_input, action_name):
+    """
+    Rescores the submissions of the problem in `task_input`, grading the stored
+    answers of every learner against a single parsed problem, without binding
+    the problem to each learner, and saves the updated student modules of each
+    chunk with a bulk update.
+
+    Learners who lost access to the problem are not rescored, as they are by
+    rescore_problem_module_state.
+
+    Returns None, without rescoring anything, if the problem has responses whose
+    grading may depend on more than a learner's stored answers, or if field
+    overrides may change the problem for some learners.
+    """
+    start_time = time()
+    usage_key = UsageKey.from_string(task_input['problem_url']).map_into_course(course_id)
+    block = modulestore().get_item(usage_key)
+    course = get_course_by_id(course_id)
+    if _has_learner_field_overrides(course, usage_key):
+        return None
+    modules_to_update = _get_modules_to_update(course_id, [usage_key], task_input.get('student'), None)
+    first_module = modules_to_update.select_related('student').order_by('id').first()
+    if first_module is None:
+        return None
+
+    with modulestore().bulk_operations(course_id):
+        instance = _get_module_instance_for_task(
+            course_id,
+            first_module.student,
+            block,
+            xblock_instance_args,
+            grade_bucket_type='rescore',
+            course=course,
+        )
+    if instance is None or not hasattr(instance, 'new_lcp'):
+        return None
+    lcp = instance.new_lcp(None, text=block.data)
+    if not _supports_batch_rescoring(lcp):
+        return None
+
+    total_num_modules = modules_to_update.count()
+    TASK_LOG.info(
+        "Batch rescoring %d submissions of problem %s in course %s", total_num_modules, usage_key, course_id
+    )
+    task_progress = TaskProgress(action_name, total_num_modules, start_time)
+    task_progress.update_task_state()
+    for student_modules in _iter_module_chunks(modules_to_update, BATCH_RESCORE_CHUNK_SIZE):
+        _batch_rescore_student_modules(
+            xblock_instance_args,
+            block,
+            lcp,
+            student_modules,
+            task_input['only_if_higher'],
+            task_progress,
+        )
+        task_progress.update_task_state()
     return task_progress.update_task_state()
 
 
+def _has_learner_field_overrides(course, usage_key):
+    """
+    Returns whether the given problem may differ for some learners because of
+    per-learner field overrides.  Individual overrides of a learner's due date,
+    i.e. due date extensions, and of when answers are shown don't change how
+    the problem is graded.
+    """
+    for provider_name in settings.FIELD_OVERRIDE_PROVIDERS:
+        if provider_name in BATCH_RESCORE_IGNORED_OVERRIDE_PROVIDERS:
+            continue
+        if not resolve_dotted(provider_name).enabled_for(course):
+            continue
+        if provider_name != INDIVIDUAL_STUDENT_OVERRIDE_PROVIDER:
+            return True
+        if StudentFieldOverride.objects.filter(course_id=course.id, location=usage_key).exclude(field='due').exists():
+            return True
+    return False
+
+
+def _iter_module_chunks(modules, chunk_size):
+    """
+    Yields lists of at most `chunk_size` of the given student modules, in order
+    of their ids, loading one list at a time.
+    """
+    last_module_id = 0
+    while True:
+        student_modules = list(
+            modules.filter(id__gt=last_module_id).select_related('student').order_by('id')[:chunk_size]
+        )
+        if not student_modules:
+            return
+        yield student_modules
+        last_module_id = student_modules[-1].id
+
+
+def _supports_batch_rescoring(lcp):
+    """
+    Returns whether every learner's submission of the given problem can be
+    rescored by the same LoncapaProblem.  Scripts, shuffled choices and answer
+    pools make a problem depend on the learner's seed, and the grading method
+    feature rescores the full history of each learner's submissions.
+    """
+    return (
+        lcp.supports_rescoring() and
+        not lcp.is_grading_method_enabled and
+        not lcp.context.get('script_code') and
+        not lcp.tree.xpath("//*[@shuffle='true' or @answer-pool]") and
+        all(response.tag in BATCH_RESCORE_RESPONSE_TYPES for response in lcp.responders)
+    )
+
+
+@outer_atomic
+def _batch_rescore_student_modules(xblock_instance_args, block, lcp, student_modules, only_if_higher, task_progress):
+    """
+    Rescores the given student modules of `block` against `lcp`, saves the
+    updated student modules with a single bulk update, and then records their
+    history, publishes their score changes and emits their tracking events.
+    """
+    updated_modules = []
+    rescore_events = []
+    for student_module in student_modules:
+        task_progress.attempted += 1
+        if has_access(student_module.student, 'load', block, student_module.course_id):
+            update_status, event_info, score_updated = _rescore_student_module(lcp, student_module, only_if_higher)
+        else:
+            TASK_LOG.warning(
+                "No module %(loc)s for student %(student)s--access denied?",
+                dict(loc=student_module.module_state_key, student=student_module.student)
+            )
+            update_status, event_info, score_updated = UPDATE_STATUS_FAILED, None, False
+        if update_status == UPDATE_STATUS_SUCCEEDED:
+            task_progress.succeeded += 1
+        elif update_status == UPDATE_STATUS_FAILED:
+            task_progress.failed += 1
+        else:
+            task_progress.skipped += 1
+        if event_info is not None:
+            updated_modules.append(student_module)
+            rescore_events.append((student_module, event_info, score_updated))
+
+    modified = now()
+    for student_module in updated_modules:
+        student_module.modified = modified
+    StudentModule.objects.bulk_update(updated_modules, ['state', 'grade', 'max_grade', 'modified'])
+
+    for student_module, event_info, score_updated in rescore_events:
+        # bulk_update does not send post_save, which records the student module's history.
+        post_save.send(sender=StudentModule, instance=student_module, created=False)
+
+        create_new_event_transaction_id()
+        set_event_transaction_type(grades_events.GRADES_RESCORE_EVENT_TYPE)
+        if score_updated:
+            grades_signals.PROBLEM_RAW_SCORE_CHANGED.send(
+                sender=None,
+                raw_earned=student_module.grade,
+                raw_possible=student_module.max_grade,
+                weight=getattr(block, 'weight', None),
+                user_id=student_module.student_id,
+                course_id=str(student_module.course_id),
+                usage_id=str(student_module.module_state_key),
+                only_if_higher=only_if_higher,
+                modified=student_module.modified,
+                score_db_table=grades_constants.ScoreDatabaseTableEnum.courseware_student_module,
+                score_deleted=False,
+                grader_response=False,
+            )
+        track_function = _get_track_function_for_task(student_module.student, xblock_instance_args)
+        track_function('problem_rescore', event_info)
+
+
+def _rescore_student_module(lcp, student_module, only_if_higher):
+    """
+    Rescores the stored answers of the given student module against `lcp`, and
+    updates the student module's state and, unless `only_if_higher` prevents
+    it, its score, without saving it.
+
+    Returns a tuple of the update status, the info of the rescore event (None if
+    the student module was not updated), and whether the score was updated.
+    """
+    state = json.loads(student_module.state) if student_module.state else {}
+    if not state.get('done'):
+        return UPDATE_STATUS_SKIPPED, None, False
+
+    event_info = {
+        'state': state,
+        'problem_id': str(student_module.module_state_key),
+        'orig_score': state.get('score', {}).get('raw_earned'),
+        'orig_total': state.get('score', {}).get('raw_possible'),
+    }
+    lcp.student_answers = state.get('student_answers', {})
+    lcp.correct_map = CorrectMap()
+    lcp.correct_map.set_dict(state.get('correct_map', {}))
+    # Make sure that the attempt number is always at least 1 for grading purposes.
+    lcp.context['attempt'] = max(state.get('attempts', 0), 1)
+    try:
+        lcp.correct_map.update(lcp.get_grade_from_current_answers(None))
+    except (LoncapaProblemError, ResponseError):
+        TASK_LOG.exception(
+            "error processing rescore call for course %(course)s, problem %(loc)s and student %(student)s",
+            dict(course=student_module.course_id, loc=student_module.module_state_key, student=student_module.student)
+        )
+        return UPDATE_STATUS_SUCCEEDED, None, False
+    except StudentInputError:
+        TASK_LOG.warning(
+            "error processing rescore call for course %(course)s, problem %(loc)s and student %(student)s",
+            dict(course=student_module.course_id, loc=student_module.module_state_key, student=student_module.student)
+        )
+        return UPDATE_STATUS_FAILED, None, False
+
+    new_score = lcp.calculate_score()
+    new_state = dict(state, correct_map=lcp.correct_map.get_dict())
+    score_updated = not only_if_higher or student_module.grade is None or is_score_higher_or_equal(
+        student_module.grade, student_module.max_grade, new_score['score'], new_score['total'],
+    )
+    if score_updated:
+        new_state['score'] = {'raw_earned': new_score['score'], 'raw_possible': new_score['total']}
+        student_module.grade = new_score['score']
+        student_module.max_grade = new_score['total']
+    student_module.state = json.dumps(new_state)
+
+    event_info.update({
+        'new_score': new_score['score'],
+        'new_total': new_score['total'],
+        'correct_map': new_state['correct_map'],
+        'success': 'correct' if all(
+            lcp.correct_map.is_correct(answer_id) for answer_id in lcp.correct_map
+        ) else 'incorrect',
+        'attempts': state.get('attempts', 0),
+    })
+    return UPDATE_STATUS_SUCCEEDED, event_info, score_updated
+
+
 @outer_atomic
 def rescore_problem_module_state(xblock_instance_args, block, student_module, task_input):
     '''
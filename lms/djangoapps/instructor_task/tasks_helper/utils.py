@@ -91,6 +91,31 @@ def upload_zip_to_report_store(file, zip_name, course_id, timestamp, config_name
     return report_name
 
 
+def upload_npz_file_to_report_store(file, npz_name, course_id, timestamp, config_name='GRADES_DOWNLOAD', parent_dir=''):
+    """
+    Upload a NumPy .npz archive using ReportStore.
+
+    Arguments:
+        file: archive data in a file-like object
+        npz_name: Name of the resulting archive
+        course_id: ID of the course
+        parent_dir: Name of the directory where the archive will be stored
+
+    Returns:
+        report_name: string - Name of the generated report
+    """
+    report_store = ReportStore.from_config(config_name)
+    report_name = "{course_prefix}_{npz_name}_{timestamp_str}.npz".format(
+        course_prefix=course_filename_prefix_generator(course_id),
+        npz_name=npz_name,
+        timestamp_str=timestamp.strftime("%Y-%m-%d-%H%M")
+    )
+
+    report_store.store(course_id, report_name, file, parent_dir)
+    tracker_emit(npz_name)
+    return report_name
+
+
 def tracker_emit(report_name):
     """
     Emits a 'report.requested' event for the given report.
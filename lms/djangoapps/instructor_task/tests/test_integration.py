@@ -31,6 +31,7 @@ from lms.djangoapps.instructor_task.api import (
     submit_rescore_problem_for_student,
     submit_reset_problem_attempts_for_all_students
 )
+from lms.djangoapps.instructor_task.config.waffle import USE_BATCH_RESCORING, USE_PARTITIONED_MODULE_STATE_UPDATES
 from lms.djangoapps.instructor_task.data import InstructorTaskTypes
 from lms.djangoapps.instructor_task.models import InstructorTask
 from lms.djangoapps.instructor_task.tasks_helper.grades import CourseGradeReport
@@ -41,6 +42,7 @@ from lms.djangoapps.instructor_task.tests.test_base import (
     TestReportMixin
 )
 from openedx.core.djangoapps.util.testing import TestConditionalContent
+from openedx.core.djangoapps.waffle_utils.testutils import override_waffle_flag
 from openedx.core.lib.url_utils import quote_slashes
 from xmodule.modulestore import ModuleStoreEnum  # lint-amnesty, pylint: disable=wrong-import-order
 from xmodule.modulestore.tests.factories import BlockFactory  # lint-amnesty, pylint: disable=wrong-import-order
@@ -232,6 +234,29 @@ class TestRescoringTask(TestIntegrationTask):
             problem_edit, new_expected_scores, new_expected_max, rescore_if_higher=True,
         )
 
+    @ddt.data(
+        (RescoreTestData(edit=dict(correct_answer=OPTION_2), new_expected_scores=(0, 1, 1, 2), new_expected_max=2), False),
+        (RescoreTestData(edit=dict(num_inputs=2), new_expected_scores=(2, 1, 1, 0), new_expected_max=4), False),
+        (RescoreTestData(edit=dict(correct_answer=OPTION_2), new_expected_scores=(2, 1, 1, 2), new_expected_max=2), True),
+    )
+    @ddt.unpack
+    def test_batch_rescoring_option_problem(self, rescore_test_data, rescore_if_higher):
+        """
+        Verify that rescoring all learners in batches gives the same results
+        as rescoring them one at a time.
+        """
+        with override_waffle_flag(USE_BATCH_RESCORING, active=True), patch(
+            'lms.djangoapps.instructor_task.tasks_helper.module_state.rescore_problem_module_state',
+        ) as mock_rescore_problem_module_state:
+            self.verify_rescore_results(
+                rescore_test_data.edit,
+                rescore_test_data.new_expected_scores,
+                rescore_test_data.new_expected_max,
+                rescore_if_higher=rescore_if_higher,
+            )
+        # The learners' problems are not bound one at a time.
+        mock_rescore_problem_module_state.assert_not_called()
+
     def test_rescoring_if_higher_scores_equal(self):
         """
         Specifically tests rescore when the previous and new raw scores are equal. In this case, the scores should
@@ -486,6 +511,30 @@ class TestResetAttemptsTask(TestIntegrationTask):
         for username in self.userlist:
             assert self.get_num_attempts(username, block) == 0
 
+    @override_settings(MODULE_STATE_UPDATE_MODULES_PER_TASK=3)
+    def test_partitioned_reset_attempts_on_problem(self):
+        """Run reset-attempts scenario on option problem, in subtasks"""
+        problem_url_name = 'H1P1'
+        self.define_option_problem(problem_url_name)
+        location = InstructorTaskModuleTestCase.problem_location(problem_url_name)
+        block = self.module_store.get_item(location)
+        for username in self.userlist:
+            self.submit_student_answer(username, problem_url_name, [OPTION_1, OPTION_1])
+
+        with override_waffle_flag(USE_PARTITIONED_MODULE_STATE_UPDATES, active=True):
+            instructor_task = self.reset_problem_attempts('instructor', location)
+
+        for username in self.userlist:
+            assert self.get_num_attempts(username, block) == 0
+        instructor_task = InstructorTask.objects.get(id=instructor_task.id)
+        assert instructor_task.task_state == SUCCESS
+        assert json.loads(instructor_task.subtasks)['succeeded'] == 2
+        assert_dict_contains_subset(
+            self,
+            {'attempted': 4, 'succeeded': 4, 'failed': 0, 'total': 4},
+            json.loads(instructor_task.task_output),
+        )
+
     def test_reset_failure(self):
         """Simulate a failure in resetting attempts on a problem"""
         problem_url_name = 'H1P1'
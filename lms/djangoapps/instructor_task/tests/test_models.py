@@ -6,6 +6,7 @@ Tests for instructor_task/models.py.
 import copy
 import time
 from io import StringIO
+from tempfile import TemporaryFile
 import pytest
 from django.conf import settings
 from django.test import SimpleTestCase, TestCase, override_settings
@@ -66,6 +67,24 @@ class ReportStoreTestMixin:
 
         assert [link[0] for link in report_store.links_for(self.course_id)] == ['new_file', 'middle_file', 'old_file']
 
+    def test_store_files(self):
+        """
+        Test that text and binary files are stored as utf-8 encoded bytes.
+        """
+        report_store = self.create_report_store()  # lint-amnesty, pylint: disable=assignment-from-no-return
+        with TemporaryFile('w+', encoding='utf-8') as text_file, TemporaryFile() as binary_file:
+            text_file.write('caf\u00e9')
+            text_file.seek(0)
+            binary_file.write('caf\u00e9'.encode('utf-8'))
+            binary_file.seek(0)
+            files = {'text_file': text_file, 'binary_file': binary_file, 'string_file': StringIO('caf\u00e9')}
+            for filename, file in files.items():
+                report_store.store(self.course_id, filename, file)
+
+        for filename in files:
+            with report_store.open(self.course_id, filename) as stored_file:
+                assert stored_file.read() == 'caf\u00e9'.encode('utf-8')
+
 
 class LocalFSReportStoreTestCase(ReportStoreTestMixin, TestReportMixin, SimpleTestCase):
     """
@@ -7,6 +7,7 @@ Unit tests for LMS instructor-initiated background tasks helper functions.
 """
 
 
+import json
 import os
 import shutil
 import tempfile
@@ -14,10 +15,13 @@ from collections import OrderedDict
 from contextlib import ExitStack, contextmanager
 from datetime import datetime, timedelta
 from unittest.mock import ANY, MagicMock, Mock, patch
+from uuid import uuid4
 
 import ddt
+import numpy
 import pytest
 import unicodecsv
+from celery.states import SUCCESS
 from django.conf import settings
 from django.test.utils import override_settings
 from edx_django_utils.cache import RequestCache
@@ -37,7 +41,8 @@ from lms.djangoapps.grades.course_data import CourseData
 from lms.djangoapps.grades.models import PersistentCourseGrade, PersistentSubsectionGradeOverride
 from lms.djangoapps.grades.subsection_grade import CreateSubsectionGrade
 from lms.djangoapps.grades.transformer import GradesTransformer
-from lms.djangoapps.instructor_analytics.basic import UNAVAILABLE, list_problem_responses
+from lms.djangoapps.grades.vectorized_course_grade import VectorizedCourseGrader
+from lms.djangoapps.instructor_analytics.basic import UNAVAILABLE, get_response_state
 from lms.djangoapps.instructor_task.tasks_helper.certs import generate_students_certificates
 from lms.djangoapps.instructor_task.tasks_helper.enrollments import upload_may_enroll_csv, upload_students_csv
 from lms.djangoapps.instructor_task.tasks_helper.grades import (
@@ -54,6 +59,7 @@ from lms.djangoapps.instructor_task.tasks_helper.misc import (
     upload_ora2_submission_files,
     upload_ora2_summary
 )
+from lms.djangoapps.instructor_task.tests.factories import InstructorTaskFactory
 from lms.djangoapps.instructor_task.tests.test_base import (
     InstructorTaskCourseTestCase,
     InstructorTaskModuleTestCase,
@@ -83,6 +89,10 @@ _TEAMS_CONFIG = TeamsConfig({
     'topics': [{'id': 'topic', 'name': 'Topic', 'description': 'A Topic'}],
 })
 USE_ON_DISK_GRADE_REPORT = 'lms.djangoapps.instructor_task.tasks_helper.grades.use_on_disk_grade_reporting'
+USE_SHARDED_GRADE_REPORT = 'lms.djangoapps.instructor_task.tasks_helper.grades.use_sharded_grade_reporting'
+USE_VECTORIZED_COURSE_GRADE_REPORT = (
+    'lms.djangoapps.instructor_task.tasks_helper.grades.use_vectorized_course_grade_report'
+)
 
 
 class InstructorGradeReportTestCase(TestReportMixin, InstructorTaskCourseTestCase):
@@ -156,6 +166,37 @@ class TestInstructorGradeReport(InstructorGradeReportTestCase):
         report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
         assert any(('grade_report_err' in item[0]) for item in report_store.links_for(self.course.id))
 
+    @override_settings(COURSE_GRADE_REPORT_USERS_PER_TASK=2)
+    @patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task')
+    def test_sharded_report(self, _mock_current_task):
+        """
+        Test that a sharded grade report is generated by subtasks and
+        merged into a single report with the rows of all students.
+        """
+        usernames = [f'student{index}' for index in range(5)]
+        for username in usernames:
+            self.create_student(username, f'{username}@example.com')
+        entry = InstructorTaskFactory.create(course_id=self.course.id, task_id=str(uuid4()))
+
+        with patch(USE_ON_DISK_GRADE_REPORT, return_value=True), patch(USE_SHARDED_GRADE_REPORT, return_value=True):
+            CourseGradeReport.generate(None, entry.id, self.course.id, {}, 'graded')
+
+        entry.refresh_from_db()
+        assert entry.task_state == SUCCESS
+        assert_dict_contains_subset(
+            self,
+            {'attempted': 5, 'succeeded': 5, 'failed': 0, 'total': 5},
+            json.loads(entry.task_output),
+        )
+        assert json.loads(entry.subtasks)['succeeded'] == 3
+
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        assert len(report_store.links_for(self.course.id)) == 1
+        self.verify_rows_in_csv(
+            [{'Username': username, 'Grade': '0.0'} for username in usernames],
+            ignore_other_columns=True,
+        )
+
     def test_cohort_data_in_grading(self):
         """
         Test that cohort data is included in grades csv if cohort configuration is enabled for course.
@@ -525,10 +566,10 @@ class TestProblemResponsesReport(TestReportMixin, InstructorTaskModuleTestCase):
         assert len(student_data) == 4
 
     @patch(
-        'lms.djangoapps.instructor_task.tasks_helper.grades.list_problem_responses',
-        wraps=list_problem_responses
+        'lms.djangoapps.instructor_task.tasks_helper.grades.get_response_state',
+        wraps=get_response_state
     )
-    def test_build_student_data_for_block_without_generate_report_data(self, mock_list_problem_responses):
+    def test_build_student_data_for_block_without_generate_report_data(self, mock_get_response_state):
         """
         Ensure that building student data for a block the doesn't have the
         ``generate_report_data`` method works as expected.
@@ -554,7 +595,7 @@ class TestProblemResponsesReport(TestReportMixin, InstructorTaskModuleTestCase):
         )
         assert 'state' in student_data[0]
         assert student_data_keys_list == ['username', 'title', 'location', 'block_key', 'state']
-        mock_list_problem_responses.assert_called_with(self.course.id, ANY, ANY)
+        mock_get_response_state.assert_called_once()
 
     @patch('xmodule.capa_block.ProblemBlock.generate_report_data', create=True)
     def test_build_student_data_for_block_with_mock_generate_report_data(self, mock_generate_report_data):
@@ -745,26 +786,87 @@ class TestProblemResponsesReport(TestReportMixin, InstructorTaskModuleTestCase):
         )
         assert len(student_data) == filtered_count
 
-    @patch('lms.djangoapps.instructor_task.tasks_helper.grades.list_problem_responses')
     @patch('xmodule.capa_block.ProblemBlock.generate_report_data', create=True)
     def test_build_student_data_for_block_with_generate_report_data_not_implemented(
             self,
             mock_generate_report_data,
-            mock_list_problem_responses,
     ):
         """
         Ensure that if ``generate_report_data`` raises a NotImplementedError,
         the report falls back to the alternative method.
         """
         problem = self.define_option_problem('Problem1')
+        self.submit_student_answer(self.student.username, 'Problem1', ['Option 1'])
         mock_generate_report_data.side_effect = NotImplementedError
-        ProblemResponses._build_student_data(
+        student_data, student_data_keys_list = ProblemResponses._build_student_data(
             user_id=self.instructor.id,
             course_key=self.course.id,
             usage_key_str_list=[str(problem.location)],
         )
         mock_generate_report_data.assert_called_with(ANY, ANY)
-        mock_list_problem_responses.assert_called_with(self.course.id, ANY, ANY)
+        assert len(student_data) == 1
+        assert student_data[0]['username'] == 'student'
+        assert 'state' in student_data[0]
+        assert student_data_keys_list == ['username', 'title', 'location', 'block_key', 'state']
+
+    @override_settings(USER_STATE_BATCH_SIZE=2)
+    def test_build_student_data_in_pages(self):
+        """
+        Ensure that the responses of a block are read in pages, in order of
+        learner, and that the limit of responses applies across pages.
+        """
+        self.define_option_problem('Problem1')
+        students = [self.create_student(f'student{ctr}') for ctr in range(5)]
+        for student in reversed(students):
+            self.submit_student_answer(student.username, 'Problem1', ['Option 1'])
+
+        student_data, _ = ProblemResponses._build_student_data(
+            user_id=self.instructor.id,
+            course_key=self.course.id,
+            usage_key_str_list=[str(self.course.location)],
+        )
+        assert [data['username'] for data in student_data] == [student.username for student in students]
+        assert all(data['Answer'] == 'Option 1' for data in student_data)
+
+        with patch.dict('django.conf.settings.FEATURES', {'MAX_PROBLEM_RESPONSES_COUNT': 3}):
+            student_data, _ = ProblemResponses._build_student_data(
+                user_id=self.instructor.id,
+                course_key=self.course.id,
+                usage_key_str_list=[str(self.course.location)],
+            )
+        assert [data['username'] for data in student_data] == [student.username for student in students[:3]]
+
+    def test_generate_csv(self):
+        """
+        Ensure that the generated responses are uploaded as a CSV with the
+        columns of all responses.
+        """
+        self.define_option_problem('Problem1')
+        self.submit_student_answer(self.student.username, 'Problem1', ['Option 1'])
+        task_input = {
+            'problem_locations': str(self.course.location),
+            'user_id': self.instructor.id
+        }
+        with patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task'):
+            result = ProblemResponses.generate(None, None, self.course.id, task_input, 'calculated')
+
+        assert set(({'attempted': 1, 'succeeded': 1, 'failed': 0}).items()).issubset(set(result.items()))
+        assert self.get_csv_row_with_headers() == [
+            'username', 'title', 'location', 'Answer', 'Answer ID', 'Correct Answer', 'Question', 'block_key', 'state',
+        ]
+        self.verify_rows_in_csv(
+            [{
+                'username': 'student',
+                'title': 'Problem1',
+                'location': 'test_course > Section > Subsection > Problem1',
+                'Answer': 'Option 1',
+                'Answer ID': 'Problem1_2_1',
+                'Correct Answer': 'Option 1',
+                'Question': 'The correct answer is Option 1',
+                'block_key': 'block-v1:edx+1.23x+test_course+type@problem+block@Problem1',
+            }],
+            ignore_other_columns=True,
+        )
 
     def test_success(self):
         task_input = {
@@ -773,15 +875,12 @@ class TestProblemResponsesReport(TestReportMixin, InstructorTaskModuleTestCase):
         }
         with patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task'):
             with patch('lms.djangoapps.instructor_task.tasks_helper.grades'
-                       '.ProblemResponses._build_student_data') as mock_build_student_data:
-                mock_build_student_data.return_value = (
-                    [
-                        {'username': 'user0', 'state': 'state0'},
-                        {'username': 'user1', 'state': 'state1'},
-                        {'username': 'user2', 'state': 'state2'},
-                    ],
-                    ['username', 'state']
-                )
+                       '.ProblemResponses._iter_student_data') as mock_iter_student_data:
+                mock_iter_student_data.return_value = iter([
+                    {'username': 'user0', 'state': 'state0'},
+                    {'username': 'user1', 'state': 'state1'},
+                    {'username': 'user2', 'state': 'state2'},
+                ])
                 result = ProblemResponses.generate(
                     None, None, self.course.id, task_input, 'calculated'
                 )
@@ -812,15 +911,12 @@ class TestProblemResponsesReport(TestReportMixin, InstructorTaskModuleTestCase):
         with patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task'), \
                 freeze_time('2020-01-01'):
             with patch('lms.djangoapps.instructor_task.tasks_helper.grades'
-                       '.ProblemResponses._build_student_data') as mock_build_student_data:
-                mock_build_student_data.return_value = (
-                    [
-                        {'username': 'user0', 'state': 'state0'},
-                        {'username': 'user1', 'state': 'state1'},
-                        {'username': 'user2', 'state': 'state2'},
-                    ],
-                    ['username', 'state']
-                )
+                       '.ProblemResponses._iter_student_data') as mock_iter_student_data:
+                mock_iter_student_data.return_value = iter([
+                    {'username': 'user0', 'state': 'state0'},
+                    {'username': 'user1', 'state': 'state1'},
+                    {'username': 'user2', 'state': 'state2'},
+                ])
                 result = ProblemResponses.generate(
                     None, None, self.course.id, task_input, 'calculated'
                 )
@@ -911,6 +1007,121 @@ class TestProblemGradeReport(TestReportMixin, InstructorTaskModuleTestCase):
             )))
         ])
 
+    @patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task')
+    @patch('lms.djangoapps.instructor_task.tasks_helper.grades.use_columnar_problem_grade_report', return_value=True)
+    def test_single_problem_columnar(self, _, __):
+        vertical = BlockFactory.create(
+            parent_location=self.problem_section.location,
+            category='vertical',
+            metadata={'graded': True},
+            display_name='Problem Vertical'
+        )
+        self.define_option_problem('Problem1', parent=vertical)
+
+        self.submit_student_answer(self.student_1.username, 'Problem1', ['Option 1'])
+        result = ProblemGradeReport.generate(None, None, self.course.id, {}, 'graded')
+        assert_dict_contains_subset(
+            self,
+            {'action_name': 'graded', 'attempted': 2, 'succeeded': 2, 'failed': 0},
+            result
+        )
+        problem_name = 'Homework 1: Subsection - Problem1'
+        header_row = self.csv_header_row + [problem_name + ' (Earned)', problem_name + ' (Possible)']
+        self.verify_rows_in_csv([
+            dict(list(zip(
+                header_row,
+                [
+                    str(self.student_1.id),
+                    self.student_1.email,
+                    self.student_1.username,
+                    ENROLLED_IN_COURSE,
+                    '0.01', '1.0', '2.0',
+                ]
+            ))),
+            dict(list(zip(
+                header_row,
+                [
+                    str(self.student_2.id),
+                    self.student_2.email,
+                    self.student_2.username,
+                    ENROLLED_IN_COURSE,
+                    '0.0', 'Not Attempted', '2.0',
+                ]
+            )))
+        ])
+
+    @patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task')
+    @patch('lms.djangoapps.instructor_task.tasks_helper.grades.use_columnar_problem_grade_report', return_value=True)
+    def test_single_problem_npz(self, _, __):
+        vertical = BlockFactory.create(
+            parent_location=self.problem_section.location,
+            category='vertical',
+            metadata={'graded': True},
+            display_name='Problem Vertical'
+        )
+        problem = self.define_option_problem('Problem1', parent=vertical)
+
+        self.submit_student_answer(self.student_1.username, 'Problem1', ['Option 1'])
+        result = ProblemGradeReport.generate(None, None, self.course.id, {'report_format': 'npz'}, 'graded')
+        assert_dict_contains_subset(
+            self,
+            {'action_name': 'graded', 'attempted': 2, 'succeeded': 2, 'failed': 0},
+            result
+        )
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        report_filename = report_store.links_for(self.course.id)[0][0]
+        assert report_filename.endswith('.npz')
+        with report_store.storage.open(report_store.path_to(self.course.id, report_filename)) as npz_file:
+            with numpy.load(npz_file) as report:
+                assert report['user_id'].tolist() == [self.student_1.id, self.student_2.id]
+                assert report['grade'].tolist() == [0.01, 0.0]
+                assert report['problem_key'].tolist() == [str(problem.location)]
+                assert report['default_possible'].tolist() == [2.0]
+                assert report['cell_user'].tolist() == [0]
+                assert report['cell_problem'].tolist() == [0]
+                assert report['cell_earned'].tolist() == [1.0]
+                assert report['cell_possible'].tolist() == [2.0]
+                assert report['cell_attempted'].tolist() == [True]
+
+    @ddt.data({}, {'report_format': 'npz'})
+    @patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task')
+    @patch('lms.djangoapps.instructor_task.tasks_helper.grades.use_columnar_problem_grade_report', return_value=True)
+    def test_columnar_grading_failure(self, task_input, _, __):
+        """
+        Test that the learners whose course structure can't be computed are
+        reported in the error file of columnar reports, and the others graded.
+        """
+        self.define_option_problem('Problem1')
+        get_user_structures = VectorizedCourseGrader.get_user_structures
+
+        def fail_for_student_2(grader, users):
+            if users[0] == self.student_2:
+                raise TypeError('Cannot compute the course structure')
+            return get_user_structures(grader, users)
+
+        with patch.object(
+            VectorizedCourseGrader, 'get_user_structures', autospec=True, side_effect=fail_for_student_2,
+        ):
+            result = ProblemGradeReport.generate(None, None, self.course.id, task_input, 'graded')
+        assert_dict_contains_subset(
+            self,
+            {'action_name': 'graded', 'attempted': 2, 'succeeded': 1, 'failed': 1},
+            result
+        )
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        assert any('problem_grade_report_err' in item[0] for item in report_store.links_for(self.course.id))
+        self.verify_rows_in_csv(
+            [{
+                'Student ID': str(self.student_2.id),
+                'Email': self.student_2.email,
+                'Username': self.student_2.username,
+                'error_msg': 'Cannot compute the course structure',
+            }],
+            file_index=[
+                'problem_grade_report_err' in item[0] for item in report_store.links_for(self.course.id)
+            ].index(True),
+        )
+
     @patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task')
     @ddt.data(True, False)
     def test_single_problem_verified_student_only(self, use_tempfile, _):
@@ -1179,8 +1390,9 @@ class TestProblemReportCohortedContent(TestReportMixin, ContentGroupTestCase, In
             ] + grade
         )))
 
-    @ddt.data(True, False)
-    def test_cohort_content(self, use_tempfile):
+    @ddt.data((True, False), (False, False), (False, True))
+    @ddt.unpack
+    def test_cohort_content(self, use_tempfile, use_columnar):
         self.submit_student_answer(self.alpha_user.username, 'Problem0', ['Option 1', 'Option 1'])
         resp = self.submit_student_answer(self.alpha_user.username, 'Problem1', ['Option 1', 'Option 1'])
         assert resp.status_code == 404
@@ -1190,7 +1402,10 @@ class TestProblemReportCohortedContent(TestReportMixin, ContentGroupTestCase, In
         self.submit_student_answer(self.beta_user.username, 'Problem1', ['Option 1', 'Option 2'])
 
         with patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task'):
-            with patch(USE_ON_DISK_GRADE_REPORT, return_value=use_tempfile):
+            with patch(USE_ON_DISK_GRADE_REPORT, return_value=use_tempfile), patch(
+                'lms.djangoapps.instructor_task.tasks_helper.grades.use_columnar_problem_grade_report',
+                return_value=use_columnar,
+            ):
                 result = ProblemGradeReport.generate(None, None, self.course.id, {}, 'graded')
             assert_dict_contains_subset(
                 self,
@@ -1867,11 +2082,13 @@ class TestGradeReport(TestReportMixin, InstructorTaskModuleTestCase):
         )
         self.define_option_problem('Unreleased', parent=self.unreleased_section)
 
+    @ddt.data(False, True)
     @patch.dict(settings.FEATURES, {'DISABLE_START_DATES': False})
-    def test_grade_report(self):
+    def test_grade_report(self, use_vectorized):
         self.submit_student_answer(self.student.username, 'Problem1', ['Option 1'])
 
-        with patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task'):
+        with patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task'), \
+                patch(USE_VECTORIZED_COURSE_GRADE_REPORT, return_value=use_vectorized):
             result = CourseGradeReport.generate(None, None, self.course.id, {}, 'graded')
             assert_dict_contains_subset(
                 self,
@@ -1916,7 +2133,8 @@ class TestGradeReport(TestReportMixin, InstructorTaskModuleTestCase):
             parent_dir=directory_name
         )
 
-    def test_grade_report_with_overrides(self):
+    @ddt.data(False, True)
+    def test_grade_report_with_overrides(self, use_vectorized):
         course_data = CourseData(self.student, course=self.course)
         subsection_grade = CreateSubsectionGrade(self.unattempted_section, course_data.structure, {}, {})
         grade_model = subsection_grade.update_or_create_model(self.student, force_update_subsections=True)
@@ -1931,7 +2149,8 @@ class TestGradeReport(TestReportMixin, InstructorTaskModuleTestCase):
 
         self.submit_student_answer(self.student.username, 'Problem1', ['Option 1'])
 
-        with patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task'):
+        with patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task'), \
+                patch(USE_VECTORIZED_COURSE_GRADE_REPORT, return_value=use_vectorized):
             result = CourseGradeReport.generate(None, None, self.course.id, {}, 'graded')
             assert_dict_contains_subset(
                 self,
@@ -2473,6 +2473,40 @@ FIELD_OVERRIDE_PROVIDERS = ()
 MODULESTORE_FIELD_OVERRIDE_PROVIDERS = ('openedx.features.content_type_gating.'
                                         'field_override.ContentTypeGatingFieldOverride',)
 
+# .. setting_name: STUDENT_MODULE_WRITE_BEHIND_BLOCK_TYPES
+# .. setting_default: []
+# .. setting_description: Block types, such as 'video' or 'poll', whose user state writes in
+#   requests are coalesced: successive writes of the state of the same block for the same user
+#   are merged in the memory of the process, across requests, and saved to StudentModule with a
+#   single update once STUDENT_MODULE_WRITE_BEHIND_WINDOW has passed. Pending writes are also
+#   saved before the user's state is read or deleted in the same process, before a score is set,
+#   when STUDENT_MODULE_WRITE_BEHIND_MAX_PENDING_WRITES is exceeded, and when the process exits.
+#   The writes of each user are saved separately; writes that fail to save are logged and kept
+#   pending to be saved again, except when the process exits.
+#   Writes outside of requests, such as in celery tasks, are always saved immediately.
+# .. setting_warning: Pending writes are lost if the process is killed, and are not seen by
+#   other processes until they are saved. Only list block types whose recent state can be lost
+#   this way, and never scored block types.
+STUDENT_MODULE_WRITE_BEHIND_BLOCK_TYPES = []
+
+# .. setting_name: STUDENT_MODULE_WRITE_BEHIND_WINDOW
+# .. setting_default: 0
+# .. setting_description: Number of seconds for which the coalesced user state writes of a block
+#   (see STUDENT_MODULE_WRITE_BEHIND_BLOCK_TYPES) are kept in memory after the first of them. They
+#   are saved by the first request of the process that finishes once this time has passed, or by a
+#   timer thread of the process if no request finishes first. With the default of 0, the writes
+#   are saved as soon as a request finishes, so at most the writes of the requests in progress can
+#   be lost; larger windows coalesce more writes, at the cost of losing up to that many seconds of
+#   writes if the process is killed.
+STUDENT_MODULE_WRITE_BEHIND_WINDOW = 0
+
+# .. setting_name: STUDENT_MODULE_WRITE_BEHIND_MAX_PENDING_WRITES
+# .. setting_default: 1000
+# .. setting_description: Maximum number of blocks with pending, coalesced user state writes in a
+#   process (see STUDENT_MODULE_WRITE_BEHIND_BLOCK_TYPES). When a write would exceed it, all pending
+#   writes are saved first.
+STUDENT_MODULE_WRITE_BEHIND_MAX_PENDING_WRITES = 1000
+
 # Sets the maximum number of courses listed on the homepage
 # If set to None, all courses will be listed on the homepage
 HOMEPAGE_COURSE_MAX = None
@@ -236,6 +236,10 @@ ENTERPRISE_MARKETING_FOOTER_QUERY_PARAMS = OrderedDict([
 
 ############### Module Store Items ##########
 HOSTNAME_MODULESTORE_DEFAULT_MAPPINGS = {}
+# Threads don't see the data of the transaction of the test
+COURSE_OVERVIEW_REFRESH_MAX_WORKERS = 1
+# Rolled back test transactions don't remove the overviews that they saved from the shared cache
+COURSE_OVERVIEW_CACHE_TIMEOUT = 0
 
 ### This enables the Metrics tab for the Instructor dashboard ###########
 CLASS_DASHBOARD = True
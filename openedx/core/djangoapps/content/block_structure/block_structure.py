@@ -10,6 +10,7 @@ The following internal data structures are implemented:
 """
 
 
+from contextlib import contextmanager
 from copy import deepcopy
 from functools import partial
 from logging import getLogger
@@ -26,6 +27,10 @@ logger = getLogger(__name__)  # pylint: disable=invalid-name
 # A dictionary key value for storing a transformer's version number.
 TRANSFORMER_VERSION_KEY = '_version'
 
+# A dictionary key value for storing the xBlock fields a transformer
+# requested during its collect phase.
+REQUESTED_XBLOCK_FIELDS_KEY = '_requested_xblock_fields'
+
 
 class _BlockRelations:
     """
@@ -403,7 +408,7 @@ class BlockStructureBlockData(BlockStructure):
     # update this value whenever the data structure changes. Dependent storage
     # layers can then use this value when serializing/deserializing block
     # structures, and invalidating any previously cached/stored data.
-    VERSION = 2
+    VERSION = 3
 
     def __init__(self, root_block_usage_key):
         super().__init__(root_block_usage_key)
@@ -788,6 +793,11 @@ class BlockStructureModulestoreData(BlockStructureBlockData):
         # set(string)
         self._requested_xblock_fields = set()
 
+        # Set of xBlock field names requested since recording started,
+        # or None if not recording.
+        # set(string)
+        self._recorded_xblock_fields = None
+
     def request_xblock_fields(self, *field_names):
         """
         Records request for collecting data for the given xBlock fields.
@@ -803,6 +813,8 @@ class BlockStructureModulestoreData(BlockStructureBlockData):
                 xBlock fields whose values should be collected.
         """
         self._requested_xblock_fields.update(set(field_names))
+        if self._recorded_xblock_fields is not None:
+            self._recorded_xblock_fields.update(set(field_names))
 
     def get_xblock(self, usage_key):
         """
@@ -832,6 +844,18 @@ class BlockStructureModulestoreData(BlockStructureBlockData):
         """
         self._xblock_map[usage_key] = xblock
 
+    @contextmanager
+    def _record_requested_xblock_fields(self):
+        """
+        A context manager that yields the set of xBlock field names
+        requested within its context.
+        """
+        self._recorded_xblock_fields = set()
+        try:
+            yield self._recorded_xblock_fields
+        finally:
+            self._recorded_xblock_fields = None
+
     def _collect_requested_xblock_fields(self):
         """
         Iterates through all instantiated xBlocks that were added and
@@ -0,0 +1,437 @@
+"""
+Columnar serialization format for BlockStructure objects.
+
+Rather than pickling the raw relations and block data dicts (which
+deserialize into tens of thousands of small Python objects for a large
+course), the columnar format:
+
+    * interns every usage key into a single table, so blocks are
+      identified by their integer index within the table,
+    * stores parent/child relations as CSR-style (compressed sparse row)
+      integer arrays, and
+    * stores each collected xBlock field and each transformer block
+      field as a single dense column of values, indexed by block, and
+      pickled into its own blob.
+
+On deserialization, block relations are rebuilt eagerly (they are needed
+by every traversal) while per-block data is materialized lazily by
+ColumnarBlockDataMap, only for the blocks that are actually accessed.
+Since each column is encoded independently, unpickling the payload
+itself only copies the blobs; a column's values are decoded the first
+time any block's value for that field is read.
+"""
+import pickle
+from array import array
+from collections.abc import MutableMapping
+from copy import deepcopy
+
+from .block_structure import _BlockRelations, BlockData, TransformerData
+
+# Identifies a serialized payload as being in the columnar format.
+COLUMNAR_FORMAT = 'columnar'
+
+# Version of the columnar format.  Incrementally update this value
+# whenever the layout of the serialized payload changes.
+COLUMNAR_FORMAT_VERSION = 2
+
+# Typecode of the integer arrays used for relations.
+_INDEX_TYPECODE = 'l'
+
+
+def is_columnar(data):
+    """
+    Returns whether the given deserialized payload is in the
+    columnar format.
+    """
+    return isinstance(data, dict) and data.get('format') == COLUMNAR_FORMAT
+
+
+def serialize_to_columns(block_structure):
+    """
+    Returns a picklable columnar representation of the given
+    block structure's relations, transformer data and block data.
+
+    Arguments:
+        block_structure (BlockStructureBlockData) - The block structure
+            that is to be serialized.
+    """
+    # pylint: disable=protected-access
+    block_relations = block_structure._block_relations
+    block_data_map = block_structure._block_data_map
+
+    usage_keys = list(block_relations)
+    for usage_key in block_data_map:
+        if usage_key not in block_relations:
+            usage_keys.append(usage_key)
+    key_index = {usage_key: index for index, usage_key in enumerate(usage_keys)}
+
+    return {
+        'format': COLUMNAR_FORMAT,
+        'version': COLUMNAR_FORMAT_VERSION,
+        'usage_keys': usage_keys,
+        'num_related': len(block_relations),
+        'children': _to_csr(block_relations, key_index, 'children'),
+        'parents': _to_csr(block_relations, key_index, 'parents'),
+        'transformer_data': block_structure.transformer_data,
+        'block_data': _to_block_data_columns(usage_keys, block_data_map),
+    }
+
+
+def deserialize_from_columns(data):
+    """
+    Returns a tuple of (block_relations, transformer_data, block_data_map)
+    from the given columnar representation, as expected by
+    BlockStructureFactory.create_new.
+
+    Raises:
+        ValueError if the data is in an unsupported version of the format.
+    """
+    if data['version'] != COLUMNAR_FORMAT_VERSION:
+        raise ValueError(f"Unsupported columnar block structure version {data['version']}.")
+
+    usage_keys = data['usage_keys']
+    children_offsets, children_indices = data['children']
+    parents_offsets, parents_indices = data['parents']
+
+    block_relations = {}
+    for index in range(data['num_related']):
+        relations = _BlockRelations()
+        relations.children = [
+            usage_keys[i] for i in children_indices[children_offsets[index]:children_offsets[index + 1]]
+        ]
+        relations.parents = [
+            usage_keys[i] for i in parents_indices[parents_offsets[index]:parents_offsets[index + 1]]
+        ]
+        block_relations[usage_keys[index]] = relations
+
+    block_data_map = ColumnarBlockDataMap(usage_keys, data['block_data'])
+    return block_relations, data['transformer_data'], block_data_map
+
+
+class ColumnarBlockDataMap(MutableMapping):
+    """
+    A mapping of usage key to BlockData that is backed by columnar
+    data.  A BlockData object is only materialized from the columns the
+    first time its block is accessed, and its fields are only decoded
+    from the columns the first time they are read; mutations apply to
+    the materialized objects only, leaving the columns untouched.
+    """
+    def __init__(self, usage_keys, columns):
+        self._usage_keys = usage_keys
+        self._fields = _ColumnGroup(columns['fields'])
+        self._transformers = {
+            transformer_name: (present, _ColumnGroup(transformer_columns))
+            for transformer_name, (present, transformer_columns) in columns['transformers'].items()
+        }
+
+        # Map of usage key to the index of its block within the columns,
+        # for all blocks that have block data.
+        # dict {UsageKey: int}
+        self._index = {
+            usage_keys[index]: index
+            for index in _present_indices(columns['present'], len(usage_keys))
+        }
+
+        # Map of usage key to BlockData for all blocks that have been
+        # accessed or set.
+        # dict {UsageKey: BlockData}
+        self._materialized = {}
+
+        # Set of usage keys of columnar blocks that have been removed.
+        # set(UsageKey)
+        self._removed = set()
+
+    def __getitem__(self, usage_key):
+        try:
+            return self._materialized[usage_key]
+        except KeyError:
+            pass
+        if usage_key in self._removed:
+            raise KeyError(usage_key)
+        block_data = self._materialize(self._index[usage_key])
+        self._materialized[usage_key] = block_data
+        return block_data
+
+    def __setitem__(self, usage_key, block_data):
+        self._materialized[usage_key] = block_data
+        self._removed.discard(usage_key)
+
+    def __delitem__(self, usage_key):
+        if usage_key in self._materialized:
+            del self._materialized[usage_key]
+            if usage_key in self._index:
+                self._removed.add(usage_key)
+        elif usage_key in self._index and usage_key not in self._removed:
+            self._removed.add(usage_key)
+        else:
+            raise KeyError(usage_key)
+
+    def __contains__(self, usage_key):
+        return usage_key in self._materialized or (usage_key in self._index and usage_key not in self._removed)
+
+    def __iter__(self):
+        for usage_key in self._index:
+            if usage_key not in self._removed:
+                yield usage_key
+        for usage_key in self._materialized:
+            if usage_key not in self._index:
+                yield usage_key
+
+    def __len__(self):
+        added = sum(1 for usage_key in self._materialized if usage_key not in self._index)
+        return len(self._index) - len(self._removed) + added
+
+    def __deepcopy__(self, memo):
+        """
+        Returns a copy of this map that shares the (immutable) encoded
+        columns and the block index with this map, and deep-copies only
+        the blocks that have been materialized.
+        """
+        new_map = self.__class__.__new__(self.__class__)
+        memo[id(self)] = new_map
+        new_map._usage_keys = self._usage_keys
+        new_map._index = self._index
+        new_map._fields = deepcopy(self._fields, memo)
+        new_map._transformers = deepcopy(self._transformers, memo)
+        new_map._materialized = deepcopy(self._materialized, memo)
+        new_map._removed = set(self._removed)
+        return new_map
+
+    def _materialize(self, index):
+        """
+        Returns a new BlockData for the block at the given index, whose
+        fields are backed by the columns.
+        """
+        block_data = BlockData(self._usage_keys[index])
+        block_data.fields = _ColumnarFields(self._fields, index)
+        for transformer_name, (present, transformer_columns) in self._transformers.items():
+            if _is_present(present, index):
+                transformer_data = TransformerData()
+                transformer_data.fields = _ColumnarFields(transformer_columns, index)
+                block_data.transformer_data[transformer_name] = transformer_data
+        return block_data
+
+
+class _ColumnGroup:
+    """
+    A group of columns, each of which is kept in its encoded form until
+    a value in it is first read.
+    """
+    def __init__(self, columns):
+        # Map of field name to its column's presence bitmap and pickled
+        # list of values.
+        # dict {string: (bytes or None, bytes)}
+        self._columns = columns
+
+        # Map of field name to the decoded values of its column, for
+        # all columns that have been read.
+        # dict {string: list}
+        self._decoded = {}
+
+    def __deepcopy__(self, memo):
+        """
+        Returns a copy of this group that shares the encoded columns.
+        Decoded values are not shared since any value that has been
+        handed out is owned by the _ColumnarFields that read it.
+        """
+        new_group = _ColumnGroup(self._columns)
+        memo[id(self)] = new_group
+        return new_group
+
+    def __getstate__(self):
+        return {'_columns': self._columns, '_decoded': {}}
+
+    def has_value(self, field_name, index):
+        """
+        Returns whether the column of the given field has a value at
+        the given index.
+        """
+        column = self._columns.get(field_name)
+        return column is not None and _is_present(column[0], index)
+
+    def field_names(self, index):
+        """
+        Returns the names of the fields that have a value at the given
+        index, without decoding any columns.
+        """
+        return [
+            field_name
+            for field_name, (present, _) in self._columns.items()
+            if _is_present(present, index)
+        ]
+
+    def value(self, field_name, index):
+        """
+        Returns the value of the given field at the given index,
+        decoding the field's column if it has not been read yet.
+
+        Raises:
+            KeyError if the field has no value at the given index.
+        """
+        if not self.has_value(field_name, index):
+            raise KeyError(field_name)
+        try:
+            values = self._decoded[field_name]
+        except KeyError:
+            values = self._decoded[field_name] = pickle.loads(self._columns[field_name][1])
+        return values[index]
+
+
+class _ColumnarFields(MutableMapping):
+    """
+    The fields dict of a single block that is backed by a group of
+    columns.  Values are copied out of the columns when first read, so
+    the block owns every value it hands out; mutations apply to the
+    block only.
+    """
+    def __init__(self, column_group, index):
+        self._column_group = column_group
+        self._index = index
+
+        # Map of field name to value for all fields that have been read
+        # or set on this block.
+        # dict {string: any picklable type}
+        self._values = {}
+
+        # Set of names of columnar fields that have been removed.
+        # set(string)
+        self._removed = set()
+
+    def __getitem__(self, field_name):
+        try:
+            return self._values[field_name]
+        except KeyError:
+            pass
+        if field_name in self._removed:
+            raise KeyError(field_name)
+        value = self._values[field_name] = self._column_group.value(field_name, self._index)
+        return value
+
+    def __setitem__(self, field_name, value):
+        self._values[field_name] = value
+        self._removed.discard(field_name)
+
+    def __delitem__(self, field_name):
+        if field_name not in self:
+            raise KeyError(field_name)
+        self._values.pop(field_name, None)
+        if self._column_group.has_value(field_name, self._index):
+            self._removed.add(field_name)
+
+    def __contains__(self, field_name):
+        if field_name in self._values:
+            return True
+        return field_name not in self._removed and self._column_group.has_value(field_name, self._index)
+
+    def __iter__(self):
+        column_field_names = self._column_group.field_names(self._index)
+        for field_name in column_field_names:
+            if field_name not in self._removed:
+                yield field_name
+        for field_name in self._values:
+            if field_name not in column_field_names:
+                yield field_name
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+def _to_csr(block_relations, key_index, relation_name):
+    """
+    Returns a tuple of (offsets, indices) integer arrays representing
+    the given relation of each block in CSR form.  The related blocks of
+    the block at index i are at indices[offsets[i]:offsets[i + 1]].
+    """
+    offsets = array(_INDEX_TYPECODE, [0])
+    indices = array(_INDEX_TYPECODE)
+    for relations in block_relations.values():
+        indices.extend(key_index[usage_key] for usage_key in getattr(relations, relation_name))
+        offsets.append(len(indices))
+    return offsets, indices
+
+
+def _to_block_data_columns(usage_keys, block_data_map):
+    """
+    Returns the columns for the xBlock fields and transformer block
+    fields of all blocks in the given block_data_map.
+    """
+    num_blocks = len(usage_keys)
+    block_data_rows = [block_data_map.get(usage_key) for usage_key in usage_keys]
+
+    transformer_rows = {}
+    for index, block_data in enumerate(block_data_rows):
+        if block_data is None:
+            continue
+        for transformer_name, transformer_data in block_data.transformer_data.items():
+            rows = transformer_rows.setdefault(transformer_name, [None] * num_blocks)
+            rows[index] = transformer_data.fields
+
+    return {
+        'present': _presence_of(block_data_rows),
+        'fields': _to_columns([
+            block_data.fields if block_data is not None else None
+            for block_data in block_data_rows
+        ]),
+        'transformers': {
+            transformer_name: (_presence_of(rows), _to_columns(rows))
+            for transformer_name, rows in transformer_rows.items()
+        },
+    }
+
+
+def _to_columns(rows):
+    """
+    Returns a map of field name to a (presence, pickled values) column
+    for the given rows of field dicts, where a row of None has no
+    fields.
+    """
+    field_names = []
+    seen_field_names = set()
+    for row in rows:
+        for field_name in row or ():
+            if field_name not in seen_field_names:
+                seen_field_names.add(field_name)
+                field_names.append(field_name)
+
+    columns = {}
+    for field_name in field_names:
+        values = [None] * len(rows)
+        present = bytearray(len(rows))
+        for index, row in enumerate(rows):
+            if row is not None and field_name in row:
+                values[index] = row[field_name]
+                present[index] = 1
+        columns[field_name] = (_compact_presence(present), pickle.dumps(values, pickle.HIGHEST_PROTOCOL))
+    return columns
+
+
+def _presence_of(rows):
+    """
+    Returns the compacted presence bitmap for the given rows, where a
+    row of None is absent.
+    """
+    return _compact_presence(bytearray(0 if row is None else 1 for row in rows))
+
+
+def _compact_presence(present):
+    """
+    Returns None if every entry in the given presence bitmap is
+    present, or the bitmap as bytes otherwise.
+    """
+    return None if all(present) else bytes(present)
+
+
+def _is_present(present, index):
+    """
+    Returns whether the entry at index is set in the given presence
+    bitmap.  A bitmap of None means every entry is present.
+    """
+    return present is None or bool(present[index])
+
+
+def _present_indices(present, length):
+    """
+    Returns the indices set in the given presence bitmap.
+    """
+    return range(length) if present is None else (index for index, flag in enumerate(present) if flag)
+
@@ -9,6 +9,18 @@ from openedx.core.lib.cache_utils import request_cached
 
 from .models import BlockStructureConfiguration
 
+# .. toggle_name: block_structure.incremental_updates
+# .. toggle_implementation: WaffleSwitch
+# .. toggle_default: False
+# .. toggle_description: When enabled, a course publish updates the stored block structure by re-collecting
+#   the transformers' requested xBlock fields only for the blocks that changed since the stored version, and for
+#   the descendants of blocks whose inheritable fields changed, instead of re-collecting the whole course. Falls
+#   back to a full update whenever blocks are added, removed or moved, or when a registered transformer does not
+#   declare COLLECTED_XBLOCK_FIELDS or declares one of the changed fields.
+# .. toggle_use_cases: opt_in
+# .. toggle_creation_date: 2026-10-18
+INCREMENTAL_UPDATES = WaffleSwitch('block_structure.incremental_updates', __name__)
+
 
 @request_cached()
 def num_versions_to_keep():
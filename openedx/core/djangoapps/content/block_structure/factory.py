@@ -93,6 +93,69 @@ class BlockStructureFactory:
         """
         return block_structure_store.get(root_block_usage_key)
 
+    @classmethod
+    def create_from_collected(cls, collected_block_structure):
+        """
+        Returns a block structure with the relations and collected data
+        of the given collected block structure, to which xBlocks can be
+        added with add_xblocks_from_modulestore.
+
+        Arguments:
+            collected_block_structure (BlockStructureBlockData) - A
+                previously collected block structure. Its data is not
+                copied, so it should not be used afterwards.
+
+        Returns:
+            BlockStructureModulestoreData - The block structure, ready
+                for (re-)collection.
+        """
+        # pylint: disable=protected-access
+        block_structure = BlockStructureModulestoreData(collected_block_structure.root_block_usage_key)
+        block_structure._block_relations = collected_block_structure._block_relations
+        block_structure.transformer_data = collected_block_structure.transformer_data
+        block_structure._block_data_map = collected_block_structure._block_data_map
+        return block_structure
+
+    @classmethod
+    def add_xblocks_from_modulestore(cls, block_structure, usage_key, modulestore, include_descendants=False):
+        """
+        Adds the xBlock for the given usage_key, and optionally those of
+        its descendants, from the modulestore to the given block
+        structure. xBlocks that were already added are not reloaded.
+
+        Arguments:
+            block_structure (BlockStructureModulestoreData) - The
+                block structure to which the xBlocks are added.
+
+            usage_key (UsageKey) - The usage key of the block whose
+                xBlock is to be added.
+
+            modulestore (ModuleStoreRead) - The modulestore that
+                contains the data for the xBlocks.
+
+            include_descendants (bool) - Whether the xBlocks of all the
+                block's descendants are added as well. They are loaded
+                along with the block's xBlock.
+        """
+        # pylint: disable=protected-access
+        if usage_key in block_structure._xblock_map and not include_descendants:
+            return
+
+        xblock = modulestore.get_item(usage_key, depth=None if include_descendants else 0, lazy=False)
+
+        def add_xblock(xblock):
+            """
+            Recursively adds the given xBlock and, if requested, its
+            descendants.
+            """
+            location = xblock.location.for_branch(None)
+            block_structure._xblock_map.setdefault(location, xblock)
+            if include_descendants:
+                for child in xblock.get_children():
+                    add_xblock(child)
+
+        add_xblock(xblock)
+
     @classmethod
     def create_new(cls, root_block_usage_key, block_relations, transformer_data, block_data_map):
         """
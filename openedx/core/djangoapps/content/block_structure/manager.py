@@ -5,14 +5,20 @@ BlockStructures.
 
 
 from contextlib import contextmanager
+from logging import getLogger
 
 from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.exceptions import ItemNotFoundError
+from xmodule.modulestore.inheritance import InheritanceMixin
 
+from . import config
 from .exceptions import BlockStructureNotFound, TransformerDataIncompatible, UsageKeyNotInBlockStructure
 from .factory import BlockStructureFactory
 from .store import BlockStructureStore
 from .transformers import BlockStructureTransformers
 
+logger = getLogger(__name__)  # pylint: disable=C0103
+
 
 class BlockStructureManager:
     """
@@ -126,7 +132,8 @@ class BlockStructureManager:
         """
         with self._bulk_operations():
             if not self.store.is_up_to_date(self.root_block_usage_key, self.modulestore):
-                self._update_collected()
+                if not (config.INCREMENTAL_UPDATES.is_enabled() and self._update_collected_incrementally()):
+                    self._update_collected()
 
     def _update_collected(self):
         """
@@ -148,6 +155,86 @@ class BlockStructureManager:
             self.store.add(block_structure)
             return block_structure
 
+    def _update_collected_incrementally(self):
+        """
+        The store is updated with the requested xBlock fields re-collected
+        only for the blocks that changed since the stored version, along
+        with the descendants of blocks whose inheritable fields changed.
+
+        Returns whether the store was updated. The store is not updated
+        if the stored block structure is missing or outdated, if the
+        modulestore does not support versioned structures, if blocks
+        were added, removed or moved, or if any transformer's collected
+        data may depend on the changed fields, in which case a full
+        update is needed instead.
+        """
+        if not hasattr(self.modulestore, 'get_block_changes'):
+            return False
+
+        with self._bulk_operations():
+            try:
+                data_version = self.store.get_data_version(self.root_block_usage_key)
+                if data_version is None:
+                    return False
+                collected_block_structure = self.store.get(self.root_block_usage_key)
+                block_changes = self.modulestore.get_block_changes(
+                    self.root_block_usage_key.course_key.for_branch(ModuleStoreEnum.BranchName.published),
+                    data_version,
+                )
+            except (BlockStructureNotFound, ItemNotFoundError, NotImplementedError):
+                return False
+
+            if block_changes.removed or any(
+                changed_fields is None or 'children' in changed_fields or usage_key not in collected_block_structure
+                for usage_key, changed_fields in block_changes.changed.items()
+            ):
+                logger.info(
+                    'BlockStructure: Blocks were added, removed or moved since %s; %s needs a full update.',
+                    data_version,
+                    self.root_block_usage_key,
+                )
+                return False
+
+            changed_fields = set().union(*block_changes.changed.values())
+            outdated_transformers = BlockStructureTransformers.get_outdated_transformers(
+                collected_block_structure,
+                changed_fields,
+            )
+            if outdated_transformers:
+                logger.info(
+                    'BlockStructure: Transformers %s depend on fields changed since %s; %s needs a full update.',
+                    sorted(transformer.name() for transformer in outdated_transformers),
+                    data_version,
+                    self.root_block_usage_key,
+                )
+                return False
+
+            # Always uses published-only branch regardless of CMS or LMS context.
+            with self.modulestore.branch_setting(
+                ModuleStoreEnum.Branch.published_only,
+                self.root_block_usage_key.course_key
+            ):
+                block_structure = BlockStructureFactory.create_from_collected(collected_block_structure)
+
+                # Load the root xBlock, whose version fields change with
+                # every publish, and the changed xBlocks. The values of
+                # inheritable fields also change on all the descendants
+                # of a block, so its whole subtree is loaded.
+                inheritable_fields = set(InheritanceMixin.fields)  # pylint: disable=no-member
+                BlockStructureFactory.add_xblocks_from_modulestore(
+                    block_structure, self.root_block_usage_key, self.modulestore,
+                )
+                for usage_key, block_changed_fields in block_changes.changed.items():
+                    BlockStructureFactory.add_xblocks_from_modulestore(
+                        block_structure, usage_key, self.modulestore,
+                        include_descendants=bool(block_changed_fields & inheritable_fields),
+                    )
+
+                BlockStructureTransformers.collect_incrementally(block_structure, changed_fields)
+
+            self.store.add(block_structure)
+            return True
+
     def clear(self):
         """
         Removes data for the block structure associated with the given
@@ -7,10 +7,11 @@ Module for the Storage of BlockStructure objects.
 from logging import getLogger
 
 
-from openedx.core.lib.cache_utils import zpickle, zunpickle
+from openedx.core.lib.cache_utils import get_cross_process_cache, zpickle, zunpickle
 
 from . import config
 from .block_structure import BlockStructureBlockData
+from .columnar import deserialize_from_columns, is_columnar, serialize_to_columns
 from .exceptions import BlockStructureNotFound
 from .factory import BlockStructureFactory
 from .models import BlockStructureModel
@@ -35,6 +36,10 @@ class BlockStructureStore:
         """
         self._cache = cache
 
+        # Serialized block structures shared by all processes on the
+        # host, if enabled. Checked before the cache.
+        self._shared_cache = get_cross_process_cache('block_structures')
+
     def add(self, block_structure):
         """
         Stores and caches a compressed and pickled serialization of
@@ -93,7 +98,10 @@ class BlockStructureStore:
                 of the block structure that is to be removed.
         """
         bs_model = self._get_model(root_block_usage_key)
-        self._cache.delete(self._encode_root_cache_key(bs_model))
+        cache_key = self._encode_root_cache_key(bs_model)
+        self._cache.delete(cache_key)
+        if self._shared_cache is not None:
+            self._shared_cache.delete(cache_key)
         bs_model.delete()
         logger.info("BlockStructure: Deleted from cache and store; %s.", bs_model)
 
@@ -111,6 +119,24 @@ class BlockStructureStore:
 
         return False
 
+    def get_data_version(self, root_block_usage_key):
+        """
+        Returns the version of the data (the modulestore's course
+        version) from which the stored block structure for the given key
+        was collected, or None if it was collected with outdated
+        transformer or block structure schemas.
+
+        Raises:
+            BlockStructureNotFound if the root_block_usage_key is not
+            found.
+        """
+        version_data = self._version_data_of_model(self._get_model(root_block_usage_key))
+        current_schema_version_data = self._version_data_of_block(root_block=None)
+        for field_name in ('transformers_schema_version', 'block_structure_schema_version'):
+            if version_data[field_name] != current_schema_version_data[field_name]:
+                return None
+        return version_data['data_version']
+
     def _get_model(self, root_block_usage_key):
         """
         Returns the model associated with the given key.
@@ -133,9 +159,11 @@ class BlockStructureStore:
     def _add_to_cache(self, serialized_data, bs_model):
         """
         Adds the given serialized_data for the given BlockStructureModel
-        to the cache.
+        to the cache, and to the shared cache if enabled.
         """
         cache_key = self._encode_root_cache_key(bs_model)
+        if self._shared_cache is not None:
+            self._shared_cache.set(cache_key, serialized_data)
         total_bytes_in_one_mb = 1024 * 1024
         data_size_in_bytes = len(serialized_data)
         data_size_in_mbs = round(data_size_in_bytes / total_bytes_in_one_mb, 2)
@@ -151,16 +179,23 @@ class BlockStructureStore:
     def _get_from_cache(self, bs_model):
         """
         Returns the serialized data for the given BlockStructureModel
-        from the cache.
+        from the shared cache, if enabled, or else from the cache.
         Raises:
              BlockStructureNotFound if not found.
         """
         cache_key = self._encode_root_cache_key(bs_model)
+        if self._shared_cache is not None:
+            serialized_data = self._shared_cache.get(cache_key)
+            if serialized_data:
+                return serialized_data
+
         serialized_data = self._cache.get(cache_key)
 
         if not serialized_data:
             logger.info("BlockStructure: Not found in cache; %s.", bs_model)
             raise BlockStructureNotFound(bs_model.data_usage_key)
+        if self._shared_cache is not None:
+            self._shared_cache.set(cache_key, serialized_data)
         return serialized_data
 
     def _get_from_store(self, bs_model):
@@ -174,22 +209,26 @@ class BlockStructureStore:
 
     def _serialize(self, block_structure):
         """
-        Serializes the data for the given block_structure.
+        Serializes the data for the given block_structure, in the
+        columnar format.
         """
-        data_to_cache = (
-            block_structure._block_relations,
-            block_structure.transformer_data,
-            block_structure._block_data_map,
-        )
-        return zpickle(data_to_cache)
+        return zpickle(serialize_to_columns(block_structure))
 
     def _deserialize(self, serialized_data, root_block_usage_key):
         """
         Deserializes the given data and returns the parsed block_structure.
+
+        Both the columnar format and the legacy format of pickled
+        (block_relations, transformer_data, block_data_map) tuples are
+        supported.
         """
 
         try:
-            block_relations, transformer_data, block_data_map = zunpickle(serialized_data)
+            data = zunpickle(serialized_data)
+            if is_columnar(data):
+                block_relations, transformer_data, block_data_map = deserialize_from_columns(data)
+            else:
+                block_relations, transformer_data, block_data_map = data
         except Exception:
             # Somehow failed to de-serialized the data, assume it's corrupt.
             bs_model = self._get_model(root_block_usage_key)
@@ -0,0 +1,146 @@
+"""
+Tests for columnar.py
+"""
+# pylint: disable=protected-access
+import pickle
+from copy import deepcopy
+from unittest import TestCase
+
+import ddt
+
+from ..block_structure import BlockStructureModulestoreData
+from ..columnar import (
+    COLUMNAR_FORMAT_VERSION,
+    ColumnarBlockDataMap,
+    deserialize_from_columns,
+    is_columnar,
+    serialize_to_columns,
+)
+from ..factory import BlockStructureFactory
+from .helpers import ChildrenMapTestMixin, MockTransformer
+
+
+@ddt.ddt
+class TestColumnarSerialization(TestCase, ChildrenMapTestMixin):
+    """
+    Tests for the columnar serialization of block structures.
+    """
+    def create_collected_structure(self, children_map):
+        """
+        Returns a block structure for the given children_map with
+        sparse xBlock fields and transformer data collected.
+        """
+        block_structure = self.create_block_structure(children_map, BlockStructureModulestoreData)
+        for block_key in range(len(children_map)):
+            if block_key % 2:
+                block_structure[block_key].display_name = f'Block {block_key}'
+            block_structure[block_key].visible_to_staff_only = False
+        block_structure._add_transformer(MockTransformer)
+        block_structure.set_transformer_block_field(0, MockTransformer, 'test', 'val')
+        return block_structure
+
+    def round_trip(self, block_structure):
+        """
+        Returns the block structure after serializing to columns,
+        pickling and deserializing.
+        """
+        data = pickle.loads(pickle.dumps(serialize_to_columns(block_structure)))
+        assert is_columnar(data)
+        return BlockStructureFactory.create_new(
+            block_structure.root_block_usage_key,
+            *deserialize_from_columns(data)
+        )
+
+    @ddt.data(
+        ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP,
+        ChildrenMapTestMixin.LINEAR_CHILDREN_MAP,
+        ChildrenMapTestMixin.DAG_CHILDREN_MAP,
+    )
+    def test_round_trip(self, children_map):
+        block_structure = self.create_collected_structure(children_map)
+        new_structure = self.round_trip(block_structure)
+
+        self.assert_block_structure(new_structure, children_map)
+        for block_key in range(len(children_map)):
+            assert new_structure.get_parents(block_key) == block_structure.get_parents(block_key)
+            assert new_structure.get_children(block_key) == block_structure.get_children(block_key)
+            assert new_structure[block_key].fields == block_structure[block_key].fields
+            assert new_structure.get_xblock_field(block_key, 'display_name') == (
+                f'Block {block_key}' if block_key % 2 else None
+            )
+        assert new_structure.get_transformer_block_field(0, MockTransformer, 'test') == 'val'
+        assert new_structure.get_transformer_block_field(1, MockTransformer, 'test') is None
+        assert new_structure._get_transformer_data_version(MockTransformer) == MockTransformer.WRITE_VERSION
+
+    def test_lazy_materialization(self):
+        block_structure = self.round_trip(self.create_collected_structure(self.SIMPLE_CHILDREN_MAP))
+        block_data_map = block_structure._block_data_map
+        assert isinstance(block_data_map, ColumnarBlockDataMap)
+        assert not block_data_map._materialized
+
+        block_structure.get_xblock_field(3, 'display_name')
+        assert list(block_data_map._materialized) == [3]
+        assert len(block_data_map) == len(self.SIMPLE_CHILDREN_MAP)
+
+    def test_lazy_decoding(self):
+        block_structure = self.round_trip(self.create_collected_structure(self.SIMPLE_CHILDREN_MAP))
+        block_data_map = block_structure._block_data_map
+        assert not block_data_map._fields._decoded
+
+        assert block_structure.get_xblock_field(3, 'display_name') == 'Block 3'
+        assert block_structure.get_xblock_field(4, 'display_name') is None
+        assert list(block_data_map._fields._decoded) == ['display_name']
+        assert set(block_structure[3].fields) == {'display_name', 'visible_to_staff_only'}
+        assert list(block_data_map._fields._decoded) == ['display_name']
+
+        _, transformer_columns = block_data_map._transformers[MockTransformer.name()]
+        assert not transformer_columns._decoded
+        assert block_structure.get_transformer_block_field(0, MockTransformer, 'test') == 'val'
+        assert list(transformer_columns._decoded) == ['test']
+
+    def test_mutations(self):
+        block_structure = self.round_trip(self.create_collected_structure(self.SIMPLE_CHILDREN_MAP))
+        block_structure.override_xblock_field(1, 'display_name', 'Overridden')
+        block_structure.remove_block(2, keep_descendants=False)
+        block_structure._get_or_create_block(5)
+
+        assert block_structure.get_xblock_field(1, 'display_name') == 'Overridden'
+        assert 2 not in block_structure._block_data_map
+        assert list(block_structure._block_data_map) == [0, 1, 3, 4, 5]
+
+        copied_structure = block_structure.copy()
+        assert list(copied_structure._block_data_map) == [0, 1, 3, 4, 5]
+        assert copied_structure.get_xblock_field(1, 'display_name') == 'Overridden'
+
+    def test_re_serialize(self):
+        block_structure = self.round_trip(self.create_collected_structure(self.DAG_CHILDREN_MAP))
+        block_structure.remove_block(4, keep_descendants=False)
+        new_structure = self.round_trip(block_structure)
+        assert 4 not in new_structure
+        assert new_structure.get_children(2) == [3]
+        assert new_structure.get_xblock_field(5, 'display_name') == 'Block 5'
+
+    def test_unsupported_version(self):
+        data = serialize_to_columns(self.create_collected_structure(self.LINEAR_CHILDREN_MAP))
+        data['version'] = COLUMNAR_FORMAT_VERSION + 1
+        with self.assertRaises(ValueError):
+            deserialize_from_columns(data)
+
+    def test_detached_copy(self):
+        block_structure = self.round_trip(self.create_collected_structure(self.LINEAR_CHILDREN_MAP))
+        copied_map = deepcopy(block_structure._block_data_map)
+        copied_map[0].display_name = 'Changed'
+        assert block_structure.get_xblock_field(0, 'display_name') is None
+
+    def test_copy_shares_encoded_columns(self):
+        block_structure = self.round_trip(self.create_collected_structure(self.LINEAR_CHILDREN_MAP))
+        block_structure.override_xblock_field(1, 'display_name', ['Overridden'])
+
+        copied_structure = block_structure.copy()
+        copied_map = copied_structure._block_data_map
+        assert copied_map._fields._columns is block_structure._block_data_map._fields._columns
+        assert not copied_map._fields._decoded
+
+        copied_structure.get_xblock_field(1, 'display_name').append('Changed')
+        assert block_structure.get_xblock_field(1, 'display_name') == ['Overridden']
+        assert copied_structure.get_xblock_field(3, 'display_name') == 'Block 3'
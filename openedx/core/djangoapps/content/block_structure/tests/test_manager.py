@@ -6,10 +6,13 @@ import pytest
 import ddt
 from unittest.mock import MagicMock
 from django.test import TestCase
+from edx_toggles.toggles.testutils import override_waffle_switch
 
 from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.split_mongo import BlockChanges
 
 from ..block_structure import BlockStructureBlockData
+from ..config import INCREMENTAL_UPDATES
 from ..exceptions import UsageKeyNotInBlockStructure
 from ..manager import BlockStructureManager
 from ..transformers import BlockStructureTransformers
@@ -95,6 +98,34 @@ class TestTransformer1(MockTransformer):
         return data_key + 't1.val1.' + str(block_key)
 
 
+class TestIncrementalTransformer(MockTransformer):
+    """
+    Test Transformer class whose collected data only depends on its
+    requested fields.
+    """
+    COLLECTED_XBLOCK_FIELDS = ()
+    requested_fields = ('course_version', 'display_name', 'due')
+    collect_call_count = 0
+
+    @classmethod
+    def collect(cls, block_structure):
+        """
+        Requests xBlock fields for the block structure.
+        """
+        block_structure.request_xblock_fields(*cls.requested_fields)
+        cls.collect_call_count += 1
+
+
+class TestIncrementalTransformer2(TestIncrementalTransformer):
+    """
+    Test Transformer class whose collected data depends on the format
+    field.
+    """
+    COLLECTED_XBLOCK_FIELDS = ('format',)
+    requested_fields = ()
+    collect_call_count = 0
+
+
 @ddt.ddt
 class TestBlockStructureManager(UsageKeyFactoryMixin, ChildrenMapTestMixin, TestCase):
     """
@@ -191,6 +222,79 @@ class TestBlockStructureManager(UsageKeyFactoryMixin, ChildrenMapTestMixin, Test
 
             self.collect_and_verify(expect_modulestore_called=False, expect_cache_updated=False)
 
+    @override_waffle_switch(INCREMENTAL_UPDATES, True)
+    def test_update_collected_incrementally(self):
+        TestIncrementalTransformer.collect_call_count = 0
+        TestIncrementalTransformer2.collect_call_count = 0
+        registered_transformers = [TestIncrementalTransformer(), TestIncrementalTransformer2()]
+        root_xblock = self.modulestore.get_item(self.block_key_factory(0))
+        changed_key = self.block_key_factory(3)
+        changed_xblock = self.modulestore.get_item(changed_key)
+        self.modulestore.get_block_changes = MagicMock()
+
+        def update_collected(version, block_changes):
+            """
+            Updates the collected data for the given course version and
+            changes since the previous version.
+            """
+            root_xblock.field_map['course_version'] = version
+            self.modulestore.get_block_changes.return_value = block_changes
+            self.modulestore.get_items_call_count = 0
+            self.bs_manager.update_collected_if_needed()
+            return self.bs_manager.get_collected()
+
+        def get_collect_call_counts():
+            return [TestIncrementalTransformer.collect_call_count, TestIncrementalTransformer2.collect_call_count]
+
+        with mock_registered_transformers(registered_transformers):
+            changed_xblock.field_map['display_name'] = 'Old Name'
+            update_collected('v1', None)
+            assert get_collect_call_counts() == [1, 1]
+            self.modulestore.get_block_changes.assert_not_called()
+
+            # Only a requested field changed: its values are updated
+            # for the root and the changed block only.
+            changed_xblock.field_map['display_name'] = 'New Name'
+            block_structure = update_collected('v2', BlockChanges({changed_key: {'display_name'}}, set()))
+            assert self.modulestore.get_block_changes.call_args[0][1] == 'v1'
+            assert get_collect_call_counts() == [1, 1]
+            assert block_structure.get_xblock_field(changed_key, 'display_name') == 'New Name'
+            assert block_structure.get_xblock_field(self.block_key_factory(0), 'course_version') == 'v2'
+
+            # An inheritable field changed on a parent: its values are
+            # updated for all its descendants.
+            parent_key = self.block_key_factory(1)
+            for block_id in (1, 3, 4):
+                self.modulestore.get_item(self.block_key_factory(block_id)).field_map['due'] = 'tomorrow'
+            block_structure = update_collected('v3', BlockChanges({parent_key: {'due'}}, set()))
+            assert get_collect_call_counts() == [1, 1]
+            for block_id in (1, 3, 4):
+                assert block_structure.get_xblock_field(self.block_key_factory(block_id), 'due') == 'tomorrow'
+            assert block_structure.get_xblock_field(self.block_key_factory(2), 'due') is None
+
+            # A field a transformer's collect method reads changed: the
+            # data is fully re-collected.
+            update_collected('v4', BlockChanges({changed_key: {'format'}}, set()))
+            assert get_collect_call_counts() == [2, 2]
+
+            # A block was added: the data is fully re-collected.
+            update_collected('v5', BlockChanges({changed_key: None}, set()))
+            assert get_collect_call_counts() == [3, 3]
+
+    @override_waffle_switch(INCREMENTAL_UPDATES, True)
+    def test_update_collected_incrementally_undeclared_transformer(self):
+        root_xblock = self.modulestore.get_item(self.block_key_factory(0))
+        self.modulestore.get_block_changes = MagicMock(
+            return_value=BlockChanges({self.block_key_factory(3): {'display_name'}}, set())
+        )
+        with mock_registered_transformers(self.registered_transformers):
+            root_xblock.field_map['course_version'] = 'v1'
+            self.bs_manager.update_collected_if_needed()
+            root_xblock.field_map['course_version'] = 'v2'
+            self.bs_manager.update_collected_if_needed()
+        self.modulestore.get_block_changes.assert_called_once()
+        assert TestTransformer1.collect_call_count == 2
+
     def test_get_collected_transformer_version(self):
         self.collect_and_verify(expect_modulestore_called=True, expect_cache_updated=True)
 
@@ -4,8 +4,13 @@ Tests for block_structure/cache.py
 
 import pytest
 import ddt
+from django.test.utils import override_settings
 
 from openedx.core.djangolib.testing.utils import CacheIsolationTestCase
+from openedx.core.lib.cache_utils import zpickle, zunpickle
+from openedx.core.lib.tempdir import mkdtemp_clean
+
+from ..columnar import ColumnarBlockDataMap, is_columnar
 
 from ..config.models import BlockStructureConfiguration
 from ..exceptions import BlockStructureNotFound
@@ -66,6 +71,44 @@ class TestBlockStructureStore(UsageKeyFactoryMixin, ChildrenMapTestMixin, CacheI
         stored_value = self.store.get(self.block_structure.root_block_usage_key)
         self.assert_block_structure(stored_value, self.children_map)
 
+    def test_cross_process_cache(self):
+        with override_settings(CROSS_PROCESS_CACHE_DIR=mkdtemp_clean()):
+            BlockStructureStore(self.mock_cache).add(self.block_structure)
+            self.mock_cache.map.clear()
+
+            # a store in another process finds the structure in the shared cache
+            stored_value = BlockStructureStore(self.mock_cache).get(self.block_structure.root_block_usage_key)
+            self.assert_block_structure(stored_value, self.children_map)
+            assert not self.mock_cache.map
+
+            BlockStructureStore(self.mock_cache).delete(self.block_structure.root_block_usage_key)
+            with pytest.raises(BlockStructureNotFound):
+                BlockStructureStore(self.mock_cache).get(self.block_structure.root_block_usage_key)
+
+    def test_serialized_as_columns(self):
+        serialized_data = self.store._serialize(self.block_structure)  # pylint: disable=protected-access
+        assert is_columnar(zunpickle(serialized_data))
+
+        stored_value = self.store._deserialize(  # pylint: disable=protected-access
+            serialized_data, self.block_structure.root_block_usage_key,
+        )
+        assert isinstance(stored_value._block_data_map, ColumnarBlockDataMap)  # pylint: disable=protected-access
+        self.assert_block_structure(stored_value, self.children_map)
+        assert stored_value.get_transformer_block_field(
+            self.block_key_factory(0), MockTransformer, 'test',
+        ) == f'{MockTransformer.name()} val'
+
+    def test_deserialize_legacy_format(self):
+        serialized_data = zpickle((
+            self.block_structure._block_relations,  # pylint: disable=protected-access
+            self.block_structure.transformer_data,
+            self.block_structure._block_data_map,  # pylint: disable=protected-access
+        ))
+        stored_value = self.store._deserialize(  # pylint: disable=protected-access
+            serialized_data, self.block_structure.root_block_usage_key,
+        )
+        self.assert_block_structure(stored_value, self.children_map)
+
     @ddt.data(1, 5, None)
     def test_cache_timeout(self, timeout):
         if timeout is not None:
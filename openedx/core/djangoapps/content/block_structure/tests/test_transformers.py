@@ -4,14 +4,16 @@ Tests for transformers.py
 from unittest import TestCase
 from unittest.mock import MagicMock, patch
 
+import ddt
 import pytest
 
-from ..block_structure import BlockStructureModulestoreData
+from ..block_structure import REQUESTED_XBLOCK_FIELDS_KEY, BlockStructureModulestoreData
 from ..exceptions import TransformerDataIncompatible, TransformerException
 from ..transformers import BlockStructureTransformers
 from .helpers import ChildrenMapTestMixin, MockFilteringTransformer, MockTransformer, mock_registered_transformers
 
 
+@ddt.ddt
 class TestBlockStructureTransformers(ChildrenMapTestMixin, TestCase):
     """
     Test class for testing BlockStructureTransformers
@@ -75,3 +77,47 @@ class TestBlockStructureTransformers(ChildrenMapTestMixin, TestCase):
                 self.transformers.verify_versions(block_structure)
             self.transformers.collect(block_structure)
             assert self.transformers.verify_versions(block_structure)
+
+    def test_collect_records_requested_fields(self):
+        block_structure = self.create_block_structure(self.SIMPLE_CHILDREN_MAP, BlockStructureModulestoreData)
+        with mock_registered_transformers([RequestingTransformer]):
+            self.transformers.collect(block_structure)
+        assert block_structure.get_transformer_data(
+            RequestingTransformer, REQUESTED_XBLOCK_FIELDS_KEY,
+        ) == {'due'}
+
+    @ddt.data(
+        ({'display_name'}, ['MockTransformer']),
+        ({'due'}, ['MockTransformer']),
+        ({'start'}, ['MockTransformer', 'RequestingTransformer']),
+    )
+    @ddt.unpack
+    def test_get_outdated_transformers(self, changed_fields, expected_outdated):
+        block_structure = self.create_block_structure(self.SIMPLE_CHILDREN_MAP, BlockStructureModulestoreData)
+        with mock_registered_transformers([RequestingTransformer, MockTransformer]):
+            self.transformers.collect(block_structure)
+            outdated = BlockStructureTransformers.get_outdated_transformers(block_structure, changed_fields)
+        assert sorted(transformer.name() for transformer in outdated) == expected_outdated
+
+    def test_collect_incrementally(self):
+        block_structure = self.create_block_structure(self.SIMPLE_CHILDREN_MAP, BlockStructureModulestoreData)
+        with mock_registered_transformers([RequestingTransformer]):
+            self.transformers.collect(block_structure)
+            block_structure._requested_xblock_fields = set()  # pylint: disable=protected-access
+            BlockStructureTransformers.collect_incrementally(block_structure, {'due'})
+            assert block_structure._requested_xblock_fields == {'due'}  # pylint: disable=protected-access
+
+            with pytest.raises(TransformerException):
+                BlockStructureTransformers.collect_incrementally(block_structure, {'start'})
+
+
+class RequestingTransformer(MockTransformer):
+    """
+    Mock transformer that requests an xBlock field and declares the
+    fields its collect method depends on.
+    """
+    COLLECTED_XBLOCK_FIELDS = ('start',)
+
+    @classmethod
+    def collect(cls, block_structure):
+        block_structure.request_xblock_fields('due')
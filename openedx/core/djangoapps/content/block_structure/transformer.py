@@ -58,6 +58,20 @@ class BlockStructureTransformer:
     WRITE_VERSION = 0
     READ_VERSION = 0
 
+    # The names of the xBlock fields whose values the transformer's
+    # collect method reads to compute its collected data, as opposed to
+    # only requesting them through request_xblock_fields.
+    #
+    # By setting this attribute, a transformer declares that its
+    # collected data, other than the values of its requested fields,
+    # depends only on the block structure's relations and on these
+    # fields.  When a course is updated incrementally, only the values
+    # of the requested fields are re-collected, so an incremental update
+    # is possible only if none of these fields changed.  The default of
+    # None means the dependencies are unknown, and the course is always
+    # fully re-collected.
+    COLLECTED_XBLOCK_FIELDS = None
+
     @classmethod
     def name(cls):
         """
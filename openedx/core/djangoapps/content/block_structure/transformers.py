@@ -3,6 +3,7 @@ Module for a collection of BlockStructureTransformers.
 """
 from logging import getLogger
 
+from .block_structure import REQUESTED_XBLOCK_FIELDS_KEY
 from .exceptions import TransformerDataIncompatible, TransformerException
 from .transformer import FilteringTransformerMixin, combine_filters
 from .transformer_registry import TransformerRegistry
@@ -74,12 +75,99 @@ class BlockStructureTransformers:
         Collects data for each registered transformer.
         """
         for transformer in TransformerRegistry.get_registered_transformers():
-            block_structure._add_transformer(transformer)  # pylint: disable=protected-access
-            transformer.collect(block_structure)
+            cls._collect_transformer(block_structure, transformer)
 
         # Collect all fields that were requested by the transformers.
         block_structure._collect_requested_xblock_fields()  # pylint: disable=protected-access
 
+    @classmethod
+    def get_outdated_transformers(cls, block_structure, changed_fields):
+        """
+        Returns the registered transformers whose collected data in the
+        given block structure may depend on the given changed xBlock
+        fields, other than through the values of their requested fields.
+
+        Transformers that do not declare COLLECTED_XBLOCK_FIELDS, or
+        whose requested fields were not recorded, are always outdated.
+
+        Arguments:
+            block_structure (BlockStructureBlockData) - A block
+                structure with previously collected data.
+
+            changed_fields (set(string)) - The names of the xBlock
+                fields that changed.
+
+        Returns:
+            [BlockStructureTransformer] - The outdated transformers.
+        """
+        return [
+            transformer
+            for transformer in TransformerRegistry.get_registered_transformers()
+            if (
+                transformer.COLLECTED_XBLOCK_FIELDS is None or
+                block_structure.get_transformer_data(transformer, REQUESTED_XBLOCK_FIELDS_KEY) is None or
+                changed_fields & set(transformer.COLLECTED_XBLOCK_FIELDS)
+            )
+        ]
+
+    @classmethod
+    def collect_incrementally(cls, block_structure, changed_fields):
+        """
+        Updates the data in the given previously collected block
+        structure, for a change to the given xBlock fields that does not
+        alter the structure's blocks or relations.
+
+        The transformers are not re-collected. Instead, the fields they
+        requested are re-collected for the xBlocks that were added to
+        the block structure, which should include those of the changed
+        blocks and of all the descendants of blocks whose inheritable
+        fields changed.
+
+        Arguments:
+            block_structure (BlockStructureModulestoreData) - A block
+                structure with previously collected data.
+
+            changed_fields (set(string)) - The names of the xBlock
+                fields that changed.
+
+        Raises:
+            TransformerException - If a transformer's collected data
+                may depend on the changed fields, in which case the
+                block structure needs to be fully re-collected.
+        """
+        outdated_transformers = cls.get_outdated_transformers(block_structure, changed_fields)
+        if outdated_transformers:
+            raise TransformerException(
+                'Transformers {} need to be re-collected for changes to {}.'.format(
+                    sorted(transformer.name() for transformer in outdated_transformers),
+                    sorted(changed_fields),
+                )
+            )
+
+        for transformer in TransformerRegistry.get_registered_transformers():
+            block_structure.request_xblock_fields(
+                *block_structure.get_transformer_data(transformer, REQUESTED_XBLOCK_FIELDS_KEY)
+            )
+
+        block_structure._collect_requested_xblock_fields()  # pylint: disable=protected-access
+
+        logger.info(
+            'BlockStructure: Incrementally collected %s; changed fields: %s.',
+            block_structure.root_block_usage_key,
+            sorted(changed_fields),
+        )
+
+    @classmethod
+    def _collect_transformer(cls, block_structure, transformer):
+        """
+        Collects data for the given transformer, storing the names of
+        the xBlock fields it requested along with its data.
+        """
+        block_structure._add_transformer(transformer)  # pylint: disable=protected-access
+        with block_structure._record_requested_xblock_fields() as requested_fields:  # pylint: disable=protected-access
+            transformer.collect(block_structure)
+        block_structure.set_transformer_data(transformer, REQUESTED_XBLOCK_FIELDS_KEY, requested_fields)
+
     @classmethod
     def verify_versions(cls, block_structure):
         """
@@ -65,12 +65,15 @@ class TestGenerateCourseOverview(ModuleStoreTestCase):
     def test_generate_force_update(self):
         self.command.handle(all_courses=True)
 
-        # update each course
+        # update each course, and then mark course_key_2's overview as built from its updated version
         updated_course_name = 'test_generate_course_overview.course_edit'
         for course_key in (self.course_key_1, self.course_key_2):
             course = self.store.get_course(course_key)
             course.display_name = updated_course_name
             self.store.update_item(course, self.user.id)
+        CourseOverview.objects.filter(id=self.course_key_2).update(
+            course_version=str(self.store.get_course(self.course_key_2).course_version)
+        )
 
         # force_update course_key_1, but not course_key_2
         self.command.handle(str(self.course_key_1), all_courses=False, force_update=True)
@@ -79,6 +82,19 @@ class TestGenerateCourseOverview(ModuleStoreTestCase):
         assert CourseOverview.get_from_id(self.course_key_1).display_name == updated_course_name
         assert CourseOverview.get_from_id(self.course_key_2).display_name != updated_course_name
 
+    def test_generate_changed_courses(self):
+        self.command.handle(all_courses=True)
+
+        course = self.store.get_course(self.course_key_1)
+        course.display_name = 'test_generate_course_overview.course_edit'
+        self.store.update_item(course, self.user.id)
+
+        # Without force_update, only the overviews of changed courses are updated
+        with patch.object(CourseOverview, '_create_or_update', wraps=CourseOverview._create_or_update) as mock_update:
+            self.command.handle(all_courses=True)
+        assert [call.args[0].id for call in mock_update.call_args_list] == [self.course_key_1]
+        assert CourseOverview.get_from_id(self.course_key_1).display_name == course.display_name
+
     def test_invalid_key(self):
         """
         Test that CommandError is raised for invalid key.
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.20 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('course_overviews', '0029_alter_historicalcourseoverview_options'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='courseoverview',
+            name='course_version',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name='historicalcourseoverview',
+            name='course_version',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+    ]
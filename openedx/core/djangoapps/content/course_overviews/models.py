@@ -5,6 +5,7 @@ Declaration of CourseOverview model
 
 import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from urllib.parse import urlparse, urlunparse
 from zoneinfo import ZoneInfo
@@ -12,16 +13,19 @@ from zoneinfo import ZoneInfo
 from ccx_keys.locator import CCXLocator
 from config_models.models import ConfigurationModel
 from django.conf import settings
-from django.db import models, transaction
-from django.db.models import Q
+from django.core.cache import cache
+from django.db import connections, models, transaction
+from django.db.models import Q, prefetch_related_objects
 from django.db.models.signals import post_save, post_delete
 from django.db.utils import IntegrityError
 from django.template import defaultfilters
+from django.utils import timezone
 
 from django.utils.functional import cached_property
 from model_utils.models import TimeStampedModel
 from opaque_keys.edx.django.models import CourseKeyField, UsageKeyField
 from simple_history.models import HistoricalRecords
+from simple_history.utils import bulk_create_with_history, bulk_update_with_history
 
 from lms.djangoapps.courseware.model_data import FieldDataCache
 from openedx.core.djangoapps.catalog.models import CatalogIntegration
@@ -64,10 +68,15 @@ class CourseOverview(TimeStampedModel):
         app_label = 'course_overviews'
 
     # IMPORTANT: Bump this whenever you modify this model and/or add a migration.
-    VERSION = 19
+    VERSION = 20
+
+    # Number of courses whose overviews bulk_load_from_module_store writes at once.
+    REFRESH_BATCH_SIZE = 50
 
     # Cache entry versioning.
     version = models.IntegerField()
+    # Version of the published course that the entry was built from, if the modulestore versions courses.
+    course_version = models.CharField(max_length=255, null=True, blank=True)
 
     # Course identification
     id = CourseKeyField(db_index=True, primary_key=True, max_length=255)
@@ -154,7 +163,7 @@ class CourseOverview(TimeStampedModel):
     history = HistoricalRecords()
 
     @classmethod
-    def _create_or_update(cls, course):  # lint-amnesty, pylint: disable=too-many-statements
+    def _create_or_update(cls, course, course_overview=None):  # lint-amnesty, pylint: disable=too-many-statements
         """
         Creates or updates a CourseOverview object from a CourseBlock.
 
@@ -163,6 +172,8 @@ class CourseOverview(TimeStampedModel):
 
         Arguments:
             course (CourseBlock): any course block object
+            course_overview (CourseOverview): the overview to update, if the
+                caller already has it; otherwise the overview is looked up
 
         Returns:
             CourseOverview: created or updated overview extracted from the given course
@@ -192,20 +203,22 @@ class CourseOverview(TimeStampedModel):
             end = ccx.due
             max_student_enrollments_allowed = ccx.max_student_enrollments_allowed
 
-        course_overview = cls.objects.filter(id=course.id)
-        if course_overview.exists():
-            log.info('Updating course overview for %s.', str(course.id))
-            course_overview = course_overview.first()
-            # MySQL ignores casing, but CourseKey doesn't. To prevent multiple
-            # courses with different cased keys from overriding each other, we'll
-            # check for equality here in python.
-            if course_overview.id != course.id:
-                raise CourseOverviewCaseMismatchException(course_overview.id, course.id)
-        else:
-            log.info('Creating course overview for %s.', str(course.id))
-            course_overview = cls()
+        if course_overview is None:
+            course_overview = cls.objects.filter(id=course.id)
+            if course_overview.exists():
+                log.info('Updating course overview for %s.', str(course.id))
+                course_overview = course_overview.first()
+                # MySQL ignores casing, but CourseKey doesn't. To prevent multiple
+                # courses with different cased keys from overriding each other, we'll
+                # check for equality here in python.
+                if course_overview.id != course.id:
+                    raise CourseOverviewCaseMismatchException(course_overview.id, course.id)
+            else:
+                log.info('Creating course overview for %s.', str(course.id))
+                course_overview = cls()
 
         course_overview.version = cls.VERSION
+        course_overview.course_version = cls._get_course_version(course)
         course_overview.id = course.id
         course_overview._location = course.location  # lint-amnesty, pylint: disable=protected-access
         course_overview.org = course.location.org
@@ -320,18 +333,7 @@ class CourseOverview(TimeStampedModel):
                         course_overview.save()
                         # Remove and recreate all the course tabs
                         CourseOverviewTab.objects.filter(course_overview=course_overview).delete()
-                        CourseOverviewTab.objects.bulk_create([
-                            CourseOverviewTab(
-                                tab_id=tab.tab_id,
-                                type=tab.type,
-                                name=tab.name,
-                                course_staff_only=tab.course_staff_only,
-                                url_slug=tab.get('url_slug'),
-                                link=tab.get('link'),
-                                is_hidden=tab.get('is_hidden', False),
-                                course_overview=course_overview)
-                            for tab in course.tabs
-                        ])
+                        CourseOverviewTab.objects.bulk_create(cls._get_course_tabs(course_overview, course))
                         # Remove and recreate course images
                         CourseOverviewImageSet.objects.filter(course_overview=course_overview).delete()
                         CourseOverviewImageSet.create(course_overview, course)
@@ -373,6 +375,227 @@ class CourseOverview(TimeStampedModel):
                 )
                 raise cls.DoesNotExist()
 
+    @classmethod
+    def bulk_load_from_module_store(cls, course_keys, force_update=False, max_workers=None):
+        """
+        Load the given courses from the modulestore, and create or update their
+        CourseOverviews, tabs and images in bulk.
+
+        Courses are loaded, and their overviews computed, by up to max_workers
+        threads at once, and the overviews are written REFRESH_BATCH_SIZE at a
+        time. Unless force_update is True, the overviews of courses that are
+        unchanged since they were built, by this VERSION of the model, are left
+        as they are. Errors with individual courses are logged, not raised.
+
+        Arguments:
+            course_keys (list[CourseKey]): the courses to load.
+            force_update (bool): whether to update unchanged courses too.
+            max_workers (int): the maximum number of courses to load at once.
+                Defaults to the COURSE_OVERVIEW_REFRESH_MAX_WORKERS setting.
+
+        Returns: dict[CourseKey, CourseOverview] of the created or updated overviews.
+        """
+        if max_workers is None:
+            max_workers = settings.COURSE_OVERVIEW_REFRESH_MAX_WORKERS
+        course_keys = list(course_keys)
+
+        updated_overviews = {}
+        executor = ThreadPoolExecutor(max_workers=max_workers) if max_workers > 1 else None
+        try:
+            for index in range(0, len(course_keys), cls.REFRESH_BATCH_SIZE):
+                batch = course_keys[index:index + cls.REFRESH_BATCH_SIZE]
+                overviews = {overview.id: overview for overview in cls.objects.filter(id__in=batch)}
+                structures = cls._prefetch_course_structures(batch)
+                # The version of a course is the id of its structure.
+                course_versions = {course_key: str(structure['_id']) for course_key, structure in structures.items()}
+                if executor:
+                    # Worker threads have database connections of their own, which they close when done.
+                    results = executor.map(
+                        lambda course_key: cls._build_for_refresh(
+                            course_key, overviews.get(course_key), force_update,
+                            course_version=course_versions.get(course_key), close_connections=True,
+                        ),
+                        batch,
+                    )
+                else:
+                    results = (
+                        cls._build_for_refresh(
+                            course_key, overviews.get(course_key), force_update,
+                            course_version=course_versions.get(course_key),
+                        )
+                        for course_key in batch
+                    )
+                updated_overviews.update(cls._bulk_save([result for result in results if result is not None]))
+        finally:
+            if executor:
+                executor.shutdown()
+
+        return updated_overviews
+
+    @staticmethod
+    def _prefetch_course_structures(course_keys):
+        """
+        Fetch the structures of the given courses from the modulestore in bulk,
+        which primes the structure cache for loading the courses one at a time.
+        """
+        try:
+            return modulestore().get_course_structures(course_keys)
+        except Exception:  # pylint: disable=broad-except
+            log.exception('Could not fetch the structures of %d courses in bulk.', len(course_keys))
+            return {}
+
+    @classmethod
+    def _build_for_refresh(
+        cls, course_key, course_overview, force_update, course_version=None, close_connections=False,
+    ):
+        """
+        Load the given course, and return its updated overview, tabs and image
+        set, without saving them, for bulk_load_from_module_store.
+
+        If the version of the course in the modulestore is given, the course
+        isn't loaded when its overview is already up to date with it.
+
+        Returns None if the course doesn't need to be or can't be updated.
+        """
+        try:
+            if not force_update and course_version is not None and cls._is_up_to_date(course_overview, course_version):
+                log.info('Course overview for %s is up to date.', str(course_key))
+                return None
+
+            store = modulestore()
+            with store.bulk_operations(course_key):
+                course = store.get_course(course_key)
+                if not isinstance(course, CourseBlock):
+                    log.info("Could not create CourseOverview for missing or broken course: %s", course_key)
+                    raise cls.DoesNotExist()
+
+                if not force_update and cls._is_up_to_date(course_overview, cls._get_course_version(course)):
+                    log.info('Course overview for %s is up to date.', str(course_key))
+                    return None
+
+                if course_overview is None:
+                    log.info('Creating course overview for %s.', str(course_key))
+                    course_overview = cls()
+                else:
+                    log.info('Updating course overview for %s.', str(course_key))
+                course_overview = cls._create_or_update(course, course_overview)
+                return (
+                    course_overview,
+                    cls._get_course_tabs(course_overview, course),
+                    CourseOverviewImageSet.build(course_overview, course),
+                )
+        except Exception as ex:  # pylint: disable=broad-except
+            log.exception(
+                'An error occurred while generating course overview for %s: %s',
+                str(course_key),
+                str(ex),
+            )
+            return None
+        finally:
+            if close_connections:
+                connections.close_all()
+
+    @classmethod
+    def _bulk_save(cls, results):
+        """
+        Save the overviews, tabs and image sets built by _build_for_refresh in
+        bulk, and return the saved overviews by course key.
+        """
+        if not results:
+            return {}
+
+        course_overviews = [course_overview for course_overview, _, _ in results]
+        created = [course_overview for course_overview in course_overviews if course_overview._state.adding]
+        updated = [course_overview for course_overview in course_overviews if not course_overview._state.adding]
+        now = timezone.now()
+        for course_overview in updated:
+            course_overview.modified = now
+        course_ids = [course_overview.id for course_overview in course_overviews]
+
+        try:
+            with transaction.atomic():
+                bulk_create_with_history(created, cls)
+                bulk_update_with_history(
+                    updated,
+                    cls,
+                    fields=[
+                        field.name for field in cls._meta.concrete_fields
+                        if not field.primary_key and field.name != 'created'
+                    ],
+                )
+                # Remove and recreate all the course tabs and images
+                CourseOverviewTab.objects.filter(course_overview_id__in=course_ids).delete()
+                CourseOverviewTab.objects.bulk_create([tab for _, tabs, _ in results for tab in tabs])
+                CourseOverviewImageSet.objects.filter(course_overview_id__in=course_ids).delete()
+                image_sets = CourseOverviewImageSet.objects.bulk_create(
+                    [image_set for _, _, image_set in results if image_set is not None]
+                )
+                for image_set in image_sets:
+                    image_set.course_overview.image_set = image_set
+
+                # Bulk writes don't send the signals that saving each overview would.
+                for course_overview in course_overviews:
+                    post_save.send(
+                        sender=cls,
+                        instance=course_overview,
+                        created=course_overview in created,
+                        update_fields=None,
+                        raw=False,
+                        using=course_overview._state.db,
+                    )
+        except IntegrityError:
+            # Another process created some of these overviews at the same time,
+            # so save the overviews of these courses one at a time instead.
+            log.info(
+                "CourseOverviews of %d courses were created concurrently; saving them one at a time.", len(results),
+            )
+            course_overviews = []
+            for course_id in course_ids:
+                try:
+                    course_overviews.append(cls.load_from_module_store(course_id))
+                except Exception:  # pylint: disable=broad-except
+                    pass  # load_from_module_store logs its errors.
+
+        return {course_overview.id: course_overview for course_overview in course_overviews}
+
+    @classmethod
+    def _is_up_to_date(cls, course_overview, course_version):
+        """
+        Return whether the given overview was built, by this VERSION of the
+        model, from the given version of its course.
+        """
+        return (
+            course_overview is not None and
+            course_overview.version >= cls.VERSION and course_overview.course_version == course_version
+        )
+
+    @staticmethod
+    def _get_course_version(course):
+        """
+        Return the version of the given course in the modulestore, as a
+        string, or None if the modulestore doesn't version courses.
+        """
+        course_version = getattr(course, 'course_version', None)
+        return str(course_version) if course_version is not None else None
+
+    @staticmethod
+    def _get_course_tabs(course_overview, course):
+        """
+        Return the unsaved CourseOverviewTabs of the given course.
+        """
+        return [
+            CourseOverviewTab(
+                tab_id=tab.tab_id,
+                type=tab.type,
+                name=tab.name,
+                course_staff_only=tab.course_staff_only,
+                url_slug=tab.get('url_slug'),
+                link=tab.get('link'),
+                is_hidden=tab.get('is_hidden', False),
+                course_overview=course_overview)
+            for tab in course.tabs
+        ]
+
     @classmethod
     def course_exists(cls, course_id):
         """
@@ -436,31 +659,111 @@ class CourseOverview(TimeStampedModel):
         """
         Return a dict mapping course_ids to CourseOverviews.
 
-        Tries to select all CourseOverviews in one query,
-        then fetches remaining (uncached) overviews from the modulestore.
+        Looks the CourseOverviews up in the request cache, then in the shared
+        cache, then selects the remaining ones, with their tabs and images, in
+        one query, and finally fetches the rest from the modulestore.
 
-        Course IDs for non-existant courses will map to None.
+        Course IDs for non-existant courses will map to None. That they don't
+        exist is cached too, until an overview of the course is saved.
 
         Arguments:
             course_ids (iterable[CourseKey])
 
         Returns: dict[CourseKey, CourseOverview|None]
         """
-        overviews = {
+        course_ids = list(course_ids)
+        overviews = {}
+
+        request_cache = RequestCache('course_overview')
+        for course_id in course_ids:
+            cached_response = request_cache.get_cached_response(cls._get_cache_key(course_id))
+            if cached_response.is_found:
+                overviews[course_id] = cached_response.value
+
+        shared_cache_timeout = settings.COURSE_OVERVIEW_CACHE_TIMEOUT
+        if shared_cache_timeout:
+            cache_keys = {
+                cls._get_cache_key(course_id): course_id for course_id in course_ids if course_id not in overviews
+            }
+            for cache_key, row in cache.get_many(list(cache_keys)).items():
+                overview = cls._from_cache_row(row)
+                overviews[cache_keys[cache_key]] = overview
+                request_cache.set(cache_key, overview)
+
+        uncached_course_ids = [course_id for course_id in course_ids if course_id not in overviews]
+        if not uncached_course_ids:
+            return overviews
+
+        overviews.update({
             overview.id: overview
-            for overview in cls.objects.select_related('image_set').filter(
-                id__in=course_ids,
+            for overview in cls.objects.select_related('image_set').prefetch_related('tab_set').filter(
+                id__in=uncached_course_ids,
                 version__gte=cls.VERSION
             )
-        }
-        for course_id in course_ids:
+        })
+        loaded_overviews = []
+        for course_id in uncached_course_ids:
             if course_id not in overviews:
                 try:
                     overviews[course_id] = cls.load_from_module_store(course_id)
+                    loaded_overviews.append(overviews[course_id])
                 except CourseOverview.DoesNotExist:
                     overviews[course_id] = None
+        prefetch_related_objects(loaded_overviews, 'tab_set')
+
+        rows = {}
+        for course_id in uncached_course_ids:
+            cache_key = cls._get_cache_key(course_id)
+            request_cache.set(cache_key, overviews[course_id])
+            rows[cache_key] = cls._to_cache_row(overviews[course_id])
+        if shared_cache_timeout:
+            cache.set_many(rows, shared_cache_timeout)
         return overviews
 
+    @classmethod
+    def _get_cache_key(cls, course_id):
+        """
+        Return the key of the given course's overview in the caches of get_from_ids.
+        """
+        return f'course_overviews.overview.v{cls.VERSION}.{course_id}'
+
+    @classmethod
+    def _to_cache_row(cls, overview):
+        """
+        Serialize the given overview, with its tabs and image set, for the
+        shared cache of get_from_ids. None is serialized as is.
+        """
+        if overview is None:
+            return None
+        image_set = getattr(overview, 'image_set', None)
+        return {
+            'overview': _model_field_values(overview),
+            'tabs': [_model_field_values(tab) for tab in overview.tab_set.all()],
+            'image_set': _model_field_values(image_set) if image_set else None,
+        }
+
+    @classmethod
+    def _from_cache_row(cls, row):
+        """
+        Return the overview serialized by _to_cache_row, with its tabs and
+        image set prefetched.
+        """
+        if row is None:
+            return None
+        overview = _model_from_field_values(cls, row['overview'])
+        tabs = overview.tab_set.all()
+        tabs._result_cache = [  # pylint: disable=protected-access
+            _model_from_field_values(CourseOverviewTab, tab) for tab in row['tabs']
+        ]
+        tabs._prefetch_done = True  # pylint: disable=protected-access
+        overview._prefetched_objects_cache = {'tab_set': tabs}  # pylint: disable=protected-access
+        if row['image_set']:
+            overview.image_set = _model_from_field_values(CourseOverviewImageSet, row['image_set'])
+        else:
+            # Remember that there is no image set, rather than query for it.
+            cls._meta.get_field('image_set').set_cached_value(overview, None)
+        return overview
+
     @classmethod
     def _get_course_has_highlights(cls, course):
         # Avoid circular import here
@@ -647,6 +950,10 @@ class CourseOverview(TimeStampedModel):
         A side-effecting method that updates CourseOverview objects for
         the given course_keys.
 
+        Overviews are only updated if they are missing, were built by an
+        older VERSION of this model, or were built from an older version of
+        their course, unless force_update is True.
+
         Arguments:
             course_keys (list[CourseKey]): Identifies for which courses to
                 return CourseOverview objects.
@@ -657,19 +964,9 @@ class CourseOverview(TimeStampedModel):
         log.info('Generating course overview for %d courses.', len(course_keys))
         log.debug('Generating course overview(s) for the following courses: %s', course_keys)
 
-        action = CourseOverview.load_from_module_store if force_update else CourseOverview.get_from_id
-
-        for course_key in course_keys:
-            try:
-                action(course_key)
-            except Exception as ex:  # pylint: disable=broad-except
-                log.exception(
-                    'An error occurred while generating course overview for %s: %s',
-                    str(course_key),
-                    str(ex),
-                )
+        updated_overviews = CourseOverview.bulk_load_from_module_store(course_keys, force_update=force_update)
 
-        log.info('Finished generating course overviews.')
+        log.info('Finished generating course overviews; %d were created or updated.', len(updated_overviews))
 
     @classmethod
     def get_all_courses(cls, orgs=None, filter_=None, active_only=False, course_keys=None):
@@ -770,7 +1067,7 @@ class CourseOverview(TimeStampedModel):
         """
         Returns an iterator of CourseTabs.
         """
-        for tab_dict in self.tab_set.all().values():
+        for tab_dict in map(_model_field_values, self.tab_set.all()):
             tab = CourseTab.from_json(tab_dict)
             if tab is None:
                 log.warning("Can't instantiate CourseTab from %r", tab_dict)
@@ -1091,11 +1388,8 @@ class CourseOverviewImageSet(TimeStampedModel):
 
         This will save the CourseOverviewImageSet before it returns.
         """
-        from openedx.core.lib.courses import create_course_image_thumbnail
-
         # If image thumbnails are not enabled, do nothing.
-        config = CourseOverviewImageConfig.current()
-        if not config.enabled:
+        if not CourseOverviewImageConfig.current().enabled:
             return
 
         # If a course object was provided, use that. Otherwise, pull it from
@@ -1105,24 +1399,7 @@ class CourseOverviewImageSet(TimeStampedModel):
         if not course:
             course = modulestore().get_course(course_overview.id)
 
-        image_set = cls(course_overview=course_overview)
-
-        if course.course_image:
-            # Try to create a thumbnails of the course image. If this fails for any
-            # reason (weird format, non-standard URL, etc.), the URLs will default
-            # to being blank. No matter what happens, we don't want to bubble up
-            # a 500 -- an image_set is always optional.
-            try:
-                image_set.small_url = create_course_image_thumbnail(course, config.small)
-                image_set.large_url = create_course_image_thumbnail(course, config.large)
-            except Exception:  # pylint: disable=broad-except
-                log.exception(
-                    "Could not create thumbnail for course %s with image %s (small=%s), (large=%s)",
-                    course.id,
-                    course.course_image,
-                    config.small,
-                    config.large
-                )
+        image_set = cls.build(course_overview, course)
 
         # Regardless of whether we created thumbnails or not, we need to save
         # this record before returning. If no thumbnails were created (there was
@@ -1145,6 +1422,39 @@ class CourseOverviewImageSet(TimeStampedModel):
             #          to unsaved related object 'course_overview'.")
             pass
 
+    @classmethod
+    def build(cls, course_overview, course):
+        """
+        Create thumbnail images for this CourseOverview, and return their
+        unsaved CourseOverviewImageSet, or None if thumbnails aren't enabled.
+        """
+        from openedx.core.lib.courses import create_course_image_thumbnail
+
+        config = CourseOverviewImageConfig.current()
+        if not config.enabled:
+            return None
+
+        image_set = cls(course_overview=course_overview)
+
+        if course.course_image:
+            # Try to create a thumbnails of the course image. If this fails for any
+            # reason (weird format, non-standard URL, etc.), the URLs will default
+            # to being blank. No matter what happens, we don't want to bubble up
+            # a 500 -- an image_set is always optional.
+            try:
+                image_set.small_url = create_course_image_thumbnail(course, config.small)
+                image_set.large_url = create_course_image_thumbnail(course, config.large)
+            except Exception:  # pylint: disable=broad-except
+                log.exception(
+                    "Could not create thumbnail for course %s with image %s (small=%s), (large=%s)",
+                    course.id,
+                    course.course_image,
+                    config.small,
+                    config.large
+                )
+
+        return image_set
+
     def __str__(self):
         return "CourseOverviewImageSet({}, small_url={}, large_url={})".format(
             self.course_overview_id, self.small_url, self.large_url
@@ -1208,6 +1518,22 @@ class SimulateCoursePublishConfig(ConfigurationModel):
         return str(self.arguments)
 
 
+def _model_field_values(instance):
+    """
+    Return the values of the concrete fields of the given model instance, as
+    QuerySet.values() would.
+    """
+    return {field.attname: getattr(instance, field.attname) for field in instance._meta.concrete_fields}
+
+
+def _model_from_field_values(model, values):
+    """
+    Return the instance of the given model with the given field values, as
+    if it was loaded from the database.
+    """
+    return model.from_db(None, list(values), list(values.values()))
+
+
 def _invalidate_overview_cache(**kwargs):  # pylint: disable=unused-argument
     """
     Invalidate the course overview request cache.
@@ -1215,7 +1541,23 @@ def _invalidate_overview_cache(**kwargs):  # pylint: disable=unused-argument
     RequestCache('course_overview').clear()
 
 
+def _invalidate_shared_overview_cache(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Invalidate the entry of the shared cache of CourseOverview.get_from_ids
+    of the course whose overview or image set changed, now and once the
+    transaction that changed it, and which may still change its tabs, commits.
+    """
+    course_id = instance.id if sender is CourseOverview else instance.course_overview_id
+    cache_key = CourseOverview._get_cache_key(course_id)  # pylint: disable=protected-access
+    cache.delete(cache_key)
+    transaction.on_commit(lambda: cache.delete(cache_key))
+
+
 post_save.connect(_invalidate_overview_cache, sender=CourseOverview)
 post_save.connect(_invalidate_overview_cache, sender=CourseOverviewImageConfig)
 post_delete.connect(_invalidate_overview_cache, sender=CourseOverview)
 post_delete.connect(_invalidate_overview_cache, sender=CourseOverviewImageConfig)
+post_save.connect(_invalidate_shared_overview_cache, sender=CourseOverview)
+post_save.connect(_invalidate_shared_overview_cache, sender=CourseOverviewImageSet)
+post_delete.connect(_invalidate_shared_overview_cache, sender=CourseOverview)
+post_delete.connect(_invalidate_shared_overview_cache, sender=CourseOverviewImageSet)
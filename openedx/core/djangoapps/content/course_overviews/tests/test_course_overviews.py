@@ -25,6 +25,7 @@ from openedx.core.djangoapps.catalog.tests.mixins import CatalogIntegrationMixin
 from openedx.core.djangoapps.dark_lang.models import DarkLangConfig
 from openedx.core.djangoapps.models.course_details import CourseDetails
 from openedx.core.djangolib.testing.utils import CacheIsolationTestCase
+from openedx.core.lib.cache_utils import RequestCache
 from openedx.core.lib.courses import course_image_url
 from common.djangoapps.static_replace.models import AssetBaseUrlConfig
 from xmodule.assetstore.assetmgr import AssetManager  # lint-amnesty, pylint: disable=wrong-import-order
@@ -499,11 +500,66 @@ class CourseOverviewTestCase(CatalogIntegrationMixin, ModuleStoreTestCase, Cache
     def test_update_select_courses(self):
         course_ids = [CourseFactory.create().id for __ in range(3)]
         select_course_ids = course_ids[:len(course_ids) - 1]  # all items except the last
-        with mock.patch(
-            'openedx.core.djangoapps.content.course_overviews.models.CourseOverview.get_from_id'
-        ) as mock_get_from_id:
-            CourseOverview.update_select_courses(select_course_ids)
-            assert mock_get_from_id.call_count == len(select_course_ids)
+        CourseOverview.update_select_courses(select_course_ids)
+        assert set(CourseOverview.objects.values_list('id', flat=True)) == set(select_course_ids)
+
+    def test_bulk_load_from_module_store(self):
+        course_ids = [CourseFactory.create().id for __ in range(3)]
+        with mock.patch.object(CourseOverview, 'REFRESH_BATCH_SIZE', 2):
+            overviews = CourseOverview.bulk_load_from_module_store(course_ids)
+        assert set(overviews) == set(course_ids)
+        for course_id in course_ids:
+            course_overview = CourseOverview.objects.get(id=course_id)
+            assert course_overview.version == CourseOverview.VERSION
+            assert course_overview.course_version == str(modulestore().get_course(course_id).course_version)
+            assert {tab.tab_id for tab in course_overview.tab_set.all()} == {
+                tab.tab_id for tab in modulestore().get_course(course_id).tabs
+            }
+            assert course_overview.history.count() == 1
+
+    def test_bulk_load_from_module_store_fetches_structures_in_bulk(self):
+        course_ids = [CourseFactory.create().id for __ in range(3)]
+        store = modulestore()
+        with mock.patch.object(CourseOverview, 'REFRESH_BATCH_SIZE', 2):
+            with mock.patch.object(store, 'get_course_structures', wraps=store.get_course_structures) as mock_fetch:
+                CourseOverview.bulk_load_from_module_store(course_ids)
+        assert mock_fetch.call_args_list == [mock.call(course_ids[:2]), mock.call(course_ids[2:])]
+        assert set(store.get_course_structures(course_ids)) == set(course_ids)
+
+    def test_bulk_load_from_module_store_skips_unchanged_courses(self):
+        course = CourseFactory.create()
+        unchanged_course = CourseFactory.create()
+        CourseOverview.bulk_load_from_module_store([course.id, unchanged_course.id])
+
+        course.display_name = 'Updated display name'
+        self.store.update_item(course, ModuleStoreEnum.UserID.test)
+        overviews = CourseOverview.bulk_load_from_module_store([course.id, unchanged_course.id])
+        assert set(overviews) == {course.id}
+        assert CourseOverview.objects.get(id=course.id).display_name == 'Updated display name'
+
+        overviews = CourseOverview.bulk_load_from_module_store([course.id, unchanged_course.id], force_update=True)
+        assert set(overviews) == {course.id, unchanged_course.id}
+
+    def test_bulk_load_from_module_store_skips_unchanged_courses_without_loading_them(self):
+        course = CourseFactory.create()
+        unchanged_course = CourseFactory.create()
+        CourseOverview.bulk_load_from_module_store([course.id, unchanged_course.id])
+
+        course.display_name = 'Updated display name'
+        self.store.update_item(course, ModuleStoreEnum.UserID.test)
+        store = modulestore()
+        with mock.patch.object(store, 'get_course', wraps=store.get_course) as mock_get_course:
+            overviews = CourseOverview.bulk_load_from_module_store([course.id, unchanged_course.id])
+        assert set(overviews) == {course.id}
+        assert unchanged_course.id not in [call.args[0] for call in mock_get_course.call_args_list]
+
+    def test_bulk_load_from_module_store_skips_broken_courses(self):
+        course = CourseFactory.create()
+        missing_course_id = CourseKey.from_string('course-v1:Missing+Course+Run')
+        with mock.patch('openedx.core.djangoapps.content.course_overviews.models.log') as mock_log:
+            overviews = CourseOverview.bulk_load_from_module_store([missing_course_id, course.id])
+        assert set(overviews) == {course.id}
+        mock_log.info.assert_any_call("Could not create CourseOverview for missing or broken course: %s", missing_course_id)
 
     def test_get_all_courses(self):
         course_ids = [CourseFactory.create(emit_signals=True).id for __ in range(3)]
@@ -624,6 +680,77 @@ class CourseOverviewTestCase(CatalogIntegrationMixin, ModuleStoreTestCase, Cache
         assert CourseOverview.objects.filter(id=course_key).exists()
 
 
+@override_settings(COURSE_OVERVIEW_CACHE_TIMEOUT=300)
+class CourseOverviewGetFromIdsCacheTestCase(ModuleStoreTestCase, CacheIsolationTestCase):
+    """
+    Tests for the caches of CourseOverview.get_from_ids.
+    """
+    ENABLED_CACHES = ['default']
+    ENABLED_SIGNALS = ['course_published']
+
+    def setUp(self):
+        super().setUp()
+        self.course = CourseFactory.create(emit_signals=True)
+        self.missing_course_key = CourseKey.from_string('course-v1:Missing+Course+Run')
+        self.course_ids = [self.course.id, self.missing_course_key]
+
+    def _assert_overviews(self, overviews):
+        """
+        Asserts that the given overviews are the expected ones, and that their
+        tabs and image sets can be read without queries.
+        """
+        assert set(overviews) == set(self.course_ids)
+        assert overviews[self.missing_course_key] is None
+        with self.assertNumQueries(0):
+            assert overviews[self.course.id].display_name == self.course.display_name
+            assert {tab.tab_id for tab in overviews[self.course.id].tabs} == {tab.tab_id for tab in self.course.tabs}
+            assert not hasattr(overviews[self.course.id], 'image_set')
+
+    def test_request_cache(self):
+        self._assert_overviews(CourseOverview.get_from_ids(self.course_ids))
+        with self.assertNumQueries(0):
+            overviews = CourseOverview.get_from_ids(self.course_ids)
+        self._assert_overviews(overviews)
+
+    def test_shared_cache(self):
+        CourseOverview.get_from_ids(self.course_ids)
+        RequestCache.clear_all_namespaces()
+        with mock.patch.object(CourseOverview, 'load_from_module_store') as mock_load_from_module_store:
+            with self.assertNumQueries(0):
+                overviews = CourseOverview.get_from_ids(self.course_ids)
+        assert not mock_load_from_module_store.called
+        self._assert_overviews(overviews)
+
+    def test_shared_cache_disabled(self):
+        CourseOverview.get_from_ids(self.course_ids)
+        RequestCache.clear_all_namespaces()
+        with override_settings(COURSE_OVERVIEW_CACHE_TIMEOUT=0):
+            with mock.patch.object(
+                CourseOverview, 'load_from_module_store', wraps=CourseOverview.load_from_module_store,
+            ) as mock_load_from_module_store:
+                CourseOverview.get_from_ids(self.course_ids)
+        mock_load_from_module_store.assert_called_once_with(self.missing_course_key)
+
+    def test_invalidated_on_save(self):
+        CourseOverview.get_from_ids(self.course_ids)
+        course_overview = CourseOverview.objects.get(id=self.course.id)
+        course_overview.display_name = 'Updated display name'
+        course_overview.save()
+        RequestCache.clear_all_namespaces()
+        assert CourseOverview.get_from_ids(self.course_ids)[self.course.id].display_name == 'Updated display name'
+
+    def test_missing_course_created(self):
+        CourseOverview.get_from_ids(self.course_ids)
+        course = CourseFactory.create(
+            org=self.missing_course_key.org,
+            number=self.missing_course_key.course,
+            run=self.missing_course_key.run,
+            emit_signals=True,
+        )
+        RequestCache.clear_all_namespaces()
+        assert CourseOverview.get_from_ids(self.course_ids)[self.missing_course_key].id == course.id
+
+
 @ddt.ddt
 class CourseOverviewImageSetTestCase(ModuleStoreTestCase):
     """
@@ -1,12 +1,26 @@
 """
 Helper functions for caching course assets.
 """
+import logging
+import os
+import re
+import threading
+from collections import Counter
+from functools import lru_cache
+from time import time
+
+from django.conf import settings
 from django.core.cache import caches
 from django.core.cache.backends.base import InvalidCacheBackendError
+from django.dispatch import receiver
+from django.test.signals import setting_changed
+from edx_django_utils.monitoring import accumulate, set_custom_attribute
 from opaque_keys import InvalidKeyError
 
 from xmodule.contentstore.content import STATIC_CONTENT_VERSION
 
+log = logging.getLogger(__name__)
+
 # See if there's a "course_assets" cache configured, and if not, fallback to the default cache.
 CONTENT_CACHE = caches['default']
 try:
@@ -48,3 +62,276 @@ def del_cached_content(location):
         pass
 
     CONTENT_CACHE.delete_many(locations, version=STATIC_CONTENT_VERSION)
+
+
+class AssetDiskCache:
+    """
+    A size-bounded cache of the data of course assets in files on local disk.
+
+    Files are named by the digests of the assets' content, so that an asset
+    that changes is cached anew, and identical assets of several courses share
+    a file.  Only assets between `min_asset_size` and `max_asset_size` bytes
+    are cached; smaller ones are held by the Django cache of course assets.
+    When the files hold more than `max_size` bytes, the least recently used
+    ones are removed until they hold at most nine tenths of it.
+
+    On a miss, the asset is served from the contentstore while a background
+    thread fills the cache.  Only one fill of an asset runs at a time across
+    the processes sharing the cache directory, and at most
+    `max_concurrent_fills` fills run at a time in each process.
+
+    The hits and misses of the cache are counted for each course.
+    """
+    DIGEST_PATTERN = re.compile(r'[0-9a-fA-F]+')
+    # Seconds after which the lock of a fill is considered abandoned, e.g. by a killed process.
+    FILL_LOCK_TIMEOUT = 15 * 60
+
+    def __init__(
+        self, location, max_size=10 * 1024 ** 3, min_asset_size=1024 ** 2, max_asset_size=None,
+        max_concurrent_fills=4,
+    ):
+        self.location = location
+        self.max_size = max_size
+        self.min_asset_size = min_asset_size
+        self.max_asset_size = max_size if max_asset_size is None else min(max_asset_size, max_size)
+        self.max_concurrent_fills = max_concurrent_fills
+        self.hits = Counter()
+        self.misses = Counter()
+        self._fills = {}
+        self._fills_lock = threading.Lock()
+        os.makedirs(location, exist_ok=True)
+
+    def hit_rate(self, course_key):
+        """
+        Returns the fraction of the lookups of the assets of the given course
+        that were hits, or None if there were no lookups.
+        """
+        lookups = self.hits[str(course_key)] + self.misses[str(course_key)]
+        return self.hits[str(course_key)] / lookups if lookups else None
+
+    def is_cacheable(self, content):
+        """
+        Returns whether the data of the given content can be cached.
+        """
+        digest = getattr(content, 'content_digest', None)
+        return (
+            digest is not None and
+            self.DIGEST_PATTERN.fullmatch(digest) is not None and
+            content.length is not None and
+            self.min_asset_size <= content.length <= self.max_asset_size
+        )
+
+    def open(self, content, load_content):
+        """
+        Returns a binary file of the data of the given cacheable content, or
+        None on a miss.
+
+        On a miss, the cache is filled in the background from the content
+        returned by `load_content`, which must return a new stream of the
+        content, so that the caller can serve the given content meanwhile.
+        """
+        course_key = str(content.location.course_key)
+        path = os.path.join(self.location, content.content_digest)
+        try:
+            asset_file = open(path, 'rb')  # pylint: disable=consider-using-with
+        except FileNotFoundError:
+            self._record_lookup(course_key, hit=False)
+            self._start_fill(content, path, load_content)
+            return None
+
+        # Mark the file as recently used, so that it is culled last.
+        os.utime(asset_file.fileno())
+        self._record_lookup(course_key, hit=True)
+        return asset_file
+
+    def wait_for_fills(self, timeout=None):
+        """
+        Waits for the fills in progress in this process to finish.
+        """
+        with self._fills_lock:
+            fills = list(self._fills.values())
+        for fill in fills:
+            fill.join(timeout)
+
+    def _record_lookup(self, course_key, hit):
+        """
+        Counts a lookup of an asset of the given course.
+        """
+        set_custom_attribute('contentserver.disk_cache.hit', hit)
+        if hit:
+            self.hits[course_key] += 1
+            # .. custom_attribute_name: contentserver.disk_cache.hits
+            # .. custom_attribute_description: Number of assets served from the on-disk asset
+            #   cache. Along with the course_id attribute, gives the hit rate of each course.
+            accumulate('contentserver.disk_cache.hits', 1)
+        else:
+            self.misses[course_key] += 1
+            # .. custom_attribute_name: contentserver.disk_cache.misses
+            # .. custom_attribute_description: Number of assets that were served from the
+            #   contentstore while the on-disk asset cache was filled with them.
+            accumulate('contentserver.disk_cache.misses', 1)
+        # .. custom_attribute_name: contentserver.disk_cache.course_hit_rate
+        # .. custom_attribute_description: Fraction of the lookups of the assets of the
+        #   request's course (see the course_id attribute) in the on-disk asset cache of
+        #   the process that were hits, since the process started.
+        set_custom_attribute('contentserver.disk_cache.course_hit_rate', self.hit_rate(course_key))
+
+    def _start_fill(self, content, path, load_content):
+        """
+        Starts filling the file at `path` with the data of the content in a
+        background thread, unless it is already being filled or too many
+        fills are running in this process.
+        """
+        digest = content.content_digest
+        with self._fills_lock:
+            if digest in self._fills or len(self._fills) >= self.max_concurrent_fills:
+                return
+            if not self._acquire_fill_lock(path):
+                # Another process is filling it.
+                return
+            fill = self._fills[digest] = threading.Thread(
+                target=self._fill, args=(content.location, content.length, digest, path, load_content), daemon=True,
+            )
+        fill.start()
+
+    def _acquire_fill_lock(self, path):
+        """
+        Creates the lock file of the fill of the file at `path`, and returns
+        whether it was created, i.e. whether no other fill of it is running.
+        """
+        lock_path = f'{path}.lock'
+        for __ in range(2):
+            try:
+                os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return True
+            except FileExistsError:
+                try:
+                    if time() - os.stat(lock_path).st_mtime < self.FILL_LOCK_TIMEOUT:
+                        return False
+                    os.remove(lock_path)
+                except FileNotFoundError:
+                    pass
+        return False
+
+    def _fill(self, location, length, digest, path, load_content):
+        """
+        Writes the data of the content loaded by `load_content` to the file at `path`.
+        """
+        temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            content = load_content()
+            try:
+                with open(temp_path, 'wb') as asset_file:
+                    for chunk in content.stream_data():
+                        asset_file.write(chunk)
+                    written = asset_file.tell()
+            finally:
+                content.close()
+            if written != length:
+                raise OSError(f'Read {written} of the {length} bytes of the asset')
+            # Replace the file atomically, so that concurrent readers never see a partial file.
+            os.replace(temp_path, path)
+            self._cull(keep_path=path)
+        except Exception:  # pylint: disable=broad-except
+            log.exception("Could not cache asset %s in %s", location, self.location)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            try:
+                os.remove(f'{path}.lock')
+            except FileNotFoundError:
+                pass
+            with self._fills_lock:
+                self._fills.pop(digest, None)
+
+    def _cull(self, keep_path):
+        """
+        Removes the least recently used files, other than the one at
+        `keep_path`, if the cache is too large.
+        """
+        with os.scandir(self.location) as dir_entries:
+            entries = []
+            for entry in dir_entries:
+                if self.DIGEST_PATTERN.fullmatch(entry.name):
+                    entries.append(entry)
+                elif entry.name.endswith('.tmp') and time() - entry.stat().st_mtime > self.FILL_LOCK_TIMEOUT:
+                    # Left behind by a fill that was killed.
+                    try:
+                        os.remove(entry.path)
+                    except FileNotFoundError:
+                        pass
+        stats = {entry.path: entry.stat() for entry in entries}
+        size = sum(stat.st_size for stat in stats.values())
+        if size <= self.max_size:
+            return
+        for path in sorted(stats, key=lambda path: stats[path].st_mtime):
+            if size <= self.max_size * 0.9:
+                break
+            if path == keep_path:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            size -= stats[path].st_size
+
+
+class AssetFileRange:
+    """
+    A file-like object of a range of the bytes of a binary file, to stream as
+    a FileResponse.
+
+    It exposes the descriptor of the file, positioned at the start of the range,
+    so that WSGI servers that send files with sendfile can do so without copying
+    the data, up to the response's Content-Length.  Other servers read it.
+    """
+
+    def __init__(self, asset_file, first, length):
+        asset_file.seek(first)
+        self._file = asset_file
+        self._remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self._remaining:
+            size = self._remaining
+        data = self._file.read(size)
+        self._remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self._file.fileno()
+
+    def close(self):
+        self._file.close()
+
+
+@lru_cache(maxsize=1)
+def get_asset_disk_cache():
+    """
+    Returns the on-disk asset cache configured by the ``COURSE_ASSETS_DISK_CACHE``
+    setting, or None if it is not configured.
+    """
+    # .. setting_name: COURSE_ASSETS_DISK_CACHE
+    # .. setting_default: None
+    # .. setting_description: Configures a cache of the data of course assets in files on the
+    #   local disk of each contentserver, from which assets are streamed without being read
+    #   into memory. The value is a dict of the 'location' directory of the files, their
+    #   'max_size' in bytes, the 'min_asset_size' and 'max_asset_size' in bytes of the
+    #   assets to cache, and the 'max_concurrent_fills' of the cache in each process. Assets
+    #   that miss are served from the contentstore while the cache is filled in the
+    #   background. For example: ``{'location': '/tmp/course_assets', 'max_size': 10 * 1024 ** 3}``.
+    # .. setting_warning: The location should be on a local disk with at least 'max_size'
+    #   bytes free.
+    config = getattr(settings, 'COURSE_ASSETS_DISK_CACHE', None)
+    if not config:
+        return None
+    return AssetDiskCache(**config)
+
+
+@receiver(setting_changed)
+def reset_asset_disk_cache(sender, setting, **kwargs):  # pylint: disable=unused-argument
+    """
+    Reset the on-disk asset cache when its setting changes during unit tests.
+    """
+    if setting == 'COURSE_ASSETS_DISK_CACHE':
+        get_asset_disk_cache.cache_clear()
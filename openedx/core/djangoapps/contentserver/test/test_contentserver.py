@@ -6,6 +6,8 @@ Tests for content server.
 import copy
 import datetime
 import logging
+import os
+import tempfile
 import unittest
 from unittest.mock import patch
 from uuid import uuid4
@@ -28,6 +30,7 @@ from xmodule.modulestore.tests.django_utils import TEST_DATA_SPLIT_MODULESTORE,
 from xmodule.modulestore.xml_importer import import_course_from_xml
 
 from .. import views
+from ..caching import get_asset_disk_cache
 
 log = logging.getLogger(__name__)
 
@@ -367,6 +370,81 @@ class ContentStoreToyCourseTest(SharedModuleStoreTestCase):
             first=(self.length_unlocked), last=(self.length_unlocked)))
         assert resp.status_code == 416
 
+    def _save_large_asset(self, name):
+        """
+        Saves an unlocked asset that is too large for the Django cache of course assets.
+        """
+        asset_key = self.course_key.make_asset_key('asset', name)
+        data = (name.encode('utf-8') * 1024 ** 2)[:2 * 1024 ** 2]
+        self.contentstore.save(StaticContent(asset_key, name, 'application/octet-stream', data))
+        return '/' + str(asset_key), data
+
+    def test_disk_cache(self):
+        """
+        Test that large assets are served from the contentstore while they are
+        cached on disk, then streamed from it, in full or in ranges.
+        """
+        url, data = self._save_large_asset('large_static.bin')
+        with tempfile.TemporaryDirectory() as cache_dir:
+            with override_settings(COURSE_ASSETS_DISK_CACHE={'location': cache_dir}):
+                resp = self.client.get(url)
+                assert resp.status_code == 200
+                assert resp['Content-Length'] == str(len(data))
+                assert b''.join(resp.streaming_content) == data
+                get_asset_disk_cache().wait_for_fills()
+                assert len(os.listdir(cache_dir)) == 1
+
+                resp = self.client.get(url, HTTP_RANGE='bytes=1000-1999')
+                assert resp.status_code == 206
+                assert resp['Content-Range'] == f'bytes 1000-1999/{len(data)}'
+                assert resp['Content-Length'] == '1000'
+                assert b''.join(resp.streaming_content) == data[1000:2000]
+
+                disk_cache = get_asset_disk_cache()
+                assert disk_cache.hit_rate(self.course_key) == 0.5
+
+    def test_disk_cache_small_asset(self):
+        """
+        Test that assets held by the Django cache of course assets aren't cached on disk.
+        """
+        with tempfile.TemporaryDirectory() as cache_dir:
+            with override_settings(COURSE_ASSETS_DISK_CACHE={'location': cache_dir}):
+                resp = self.client.get(self.url_unlocked)
+                assert resp.status_code == 200
+                assert not os.listdir(cache_dir)
+
+    def test_disk_cache_culling(self):
+        """
+        Test that the least recently used files are removed when the disk cache is full.
+        """
+        url, data = self._save_large_asset('large_static.bin')
+        other_url, __ = self._save_large_asset('other_large_static.bin')
+        with tempfile.TemporaryDirectory() as cache_dir:
+            with override_settings(COURSE_ASSETS_DISK_CACHE={'location': cache_dir, 'max_size': len(data) + 1}):
+                assert self.client.get(url).status_code == 200
+                get_asset_disk_cache().wait_for_fills()
+                assert self.client.get(other_url).status_code == 200
+                get_asset_disk_cache().wait_for_fills()
+                assert len(os.listdir(cache_dir)) == 1
+
+    def test_disk_cache_single_fill(self):
+        """
+        Test that an asset that is being cached by another process is served
+        from the contentstore without being cached again.
+        """
+        url, data = self._save_large_asset('large_static.bin')
+        with tempfile.TemporaryDirectory() as cache_dir:
+            with override_settings(COURSE_ASSETS_DISK_CACHE={'location': cache_dir}):
+                content = self.contentstore.find(StaticContent.get_location_from_path(url))
+                lock_path = os.path.join(cache_dir, f'{content.content_digest}.lock')
+                open(lock_path, 'w').close()  # pylint: disable=consider-using-with
+
+                resp = self.client.get(url)
+                assert resp.status_code == 200
+                assert b''.join(resp.streaming_content) == data
+                get_asset_disk_cache().wait_for_fills()
+                assert os.listdir(cache_dir) == [os.path.basename(lock_path)]
+
     def test_vary_header_sent(self):
         """
         Tests that we're properly setting the Vary header to ensure browser requests don't get
@@ -9,6 +9,7 @@ import datetime
 import logging
 
 from django.http import (
+    FileResponse,
     HttpResponse,
     HttpResponseBadRequest,
     HttpResponseForbidden,
@@ -26,13 +27,13 @@ from common.djangoapps.student.models import CourseEnrollment
 from openedx.core.djangoapps.header_control import force_header_for_response
 from openedx.core.djangoapps.waffle_utils import CourseWaffleFlag
 from xmodule.assetstore.assetmgr import AssetManager
-from xmodule.contentstore.content import XASSET_LOCATION_TAG, StaticContent
+from xmodule.contentstore.content import XASSET_LOCATION_TAG, StaticContent, StaticContentStream
 from xmodule.exceptions import NotFoundError
 from xmodule.modulestore import InvalidLocationError
 from xmodule.modulestore.exceptions import ItemNotFoundError
 from xmodule.util.sandboxing import course_code_library_asset_name
 
-from .caching import get_cached_content, set_cached_content
+from .caching import AssetFileRange, get_asset_disk_cache, get_cached_content, set_cached_content
 from .models import CdnUserAgentsConfig, CourseAssetCacheTtlConfig
 
 
@@ -138,9 +139,10 @@ def process_request(request):
         # Response -> Content-Range attribute structure: "Content-Range: bytes first-last/totalLength"
         # http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html#sec14.35
         response = None
+        asset_file, content = open_asset_file_from_disk_cache(content, loc)
         if request.META.get('HTTP_RANGE'):
             # If we have a StaticContent, get a StaticContentStream.  Can't manipulate the bytes otherwise.
-            if isinstance(content, StaticContent):
+            if asset_file is None and isinstance(content, StaticContent):
                 content = AssetManager.find(loc, as_stream=True)
 
             header_value = request.META['HTTP_RANGE']
@@ -168,7 +170,13 @@ def process_request(request):
 
                     if 0 <= first <= last < content.length:
                         # If the byte range is satisfiable
-                        response = HttpResponse(content.stream_data_in_range(first, last))
+                        if asset_file is not None:
+                            response = FileResponse(
+                                AssetFileRange(asset_file, first, last - first + 1),
+                                content_type=content.content_type,
+                            )
+                        else:
+                            response = HttpResponse(content.stream_data_in_range(first, last))
                         response['Content-Range'] = 'bytes {first}-{last}/{length}'.format(
                             first=first, last=last, length=content.length
                         )
@@ -181,11 +189,19 @@ def process_request(request):
                             "Cannot satisfy ranges in Range header: %s for content: %s",
                             header_value, str(loc)
                         )
+                        if asset_file is not None:
+                            asset_file.close()
                         return HttpResponse(status=416)  # Requested Range Not Satisfiable
 
         # If Range header is absent or syntactically invalid return a full content response.
         if response is None:
-            response = HttpResponse(content.stream_data())
+            if asset_file is not None:
+                response = FileResponse(
+                    AssetFileRange(asset_file, 0, content.length),
+                    content_type=content.content_type,
+                )
+            else:
+                response = HttpResponse(content.stream_data())
             response['Content-Length'] = content.length
 
         set_custom_attribute('contentserver.content_len', content.length)
@@ -346,6 +362,24 @@ def load_asset_from_location(location):
     return content
 
 
+def open_asset_file_from_disk_cache(content, location):
+    """
+    Opens the file of the data of the given content in the on-disk asset cache.
+    On a miss, the cache is filled in the background from a new stream of the
+    content, and the given content is served meanwhile.
+
+    Returns the file, or None if the on-disk asset cache isn't configured or
+    doesn't hold assets like this one, and the content to serve otherwise.
+    """
+    # Contents that aren't streams are already held in memory by the Django cache.
+    disk_cache = get_asset_disk_cache()
+    if disk_cache is None or not isinstance(content, StaticContentStream) or not disk_cache.is_cacheable(content):
+        return None, content
+
+    asset_file = disk_cache.open(content, lambda: AssetManager.find(location, as_stream=True))
+    return asset_file, content
+
+
 def parse_range_header(header_value, content_length):
     """
     Returns the unit and a list of (start, end) tuples of ranges.
@@ -13,6 +13,7 @@ class DiscussionsTopicLinkTransformer(BlockStructureTransformer):
     """
     WRITE_VERSION = 1
     READ_VERSION = 1
+    COLLECTED_XBLOCK_FIELDS = ()
     EXTERNAL_ID = "discussions_id"
     EMBED_URL = "discussions_url"
 
@@ -4,17 +4,28 @@ Utilities related to caching.
 
 
 import collections
+import errno
 import functools
+import hashlib
 import itertools
+import logging
+import mmap
+import os
+import tempfile
+import threading
+import time
 import zlib
 import pickle
 
 import wrapt
+from django.conf import settings
 from django.db.models.signals import post_save, post_delete
 from django.utils.encoding import force_str
 
 from edx_django_utils.cache import RequestCache, TieredCache
 
+log = logging.getLogger(__name__)
+
 
 def request_cached(namespace=None, arg_map_function=None, request_cache_getter=None):
     """
@@ -250,3 +261,205 @@ class CacheService:
         Caches the value against the given key.
         """
         return self._cache.set(key, value, *args, **kwargs)
+
+
+class CrossProcessCache:
+    """
+    A size-bounded cache of immutable serialized data that is shared by all
+    processes on the local host, such as the gunicorn workers of a single
+    server.
+
+    Each entry is stored in its own file under the given directory, which should
+    be on a memory-backed filesystem such as /dev/shm. Entries are read by
+    memory-mapping their file, so the serialized payload is neither fetched over
+    the network nor copied before it is deserialized, and entries outlive
+    recycled worker processes. Only the serialized bytes are shared: each
+    process deserializes its own copy of the objects, so this saves cache round
+    trips, not memory.
+
+    Entries must never change once written for a given key (e.g. a key derived
+    from an immutable version id). Writes are atomic, so a reader sees either
+    the whole entry or nothing.
+
+    The total size of the entries is tracked as they are written, and the
+    directory is only scanned when that size goes over max_size, or every
+    RESCAN_INTERVAL seconds to account for the entries written by other
+    processes. The least recently read entries are then evicted. Reads mark an
+    entry as recently read at most once every TOUCH_INTERVAL seconds. Temp files
+    left behind by processes that died while writing are removed on each scan.
+    """
+    TEMP_FILE_PREFIX = '.tmp-'
+
+    # Temp files not modified for this many seconds are considered abandoned.
+    STALE_TEMP_FILE_AGE = 300
+
+    # Seconds between scans of the directory, by which the entries written by
+    # other processes are accounted for.
+    RESCAN_INTERVAL = 60
+
+    # Seconds after which a read marks an entry as recently read again.
+    TOUCH_INTERVAL = 60
+
+    def __init__(self, directory, namespace, max_size=None):
+        self.directory = os.path.join(directory, namespace)
+        self.max_size = max_size
+
+        # Total size of the entries as of the last scan of the directory, plus
+        # the size of the entries written by this process since, and the
+        # time.monotonic() time of the last scan, or None before the first.
+        self._size = 0
+        self._last_scan_time = None
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Returns a read-only mmap of the data for key, or None if it isn't cached.
+        The returned mmap supports the buffer protocol, so it can be passed
+        directly to pickle.loads or zlib.decompress.
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as entry_file:
+                modified_time = os.fstat(entry_file.fileno()).st_mtime
+                data = mmap.mmap(entry_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            log.warning("CrossProcessCache: Unable to read entry for %s", key, exc_info=True)
+            return None
+
+        # Record the read in the entry's modification time, by which entries
+        # are evicted, unless it was recorded recently.
+        if time.time() - modified_time > self.TOUCH_INTERVAL:
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+        return data
+
+    def set(self, key, data):
+        """
+        Writes the data for key, evicting the least recently read entries if
+        the cache grows over its maximum size or the filesystem is full.
+        Failures to write are logged and otherwise ignored.
+        """
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            try:
+                self._write(key, data)
+            except OSError as error:
+                if error.errno != errno.ENOSPC:
+                    raise
+                self._cull(required_size=len(data))
+                self._write(key, data)
+
+            with self._lock:
+                self._size += len(data)
+                needs_scan = (
+                    self._last_scan_time is None or
+                    time.monotonic() - self._last_scan_time > self.RESCAN_INTERVAL or
+                    (self.max_size is not None and self._size > self.max_size)
+                )
+            if needs_scan:
+                self._cull()
+        except OSError:
+            log.warning("CrossProcessCache: Unable to write entry for %s", key, exc_info=True)
+
+    def delete(self, key):
+        """
+        Removes the entry for key, if any. Processes that already mapped the
+        entry can keep reading it.
+        """
+        self._remove(self._path(key))
+
+    def _write(self, key, data):
+        """
+        Atomically writes the data for key through a temp file.
+        """
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix=self.TEMP_FILE_PREFIX)
+        try:
+            with os.fdopen(fd, 'wb') as entry_file:
+                entry_file.write(data)
+            os.replace(temp_path, self._path(key))
+        except BaseException:
+            self._remove(temp_path)
+            raise
+
+    def _cull(self, required_size=0):
+        """
+        Scans the directory to update the total size of the entries, removing
+        stale temp files, then removes the least recently read entries until
+        the entries take no more than max_size bytes less required_size, or
+        until at least required_size bytes are freed if there is no maximum.
+        """
+        entries = []
+        total_size = 0
+        now = time.time()
+        with os.scandir(self.directory) as dir_entries:
+            for dir_entry in dir_entries:
+                try:
+                    stat = dir_entry.stat()
+                except FileNotFoundError:
+                    continue
+                if dir_entry.name.startswith(self.TEMP_FILE_PREFIX):
+                    if now - stat.st_mtime > self.STALE_TEMP_FILE_AGE:
+                        self._remove(dir_entry.path)
+                elif dir_entry.is_file():
+                    entries.append((stat.st_mtime, stat.st_size, dir_entry.path))
+                    total_size += stat.st_size
+
+        if self.max_size is not None:
+            size_limit = self.max_size - required_size
+        elif required_size:
+            size_limit = total_size - required_size
+        else:
+            size_limit = total_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total_size <= size_limit:
+                break
+            self._remove(path)
+            total_size -= size
+
+        with self._lock:
+            self._size = total_size
+            self._last_scan_time = time.monotonic()
+
+    def _remove(self, path):
+        """
+        Removes the file at path, if it exists.
+        """
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _path(self, key):
+        """
+        Returns the path of the file for key.
+        """
+        return os.path.join(self.directory, hashlib.sha256(str(key).encode('utf-8')).hexdigest())
+
+
+# Map of (directory, namespace, max_size) to the CrossProcessCache for it, so
+# that the sizes tracked by each cache last for the life of the process.
+_CROSS_PROCESS_CACHES = {}
+
+
+def get_cross_process_cache(namespace):
+    """
+    Returns the CrossProcessCache for the given namespace, or None if cross
+    process caching is disabled by the CROSS_PROCESS_CACHE_DIR setting.
+    """
+    directory = getattr(settings, 'CROSS_PROCESS_CACHE_DIR', None)
+    if not directory:
+        return None
+    max_size = getattr(settings, 'CROSS_PROCESS_CACHE_MAX_SIZE', None)
+    cache_key = (directory, namespace, max_size)
+    cross_process_cache = _CROSS_PROCESS_CACHES.get(cache_key)
+    if cross_process_cache is None:
+        cross_process_cache = _CROSS_PROCESS_CACHES.setdefault(
+            cache_key, CrossProcessCache(directory, namespace, max_size),
+        )
+    return cross_process_cache
@@ -1,16 +1,24 @@
 """
 Tests for cache_utils.py
 """
+import errno
+import os
 from time import sleep
 from unittest import TestCase
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 
 import ddt
 from edx_django_utils.cache import RequestCache
 from django.core.cache import cache
 from django.test.utils import override_settings
 
-from openedx.core.lib.cache_utils import CacheService, request_cached
+from openedx.core.lib.cache_utils import (
+    CacheService,
+    CrossProcessCache,
+    get_cross_process_cache,
+    request_cached,
+)
+from openedx.core.lib.tempdir import mkdtemp_clean
 
 
 @ddt.ddt
@@ -320,3 +328,117 @@ class CacheServiceTest(TestCase):
         assert cache_service.get(key) == value
         sleep(timeout)
         assert cache_service.get(key) is None
+
+
+class CrossProcessCacheTest(TestCase):
+    """
+    Test CrossProcessCache methods.
+    """
+    def setUp(self):
+        super().setUp()
+        self.directory = mkdtemp_clean()
+        self.shared_cache = CrossProcessCache(self.directory, 'test')
+
+    def test_get_and_set(self):
+        assert self.shared_cache.get('my_key') is None
+        self.shared_cache.set('my_key', b'some data')
+        assert bytes(self.shared_cache.get('my_key')) == b'some data'
+
+        # entries are visible to other instances, e.g. in other processes
+        assert bytes(CrossProcessCache(self.directory, 'test').get('my_key')) == b'some data'
+        assert CrossProcessCache(self.directory, 'other').get('my_key') is None
+
+    def test_set_replaces_mapped_entry(self):
+        self.shared_cache.set('my_key', b'old data')
+        mapped_data = self.shared_cache.get('my_key')
+        self.shared_cache.set('my_key', b'new data')
+        assert bytes(mapped_data) == b'old data'
+        assert bytes(self.shared_cache.get('my_key')) == b'new data'
+
+    def test_delete(self):
+        self.shared_cache.set('my_key', b'some data')
+        mapped_data = self.shared_cache.get('my_key')
+        self.shared_cache.delete('my_key')
+        self.shared_cache.delete('my_key')
+        assert self.shared_cache.get('my_key') is None
+        assert bytes(mapped_data) == b'some data'
+
+    def test_empty_entry(self):
+        self.shared_cache.set('my_key', b'')
+        assert self.shared_cache.get('my_key') is None
+
+    def test_unwritable_directory(self):
+        shared_cache = CrossProcessCache(__file__, 'test')
+        shared_cache.set('my_key', b'some data')
+        assert shared_cache.get('my_key') is None
+
+    def test_evicts_least_recently_read(self):
+        shared_cache = CrossProcessCache(self.directory, 'test', max_size=20)
+        for index, key in enumerate(('first', 'second')):
+            shared_cache.set(key, b'0123456789')
+            os.utime(shared_cache._path(key), (index, index))  # pylint: disable=protected-access
+
+        # reading an entry marks it as recently read
+        assert shared_cache.get('first') is not None
+        shared_cache.set('third', b'0123456789')
+        assert shared_cache.get('second') is None
+        assert shared_cache.get('first') is not None
+        assert shared_cache.get('third') is not None
+
+    def test_scans_only_when_over_max_size(self):
+        shared_cache = CrossProcessCache(self.directory, 'test', max_size=20)
+        with patch.object(shared_cache, '_cull', wraps=shared_cache._cull) as mock_cull:  # pylint: disable=protected-access
+            shared_cache.set('first', b'0123456789')
+            shared_cache.set('second', b'0123456789')
+            assert mock_cull.call_count == 1
+            shared_cache.set('third', b'0123456789')
+            assert mock_cull.call_count == 2
+
+    def test_rescans_for_entries_of_other_processes(self):
+        other_cache = CrossProcessCache(self.directory, 'test', max_size=20)
+        other_cache.set('first', b'0123456789')
+        other_cache.set('second', b'0123456789')
+
+        shared_cache = CrossProcessCache(self.directory, 'test', max_size=20)
+        shared_cache.set('third', b'0123456789')
+        assert len(os.listdir(shared_cache.directory)) == 2
+
+    def test_read_touches_entry_once_per_interval(self):
+        self.shared_cache.set('my_key', b'some data')
+        with patch('openedx.core.lib.cache_utils.os.utime') as mock_utime:
+            assert self.shared_cache.get('my_key') is not None
+            mock_utime.assert_not_called()
+
+            os.utime(self.shared_cache._path('my_key'), (0, 0))  # pylint: disable=protected-access
+            assert self.shared_cache.get('my_key') is not None
+            mock_utime.assert_called_once()
+
+    def test_full_filesystem(self):
+        self.shared_cache.set('old_key', b'old data')
+        with patch.object(
+            self.shared_cache, '_write', side_effect=[OSError(errno.ENOSPC, 'No space left on device'), None],
+        ) as mock_write:
+            self.shared_cache.set('my_key', b'some data')
+        assert mock_write.call_count == 2
+        assert self.shared_cache.get('old_key') is None
+
+    def test_removes_stale_temp_files(self):
+        self.shared_cache.set('my_key', b'some data')
+        stale_path = os.path.join(self.shared_cache.directory, CrossProcessCache.TEMP_FILE_PREFIX + 'stale')
+        fresh_path = os.path.join(self.shared_cache.directory, CrossProcessCache.TEMP_FILE_PREFIX + 'fresh')
+        for path in (stale_path, fresh_path):
+            with open(path, 'wb') as temp_file:
+                temp_file.write(b'partial data')
+        os.utime(stale_path, (0, 0))
+
+        self.shared_cache.set('other_key', b'other data')
+        assert not os.path.exists(stale_path)
+        assert os.path.exists(fresh_path)
+
+    def test_get_cross_process_cache(self):
+        assert get_cross_process_cache('test') is None
+        with override_settings(CROSS_PROCESS_CACHE_DIR=self.directory, CROSS_PROCESS_CACHE_MAX_SIZE=100):
+            shared_cache = get_cross_process_cache('test')
+            assert get_cross_process_cache('test') is shared_cache
+        assert shared_cache.directory == CrossProcessCache(self.directory, 'test').directory
+        assert shared_cache.max_size == 100
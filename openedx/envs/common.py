@@ -402,6 +402,33 @@ CACHES = {
     },
 }
 
+# .. setting_name: COURSE_STRUCTURE_CACHE_LOCAL_MAX_BYTES
+# .. setting_default: 0
+# .. setting_description: Maximum total size, in bytes, of the pickled split modulestore course structures
+#   kept in an in-process LRU cache in front of the 'course_structure_cache' cache. Structures are
+#   immutable, so cached entries never need invalidation; a hit skips the cache round trip and
+#   decompression. Set to 0 to disable the in-process cache.
+COURSE_STRUCTURE_CACHE_LOCAL_MAX_BYTES = 0
+
+# .. setting_name: CROSS_PROCESS_CACHE_DIR
+# .. setting_default: None
+# .. setting_description: Directory in which immutable serialized split modulestore course structures and
+#   block structures are published as files that all worker processes on the host memory-map, in front of
+#   the 'course_structure_cache' and block structure caches. A hit skips the cache round trip and isn't
+#   lost when a worker is recycled, and payloads over the memcached size limit are still cached. Each
+#   process still deserializes its own copy of the data, so this doesn't reduce memory use. The
+#   directory should be on a memory-backed filesystem, such as a tmpfs mount. Set to None to disable.
+CROSS_PROCESS_CACHE_DIR = None
+
+# .. setting_name: CROSS_PROCESS_CACHE_MAX_SIZE
+# .. setting_default: 512 * 1024 * 1024
+# .. setting_description: Maximum total size, in bytes, of the entries of each kind of data in
+#   CROSS_PROCESS_CACHE_DIR. When it is exceeded, the least recently read entries are evicted. Since
+#   each process only learns of the entries written by other processes when it rescans the directory,
+#   about once a minute, the entries can briefly exceed this size.
+#   Set to None to only evict entries when the filesystem is full.
+CROSS_PROCESS_CACHE_MAX_SIZE = 512 * 1024 * 1024
+
 DATABASES = {
     # edxapp's edxapp-migrate scripts and the edxapp_migrate play
     # will ensure that any DB not named read_replica will be migrated
@@ -1645,6 +1672,21 @@ FINANCIAL_REPORTS = {
     'ROOT_PATH': 'sandbox',
 }
 
+# .. setting_name: COURSE_GRADE_REPORT_USERS_PER_TASK
+# .. setting_default: 5000
+# .. setting_description: Number of enrolled learners graded by each subtask of a course grade
+#   report, when the ``instructor_task.use_sharded_grade_reporting`` course waffle flag is enabled.
+#   Courses with no more learners than this are graded by a single task.
+COURSE_GRADE_REPORT_USERS_PER_TASK = 5000
+
+# .. setting_name: MODULE_STATE_UPDATE_MODULES_PER_TASK
+# .. setting_default: 2000
+# .. setting_description: Number of StudentModule rows updated by each subtask of a task that resets
+#   attempts, deletes state or rescores a problem for all learners, when the
+#   ``instructor_task.use_partitioned_module_state_updates`` course waffle flag is enabled.
+#   Problems with no more rows than this are updated by a single task.
+MODULE_STATE_UPDATE_MODULES_PER_TASK = 2000
+
 ############################### Registration ###############################
 
 # .. setting_name: REGISTRATION_EMAIL_PATTERNS_ALLOWED
@@ -1866,6 +1908,21 @@ MODULESTORE = {
 # require student context.
 MODULESTORE_FIELD_OVERRIDE_PROVIDERS = ()
 
+# .. setting_name: COURSE_OVERVIEW_REFRESH_MAX_WORKERS
+# .. setting_default: 4
+# .. setting_description: Maximum number of courses that are loaded from the modulestore at once,
+#   each in a thread of its own, when CourseOverviews are refreshed in bulk, e.g. by the
+#   generate_course_overview management command.  Set it to 1 to load courses one at a time.
+COURSE_OVERVIEW_REFRESH_MAX_WORKERS = 4
+
+# .. setting_name: COURSE_OVERVIEW_CACHE_TIMEOUT
+# .. setting_default: 300
+# .. setting_description: Number of seconds for which CourseOverview.get_from_ids keeps the overviews
+#   of courses, with their tabs and images, and the fact that courses don't exist, in the default
+#   cache.  Entries are removed when the overviews are saved.  Set it to 0 to only cache overviews
+#   for the duration of a request.
+COURSE_OVERVIEW_CACHE_TIMEOUT = 300
+
 ############################# Micro-frontends ##############################
 
 # .. setting_name: ACCOUNT_MICROFRONTEND_URL
@@ -2234,6 +2291,26 @@ CODE_JAIL_REST_SERVICE_CONNECT_TIMEOUT = 0.5  # time in seconds
 #   codejail remote service endpoint.
 CODE_JAIL_REST_SERVICE_READ_TIMEOUT = 3.5  # time in seconds
 
+# .. setting_name: CODE_JAIL_REST_SERVICE_MAX_CONNECTIONS
+# .. setting_default: 10
+# .. setting_description: Maximum number of concurrent requests, and of persistent
+#   connections, from each LMS/CMS process to the codejail remote service.
+CODE_JAIL_REST_SERVICE_MAX_CONNECTIONS = 10
+
+# .. setting_name: CODE_JAIL_REST_SERVICE_CIRCUIT_BREAKER_THRESHOLD
+# .. setting_default: 5
+# .. setting_description: Number of consecutive failed requests to the codejail remote
+#   service after which LMS/CMS stops sending requests to it for
+#   CODE_JAIL_REST_SERVICE_CIRCUIT_BREAKER_RESET_TIMEOUT seconds.
+CODE_JAIL_REST_SERVICE_CIRCUIT_BREAKER_THRESHOLD = 5
+
+# .. setting_name: CODE_JAIL_REST_SERVICE_CIRCUIT_BREAKER_RESET_TIMEOUT
+# .. setting_default: 30
+# .. setting_description: Number of seconds during which no requests are sent to the
+#   codejail remote service after it failed CODE_JAIL_REST_SERVICE_CIRCUIT_BREAKER_THRESHOLD
+#   times in a row.
+CODE_JAIL_REST_SERVICE_CIRCUIT_BREAKER_RESET_TIMEOUT = 30  # time in seconds
+
 ####################### Locale/Internationalization ########################
 
 # Locale/Internationalization
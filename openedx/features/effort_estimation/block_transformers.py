@@ -34,6 +34,7 @@ class EffortEstimationTransformer(BlockStructureTransformer):
     """
     WRITE_VERSION = 1
     READ_VERSION = 1
+    COLLECTED_XBLOCK_FIELDS = ('data', 'edx_video_id', 'start_time', 'end_time')
 
     # Public xblock field names
     EFFORT_ACTIVITIES = 'effort_activities'
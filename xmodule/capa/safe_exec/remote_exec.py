@@ -2,15 +2,23 @@
 Helper methods related to safe exec.
 """
 
+import bisect
 import json
 import logging
+import threading
+from functools import lru_cache
 from importlib import import_module
+from time import monotonic
 
 import requests
 from codejail.safe_exec import SafeExecException, json_safe
 from django.conf import settings
+from django.dispatch import receiver
+from django.test.signals import setting_changed
 from django.utils.translation import gettext as _
+from edx_django_utils.monitoring import set_custom_attribute
 from edx_toggles.toggles import SettingToggle
+from requests.adapters import HTTPAdapter
 from requests.exceptions import HTTPError, RequestException
 from simplejson import JSONDecodeError
 
@@ -74,6 +82,150 @@ def get_codejail_rest_service_endpoint():
     return f"{settings.CODE_JAIL_REST_SERVICE_HOST}/api/v0/code-exec"
 
 
+class CodejailServiceClient:
+    """
+    A client of the codejail REST service that keeps persistent connections to
+    the service, bounds the number of concurrent requests, and stops sending
+    requests for a while after consecutive failures of the service.
+
+    Each thread sends its requests through its own session, since sessions are
+    not thread-safe, but all of the sessions share one pool of connections.
+
+    The latencies of the requests are counted in a histogram, whose buckets are
+    upper bounds in milliseconds.
+    """
+
+    LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float('inf'))
+
+    def __init__(self, max_connections, failure_threshold, reset_timeout):
+        self.max_connections = max_connections
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_connections)
+        self._local = threading.local()
+        self.latency_histogram = dict.fromkeys(self.LATENCY_BUCKETS_MS, 0)
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._lock = threading.Lock()
+        self._consecutive_failures = 0
+        self._open_until = 0
+
+    @property
+    def session(self):
+        """
+        Returns the session of the current thread.
+        """
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+            session.mount("http://", self._adapter)
+            session.mount("https://", self._adapter)
+        return session
+
+    def is_circuit_open(self):
+        """
+        Returns whether requests are currently refused because of the recent
+        failures of the service.
+        """
+        return monotonic() < self._open_until
+
+    def post(self, url, **kwargs):
+        """
+        Posts a request to the service and returns its response.
+
+        Raises CodejailServiceUnavailable without sending the request while the
+        circuit is open, and RequestException if the request fails.
+        """
+        circuit_open = self.is_circuit_open()
+        # .. custom_attribute_name: codejail.remote_exec.circuit_open
+        # .. custom_attribute_description: True if the request to the codejail REST service was
+        #   refused without being sent because the service failed too many times in a row.
+        set_custom_attribute("codejail.remote_exec.circuit_open", circuit_open)
+        if circuit_open:
+            raise CodejailServiceUnavailable(
+                _("Codejail API Service is unavailable. Please try again in a few minutes.")
+            )
+
+        with self._slots:
+            start = monotonic()
+            try:
+                response = self.session.post(url, **kwargs)
+            except RequestException:
+                self._record_result(succeeded=False)
+                raise
+            finally:
+                self._record_latency((monotonic() - start) * 1000)
+
+        self._record_result(succeeded=response.status_code < 500)
+        return response
+
+    def _record_latency(self, latency_ms):
+        """
+        Counts the latency of a request in the histogram.
+        """
+        bucket = self.LATENCY_BUCKETS_MS[bisect.bisect_left(self.LATENCY_BUCKETS_MS, latency_ms)]
+        with self._lock:
+            self.latency_histogram[bucket] += 1
+        # .. custom_attribute_name: codejail.remote_exec.latency_ms
+        # .. custom_attribute_description: Time in milliseconds of the last request to the
+        #   codejail REST service in the transaction.
+        set_custom_attribute("codejail.remote_exec.latency_ms", latency_ms)
+        # .. custom_attribute_name: codejail.remote_exec.latency_bucket_ms
+        # .. custom_attribute_description: Upper bound in milliseconds of the latency histogram
+        #   bucket of the last request to the codejail REST service in the transaction, so
+        #   that the histogram can be rebuilt from the transactions.
+        set_custom_attribute("codejail.remote_exec.latency_bucket_ms", str(bucket))
+
+    def _record_result(self, succeeded):
+        """
+        Opens the circuit once the service failed `failure_threshold` times in a row.
+
+        The count of failures is only reset by a success, so once the circuit
+        closes again, a single failure of the next request reopens it.
+        """
+        with self._lock:
+            if succeeded:
+                self._consecutive_failures = 0
+                return
+            self._consecutive_failures += 1
+            # .. custom_attribute_name: codejail.remote_exec.consecutive_failures
+            # .. custom_attribute_description: Number of requests to the codejail REST service
+            #   that failed in a row, including the last request in the transaction.
+            set_custom_attribute("codejail.remote_exec.consecutive_failures", self._consecutive_failures)
+            if self._consecutive_failures >= self.failure_threshold:
+                log.error(
+                    "Codejail API service failed %d times in a row; not sending requests for %s seconds",
+                    self._consecutive_failures,
+                    self.reset_timeout,
+                )
+                self._open_until = monotonic() + self.reset_timeout
+                # .. custom_attribute_name: codejail.remote_exec.circuit_opened
+                # .. custom_attribute_description: True if the last request to the codejail REST
+                #   service in the transaction opened the circuit.
+                set_custom_attribute("codejail.remote_exec.circuit_opened", True)
+
+
+@lru_cache(maxsize=1)
+def get_codejail_service_client():
+    """
+    Returns the client shared by all requests to the codejail REST service in
+    this process.
+    """
+    return CodejailServiceClient(
+        max_connections=settings.CODE_JAIL_REST_SERVICE_MAX_CONNECTIONS,
+        failure_threshold=settings.CODE_JAIL_REST_SERVICE_CIRCUIT_BREAKER_THRESHOLD,
+        reset_timeout=settings.CODE_JAIL_REST_SERVICE_CIRCUIT_BREAKER_RESET_TIMEOUT,
+    )
+
+
+@receiver(setting_changed)
+def reset_codejail_service_client(sender, setting, **kwargs):  # pylint: disable=unused-argument
+    """
+    Reset the shared client when its settings change during unit tests.
+    """
+    if setting.startswith("CODE_JAIL_REST_SERVICE_"):
+        get_codejail_service_client.cache_clear()
+
+
 def send_safe_exec_request_v0(data):
     """
     Sends a request to a codejail api service forwarding required code and files.
@@ -105,7 +257,7 @@ def send_safe_exec_request_v0(data):
     payload = json.dumps(data_send)
 
     try:
-        response = requests.post(
+        response = get_codejail_service_client().post(
             codejail_service_endpoint,
             files=extra_files,
             data={"payload": payload},
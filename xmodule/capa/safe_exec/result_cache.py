@@ -0,0 +1,245 @@
+"""
+Shared, size-bounded caches of the results of safe_exec.
+
+The `cache` that callers pass to safe_exec usually lives no longer than a
+request, so identical executions of a problem's script, with the same seed
+and globals, go to codejail again for every learner.  The cache configured
+by the ``CODE_JAIL_RESULT_CACHE`` setting is shared by all executions of a
+process (or, depending on the backend, of all processes), and is consulted
+after the caller's cache.
+
+Entries are keyed by the digest that safe_exec computes from the code, the
+globals, the random seed, the python path and the extra files, and hold the
+pair of the error message, if any, and the JSON-safe resulting globals.
+"""
+
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import caches
+from django.dispatch import receiver
+from django.test.signals import setting_changed
+from edx_django_utils.monitoring import accumulate
+
+log = logging.getLogger(__name__)
+
+
+class SafeExecResultCache:
+    """
+    Base class of the shared safe_exec result caches, which counts the hits
+    and misses of the cache and reports them as custom attributes.
+
+    Subclasses implement `_get` and `_set`.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self):
+        """
+        Returns the fraction of the lookups of this cache that were hits, or
+        None if there were no lookups.
+        """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else None
+
+    def get(self, key):
+        """
+        Returns the cached value of `key`, or None.
+        """
+        try:
+            value = self._get(key)
+        except Exception:  # pylint: disable=broad-except
+            log.exception("Could not read safe_exec result %s from the %s", key, type(self).__name__)
+            value = None
+
+        if value is None:
+            self.misses += 1
+            # .. custom_attribute_name: codejail.result_cache.misses
+            # .. custom_attribute_description: Number of lookups of the shared safe_exec result
+            #   cache that had to go to codejail.
+            accumulate('codejail.result_cache.misses', 1)
+        else:
+            self.hits += 1
+            # .. custom_attribute_name: codejail.result_cache.hits
+            # .. custom_attribute_description: Number of lookups of the shared safe_exec result
+            #   cache that were answered without going to codejail.
+            accumulate('codejail.result_cache.hits', 1)
+        return value
+
+    def set(self, key, value):
+        """
+        Caches `value` as the value of `key`.
+        """
+        try:
+            self._set(key, value)
+        except Exception:  # pylint: disable=broad-except
+            log.exception("Could not write safe_exec result %s to the %s", key, type(self).__name__)
+
+    def _get(self, key):
+        raise NotImplementedError
+
+    def _set(self, key, value):
+        raise NotImplementedError
+
+
+class LocalMemoryResultCache(SafeExecResultCache):
+    """
+    A least recently used cache in the memory of the current process.
+
+    Entries are stored as JSON strings and decoded on every lookup, since
+    safe_exec merges the cached globals into the caller's globals, which the
+    caller may then change.  Storing the objects themselves would share them
+    between the cache and every caller that read them.
+    """
+
+    def __init__(self, max_entries=1000):
+        super().__init__()
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+        return json.loads(value) if value is not None else None
+
+    def _set(self, key, value):
+        value = json.dumps(value)
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class DjangoCacheResultCache(SafeExecResultCache):
+    """
+    A cache stored in one of the caches of the ``CACHES`` setting, which may be
+    shared between processes.  Its size is bounded by that cache's own limits.
+    """
+
+    def __init__(self, cache_name='default', timeout=None):
+        super().__init__()
+        self.cache_name = cache_name
+        self.timeout = timeout
+
+    def _get(self, key):
+        return caches[self.cache_name].get(key)
+
+    def _set(self, key, value):
+        caches[self.cache_name].set(key, value, self.timeout)
+
+
+class FileSystemResultCache(SafeExecResultCache):
+    """
+    A cache stored as one JSON file per entry in a directory, which survives
+    restarts of the process.  Every `cull_interval` writes of a process, if the
+    directory holds more than `max_entries` files, the least recently written
+    tenth of them are removed; in between, the directory may hold up to
+    `cull_interval` more entries per process than `max_entries`.
+    """
+
+    def __init__(self, location, max_entries=10000, cull_interval=100):
+        super().__init__()
+        self.location = location
+        self.max_entries = max_entries
+        self.cull_interval = max(1, cull_interval)
+        self._writes = 0
+        self._lock = threading.Lock()
+        os.makedirs(location, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.location, f'{key}.json')
+
+    def _get(self, key):
+        try:
+            with open(self._path(key), encoding='utf-8') as cache_file:
+                return json.load(cache_file)
+        except FileNotFoundError:
+            return None
+
+    def _set(self, key, value):
+        path = self._path(key)
+        temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}'
+        with open(temp_path, 'w', encoding='utf-8') as cache_file:
+            json.dump(value, cache_file)
+        # Replace the entry atomically, so that concurrent readers never see a partial file.
+        os.replace(temp_path, path)
+
+        # Listing the directory is as costly as the write itself, so it is only done periodically.
+        with self._lock:
+            self._writes += 1
+            should_cull = self._writes % self.cull_interval == 0
+        if should_cull:
+            self._cull()
+
+    def _cull(self):
+        """
+        Removes the oldest entries if the directory has too many of them.
+        """
+        with os.scandir(self.location) as dir_entries:
+            entries = [entry for entry in dir_entries if entry.name.endswith('.json')]
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in entries[:max(len(entries) - self.max_entries, self.max_entries // 10)]:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+
+RESULT_CACHE_BACKENDS = {
+    'memory': LocalMemoryResultCache,
+    'django': DjangoCacheResultCache,
+    'filesystem': FileSystemResultCache,
+}
+
+
+@lru_cache(maxsize=1)
+def get_result_cache():
+    """
+    Returns the shared safe_exec result cache configured by the
+    ``CODE_JAIL_RESULT_CACHE`` setting, or None if it is not configured.
+    """
+    # .. setting_name: CODE_JAIL_RESULT_CACHE
+    # .. setting_default: None
+    # .. setting_description: Configures a cache of the results of sandboxed code
+    #   executions that is shared by all requests, in addition to the cache passed by the
+    #   caller of safe_exec.  The value is a dict with a 'BACKEND' of 'memory' (a least
+    #   recently used cache in the memory of each process), 'django' (one of the CACHES)
+    #   or 'filesystem' (one JSON file per result in a directory), and the 'OPTIONS' of the
+    #   backend: 'max_entries' for 'memory'; 'cache_name' and 'timeout' for 'django'; and
+    #   'location', 'max_entries' and 'cull_interval' (the number of writes between checks of
+    #   the number of entries) for 'filesystem'.  For example:
+    #   ``{'BACKEND': 'django', 'OPTIONS': {'cache_name': 'default', 'timeout': 86400}}``.
+    # .. setting_warning: Only code whose results depend on nothing but its globals, random
+    #   seed, python path and extra files should run in courses that use this cache.
+    config = getattr(settings, 'CODE_JAIL_RESULT_CACHE', None)
+    if not config:
+        return None
+
+    backend = RESULT_CACHE_BACKENDS.get(config.get('BACKEND'))
+    if backend is None:
+        log.error("Unknown CODE_JAIL_RESULT_CACHE backend %r", config.get('BACKEND'))
+        return None
+    return backend(**config.get('OPTIONS', {}))
+
+
+@receiver(setting_changed)
+def reset_result_cache(sender, setting, **kwargs):  # pylint: disable=unused-argument
+    """
+    Reset the shared result cache when its setting changes during unit tests.
+    """
+    if setting == 'CODE_JAIL_RESULT_CACHE':
+        get_result_cache.cache_clear()
@@ -4,6 +4,8 @@ import copy
 import hashlib
 import logging
 import re
+import threading
+from collections import OrderedDict
 from functools import lru_cache
 from typing import assert_type
 
@@ -17,6 +19,7 @@ from edx_django_utils.monitoring import function_trace, record_exception, set_cu
 
 from . import lazymod
 from .remote_exec import get_remote_exec, is_codejail_in_darklaunch, is_codejail_rest_service_enabled
+from .result_cache import get_result_cache
 
 log = logging.getLogger(__name__)
 
@@ -106,6 +109,58 @@ def update_hash(hasher, obj):
         hasher.update(repr(obj).encode())
 
 
+# The digests of the extra files most recently passed to safe_exec, by the id
+# of their contents.  The contents are kept with their digest so that their id
+# cannot be reused while the digest is cached.
+_EXTRA_FILE_DIGESTS = OrderedDict()
+_EXTRA_FILE_DIGESTS_SIZE = 16
+_extra_file_digests_lock = threading.Lock()
+
+
+def _extra_file_digest(contents):
+    """
+    Returns the md5 digest of the `contents` of an extra file.
+
+    The course code library carries the digest that the contentstore recorded
+    for it; the digests of other contents are memoized, since the same contents
+    are usually passed for each of the scripts and responses of a problem.
+    """
+    digest = getattr(contents, "digest", None)
+    if digest:
+        return digest
+
+    with _extra_file_digests_lock:
+        cached = _EXTRA_FILE_DIGESTS.get(id(contents))
+        if cached is not None and cached[0] is contents:
+            _EXTRA_FILE_DIGESTS.move_to_end(id(contents))
+            return cached[1]
+
+    digest = hashlib.md5(contents if isinstance(contents, bytes) else contents.encode("utf-8")).hexdigest()
+    with _extra_file_digests_lock:
+        _EXTRA_FILE_DIGESTS[id(contents)] = (contents, digest)
+        _EXTRA_FILE_DIGESTS.move_to_end(id(contents))
+        while len(_EXTRA_FILE_DIGESTS) > _EXTRA_FILE_DIGESTS_SIZE:
+            _EXTRA_FILE_DIGESTS.popitem(last=False)
+    return digest
+
+
+def _cache_key(code, globals_dict, random_seed, python_path, extra_files):
+    """
+    Returns the key of the cached result of executing `code` with the given
+    globals, random seed, python path and extra files.
+    """
+    md5er = hashlib.md5()
+    md5er.update(repr(code).encode("utf-8"))
+    update_hash(md5er, json_safe(globals_dict))
+    update_hash(md5er, python_path or [])
+    # The extra files can be large zip files, so only their digests are hashed.
+    update_hash(md5er, [
+        (filename, _extra_file_digest(contents))
+        for filename, contents in extra_files or []
+    ])
+    return f"safe_exec.{random_seed!r}.{md5er.hexdigest()}"
+
+
 @function_trace("safe_exec")
 def safe_exec(  # pylint: disable=too-many-arguments,too-many-branches,too-many-locals,too-many-positional-arguments,too-many-statements
     code,
@@ -136,7 +191,8 @@ def safe_exec(  # pylint: disable=too-many-arguments,too-many-branches,too-many-
 
     `cache` is an object with .get(key) and .set(key, value) methods.  It will be used
     to cache the execution, taking into account the code, the values of the globals,
-    and the random seed.
+    the random seed, the python path and the extra files.  The shared cache configured
+    by the CODE_JAIL_RESULT_CACHE setting, if any, is used as well.
 
     `limit_overrides_context` is an optional string to be used as a key on
     the `settings.CODE_JAIL['limit_overrides']` dictionary in order to apply
@@ -149,22 +205,22 @@ def safe_exec(  # pylint: disable=too-many-arguments,too-many-branches,too-many-
 
     If `unsafely` is true, then the code will actually be executed without sandboxing.
     """
-    # Check the cache for a previous result.
-    if cache:
-        safe_globals = json_safe(globals_dict)
-        md5er = hashlib.md5()
-        md5er.update(repr(code).encode("utf-8"))
-        update_hash(md5er, safe_globals)
-        key = f"safe_exec.{random_seed!r}.{md5er.hexdigest()}"
-        cached = cache.get(key)
-        if cached is not None:
-            # We have a cached result.  The result is a pair: the exception
-            # message, if any, else None; and the resulting globals dictionary.
-            emsg, cleaned_results = cached
-            globals_dict.update(cleaned_results)
-            if emsg:
-                raise SafeExecException(emsg)
-            return
+    # Check the caches for a previous result, first the caller's and then the shared one.
+    caches = [c for c in (cache, get_result_cache()) if c]
+    if caches:
+        key = _cache_key(code, globals_dict, random_seed, python_path, extra_files)
+        for index, result_cache in enumerate(caches):
+            cached = result_cache.get(key)
+            if cached is not None:
+                # We have a cached result.  The result is a pair: the exception
+                # message, if any, else None; and the resulting globals dictionary.
+                for missed_cache in caches[:index]:
+                    missed_cache.set(key, cached)
+                emsg, cleaned_results = cached
+                globals_dict.update(cleaned_results)
+                if emsg:
+                    raise SafeExecException(emsg)
+                return
 
     cacheable = True  # unless we get an unexpected error
 
@@ -288,9 +344,10 @@ def safe_exec(  # pylint: disable=too-many-arguments,too-many-branches,too-many-
 
     # Put the result back in the cache.  This is complicated by the fact that
     # the globals dict might not be entirely serializable.
-    if cache and cacheable:
+    if caches and cacheable:
         cleaned_results = json_safe(globals_dict)
-        cache.set(key, (emsg, cleaned_results))
+        for result_cache in caches:
+            result_cache.set(key, (emsg, cleaned_results))
 
     # If an exception happened, raise it now.
     if exception:
@@ -3,12 +3,16 @@ Tests for remote codejail execution.
 """
 
 import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest import TestCase
 from unittest.mock import patch
 
+import pytest
 from django.test import override_settings
 
-from xmodule.capa.safe_exec.remote_exec import get_remote_exec
+from xmodule.capa.safe_exec.exceptions import CodejailServiceUnavailable
+from xmodule.capa.safe_exec.remote_exec import get_codejail_service_client, get_remote_exec
 
 
 class TestRemoteExec(TestCase):
@@ -18,7 +22,7 @@ class TestRemoteExec(TestCase):
         ENABLE_CODEJAIL_REST_SERVICE=True,
         CODE_JAIL_REST_SERVICE_HOST="http://localhost",
     )
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_json_encode(self, mock_post):
         """Verify that get_remote_exec correctly JSON-encodes payload with globals."""
         get_remote_exec(
@@ -33,3 +37,106 @@ class TestRemoteExec(TestCase):
         data_arg = mock_post.call_args_list[0][1]["data"]
         payload = json.loads(data_arg["payload"])
         assert payload["globals_dict"] == {"some_data": "bytes"}
+
+
+class StandInCodejailHandler(BaseHTTPRequestHandler):
+    """
+    Answers every execution request like the codejail service would answer
+    `out = 1 + 1`, and records the client port of each request.
+    """
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        """Reply to an execution request."""
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.client_ports.append(self.client_address[1])
+        body = json.dumps({"globals_dict": {"out": 2}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        """Keep the test output quiet."""
+
+
+class TestCodejailServiceClient(TestCase):
+    """Tests for the pooled client of the codejail service, against a local stand-in service."""
+
+    def setUp(self):
+        super().setUp()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StandInCodejailHandler)
+        self.server.client_ports = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        settings_override = override_settings(
+            CODE_JAIL_REST_SERVICE_HOST=f"http://127.0.0.1:{self.server.server_port}",
+            CODE_JAIL_REST_SERVICE_MAX_CONNECTIONS=2,
+            CODE_JAIL_REST_SERVICE_CIRCUIT_BREAKER_THRESHOLD=2,
+            CODE_JAIL_REST_SERVICE_CIRCUIT_BREAKER_RESET_TIMEOUT=60,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def execution_data(self):
+        return {"code": "out = 1 + 1", "globals_dict": {}, "extra_files": None}
+
+    def test_connection_is_reused(self):
+        for _ in range(3):
+            data = self.execution_data()
+            assert get_remote_exec(data) == (None, None)
+            assert data["globals_dict"] == {"out": 2}
+
+        assert len(self.server.client_ports) == 3
+        assert len(set(self.server.client_ports)) == 1
+        assert sum(get_codejail_service_client().latency_histogram.values()) == 3
+
+    def test_concurrent_requests(self):
+        data_list = [self.execution_data() for _ in range(5)]
+        threads = [threading.Thread(target=get_remote_exec, args=(data,)) for data in data_list]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert all(data["globals_dict"] == {"out": 2} for data in data_list)
+        assert len(self.server.client_ports) == 5
+        # Each thread has its own session, but they share the pool of two connections.
+        assert len(set(self.server.client_ports)) <= 2
+
+    def test_circuit_breaker(self):
+        with override_settings(CODE_JAIL_REST_SERVICE_HOST="http://127.0.0.1:1"):
+            for _ in range(2):
+                with pytest.raises(CodejailServiceUnavailable):
+                    get_remote_exec(self.execution_data())
+            assert get_codejail_service_client().is_circuit_open()
+
+            with patch("requests.Session.post") as mock_post:
+                with pytest.raises(CodejailServiceUnavailable):
+                    get_remote_exec(self.execution_data())
+            mock_post.assert_not_called()
+
+            # Once the circuit closes again, a single failure reopens it.
+            get_codejail_service_client()._open_until = 0  # pylint: disable=protected-access
+            with pytest.raises(CodejailServiceUnavailable):
+                get_remote_exec(self.execution_data())
+            assert get_codejail_service_client().is_circuit_open()
+
+    @patch("xmodule.capa.safe_exec.remote_exec.set_custom_attribute")
+    def test_monitoring_attributes(self, mock_set_custom_attribute):
+        get_remote_exec(self.execution_data())
+        mock_set_custom_attribute.assert_any_call("codejail.remote_exec.circuit_open", False)
+        attributes = dict(call.args for call in mock_set_custom_attribute.call_args_list)
+        assert attributes["codejail.remote_exec.latency_bucket_ms"] in {
+            str(bucket) for bucket in get_codejail_service_client().LATENCY_BUCKETS_MS
+        }
+
+        with override_settings(CODE_JAIL_REST_SERVICE_HOST="http://127.0.0.1:1"):
+            for _ in range(2):
+                with pytest.raises(CodejailServiceUnavailable):
+                    get_remote_exec(self.execution_data())
+        mock_set_custom_attribute.assert_any_call("codejail.remote_exec.consecutive_failures", 2)
+        mock_set_custom_attribute.assert_any_call("codejail.remote_exec.circuit_opened", True)
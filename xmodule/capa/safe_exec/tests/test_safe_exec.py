@@ -4,6 +4,7 @@ import copy
 import hashlib
 import os
 import os.path
+import tempfile
 import textwrap
 import unittest
 from unittest.mock import call, patch
@@ -25,8 +26,10 @@ from xmodule.capa.safe_exec.remote_exec import (
     is_codejail_in_darklaunch,
     is_codejail_rest_service_enabled,
 )
+from xmodule.capa.safe_exec.result_cache import FileSystemResultCache, LocalMemoryResultCache, get_result_cache
 from xmodule.capa.safe_exec.safe_exec import emsg_normalizers, normalize_error_message
 from xmodule.capa.tests.test_util import UseUnsafeCodejail
+from xmodule.util.sandboxing import CodeLibraryZip
 
 
 @UseUnsafeCodejail()
@@ -653,6 +656,67 @@ class TestSafeExecCaching(unittest.TestCase):
             except UnicodeEncodeError:
                 self.fail(f"Tried executing code with non-ASCII unicode: {code}")
 
+    def test_cache_keys_depend_on_extra_files(self):
+        """Test that the same code with different extra files is cached separately."""
+        cache = {}
+        for contents in (b"a = 1", b"a = 2"):
+            safe_exec("a = 0", {}, python_path=["lib.py"], extra_files=[("lib.py", contents)], cache=DictCache(cache))
+        assert len(cache) == 2
+
+    def test_cache_keys_use_extra_file_digests(self):
+        """Test that extra files which carry their digest are not hashed again."""
+        cache = {}
+        contents = CodeLibraryZip(b"a = 1")
+        safe_exec("a = 0", {}, python_path=["lib.py"], extra_files=[("lib.py", contents)], cache=DictCache(cache))
+        with patch("xmodule.capa.safe_exec.safe_exec.hashlib.md5", wraps=hashlib.md5) as mock_md5:
+            safe_exec("a = 0", {}, python_path=["lib.py"], extra_files=[("lib.py", contents)], cache=DictCache(cache))
+        assert mock_md5.call_count == 1
+        assert len(cache) == 1
+
+    def test_shared_result_cache(self):
+        """Test that results are cached in and read from the shared result cache."""
+        with override_settings(CODE_JAIL_RESULT_CACHE={"BACKEND": "memory", "OPTIONS": {"max_entries": 1}}):
+            result_cache = get_result_cache()
+            caller_cache = {}
+            safe_exec("a = int(math.pi)", {}, random_seed=1, cache=DictCache(caller_cache))
+            assert result_cache.misses == 1
+
+            with patch("xmodule.capa.safe_exec.safe_exec.codejail_safe_exec") as mock_exec:
+                g = {}
+                safe_exec("a = int(math.pi)", g, random_seed=1)
+                safe_exec("a = int(math.pi)", g, random_seed=1, cache=DictCache({}))
+            mock_exec.assert_not_called()
+            assert g["a"] == 3
+            assert result_cache.hits == 2
+
+            # A different seed is a different result, and evicts the first one.
+            safe_exec("a = int(math.pi)", {}, random_seed=2)
+            assert result_cache.get(list(caller_cache)[0]) is None
+
+    def test_memory_result_cache_copies_results(self):
+        """Test that the globals read from the memory result cache are not shared with the cache."""
+        result_cache = LocalMemoryResultCache()
+        result_cache.set("safe_exec.0", (None, {"a": [1, 2]}))
+        emsg, cached_globals = result_cache.get("safe_exec.0")
+        assert emsg is None
+        cached_globals["a"].append(3)
+        assert result_cache.get("safe_exec.0") == [None, {"a": [1, 2]}]
+
+    def test_file_system_result_cache(self):
+        """Test the round trip and culling of results cached in files."""
+        with tempfile.TemporaryDirectory() as location:
+            result_cache = FileSystemResultCache(location, max_entries=10, cull_interval=4)
+            for index in range(10):
+                result_cache.set(f"safe_exec.{index}", (None, {"a": index}))
+            assert result_cache.get("safe_exec.9") == [None, {"a": 9}]
+            assert result_cache.hit_rate == 1
+
+            # The directory is only culled on every fourth write.
+            result_cache.set("safe_exec.10", (None, {"a": 10}))
+            assert len(os.listdir(location)) == 11
+            result_cache.set("safe_exec.11", (None, {"a": 11}))
+            assert len(os.listdir(location)) == 10
+
 
 class TestUpdateHash(unittest.TestCase):
     """Test the safe_exec.update_hash function to be sure it canonicalizes properly."""
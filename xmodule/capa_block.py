@@ -15,6 +15,7 @@ import re
 import struct
 import sys
 import traceback
+from collections import OrderedDict
 from zoneinfo import ZoneInfo
 
 import nh3
@@ -183,6 +184,9 @@ class _BuiltInProblemBlock(  # pylint: disable=too-many-public-methods,too-many-
 
     uses_xmodule_styles_setup = True
 
+    # Number of problems kept by `generate_report_data`, one for each seed of the learners' states.
+    REPORT_PROBLEM_CACHE_SIZE = 32
+
     display_name = String(
         display_name=_("Display Name"),
         help=_("The display name for this component."),
@@ -732,27 +736,11 @@ class _BuiltInProblemBlock(  # pylint: disable=too-many-public-methods,too-many-
             if "student_answers" not in user_state.state:
                 continue
             try:
-                lcp = LoncapaProblem(
-                    problem_text=self.data,
-                    id=self.location.html_id(),
-                    capa_system=capa_system,
-                    # We choose to run without a fully initialized CapaModule
-                    capa_block=None,
-                    state={
-                        "done": user_state.state.get("done"),
-                        "correct_map": user_state.state.get("correct_map"),
-                        "student_answers": user_state.state.get("student_answers"),
-                        "has_saved_answers": user_state.state.get("has_saved_answers"),
-                        "input_state": user_state.state.get("input_state"),
-                        "seed": user_state.state.get("seed"),
-                    },
-                    seed=user_state.state.get("seed"),
-                    # extract_tree=False allows us to work without a fully initialized CapaModule
-                    # We'll still be able to find particular data in the XML when we need it
-                    extract_tree=False,
-                )
+                lcp = self._get_report_problem(capa_system, user_state.state)
+                # The problem may have been built from the state of another learner with the same seed.
+                student_answers = user_state.state["student_answers"] or lcp.student_answers
 
-                for answer_id, orig_answers in lcp.student_answers.items():
+                for answer_id, orig_answers in student_answers.items():
                     # Some types of problems have data in lcp.student_answers that isn't in lcp.problem_data.
                     # E.g. formulae do this to store the MathML version of the answer.
                     # We exclude these rows from the report because we only need the text-only answer.
@@ -792,6 +780,49 @@ class _BuiltInProblemBlock(  # pylint: disable=too-many-public-methods,too-many-
                 }
                 yield (user_state.username, report)
 
+    def _get_report_problem(self, capa_system, state):
+        """
+        Return the LoncapaProblem used by `generate_report_data` to find the
+        question and answer texts for a learner with the given state.
+
+        The texts only depend on the seed of the problem, so problems are kept
+        in an LRU cache of REPORT_PROBLEM_CACHE_SIZE problems on the block,
+        keyed by seed and by whether the learner has any answers, since the
+        initial display answers are used when they don't.
+        """
+        cache = getattr(self, "_report_problem_cache", None)
+        if cache is None:
+            cache = self._report_problem_cache = OrderedDict()  # pylint: disable=attribute-defined-outside-init
+        seed = state.get("seed")
+        cache_key = (seed, bool(state["student_answers"]))
+        if cache_key in cache:
+            cache.move_to_end(cache_key)
+            return cache[cache_key]
+
+        lcp = LoncapaProblem(
+            problem_text=self.data,
+            id=self.location.html_id(),
+            capa_system=capa_system,
+            # We choose to run without a fully initialized CapaModule
+            capa_block=None,
+            state={
+                "done": state.get("done"),
+                "correct_map": state.get("correct_map"),
+                "student_answers": state.get("student_answers"),
+                "has_saved_answers": state.get("has_saved_answers"),
+                "input_state": state.get("input_state"),
+                "seed": seed,
+            },
+            seed=seed,
+            # extract_tree=False allows us to work without a fully initialized CapaModule
+            # We'll still be able to find particular data in the XML when we need it
+            extract_tree=False,
+        )
+        cache[cache_key] = lcp
+        if len(cache) > self.REPORT_PROBLEM_CACHE_SIZE:
+            cache.popitem(last=False)
+        return lcp
+
     @property
     def course_end_date(self):
         """
@@ -323,6 +323,23 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
                     courses[course_id] = course
         return list(courses.values())
 
+    def get_course_structures(self, course_keys, **kwargs):
+        """
+        Returns the active structures of the given courses, as a dict of course key
+        to structure, fetched in bulk from each modulestore that supports it.
+
+        Courses which are not found in such a modulestore are omitted.
+        """
+        structures = {}
+        remaining_keys = list(course_keys)
+        for store in self.modulestores:
+            if not remaining_keys:
+                break
+            if hasattr(store, 'get_course_structures'):
+                structures.update(store.get_course_structures(remaining_keys, **kwargs))
+                remaining_keys = [course_key for course_key in remaining_keys if course_key not in structures]
+        return structures
+
     def get_library_keys(self):
         """
         Returns a list of all unique content library keys in the mixed
@@ -616,6 +633,16 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
         except NotImplementedError:
             return None, None
 
+    def get_block_changes(self, course_key, from_version_guid):
+        """
+        Returns the blocks of the given course that changed since the
+        structure version identified by from_version_guid.
+
+        Raises NotImplementedError if the store does not support versioned structures.
+        """
+        store = self._verify_modulestore_support(course_key, 'get_block_changes')
+        return store.get_block_changes(course_key, from_version_guid)
+
     def get_modulestore_type(self, course_id):
         """
         Returns a type which identifies which modulestore is servicing the given course_id.
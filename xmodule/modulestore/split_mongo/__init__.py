@@ -8,3 +8,24 @@ from collections import namedtuple
 from xmodule.util.keys import BlockKey
 
 CourseEnvelope = namedtuple('CourseEnvelope', 'course_key structure')
+
+# The blocks of a course that changed between two versions of its structure.
+#   changed: dict mapping the usage key of each changed block to the set of
+#       names of its fields that changed, or to None for newly added blocks.
+#       Fields of the block's asides are named '<aside_type>.<field_name>',
+#       and a change to the block it was copied from with copy_from_template
+#       is named ORIGINAL_USAGE_FIELD.
+#   removed: set of usage keys of the blocks that no longer exist.
+BlockChanges = namedtuple('BlockChanges', 'changed removed')
+
+# The name under which BlockChanges reports a change to the original usage
+# of a block, which is kept in its edit info rather than in a field.
+ORIGINAL_USAGE_FIELD = 'original_usage'
+
+
+def aside_field_name(aside_type, field_name):
+    """
+    Returns the name under which BlockChanges reports a change to the
+    given field of the given aside.
+    """
+    return f'{aside_type}.{field_name}'
@@ -8,12 +8,15 @@ import logging
 import math
 import pickle
 import re
+import threading
 import zlib
+from collections import OrderedDict
 from contextlib import contextmanager
 from time import time
 from zoneinfo import ZoneInfo
 
 from ccx_keys.locator import CCXLocator
+from django.conf import settings
 from django.core.cache import caches, InvalidCacheBackendError
 from django.db.transaction import TransactionManagementError
 import pymongo
@@ -27,7 +30,7 @@ from xmodule.exceptions import HeartbeatFailure
 from xmodule.modulestore import BlockData
 from xmodule.modulestore.split_mongo import BlockKey
 from xmodule.mongo_utils import connect_to_mongodb, create_collection_index
-from openedx.core.lib.cache_utils import request_cached
+from openedx.core.lib.cache_utils import get_cross_process_cache, request_cached
 
 log = logging.getLogger(__name__)
 
@@ -191,13 +194,92 @@ def structure_to_mongo(structure, course_context=None):
         return new_structure
 
 
+class LocalStructureCache:
+    """
+    A thread-safe, process-local LRU cache of pickled course structures,
+    bounded by the total size of the pickled data.
+
+    Structures are keyed by their ObjectId and never change once written,
+    so entries never need to be invalidated.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Return the pickled structure data for key, or None if it isn't cached."""
+        with self._lock:
+            pickled_data = self._entries.get(key)
+            if pickled_data is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return pickled_data
+
+    def set(self, key, pickled_data):
+        """Cache the pickled structure data for key, evicting the least recently used entries."""
+        if len(pickled_data) > self.max_bytes:
+            return
+
+        with self._lock:
+            previous_data = self._entries.pop(key, None)
+            if previous_data is not None:
+                self.size -= len(previous_data)
+
+            self._entries[key] = pickled_data
+            self.size += len(pickled_data)
+
+            while self.size > self.max_bytes:
+                _, evicted_data = self._entries.popitem(last=False)
+                self.size -= len(evicted_data)
+
+    def delete(self, key):
+        """Remove the entry for key, if any."""
+        with self._lock:
+            pickled_data = self._entries.pop(key, None)
+            if pickled_data is not None:
+                self.size -= len(pickled_data)
+
+
+_local_structure_cache = None
+
+
+def get_local_structure_cache():
+    """
+    Return the process-local structure cache, or None if it is disabled
+    by the COURSE_STRUCTURE_CACHE_LOCAL_MAX_BYTES setting.
+    """
+    global _local_structure_cache  # pylint: disable=global-statement
+
+    max_bytes = getattr(settings, 'COURSE_STRUCTURE_CACHE_LOCAL_MAX_BYTES', 0)
+    if not max_bytes:
+        return None
+    if _local_structure_cache is None or _local_structure_cache.max_bytes != max_bytes:
+        _local_structure_cache = LocalStructureCache(max_bytes)
+    return _local_structure_cache
+
+
 class CourseStructureCache:
     """
     Wrapper around django cache object to cache course structure objects.
     The course structures are pickled and compressed when cached.
 
-    If the 'course_structure_cache' doesn't exist, then don't do anything for
-    for set and get.
+    If enabled, a process-local LRU cache of the pickled (but uncompressed)
+    structures is checked first, to avoid the round trip and decompression.
+    Next, if enabled, the pickled structures that are shared by all processes
+    on the host through memory-mapped files are checked.
+
+    If none of the 'course_structure_cache', the local cache and the shared
+    cache exist, then don't do anything for set and get.
     """
 
     def __init__(self):
@@ -206,43 +288,109 @@ class CourseStructureCache:
             self.cache = get_cache('course_structure_cache')
         except InvalidCacheBackendError:
             pass
+        self.local_cache = get_local_structure_cache()
+        self.shared_cache = get_cross_process_cache('course_structures')
+
+    @property
+    def enabled(self):
+        """Whether any of the caches exist."""
+        return self.cache is not None or self.local_cache is not None or self.shared_cache is not None
 
     def get(self, key, course_context=None):
         """Pull the compressed, pickled struct data from cache and deserialize."""
-        if self.cache is None:
+        if not self.enabled:
             return None
 
         with TIMER.timer("CourseStructureCache.get", course_context) as tagger:
             try:
-                compressed_pickled_data = self.cache.get(key)
-                tagger.tag(from_cache=str(compressed_pickled_data is not None).lower())
+                pickled_data = self._get_from_local_cache(key, tagger)
+                if pickled_data is None:
+                    pickled_data = self._get_from_shared_cache(key, tagger)
+
+                if pickled_data is None:
+                    if self.cache is None:
+                        return None
+
+                    compressed_pickled_data = self.cache.get(key)
+                    tagger.tag(from_cache=str(compressed_pickled_data is not None).lower())
+
+                    if compressed_pickled_data is None:
+                        # Always log cache misses, because they are unexpected
+                        tagger.sample_rate = 1
+                        return None
 
-                if compressed_pickled_data is None:
-                    # Always log cache misses, because they are unexpected
-                    tagger.sample_rate = 1
-                    return None
+                    tagger.measure('compressed_size', len(compressed_pickled_data))
 
-                tagger.measure('compressed_size', len(compressed_pickled_data))
+                    pickled_data = zlib.decompress(compressed_pickled_data)
+                    tagger.measure('uncompressed_size', len(pickled_data))
 
-                pickled_data = zlib.decompress(compressed_pickled_data)
-                tagger.measure('uncompressed_size', len(pickled_data))
+                    self._set_in_host_caches(key, pickled_data)
 
                 return pickle.loads(pickled_data, encoding='latin-1')
             except Exception:  # lint-amnesty, pylint: disable=broad-except
-                # The cached data is corrupt in some way, get rid of it.
-                log.warning("CourseStructureCache: Bad data in cache for %s", course_context)
-                self.cache.delete(key)
+                self._discard(key, course_context)
                 return None
 
+    def get_many(self, keys, course_context=None):
+        """
+        Pull the struct data for all of the given keys from cache, using a single
+        round trip to the django cache for the keys missing from the local and
+        shared caches.
+
+        Returns a dict of key to structure for the keys that were found.
+        """
+        structures = {}
+        if not self.enabled:
+            return structures
+
+        with TIMER.timer("CourseStructureCache.get_many", course_context) as tagger:
+            tagger.measure('requested_keys', len(keys))
+            pickled_data_by_key = {}
+            for key in keys:
+                pickled_data = self.local_cache.get(key) if self.local_cache is not None else None
+                if pickled_data is None and self.shared_cache is not None:
+                    pickled_data = self.shared_cache.get(key)
+                if pickled_data is not None:
+                    pickled_data_by_key[key] = pickled_data
+            tagger.measure('host_cache_hits', len(pickled_data_by_key))
+
+            remaining_keys = [key for key in keys if key not in pickled_data_by_key]
+            if remaining_keys and self.cache is not None:
+                for key, compressed_pickled_data in self.cache.get_many(remaining_keys).items():
+                    try:
+                        pickled_data = zlib.decompress(compressed_pickled_data)
+                    except Exception:  # lint-amnesty, pylint: disable=broad-except
+                        self._discard(key, course_context)
+                        continue
+                    self._set_in_host_caches(key, pickled_data)
+                    pickled_data_by_key[key] = pickled_data
+
+            for key, pickled_data in pickled_data_by_key.items():
+                try:
+                    structures[key] = pickle.loads(pickled_data, encoding='latin-1')
+                except Exception:  # lint-amnesty, pylint: disable=broad-except
+                    self._discard(key, course_context)
+
+            tagger.measure('hits', len(structures))
+            if len(structures) < len(keys):
+                # Always log cache misses, because they are unexpected
+                tagger.sample_rate = 1
+        return structures
+
     def set(self, key, structure, course_context=None):
         """Given a structure, will pickle, compress, and write to cache."""
-        if self.cache is None:
+        if not self.enabled:
             return None
 
         with TIMER.timer("CourseStructureCache.set", course_context) as tagger:
             pickled_data = pickle.dumps(structure, 4)  # Protocol can't be incremented until cache is cleared
             tagger.measure('uncompressed_size', len(pickled_data))
 
+            self._set_in_host_caches(key, pickled_data)
+
+            if self.cache is None:
+                return None
+
             # 1 = Fastest (slightly larger results)
             compressed_pickled_data = zlib.compress(pickled_data, 1)
             data_size = len(compressed_pickled_data)
@@ -261,11 +409,64 @@ class CourseStructureCache:
                 #   the memcached client failed to store value in course structure cache.
                 monitoring.set_custom_attribute('split_mongo_compressed_size_in_mbs', chunk_size_in_mbs)
 
+    def _get_from_local_cache(self, key, tagger):
+        """
+        Return the pickled struct data from the local cache, or None, recording
+        the hit or miss and the local cache's size with the given tagger.
+        """
+        if self.local_cache is None:
+            return None
+
+        pickled_data = self.local_cache.get(key)
+        tagger.tag(from_local_cache=str(pickled_data is not None).lower())
+        tagger.measure('local_cache_size', self.local_cache.size)
+        tagger.measure('local_cache_entries', len(self.local_cache))
+        if pickled_data is not None:
+            tagger.measure('uncompressed_size', len(pickled_data))
+        return pickled_data
+
+    def _get_from_shared_cache(self, key, tagger):
+        """
+        Return a read-only mapping of the pickled struct data from the shared
+        cache, or None, recording the hit or miss with the given tagger.
+        """
+        if self.shared_cache is None:
+            return None
+
+        pickled_data = self.shared_cache.get(key)
+        tagger.tag(from_shared_cache=str(pickled_data is not None).lower())
+        if pickled_data is not None:
+            tagger.measure('uncompressed_size', len(pickled_data))
+        return pickled_data
+
+    def _set_in_host_caches(self, key, pickled_data):
+        """
+        Write the pickled struct data to the local and shared caches, if enabled.
+        """
+        if self.local_cache is not None:
+            self.local_cache.set(key, pickled_data)
+        if self.shared_cache is not None:
+            self.shared_cache.set(key, pickled_data)
+
+    def _discard(self, key, course_context):
+        """
+        The cached data for key is corrupt in some way, get rid of it.
+        """
+        log.warning("CourseStructureCache: Bad data in cache for %s", course_context)
+        if self.local_cache is not None:
+            self.local_cache.delete(key)
+        if self.shared_cache is not None:
+            self.shared_cache.delete(key)
+        if self.cache is not None:
+            self.cache.delete(key)
+
 
 class MongoPersistenceBackend:
     """
     Segregation of pymongo functions from the data modeling mechanisms for split modulestore.
     """
+    # The course index fields that identify a course.
+    COURSE_INDEX_KEY_ATTRS = ('org', 'course', 'run')
 
     def __init__(
         self, db, collection, host, port=27017, tz_aware=True, user=None, password=None,
@@ -364,6 +565,44 @@ class MongoPersistenceBackend:
 
             return structure
 
+    def get_structures(self, keys, course_context=None):
+        """
+        Get the structures from the persistence mechanism whose ids are the given keys.
+
+        Cached versions of the structures are used where available; the remaining
+        structures are fetched in a single query and added to the cache.
+
+        Returns a dict of id to structure. Ids with no structure are omitted.
+        """
+        with TIMER.timer("get_structures", course_context) as tagger_get_structures:
+            keys = list(dict.fromkeys(keys))
+            tagger_get_structures.measure("requested_ids", len(keys))
+            cache = CourseStructureCache()
+
+            structures = cache.get_many(keys, course_context)
+            tagger_get_structures.measure("from_cache", len(structures))
+            missing_keys = [key for key in keys if key not in structures]
+            if missing_keys:
+                # Always log cache misses, because they are unexpected
+                tagger_get_structures.sample_rate = 1
+
+                with TIMER.timer("get_structures.find", course_context) as tagger_find:
+                    tagger_find.measure("requested_ids", len(missing_keys))
+                    docs = list(self.structures.find({'_id': {'$in': missing_keys}}))
+                    tagger_find.measure("structures", len(docs))
+                    for doc in docs:
+                        structure = structure_from_mongo(doc, course_context)
+                        cache.set(structure['_id'], structure, course_context)
+                        structures[structure['_id']] = structure
+
+                if len(structures) < len(keys):
+                    log.warning(
+                        "docs were missing when attempting to retrieve structures for keys %s",
+                        ', '.join(str(key) for key in keys if key not in structures)
+                    )
+
+            return structures
+
     def find_structures_by_id(self, ids, course_context=None):
         """
         Return all structures that specified in ``ids``.
@@ -446,40 +685,37 @@ class MongoPersistenceBackend:
         """
         with TIMER.timer("find_matching_course_indexes", course_context):
             query = {}
-            if course_keys:
-                courses_queries = self._generate_query_from_course_keys(branch, course_keys)
-                query['$or'] = courses_queries
-            else:
-                if branch is not None:
-                    query[f'versions.{branch}'] = {'$exists': True}
-
-                if search_targets:
-                    for key, value in search_targets.items():
-                        query[f'search_targets.{key}'] = value
+            if branch is not None:
+                query[f'versions.{branch}'] = {'$exists': True}
 
-                if org_target:
-                    query['org'] = org_target
+            if course_keys:
+                # Match each attribute of the keys with $in, which the index on
+                # (org, course, run) serves directly, rather than with an $or of
+                # one match per course, then drop the combinations that weren't
+                # requested.
+                requested_keys = {self._get_course_index_key(course_key) for course_key in course_keys}
+                for position, key_attr in enumerate(self.COURSE_INDEX_KEY_ATTRS):
+                    query[key_attr] = {'$in': sorted({key[position] for key in requested_keys})}
+                return [
+                    course_index for course_index in self.course_index.find(query)
+                    if tuple(course_index[key_attr] for key_attr in self.COURSE_INDEX_KEY_ATTRS) in requested_keys
+                ]
+
+            if search_targets:
+                for key, value in search_targets.items():
+                    query[f'search_targets.{key}'] = value
+
+            if org_target:
+                query['org'] = org_target
 
             return self.course_index.find(query)
 
-    def _generate_query_from_course_keys(self, branch, course_keys):
+    @classmethod
+    def _get_course_index_key(cls, course_key):
         """
-        Generate query for courses using course keys
+        Returns the values of the course index fields that identify the given course.
         """
-        courses_queries = []
-        query = {}
-        if branch:
-            query = {f'versions.{branch}': {'$exists': True}}
-
-        for course_key in course_keys:
-            course_query = {
-                key_attr: getattr(course_key, key_attr)
-                for key_attr in ('org', 'course', 'run')
-            }
-            course_query.update(query)
-            courses_queries.append(course_query)
-
-        return courses_queries
+        return tuple(getattr(course_key, key_attr) for key_attr in cls.COURSE_INDEX_KEY_ATTRS)
 
     def insert_course_index(self, course_index, course_context=None):
         """
@@ -98,7 +98,12 @@ from xmodule.modulestore.exceptions import (
     MultipleLibraryBlocksFound,
     VersionConflictError
 )
-from xmodule.modulestore.split_mongo import CourseEnvelope
+from xmodule.modulestore.split_mongo import (
+    ORIGINAL_USAGE_FIELD,
+    BlockChanges,
+    CourseEnvelope,
+    aside_field_name,
+)
 from xmodule.modulestore.split_mongo.mongo_connection import DuplicateKeyError, DjangoFlexPersistenceBackend
 from xmodule.modulestore.store_utilities import DETACHED_XBLOCK_TYPES
 from xmodule.partitions.partitions_service import PartitionService
@@ -623,6 +628,30 @@ class SplitBulkWriteMixin(BulkOperationsMixin):
         structures.extend(self.db_connection.find_structures_by_id(list(ids)))
         return structures
 
+    def get_structures_by_id(self, ids):
+        """
+        Return a dict of id to structure for all structures specified in ``ids``.
+
+        Structures in an active bulk operation are preferred. The rest are read
+        through the structure cache, with all cache misses fetched in a single query.
+
+        Arguments:
+            ids (list): A list of structure ids
+        """
+        structures = {}
+        ids = set(ids)
+
+        for _, record in self._active_records:
+            for structure in record.structures.values():
+                structure_id = structure.get('_id') if structure is not None else None
+                if structure_id in ids:
+                    ids.remove(structure_id)
+                    structures[structure_id] = structure
+
+        if ids:
+            structures.update(self.db_connection.get_structures(list(ids)))
+        return structures
+
 
 class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
     """
@@ -967,6 +996,47 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         # get the blocks for each course index (s/b the root)
         return self._get_structures_for_branch_and_locator(branch, self._create_course_locator, **kwargs)
 
+    def get_course_structures(self, course_keys, branch):
+        """
+        Returns the structures at the head of the given branch of each of the given
+        courses, as a dict of course key to structure.
+
+        Rather than looking up each course with _lookup_course, all of the course
+        indexes are found with a single query and all of the structures that are not
+        in the structure cache are fetched with a single query.
+
+        Course keys which do not identify a course in this modulestore, or whose
+        course does not have the given branch, are omitted from the result.
+
+        :param course_keys: the CourseLocators or LibraryLocators of the courses
+        :param branch: the branch for which to return structures.
+        """
+        keys_by_course = defaultdict(list)
+        for course_key in course_keys:
+            if not isinstance(course_key, (CourseLocator, LibraryLocator)) or course_key.deprecated:
+                continue
+            if course_key.org and get_library_or_course_attribute(course_key) and course_key.run:
+                keys_by_course[
+                    (course_key.org, get_library_or_course_attribute(course_key), course_key.run)
+                ].append(course_key)
+        if not keys_by_course:
+            return {}
+
+        # The indexes are matched on their course ids, which carry no branch or version.
+        version_guids, id_version_map = self.collect_ids_from_matching_indexes(
+            branch,
+            course_keys=[keys[0].replace(branch=None, version_guid=None) for keys in keys_by_course.values()],
+        )
+        if not version_guids:
+            return {}
+
+        result = {}
+        for version_guid, structure in self.get_structures_by_id(version_guids).items():
+            for course_index in id_version_map[version_guid]:
+                for course_key in keys_by_course[(course_index['org'], course_index['course'], course_index['run'])]:
+                    result[course_key] = structure
+        return result
+
     def get_course_summaries(self, branch, **kwargs):
         """
         Returns a list of `CourseSummary` which matching any given qualifiers.
@@ -1484,6 +1554,104 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             return usage_key, block.edit_info.original_usage_version
         return None, None
 
+    def get_block_changes(self, course_key, from_version_guid):
+        """
+        Compares the current structure of the given course branch with the
+        structure identified by from_version_guid, using the blocks' edit info
+        to skip blocks that were not changed.
+
+        Args:
+            course_key (CourseLocator): the course branch whose current structure is compared
+            from_version_guid (str or ObjectId): the id of the earlier structure
+
+        Returns:
+            BlockChanges
+
+        Raises:
+            ItemNotFoundError if either structure does not exist.
+        """
+        course_entry = self._lookup_course(course_key)
+        from_structure = self.get_structure(course_key, course_key.as_object_id(from_version_guid))
+        if from_structure is None:
+            raise ItemNotFoundError(f'Structure: {from_version_guid}')
+
+        from_blocks = from_structure['blocks']
+        to_blocks = course_entry.structure['blocks']
+
+        usage_course_key = course_key.replace(branch=None, version_guid=None)
+
+        def make_usage_key(block_key):
+            return usage_course_key.make_usage_key(block_key.type, block_key.id)
+
+        changed = {}
+        for block_key, block in to_blocks.items():
+            from_block = from_blocks.get(block_key)
+            if from_block is None:
+                changed[make_usage_key(block_key)] = None
+            elif self._get_block_source_version(from_block) != self._get_block_source_version(block):
+                changed_fields = self._get_changed_block_fields(course_key, from_block, block)
+                if changed_fields:
+                    changed[make_usage_key(block_key)] = changed_fields
+
+        removed = {make_usage_key(block_key) for block_key in from_blocks if block_key not in to_blocks}
+        return BlockChanges(changed, removed)
+
+    @staticmethod
+    def _get_block_source_version(block):
+        """
+        Returns the id of the structure in which the given block's field
+        values were originally set. Publishing copies blocks into a new
+        structure, so their source_version is preferred over their
+        update_version.
+        """
+        return block.edit_info.source_version or block.edit_info.update_version
+
+    def _get_changed_block_fields(self, course_key, from_block, to_block):
+        """
+        Returns the set of names of the fields whose values differ between
+        the two given versions of a block, including its content fields,
+        the fields of its asides and its original usage.
+        """
+        changed_fields = set()
+        for from_fields, to_fields in (
+            (from_block.fields, to_block.fields),
+            (from_block.defaults, to_block.defaults),
+            (self._get_aside_fields(from_block), self._get_aside_fields(to_block)),
+        ):
+            changed_fields.update(
+                field_name for field_name in set(from_fields) | set(to_fields)
+                if from_fields.get(field_name) != to_fields.get(field_name)
+            )
+
+        if from_block.definition != to_block.definition:
+            from_definition = self.get_definition(course_key, from_block.definition) or {}
+            to_definition = self.get_definition(course_key, to_block.definition) or {}
+            from_content = from_definition.get('fields', {})
+            to_content = to_definition.get('fields', {})
+            changed_fields.update(
+                field_name for field_name in set(from_content) | set(to_content)
+                if from_content.get(field_name) != to_content.get(field_name)
+            )
+
+        if (
+            (from_block.edit_info.original_usage, from_block.edit_info.original_usage_version) !=
+            (to_block.edit_info.original_usage, to_block.edit_info.original_usage_version)
+        ):
+            changed_fields.add(ORIGINAL_USAGE_FIELD)
+        return changed_fields
+
+    @staticmethod
+    def _get_aside_fields(block):
+        """
+        Returns a dict of the values of the fields of the given block's
+        asides, keyed by the names BlockChanges reports them under.
+        """
+        return {
+            aside_field_name(aside['aside_type'], field_name): value
+            for aside in block.get_asides()
+            for field_name, value in aside.get('fields', {}).items()
+        }
+
     def create_definition_from_data(self, course_key, new_def_data, category, user_id):
         """
         Pull the definition fields out of block and save to the db as a new definition
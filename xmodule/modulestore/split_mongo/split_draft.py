@@ -105,6 +105,19 @@ class DraftVersioningModuleStore(SplitMongoModuleStore, ModuleStoreDraftAndPubli
         else:
             raise InsufficientSpecificationError()
 
+    def get_course_structures(self, course_keys, **kwargs):  # lint-amnesty, pylint: disable=arguments-differ
+        """
+        Returns the structures of the given courses on the Draft or Published branch
+        depending on the branch setting.
+        """
+        branch_setting = self.get_branch_setting()
+        if branch_setting == ModuleStoreEnum.Branch.draft_preferred:
+            return super().get_course_structures(course_keys, ModuleStoreEnum.BranchName.draft)
+        elif branch_setting == ModuleStoreEnum.Branch.published_only:
+            return super().get_course_structures(course_keys, ModuleStoreEnum.BranchName.published)
+        else:
+            raise InsufficientSpecificationError()
+
     def _auto_publish_no_children(self, location, category, user_id, **kwargs):
         """
         Publishes item if the category is DIRECT_ONLY. This assumes another method has checked that
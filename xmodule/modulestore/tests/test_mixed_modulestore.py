@@ -42,7 +42,7 @@ from xblock.test.tools import TestRuntime
 from openedx.core.lib.tests import attr
 from xmodule.contentstore.content import StaticContent
 from xmodule.exceptions import InvalidVersionError
-from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore import BlockData, ModuleStoreEnum
 from xmodule.modulestore.draft_and_published import DIRECT_ONLY_CATEGORIES, UnsupportedRevisionError
 from xmodule.modulestore.edit_info import EditInfoMixin
 from xmodule.modulestore.exceptions import (
@@ -53,6 +53,7 @@ from xmodule.modulestore.exceptions import (
 from xmodule.modulestore.inheritance import InheritanceMixin
 from xmodule.modulestore.mixed import MixedModuleStore
 from xmodule.modulestore.search import navigation_index, path_to_location
+from xmodule.modulestore.split_mongo import ORIGINAL_USAGE_FIELD, aside_field_name
 from xmodule.modulestore.split_mongo.split import SplitMongoModuleStore
 from xmodule.modulestore.store_utilities import DETACHED_XBLOCK_TYPES
 from xmodule.modulestore.tests.factories import check_exact_number_of_calls, check_mongo_calls
@@ -1030,6 +1031,53 @@ class TestMixedModuleStore(CommonMixedModuleStoreSetup):
         assert not self._has_changes(locations['grandparent'])
         assert not self._has_changes(locations['parent'])
 
+    @ddt.data(ModuleStoreEnum.Type.split)
+    def test_get_block_changes(self, default_ms):
+        """
+        Tests that get_block_changes() returns only the blocks and fields changed by a publish.
+        """
+        locations = self.setup_has_changes(default_ms)
+        published_course_key = self.course.id.for_branch(ModuleStoreEnum.BranchName.published)
+        with self.store.branch_setting(ModuleStoreEnum.Branch.published_only, self.course.id):
+            from_version = self.store.get_course(self.course.id).course_version
+
+        child = self.store.get_item(locations['child'])
+        child.display_name = 'Changed Display Name'
+        self.store.update_item(child, self.user_id)
+        self.store.publish(locations['child'], self.user_id)
+
+        block_changes = self.store.get_block_changes(published_course_key, from_version)
+        assert block_changes.changed == {locations['child']: {'display_name'}}
+        assert block_changes.removed == set()
+
+        self.store.delete_item(locations['child_sibling'], self.user_id, revision=ModuleStoreEnum.RevisionOption.all)
+        block_changes = self.store.get_block_changes(published_course_key, from_version)
+        assert block_changes.changed[locations['parent']] == {'children'}
+        assert block_changes.removed == {locations['child_sibling']}
+
+    @ddt.data(ModuleStoreEnum.Type.split)
+    def test_get_block_changes_asides_and_original_usage(self, default_ms):
+        """
+        Tests that get_block_changes() reports changes to a block's asides and original usage.
+        """
+        self.initdb(default_ms)
+        split_store = self.store._get_modulestore_by_type(default_ms)  # pylint: disable=protected-access
+        from_block = BlockData(
+            fields={'display_name': 'Name'},
+            block_type='html',
+            asides=[{'aside_type': 'test_aside', 'fields': {'data_field': 'old'}}],
+        )
+        to_block = BlockData(
+            fields={'display_name': 'Name'},
+            block_type='html',
+            asides=[{'aside_type': 'test_aside', 'fields': {'data_field': 'new'}}],
+            edit_info={'original_usage': 'block-v1:org+lib+run+type@html+block@1', 'original_usage_version': 'v1'},
+        )
+        changed_fields = split_store._get_changed_block_fields(  # pylint: disable=protected-access
+            self.course_locations[self.MONGO_COURSEID].course_key, from_block, to_block,
+        )
+        assert changed_fields == {aside_field_name('test_aside', 'data_field'), ORIGINAL_USAGE_FIELD}
+
     @ddt.data(ModuleStoreEnum.Type.split)
     def test_has_changes_add_remove_child(self, default_ms):
         """
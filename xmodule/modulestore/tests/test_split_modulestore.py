@@ -9,12 +9,13 @@ import random
 import re
 import unittest
 from importlib import import_module
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 
 import pytest
 import ddt
 from ccx_keys.locator import CCXBlockUsageLocator
 from django.core.cache import InvalidCacheBackendError, caches
+from django.test.utils import override_settings
 from opaque_keys.edx.locator import BlockUsageLocator, CourseKey, CourseLocator, LocalId
 from xblock.fields import Date, Reference, ReferenceList, ReferenceValueDict, Timedelta
 
@@ -840,6 +841,100 @@ class TestCourseStructureCache(CacheIsolationMixin, SplitModuleTest):
         # now make sure that you get the same structure
         assert cached_structure == not_cached_structure
 
+    @override_settings(COURSE_STRUCTURE_CACHE_LOCAL_MAX_BYTES=10 * 1024 * 1024)
+    @patch('xmodule.modulestore.split_mongo.mongo_connection._local_structure_cache', None)
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
+    def test_course_structure_local_cache(self, mock_get_cache):
+        mock_get_cache.return_value = Mock(wraps=caches['default'])
+
+        with check_mongo_calls(1):
+            not_cached_structure = self._get_structure(self.new_course)
+
+        # the local cache is checked first, so the django cache isn't hit again
+        mock_get_cache.return_value.get.reset_mock()
+        with check_mongo_calls(0):
+            cached_structure = self._get_structure(self.new_course)
+        mock_get_cache.return_value.get.assert_not_called()
+        assert cached_structure == not_cached_structure
+
+        # each hit returns a separate copy, which callers are free to mutate
+        assert cached_structure is not self._get_structure(self.new_course)
+
+    @override_settings(COURSE_STRUCTURE_CACHE_LOCAL_MAX_BYTES=10 * 1024 * 1024)
+    @patch('xmodule.modulestore.split_mongo.mongo_connection._local_structure_cache', None)
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
+    def test_course_structure_local_cache_no_cache_configured(self, mock_get_cache):
+        mock_get_cache.side_effect = InvalidCacheBackendError
+
+        with check_mongo_calls(1):
+            not_cached_structure = self._get_structure(self.new_course)
+
+        # the local cache works without the django cache
+        with check_mongo_calls(0):
+            cached_structure = self._get_structure(self.new_course)
+
+        assert cached_structure == not_cached_structure
+
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
+    def test_course_structure_cross_process_cache(self, mock_get_cache):
+        mock_get_cache.side_effect = InvalidCacheBackendError
+
+        with override_settings(CROSS_PROCESS_CACHE_DIR=tempdir.mkdtemp_clean()):
+            with check_mongo_calls(1):
+                not_cached_structure = self._get_structure(self.new_course)
+
+            # the shared cache works without the django cache
+            with check_mongo_calls(0):
+                cached_structure = self._get_structure(self.new_course)
+            assert cached_structure == not_cached_structure
+
+            # corrupt shared data is discarded
+            CourseStructureCache().shared_cache.set(self.new_course.id.version_guid, b"bad_data")
+            with check_mongo_calls(1):
+                not_corrupt_structure = self._get_structure(self.new_course)
+            assert not_corrupt_structure == not_cached_structure
+
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
+    def test_get_course_structures(self, mock_get_cache):
+        enabled_cache = caches['default']
+        mock_get_cache.return_value = enabled_cache
+        other_course = modulestore().create_course(
+            'org', 'other_course', 'test_run', self.user, BRANCH_NAME_DRAFT,
+        )
+        missing_course_key = CourseLocator('org', 'missing_course', 'test_run')
+        course_keys = [self.new_course.id, other_course.id, missing_course_key]
+
+        # the structures of all courses are fetched with a single query
+        with check_mongo_calls(1):
+            structures = modulestore().get_course_structures(course_keys, BRANCH_NAME_DRAFT)
+        assert set(structures) == {self.new_course.id, other_course.id}
+        assert structures[self.new_course.id] == self._get_structure(self.new_course)
+        assert structures[other_course.id] == self._get_structure(other_course)
+
+        # when cache is warmed, no structures are fetched
+        with check_mongo_calls(0):
+            cached_structures = modulestore().get_course_structures(course_keys, BRANCH_NAME_DRAFT)
+        assert cached_structures == structures
+
+        # only the courses with the given branch are returned
+        with check_mongo_calls(0):
+            assert not modulestore().get_course_structures(course_keys, BRANCH_NAME_PUBLISHED)
+
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
+    def test_get_structures_corrupt_cache(self, mock_get_cache):
+        enabled_cache = caches['default']
+        mock_get_cache.return_value = enabled_cache
+        structure_id = self.new_course.id.version_guid
+        enabled_cache.set(structure_id, b"bad_data")
+
+        # If data is corrupted, get it from mongo again.
+        with check_mongo_calls(1):
+            structures = modulestore().db_connection.get_structures([structure_id])
+        assert structures[structure_id] == self._get_structure(self.new_course)
+
+        with check_mongo_calls(0):
+            modulestore().db_connection.get_structures([structure_id])
+
     @patch('xmodule.modulestore.split_mongo.mongo_connection.monitoring.set_custom_attribute')
     @patch('django.core.cache.cache.set')
     @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
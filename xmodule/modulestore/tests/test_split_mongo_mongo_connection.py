@@ -8,7 +8,7 @@ import pytest
 from pymongo.errors import ConnectionFailure
 
 from xmodule.exceptions import HeartbeatFailure
-from xmodule.modulestore.split_mongo.mongo_connection import MongoPersistenceBackend
+from xmodule.modulestore.split_mongo.mongo_connection import LocalStructureCache, MongoPersistenceBackend
 
 
 class TestHeartbeatFailureException(unittest.TestCase):
@@ -23,3 +23,42 @@ class TestHeartbeatFailureException(unittest.TestCase):
 
         with pytest.raises(HeartbeatFailure):
             useless_conn.heartbeat()
+
+
+class TestLocalStructureCache(unittest.TestCase):
+    """ Test the size-bounded LRU behavior of the process-local structure cache """
+
+    def test_get_and_set(self):
+        cache = LocalStructureCache(max_bytes=10)
+        assert cache.get('a') is None
+        cache.set('a', b'1234')
+        assert cache.get('a') == b'1234'
+        assert (cache.hits, cache.misses) == (1, 1)
+        assert cache.size == 4
+
+    def test_evicts_least_recently_used(self):
+        cache = LocalStructureCache(max_bytes=10)
+        cache.set('a', b'1234')
+        cache.set('b', b'1234')
+        cache.get('a')
+        cache.set('c', b'1234')
+        assert cache.get('b') is None
+        assert cache.get('a') == b'1234'
+        assert cache.get('c') == b'1234'
+        assert cache.size == 8
+
+    def test_replace_and_delete(self):
+        cache = LocalStructureCache(max_bytes=10)
+        cache.set('a', b'1234')
+        cache.set('a', b'12')
+        assert cache.size == 2
+        cache.delete('a')
+        cache.delete('a')
+        assert cache.get('a') is None
+        assert cache.size == 0
+
+    def test_too_large_not_cached(self):
+        cache = LocalStructureCache(max_bytes=10)
+        cache.set('a', b'12345678901')
+        assert cache.get('a') is None
+        assert len(cache) == 0
@@ -31,6 +31,7 @@ from xblock.scorable import Score
 from lms.djangoapps.courseware.user_state_client import XBlockUserState
 from openedx.core.djangolib.testing.utils import skip_unless_lms
 from xmodule.capa import responsetypes
+from xmodule.capa.capa_problem import LoncapaProblem
 from xmodule.capa.correctmap import CorrectMap
 from xmodule.capa.responsetypes import (
     LoncapaProblemError,
@@ -4208,3 +4209,16 @@ class ProblemBlockReportGenerationTest(unittest.TestCase):
                 )
             )
             assert "Python Error: No Answer Retrieved" in list(report_data[0][1].values())
+
+    def test_generate_report_data_reuses_problem_per_seed(self):
+        """Verify a problem is built once for all of the learners with the same seed."""
+        block = self._get_block()
+        user_states = list(self._mock_user_state_generator(user_count=3, response_count=2))
+        user_states[2].state["seed"] = 2
+        with patch("xmodule.capa_block.LoncapaProblem", wraps=LoncapaProblem) as mock_loncapa_problem:
+            report_data = list(block.generate_report_data(iter(user_states)))
+        assert mock_loncapa_problem.call_count == 2
+        # Each learner's answers are reported, even when the problem was built for another learner.
+        assert [report["Answer"] for _, report in report_data] == [
+            f"user{uid}_answer_{aid}" for uid in range(3) for aid in range(2)
+        ]
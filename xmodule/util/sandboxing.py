@@ -1,5 +1,6 @@
 """Utilities for managing course code libraries and sandbox execution."""
 
+import hashlib
 import re
 
 from django.conf import settings
@@ -40,6 +41,18 @@ def can_execute_unsafe_code(course_id):
     return False
 
 
+class CodeLibraryZip(bytes):
+    """
+    The bytes of a course code library file, along with the md5 digest of its
+    contents, so that safe_exec can key its cache without hashing the file.
+    """
+
+    def __new__(cls, data, digest=None):
+        code_library = super().__new__(cls, data)
+        code_library.digest = digest or hashlib.md5(data).hexdigest()
+        return code_library
+
+
 def get_python_lib_zip(contentstore, context_key: LearningContextKey):
     """Return the bytes of the course code library file, if it exists."""
     if not isinstance(context_key, CourseKey):
@@ -50,7 +63,8 @@ def get_python_lib_zip(contentstore, context_key: LearningContextKey):
     asset_key = context_key.make_asset_key("asset", python_lib_filename)
     zip_lib = contentstore().find(asset_key, throw_on_not_found=False)
     if zip_lib is not None:
-        return zip_lib.data
+        # The contentstore records the md5 digest of each asset when it is saved.
+        return CodeLibraryZip(zip_lib.data, getattr(zip_lib, "content_digest", None))
 
     return None
 